@@ -61,7 +61,9 @@ class AllocationAttributeViewSet(
 
     def get_queryset(self):
         allocation_pk = self.kwargs.get("allocation_pk", None)
-        allocation_attributes = AllocationAttribute.objects.all()
+        allocation_attributes = AllocationAttribute.objects.select_related(
+            "allocation_attribute_type", "allocationattributeusage"
+        )
         if allocation_pk:
             allocation_attributes = allocation_attributes.filter(
                 allocation=allocation_pk
@@ -79,7 +81,11 @@ class AllocationViewSet(
     serializer_class = AllocationSerializer
 
     def get_queryset(self):
-        return Allocation.objects.order_by("id")
+        return (
+            Allocation.objects.select_related("project", "status")
+            .prefetch_related("resources")
+            .order_by("id")
+        )
 
 
 class AllocationUserAttributeViewSet(
@@ -93,7 +99,9 @@ class AllocationUserAttributeViewSet(
 
     def get_queryset(self):
         allocation_user_pk = self.kwargs.get("allocation_user_pk", None)
-        allocation_user_attributes = AllocationUserAttribute.objects.all()
+        allocation_user_attributes = AllocationUserAttribute.objects.select_related(
+            "allocation_attribute_type", "allocationuserattributeusage"
+        )
         if allocation_user_pk:
             allocation_user_attributes = allocation_user_attributes.filter(
                 allocation_user=allocation_user_pk
@@ -111,7 +119,9 @@ class AllocationUserViewSet(
     serializer_class = AllocationUserSerializer
 
     def get_queryset(self):
-        return AllocationUser.objects.order_by("id")
+        return AllocationUser.objects.select_related(
+            "allocation__project", "status", "user"
+        ).order_by("id")
 
 
 class HistoricalAllocationAttributeViewSet(
@@ -164,7 +174,12 @@ class ClusterAccessRequestViewSet(
     serializer_class = ClusterAccessRequestSerializer
 
     def get_queryset(self):
-        return ClusterAccessRequest.objects.order_by("id")
+        return ClusterAccessRequest.objects.select_related(
+            "allocation_user__allocation__project",
+            "allocation_user__status",
+            "allocation_user__user",
+            "status",
+        ).order_by("id")
 
     def perform_update(self, serializer):
         try:
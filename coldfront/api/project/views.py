@@ -103,7 +103,8 @@ class ProjectUserViewSet(
     serializer_class = ProjectUserSerializer
 
     def get_queryset(self):
+        project_users = ProjectUser.objects.select_related("role", "status")
         project_pk = self.kwargs.get("project_pk")
         if project_pk:
-            return ProjectUser.objects.filter(project_id=project_pk)
-        return ProjectUser.objects.order_by("id")
+            return project_users.filter(project_id=project_pk)
+        return project_users.order_by("id")
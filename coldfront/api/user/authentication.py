@@ -1,9 +1,14 @@
 from datetime import datetime, timezone
+import hashlib
+import threading
+import time
 
+from django.core.cache import cache
 from rest_framework import exceptions
 from rest_framework.authentication import TokenAuthentication
 
 from coldfront.core.user.models import ExpiringToken
+from coldfront.core.utils.common import import_from_settings
 
 
 class ExpiringTokenAuthentication(TokenAuthentication):
@@ -12,7 +17,7 @@ class ExpiringTokenAuthentication(TokenAuthentication):
     def authenticate_credentials(self, key):
         model = self.get_model()
         try:
-            token = model.objects.select_related("user").get(key=key)
+            token = _expiring_token_cache.get(key)
         except model.DoesNotExist:
             raise exceptions.AuthenticationFailed("Invalid token.")
 
@@ -25,6 +30,105 @@ class ExpiringTokenAuthentication(TokenAuthentication):
         return token.user, token
 
 
+class ExpiringTokenCache:
+    """A cache of ExpiringTokens, with their Users, keyed by token key,
+    so that authenticating an API request does not normally query the
+    database.
+
+    Tokens are cached in the shared Django cache for
+    TOKEN_AUTHENTICATION_CACHE_TIMEOUT seconds, and in each process for
+    TOKEN_AUTHENTICATION_LOCAL_CACHE_TIMEOUT seconds. When a token or
+    its User is saved or deleted, its entries are deleted from the
+    shared cache and this process (see coldfront.core.user.signals);
+    other processes may continue to use their own entries until they
+    time out. Only valid keys are cached.
+
+    Callers are still responsible for checking whether the token has
+    expired and whether its User is active.
+    """
+
+    CACHE_KEY_PREFIX = "expiring_token"
+
+    # The maximum number of tokens cached in each process. Entries that
+    # have timed out are pruned when the limit is reached.
+    MAX_LOCAL_ENTRIES = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Map each token key to a (deadline, token) pair, where deadline is
+        # a time.monotonic() value.
+        self._local = {}
+
+    def clear(self):
+        """Discard all tokens cached in this process."""
+        with self._lock:
+            self._local.clear()
+
+    def delete(self, keys):
+        """Discard the tokens with the given keys from this process and
+        the shared cache."""
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+        cache.delete_many([self._cache_key(key) for key in keys])
+
+    def get(self, key):
+        """Return the ExpiringToken with the given key, with its User
+        selected, from this process, the shared cache, or the database,
+        in that order. Raise ExpiringToken.DoesNotExist if there is no
+        such token."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        cache_key = self._cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            token = ExpiringToken.objects.select_related("user").get(key=key)
+            cache.set(
+                cache_key,
+                token,
+                timeout=import_from_settings("TOKEN_AUTHENTICATION_CACHE_TIMEOUT", 60),
+            )
+
+        local_timeout = import_from_settings(
+            "TOKEN_AUTHENTICATION_LOCAL_CACHE_TIMEOUT", 5
+        )
+        with self._lock:
+            if len(self._local) >= self.MAX_LOCAL_ENTRIES:
+                self._prune(now)
+            self._local[key] = (now + local_timeout, token)
+        return token
+
+    def _cache_key(self, key):
+        """Return the shared cache key for the given token key, which
+        is hashed so that keys are not stored in plain text."""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f"{self.CACHE_KEY_PREFIX}:{digest}"
+
+    def _prune(self, now):
+        """Discard entries in this process that have timed out, or all
+        entries if none have. The lock must be held."""
+        expired = [key for key, (deadline, _) in self._local.items() if deadline <= now]
+        for key in expired:
+            del self._local[key]
+        if not expired:
+            self._local.clear()
+
+
+_expiring_token_cache = ExpiringTokenCache()
+
+
+def invalidate_cached_tokens(keys):
+    """Discard the cached ExpiringTokens with the given keys, so that
+    subsequent requests authenticated by them reread them from the
+    database."""
+    _expiring_token_cache.delete(keys)
+
+
 def is_token_expired(token):
     """Return whether or not the given token is older than its
     expiration time."""
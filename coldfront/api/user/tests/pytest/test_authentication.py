@@ -0,0 +1,89 @@
+"""Tests for ExpiringTokenAuthentication and its token cache."""
+
+from datetime import UTC, datetime, timedelta
+
+from django.contrib.auth.models import User
+import pytest
+from rest_framework import exceptions
+
+from coldfront.api.user.authentication import (
+    ExpiringTokenAuthentication,
+    _expiring_token_cache,
+)
+from coldfront.core.user.models import ExpiringToken
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Clear the per-process token cache before and after the test."""
+    _expiring_token_cache.clear()
+    yield
+    _expiring_token_cache.clear()
+
+
+@pytest.fixture
+def token(db):
+    user = User.objects.create(username="token_user", email="token_user@example.com")
+    return ExpiringToken.objects.create(
+        user=user, expiration=datetime.now(UTC) + timedelta(hours=1)
+    )
+
+
+def authenticate(key):
+    return ExpiringTokenAuthentication().authenticate_credentials(key)
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestExpiringTokenAuthentication:
+    """Tests for ExpiringTokenAuthentication."""
+
+    def test_cached_after_first_lookup(
+        self, locmem_cache, token, django_assert_num_queries
+    ):
+        """Test that a token is only read from the database once."""
+        with django_assert_num_queries(1):
+            user, _ = authenticate(token.key)
+        assert user == token.user
+
+        with django_assert_num_queries(0):
+            authenticate(token.key)
+
+        # Another process would read the token from the shared cache.
+        _expiring_token_cache.clear()
+        with django_assert_num_queries(0):
+            authenticate(token.key)
+
+    def test_invalid_key_not_cached(self, locmem_cache, django_assert_num_queries):
+        """Test that invalid keys are rejected, and looked up each
+        time."""
+        for _ in range(2):
+            with django_assert_num_queries(1):
+                with pytest.raises(exceptions.AuthenticationFailed):
+                    authenticate("invalid")
+
+    def test_deleted_token_rejected(self, locmem_cache, token):
+        """Test that a cached token is rejected once deleted."""
+        key = token.key
+        authenticate(key)
+        token.delete()
+        with pytest.raises(exceptions.AuthenticationFailed, match="Invalid"):
+            authenticate(key)
+
+    def test_deactivated_user_rejected(self, locmem_cache, token):
+        """Test that a cached token is rejected once its User is
+        deactivated."""
+        authenticate(token.key)
+        token.user.is_active = False
+        token.user.save()
+        with pytest.raises(exceptions.AuthenticationFailed, match="inactive"):
+            authenticate(token.key)
+
+    def test_expired_token_rejected(self, locmem_cache, token):
+        """Test that expiration is checked against the cached token,
+        and that updating the expiration takes effect."""
+        authenticate(token.key)
+        token.expiration = datetime.now(UTC) - timedelta(seconds=1)
+        token.save()
+        with pytest.raises(exceptions.AuthenticationFailed, match="Expired"):
+            authenticate(token.key)
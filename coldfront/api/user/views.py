@@ -97,7 +97,7 @@ class UserViewSet(
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        queryset = User.objects.order_by("id")
+        queryset = User.objects.select_related("userprofile").order_by("id")
         usernames = self.request.query_params.getlist("username")
         if usernames:
             queryset = queryset.filter(username__in=usernames)
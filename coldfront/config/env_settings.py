@@ -389,6 +389,14 @@ FLAGS = {
             ),
         },
     ],
+    "REQUEST_HUB_LAZY_SECTIONS_ENABLED": [
+        {
+            "condition": "boolean",
+            "value": env.bool(
+                "DJANGO_FLAGS__REQUEST_HUB_LAZY_SECTIONS_ENABLED_VALUE", default=False
+            ),
+        },
+    ],
     "SECURE_DIRS_REQUESTABLE": [
         {
             "condition": "boolean",
@@ -458,6 +466,16 @@ if env.bool("HPCS__PLUGIN_DEPARTMENTS_ENABLED", default=False):
     DEPARTMENTS_DEPARTMENT_DATA_SOURCE = env(
         "HPCS__PLUGIN_DEPARTMENTS_DEPARTMENT_DATA_SOURCE"
     )
+    DEPARTMENTS_USER_BATCH_SIZE = env.int(
+        "HPCS__PLUGIN_DEPARTMENTS_USER_BATCH_SIZE", default=50
+    )
+    DEPARTMENTS_MAX_WORKERS = env.int("HPCS__PLUGIN_DEPARTMENTS_MAX_WORKERS", default=4)
+    DEPARTMENTS_CACHE_TIMEOUT = env.int(
+        "HPCS__PLUGIN_DEPARTMENTS_CACHE_TIMEOUT", default=3600
+    )
+    DEPARTMENTS_NEGATIVE_CACHE_TIMEOUT = env.int(
+        "HPCS__PLUGIN_DEPARTMENTS_NEGATIVE_CACHE_TIMEOUT", default=300
+    )
 
 # ------------------------------------------------------------------------------
 # Plugin: faculty_storage_allocations
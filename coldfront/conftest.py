@@ -163,6 +163,20 @@ def sign_user_access_agreement(db):
     return _sign
 
 
+@pytest.fixture
+def locmem_cache(settings):
+    """Use an in-memory cache, cleared before and after the test, and
+    return it."""
+    from django.core.cache import cache
+
+    from coldfront.core.utils.tests.test_base import LOCMEM_CACHES
+
+    settings.CACHES = LOCMEM_CACHES
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
 @pytest.fixture
 def password():
     """Return a standard test password.
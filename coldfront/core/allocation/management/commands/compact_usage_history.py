@@ -0,0 +1,91 @@
+from datetime import timedelta
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from coldfront.core.allocation.utils_.usage_history_utils import (
+    UsageHistoryCompactor,
+)
+from coldfront.core.utils.common import add_argparse_dry_run_argument
+
+"""An admin command that compacts the historical records of
+AllocationAttributeUsage and AllocationUserAttributeUsage objects."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the historical records of usage objects, retaining full "
+        "resolution within a recent window and one snapshot per interval "
+        "before it. Records near the start of each allowance year are "
+        "always retained."
+    )
+
+    logger = logging.getLogger(__name__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full_resolution_days",
+            default=90,
+            type=int,
+            help=(
+                "The number of most recent days for which all records are "
+                "retained. Defaults to 90."
+            ),
+        )
+        parser.add_argument(
+            "--snapshot_hours",
+            default=24,
+            type=int,
+            help=(
+                "Before the full-resolution window, retain only the last "
+                "record of each object in each interval of this many hours. "
+                "Defaults to 24."
+            ),
+        )
+        parser.add_argument(
+            "--boundary_guard_days",
+            default=30,
+            type=int,
+            help=(
+                "Retain all records within this many days of the start of "
+                "each allowance year. Defaults to 30."
+            ),
+        )
+        parser.add_argument(
+            "--batch_size",
+            default=1000,
+            type=int,
+            help="The maximum number of records to delete per query.",
+        )
+        add_argparse_dry_run_argument(parser)
+
+    def handle(self, *args, **options):
+        for option in (
+            "full_resolution_days",
+            "snapshot_hours",
+            "boundary_guard_days",
+            "batch_size",
+        ):
+            if options[option] <= 0:
+                raise CommandError(f"--{option} must be a positive integer.")
+
+        dry_run = options["dry_run"]
+        compactor = UsageHistoryCompactor(
+            timedelta(days=options["full_resolution_days"]),
+            timedelta(hours=options["snapshot_hours"]),
+            timedelta(days=options["boundary_guard_days"]),
+            batch_size=options["batch_size"],
+            dry_run=dry_run,
+        )
+        results = compactor.run()
+
+        verb = "Would delete" if dry_run else "Deleted"
+        style = self.style.WARNING if dry_run else self.style.SUCCESS
+        for model_name, (num_considered, num_deleted) in results.items():
+            message = (
+                f"{verb} {num_deleted} of {num_considered} {model_name} records "
+                f"outside the full-resolution window."
+            )
+            self.stdout.write(style(message))
+            if not dry_run:
+                self.logger.info(message)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.15 on 2026-10-19 10:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('allocation', '0018_alter_historicalallocation_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicalallocationattribute',
+            index=models.Index(fields=['allocation', 'history_date'], name='hist_alloc_attr_alloc_date'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalallocationattributeusage',
+            index=models.Index(fields=['allocation_attribute', 'history_date'], name='hist_alloc_attr_usage_date'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalallocationuserattribute',
+            index=models.Index(fields=['allocation_user', 'history_date'], name='hist_alloc_uattr_au_date'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalallocationuserattributeusage',
+            index=models.Index(fields=['allocation_user_attribute', 'history_date'], name='hist_alloc_uattr_usage_date'),
+        ),
+    ]
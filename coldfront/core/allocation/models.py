@@ -21,6 +21,7 @@ from coldfront.core.utils.common import (
     display_time_zone_current_date,
     import_from_settings,
 )
+from coldfront.core.utils.history import IndexedHistoricalRecords
 from coldfront.core.utils.mou import DynamicFileField, upload_to_func
 
 logger = logging.getLogger(__name__)
@@ -277,7 +278,14 @@ class AllocationAttribute(TimeStampedModel):
     )
     allocation = models.ForeignKey(Allocation, on_delete=models.CASCADE)
     value = models.CharField(max_length=128)
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords(
+        indexes=[
+            models.Index(
+                fields=["allocation", "history_date"],
+                name="hist_alloc_attr_alloc_date",
+            ),
+        ]
+    )
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -322,7 +330,14 @@ class AllocationAttributeUsage(TimeStampedModel):
             MaxValueValidator(settings.ALLOCATION_MAX),
         ],
     )
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords(
+        indexes=[
+            models.Index(
+                fields=["allocation_attribute", "history_date"],
+                name="hist_alloc_attr_usage_date",
+            ),
+        ]
+    )
 
     def __str__(self):
         return (
@@ -384,7 +399,14 @@ class AllocationUserAttribute(TimeStampedModel):
     allocation = models.ForeignKey(Allocation, on_delete=models.CASCADE)
     allocation_user = models.ForeignKey(AllocationUser, on_delete=models.CASCADE)
     value = models.CharField(max_length=128)
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords(
+        indexes=[
+            models.Index(
+                fields=["allocation_user", "history_date"],
+                name="hist_alloc_uattr_au_date",
+            ),
+        ]
+    )
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -428,7 +450,14 @@ class AllocationUserAttributeUsage(TimeStampedModel):
             MaxValueValidator(settings.ALLOCATION_MAX),
         ],
     )
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords(
+        indexes=[
+            models.Index(
+                fields=["allocation_user_attribute", "history_date"],
+                name="hist_alloc_uattr_usage_date",
+            ),
+        ]
+    )
 
     def __str__(self):
         return f"{self.allocation_user_attribute.allocation_attribute_type.name}: {self.value}"
@@ -1,8 +1,11 @@
 from django.core.exceptions import ValidationError
-from django.db.models.signals import m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
 import django.dispatch
 
-from coldfront.core.allocation.models import Allocation
+from coldfront.core.allocation.models import Allocation, AllocationPeriod
+from coldfront.core.allocation.utils_.allocation_period_utils import (
+    invalidate_allowance_year_periods_cache,
+)
 from coldfront.core.resource.models import Resource
 
 allocation_activate_user = django.dispatch.Signal()
@@ -47,3 +50,11 @@ def allocation_resources_changed(sender, **kwargs):
                     f"({allocations.first().pk}) to unique-per-project "
                     f"Resource {resource.pk}."
                 )
+
+
+@django.dispatch.receiver(post_delete, sender=AllocationPeriod)
+@django.dispatch.receiver(post_save, sender=AllocationPeriod)
+def allocation_period_changed(sender, **kwargs):
+    """When an AllocationPeriod is created, updated, or deleted, clear
+    the cached allowance year AllocationPeriods."""
+    invalidate_allowance_year_periods_cache()
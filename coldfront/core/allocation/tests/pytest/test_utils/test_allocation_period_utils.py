@@ -0,0 +1,85 @@
+"""Tests for the cached lookup of allowance year AllocationPeriods."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from coldfront.core.allocation.models import AllocationPeriod
+from coldfront.core.allocation.utils_.allocation_period_utils import (
+    ALLOWANCE_YEAR_PERIODS_CACHE_KEY,
+    get_allowance_year_periods,
+)
+
+
+@pytest.fixture
+def allowance_years():
+    """Replace existing allowance year periods with three consecutive
+    ones, returned in chronological order."""
+    AllocationPeriod.objects.filter(name__startswith="Allowance Year").delete()
+    periods = []
+    for year in (2030, 2031, 2032):
+        periods.append(
+            AllocationPeriod.objects.create(
+                name=f"Allowance Year {year} - {year + 1}",
+                start_date=date(year, 6, 1),
+                end_date=date(year + 1, 5, 31),
+            )
+        )
+    return periods
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestGetAllowanceYearPeriods:
+    """Tests for get_allowance_year_periods."""
+
+    def test_periods_relative_to_date(self, locmem_cache, allowance_years):
+        """Test that the current, next, and previous periods are
+        determined relative to the given date."""
+        previous, current, next_ = allowance_years
+
+        periods = get_allowance_year_periods(date(2031, 12, 1))
+
+        assert periods.current == [current]
+        assert periods.next == next_
+        assert periods.previous == previous
+
+    def test_result_cached_for_same_date(
+        self, locmem_cache, allowance_years, django_assert_num_queries
+    ):
+        """Test that a repeated lookup for the same date is served from
+        the cache."""
+        get_allowance_year_periods(date(2031, 12, 1))
+
+        with django_assert_num_queries(0):
+            periods = get_allowance_year_periods(date(2031, 12, 1))
+
+        assert periods.current == [allowance_years[1]]
+
+    def test_result_recomputed_for_new_date(
+        self, locmem_cache, allowance_years, django_assert_num_queries
+    ):
+        """Test that a lookup for a different date is recomputed."""
+        get_allowance_year_periods(date(2031, 12, 1))
+
+        with django_assert_num_queries(1):
+            periods = get_allowance_year_periods(date(2032, 12, 1))
+
+        assert periods.current == [allowance_years[2]]
+        assert periods.next is None
+
+    def test_cache_invalidated_on_save_and_delete(self, locmem_cache, allowance_years):
+        """Test that saving or deleting an AllocationPeriod clears the
+        cache entry."""
+        get_allowance_year_periods(date(2031, 12, 1))
+        assert ALLOWANCE_YEAR_PERIODS_CACHE_KEY in locmem_cache
+
+        current = allowance_years[1]
+        current.end_date = current.end_date - timedelta(days=365)
+        current.save()
+        assert ALLOWANCE_YEAR_PERIODS_CACHE_KEY not in locmem_cache
+        assert get_allowance_year_periods(date(2031, 12, 1)).current == []
+
+        allowance_years[0].delete()
+        assert ALLOWANCE_YEAR_PERIODS_CACHE_KEY not in locmem_cache
+        assert get_allowance_year_periods(date(2031, 12, 1)).previous == current
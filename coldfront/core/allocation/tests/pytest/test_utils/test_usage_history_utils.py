@@ -0,0 +1,96 @@
+"""Unit tests for select_compactable_history_ids."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from coldfront.core.allocation.utils_.usage_history_utils import (
+    HistoryEntry,
+    select_compactable_history_ids,
+)
+
+DAY = timedelta(days=1)
+
+# Midnight UTC, so that day-long snapshot intervals start at midnight.
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _entries(*offsets, history_type="~"):
+    """Return HistoryEntry objects with IDs 1..N at the given offsets from
+    START."""
+    return [
+        HistoryEntry(i, START + offset, history_type)
+        for i, offset in enumerate(offsets, start=1)
+    ]
+
+
+@pytest.mark.unit
+class TestSelectCompactableHistoryIds:
+    """Unit tests for select_compactable_history_ids."""
+
+    def test_empty(self):
+        """Test that no IDs are returned for no entries."""
+        assert select_compactable_history_ids([], DAY, []) == []
+
+    def test_keeps_last_entry_per_interval(self):
+        """Test that all but the last entry in each interval are
+        compactable."""
+        hour = timedelta(hours=1)
+        entries = _entries(hour, 2 * hour, 3 * hour, DAY + hour, DAY + 2 * hour)
+
+        ids = select_compactable_history_ids(entries, DAY, [])
+
+        assert ids == [1, 2, 4]
+
+    def test_keeps_last_entry_overall(self):
+        """Test that the most recent entry is always retained, even if
+        it is the only entry in its interval."""
+        entries = _entries(timedelta(hours=1))
+
+        assert select_compactable_history_ids(entries, DAY, []) == []
+
+    def test_keeps_creation_and_deletion_entries(self):
+        """Test that entries creating or deleting the object are
+        retained."""
+        hour = timedelta(hours=1)
+        entries = [
+            HistoryEntry(1, START + hour, "+"),
+            HistoryEntry(2, START + 2 * hour, "~"),
+            HistoryEntry(3, START + 3 * hour, "-"),
+        ]
+
+        ids = select_compactable_history_ids(entries, DAY, [])
+
+        assert ids == [2]
+
+    def test_keeps_entries_in_and_preceding_protected_window(self):
+        """Test that entries within a protected window, and the entry
+        immediately preceding it, are retained, so that differences
+        between consecutive entries in the window are preserved."""
+        hour = timedelta(hours=1)
+        entries = _entries(
+            hour,
+            2 * hour,
+            3 * hour,
+            4 * hour,
+            5 * hour,
+            6 * hour,
+            7 * hour,
+        )
+        window = (START + 4 * hour, START + 6 * hour)
+
+        ids = select_compactable_history_ids(entries, DAY, [window])
+
+        # 3 precedes the window, 4 and 5 are in it, and 7 is the last.
+        assert ids == [1, 2, 6]
+
+    def test_window_end_is_exclusive(self):
+        """Test that an entry at the end of a protected window is not
+        protected."""
+        hour = timedelta(hours=1)
+        entries = _entries(hour, 2 * hour, 3 * hour)
+        window = (START, START + 2 * hour)
+
+        ids = select_compactable_history_ids(entries, DAY, [window])
+
+        assert ids == [2]
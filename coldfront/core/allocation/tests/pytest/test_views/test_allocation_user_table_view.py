@@ -0,0 +1,177 @@
+"""Tests for AllocationUserTableView."""
+
+from copy import deepcopy
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+import pytest
+
+from coldfront.api.statistics.utils import (
+    create_project_allocation,
+    create_user_project_allocation,
+    set_project_user_usage_value,
+)
+from coldfront.core.allocation.models import (
+    AllocationAttribute,
+    AllocationAttributeType,
+    AllocationUser,
+    AllocationUserStatusChoice,
+    AttributeType,
+)
+from coldfront.core.billing.models import BillingActivity, BillingProject
+from coldfront.core.project.models import (
+    ProjectUser,
+    ProjectUserRoleChoice,
+    ProjectUserStatusChoice,
+)
+
+NUM_USERS = 6
+
+# The indices of columns, for sorting.
+USAGE_COLUMN = 3
+
+
+@pytest.fixture
+def allocation(create_active_project_with_pi):
+    """Return the compute Allocation of a recharge Project with a PI and
+    NUM_USERS active Users, each with usage 10 * i, except for the last,
+    who has no "Service Units" attribute, and a removed User."""
+    pi = User.objects.create(username="table_pi", email="table_pi@example.com")
+    project = create_active_project_with_pi("ac_table", pi)
+    allocation = create_project_allocation(project, Decimal("1000.00")).allocation
+    for i in range(NUM_USERS + 1):
+        user = User.objects.create(
+            username=f"table_user{i}",
+            email=f"table_user{i}@example.com",
+            first_name="Table",
+            last_name=f"User{i}",
+        )
+        ProjectUser.objects.create(
+            project=project,
+            user=user,
+            role=ProjectUserRoleChoice.objects.get(name="User"),
+            status=ProjectUserStatusChoice.objects.get(name="Active"),
+        )
+        if i < NUM_USERS - 1:
+            create_user_project_allocation(user, project, Decimal("100.00"))
+            assert set_project_user_usage_value(user, project, Decimal(10 * i))
+        else:
+            AllocationUser.objects.create(
+                allocation=allocation,
+                user=user,
+                status=AllocationUserStatusChoice.objects.get(
+                    name="Active" if i < NUM_USERS else "Removed"
+                ),
+            )
+    return allocation
+
+
+@pytest.fixture
+def superuser_client(client):
+    superuser = User.objects.create_superuser(
+        username="table_superuser", email="table_superuser@example.com"
+    )
+    client.force_login(superuser)
+    return client
+
+
+@pytest.fixture
+def lrc_only(settings):
+    """Enable LRC_ONLY, instead of BRC_ONLY."""
+    flags = deepcopy(settings.FLAGS)
+    flags["BRC_ONLY"] = [{"condition": "boolean", "value": False}]
+    flags["LRC_ONLY"] = [{"condition": "boolean", "value": True}]
+    settings.FLAGS = flags
+
+
+def get_table(client, allocation, **params):
+    url = reverse("allocation-user-table", kwargs={"pk": allocation.pk})
+    response = client.get(url, {"length": 100, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def rows_by_email(data):
+    return {row["email"]: row for row in data["data"]}
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestAllocationUserTableView:
+    """Tests for AllocationUserTableView."""
+
+    def test_removed_users_excluded(self, allocation, superuser_client):
+        """Test that Removed Users are not listed."""
+        data = get_table(superuser_client, allocation)
+        assert data["recordsTotal"] == NUM_USERS
+        assert sorted(rows_by_email(data)) == [
+            f"table_user{i}@example.com" for i in range(NUM_USERS)
+        ]
+
+    def test_sorted_by_usage(self, allocation, superuser_client):
+        """Test that rows are sorted by usage, and that Users without a
+        "Service Units" attribute have a usage of "0.00"."""
+        data = get_table(
+            superuser_client,
+            allocation,
+            **{"order[0][column]": USAGE_COLUMN, "order[0][dir]": "desc"},
+        )
+        usages = [row["usage"] for row in data["data"]]
+        assert [Decimal(usage) for usage in usages] == sorted(
+            (Decimal(usage) for usage in usages), reverse=True
+        )
+        assert Decimal(usages[0]) == Decimal(10 * (NUM_USERS - 2))
+        rows = rows_by_email(data)
+        assert rows[f"table_user{NUM_USERS - 1}@example.com"]["usage"] == "0.00"
+
+    def test_billing_ids_hidden(self, allocation, superuser_client):
+        """Test that billing IDs are not included unless LRC_ONLY is
+        enabled."""
+        for row in get_table(superuser_client, allocation)["data"]:
+            assert row["user_account_fee_billing_id"] is None
+            assert row["recharge_fee_billing_id"] is None
+
+    def test_billing_ids_under_lrc(self, allocation, superuser_client, lrc_only):
+        """Test that, under LRC_ONLY, each row includes its User's
+        billing ID, or "N/A", and the Allocation's recharge fee billing
+        ID."""
+        billing_project = BillingProject.objects.create(identifier="123456")
+        user_activity = BillingActivity.objects.create(
+            billing_project=billing_project, identifier="001"
+        )
+        recharge_activity = BillingActivity.objects.create(
+            billing_project=billing_project, identifier="002"
+        )
+        profile = User.objects.get(username="table_user0").userprofile
+        profile.billing_activity = user_activity
+        profile.save()
+        AllocationAttribute.objects.create(
+            allocation=allocation,
+            # The type is only created for LRC deployments.
+            allocation_attribute_type=AllocationAttributeType.objects.get_or_create(
+                name="Billing Activity",
+                defaults={
+                    "attribute_type": AttributeType.objects.get(name="Int"),
+                    "is_private": True,
+                    "is_unique": True,
+                },
+            )[0],
+            value=str(recharge_activity.pk),
+        )
+
+        rows = rows_by_email(get_table(superuser_client, allocation))
+        assert rows["table_user0@example.com"]["user_account_fee_billing_id"] == (
+            "123456-001"
+        )
+        assert rows["table_user1@example.com"]["user_account_fee_billing_id"] == "N/A"
+        assert {row["recharge_fee_billing_id"] for row in rows.values()} == {
+            "123456-002"
+        }
+
+    def test_non_member_forbidden(self, allocation, client):
+        """Test that Users who cannot view the Allocation cannot view
+        its Users."""
+        client.force_login(User.objects.create(username="table_outsider"))
+        url = reverse("allocation-user-table", kwargs={"pk": allocation.pk})
+        assert client.get(url).status_code == 403
@@ -20,6 +20,11 @@ urlpatterns = [
         allocation_views.AllocationDetailView.as_view(),
         name="allocation-detail",
     ),
+    path(
+        "<int:pk>/user-table/",
+        allocation_views.AllocationUserTableView.as_view(),
+        name="allocation-user-table",
+    ),
     path(
         "<int:pk>/activate-request",
         allocation_views.AllocationActivateRequestView.as_view(),
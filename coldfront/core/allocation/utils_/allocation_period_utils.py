@@ -0,0 +1,65 @@
+from collections import namedtuple
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from coldfront.core.allocation.models import AllocationPeriod
+
+logger = logging.getLogger(__name__)
+
+
+# The key under which allowance year AllocationPeriods are cached.
+ALLOWANCE_YEAR_PERIODS_CACHE_KEY = "allowance_year_allocation_periods"
+
+
+# The allowance year AllocationPeriods relative to a particular date.
+# 'current' is a list, since there should be exactly one, but callers
+# must be able to detect zero or multiple. 'next' and 'previous' are
+# AllocationPeriods or None.
+AllowanceYearPeriods = namedtuple(
+    "AllowanceYearPeriods", ["date", "current", "next", "previous"]
+)
+
+
+def get_allowance_year_periods(date):
+    """Return an AllowanceYearPeriods for the given date.
+
+    The result is stored in the Django cache, along with the date it was
+    computed for, so that it is only recomputed when the date changes
+    or when an AllocationPeriod is created, updated, or deleted.
+
+    Parameters:
+        - date (date): the date relative to which periods are returned
+
+    Returns:
+        - AllowanceYearPeriods
+    """
+    cached = cache.get(ALLOWANCE_YEAR_PERIODS_CACHE_KEY)
+    if isinstance(cached, AllowanceYearPeriods) and cached.date == date:
+        return cached
+
+    periods = list(
+        AllocationPeriod.objects.filter(name__startswith="Allowance Year").order_by(
+            "pk"
+        )
+    )
+    current = [p for p in periods if p.start_date <= date <= p.end_date]
+    next_ = next((p for p in periods if p.start_date > date), None)
+    previous = max(
+        (p for p in periods if p.end_date < date),
+        key=lambda p: p.end_date,
+        default=None,
+    )
+
+    allowance_year_periods = AllowanceYearPeriods(date, current, next_, previous)
+    cache.set(ALLOWANCE_YEAR_PERIODS_CACHE_KEY, allowance_year_periods)
+    return allowance_year_periods
+
+
+def invalidate_allowance_year_periods_cache():
+    """Clear cached allowance year AllocationPeriods, both immediately
+    and once the current transaction (if any) is committed, so that
+    other processes do not re-cache uncommitted state."""
+    cache.delete(ALLOWANCE_YEAR_PERIODS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(ALLOWANCE_YEAR_PERIODS_CACHE_KEY))
@@ -0,0 +1,181 @@
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
+import logging
+
+from django.db import transaction
+import pytz
+
+from coldfront.core.allocation.models import (
+    AllocationPeriod,
+    HistoricalAllocationAttributeUsage,
+    HistoricalAllocationUserAttributeUsage,
+)
+from coldfront.core.utils.common import (
+    display_time_zone_date_to_utc_datetime,
+    utc_now_offset_aware,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# A minimal representation of a single historical record.
+HistoryEntry = namedtuple(
+    "HistoryEntry", ["history_id", "history_date", "history_type"]
+)
+
+
+# The reference point from which snapshot buckets are measured.
+_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+
+def get_allowance_year_boundaries():
+    """Return a sorted list of offset-aware UTC datetimes at which
+    allowance years started (midnight in settings.DISPLAY_TIME_ZONE on
+    the start date of each 'Allowance Year' AllocationPeriod)."""
+    start_dates = AllocationPeriod.objects.filter(
+        name__startswith="Allowance Year"
+    ).values_list("start_date", flat=True)
+    return sorted(
+        display_time_zone_date_to_utc_datetime(start_date) for start_date in start_dates
+    )
+
+
+def select_compactable_history_ids(entries, snapshot_interval, protected_windows):
+    """Given the historical records of a single object, sorted in
+    ascending (history_date, history_id) order, return the IDs of those
+    that may be deleted while retaining one snapshot per interval.
+
+    The following records are always retained:
+        - The last record in each snapshot interval, which reflects the
+          object's value at the end of the interval.
+        - Records that created or deleted the object.
+        - Records within any of the protected windows, as well as the
+          record immediately preceding each window, so that differences
+          between consecutive records within the window are preserved.
+
+    Parameters:
+        - entries (list[HistoryEntry]): the records to consider
+        - snapshot_interval (timedelta): the length of each interval
+        - protected_windows (list[tuple]): (start, end) datetime pairs,
+          with the start inclusive and the end exclusive
+
+    Returns:
+        - list[int]: the IDs of the records to delete
+    """
+    interval_seconds = snapshot_interval.total_seconds()
+    assert interval_seconds > 0
+
+    def bucket(entry):
+        return int((entry.history_date - _EPOCH).total_seconds() // interval_seconds)
+
+    def is_protected(entry):
+        return any(
+            start <= entry.history_date < end for start, end in protected_windows
+        )
+
+    compactable_ids = []
+    num_entries = len(entries)
+    for i, entry in enumerate(entries):
+        if entry.history_type != "~" or is_protected(entry):
+            continue
+        if i == num_entries - 1:
+            continue
+        next_entry = entries[i + 1]
+        if bucket(next_entry) != bucket(entry) or is_protected(next_entry):
+            continue
+        compactable_ids.append(entry.history_id)
+    return compactable_ids
+
+
+class UsageHistoryCompactor:
+    """A class that downsamples old historical records of usage objects,
+    retaining every record within a recent window, and one snapshot per
+    interval before it.
+
+    Records around the start of each allowance year are always retained
+    at full resolution, since they are needed to reconstruct usage at
+    the time of the year reset (e.g., by the
+    compute_preemptive_su_deduction management command)."""
+
+    # Historical models to compact, mapped to the name of the field
+    # referencing the underlying object.
+    history_models = {
+        HistoricalAllocationAttributeUsage: "allocation_attribute_id",
+        HistoricalAllocationUserAttributeUsage: "allocation_user_attribute_id",
+    }
+
+    def __init__(
+        self,
+        full_resolution_window,
+        snapshot_interval,
+        boundary_guard,
+        batch_size=1000,
+        dry_run=False,
+    ):
+        """Parameters:
+        - full_resolution_window (timedelta): records more recent than
+          this are never deleted
+        - snapshot_interval (timedelta): the length of the interval for
+          which one snapshot is retained before the window
+        - boundary_guard (timedelta): records within this amount of
+          time of the start of an allowance year are never deleted
+        - batch_size (int): the maximum number of records to delete
+          per query
+        - dry_run (bool): whether to only count records that would be
+          deleted
+        """
+        assert batch_size > 0
+        self._cutoff = utc_now_offset_aware() - full_resolution_window
+        self._snapshot_interval = snapshot_interval
+        self._protected_windows = [
+            (boundary - boundary_guard, boundary + boundary_guard)
+            for boundary in get_allowance_year_boundaries()
+        ]
+        self._batch_size = batch_size
+        self._dry_run = dry_run
+
+    def run(self):
+        """Compact each historical model. Return a dict mapping the name
+        of each model to a tuple of (number of records considered,
+        number of records deleted or, if dry_run, to be deleted)."""
+        results = {}
+        for history_model, object_field in self.history_models.items():
+            results[history_model.__name__] = self._compact(history_model, object_field)
+        return results
+
+    def _compact(self, history_model, object_field):
+        """Compact the given historical model, whose records reference
+        their objects via the given field."""
+        rows = (
+            history_model.objects.filter(history_date__lt=self._cutoff)
+            .order_by(object_field, "history_date", "history_id")
+            .values_list("history_id", object_field, "history_date", "history_type")
+            .iterator(chunk_size=self._batch_size)
+        )
+
+        num_considered = 0
+        compactable_ids = []
+        for _, object_rows in groupby(rows, key=lambda row: row[1]):
+            entries = [
+                HistoryEntry(history_id, history_date, history_type)
+                for history_id, _, history_date, history_type in object_rows
+            ]
+            num_considered += len(entries)
+            compactable_ids.extend(
+                select_compactable_history_ids(
+                    entries, self._snapshot_interval, self._protected_windows
+                )
+            )
+
+        if not self._dry_run:
+            for i in range(0, len(compactable_ids), self._batch_size):
+                batch = compactable_ids[i : i + self._batch_size]
+                with transaction.atomic():
+                    history_model.objects.filter(history_id__in=batch).delete()
+            logger.info(
+                f"Deleted {len(compactable_ids)} of {num_considered} "
+                f"{history_model.__name__} records older than {self._cutoff}."
+            )
+
+        return num_considered, len(compactable_ids)
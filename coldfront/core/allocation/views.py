@@ -8,7 +8,7 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 from django.db.models.query import QuerySet
 from django.forms import formset_factory
 from django.http import HttpResponseRedirect, JsonResponse
@@ -66,6 +66,7 @@ from coldfront.core.resource.utils_.allowance_utils.interface import (
 from coldfront.core.user.utils import access_agreement_signed
 from coldfront.core.utils.common import get_domain_url, import_from_settings
 from coldfront.core.utils.mail import send_email_template
+from coldfront.core.utils.mixins.views import ServerSideTableMixin, TableColumn
 
 ALLOCATION_ENABLE_ALLOCATION_RENEWAL = import_from_settings(
     "ALLOCATION_ENABLE_ALLOCATION_RENEWAL", True
@@ -439,9 +440,14 @@ class AllocationDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
                 filtered_attributes.append(attribute)
         context["attributes"] = filtered_attributes
 
-        # Only display non-removed users in the table of users.
-        allocation_users = allocation_obj.allocationuser_set.order_by("user__username")
-        context["allocation_users"] = allocation_users.exclude(status__name="Removed")
+        # Only count non-removed users. The table of users is loaded
+        # separately, one page at a time, from AllocationUserTableView.
+        allocation_users = allocation_obj.allocationuser_set.select_related(
+            "user__userprofile"
+        ).order_by("user__username")
+        context["num_allocation_users"] = allocation_users.exclude(
+            status__name="Removed"
+        ).count()
 
         # Add additional context for compute allocations.
         if self._is_compute_allocation(allocation_obj):
@@ -458,20 +464,14 @@ class AllocationDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         compute allocation."""
         # Display service units usage for each AllocationUser in the table.
         context["allocation_user_usages_visible"] = True
-        service_units_filter = {
-            "allocation_attribute_type__name": "Service Units",
+        # Retrieve the usages of all AllocationUsers, for the pie chart, in a
+        # single query.
+        allocation_user_su_usages = {
+            username: self._su_usage_display(usage)
+            for username, usage in self._annotate_with_su_usage(
+                allocation_users
+            ).values_list("user__username", "su_usage")
         }
-        allocation_user_su_usages = {}
-        for allocation_user in allocation_users:
-            attributes = allocation_user.allocationuserattribute_set.select_related(
-                "allocationuserattributeusage"
-            ).filter(**service_units_filter)
-            try:
-                su_attribute = attributes.first()
-                usage = str(su_attribute.allocationuserattributeusage.value)
-            except (AllocationUserAttribute.DoesNotExist, AttributeError, ValueError):
-                usage = "0.00"
-            allocation_user_su_usages[allocation_user.user.username] = usage
         context["allocation_user_su_usages"] = allocation_user_su_usages
 
         pie_data = generate_user_su_pie_data(allocation_user_su_usages.items())
@@ -486,65 +486,74 @@ class AllocationDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         # For LRC deployments, display the billing ID(s) for each user.
         is_lrc = flag_enabled("LRC_ONLY")
         if is_lrc:
-            self._add_lrc_billing_id_context(allocation_obj, allocation_users, context)
+            self._add_lrc_billing_id_context(allocation_obj, context)
 
-    def _add_lrc_billing_id_context(self, allocation_obj, allocation_users, context):
+    def _add_lrc_billing_id_context(self, allocation_obj, context):
         """Update the given context, given that the Allocation and
         AllocationUsers have associated LRC billing IDs.
 
-            - For all AllocationUsers, render the billing ID used for
+            - For all AllocationUsers, display the billing ID used for
               the monthly user account fee.
             - If the allowance is a recharge allowance, for all
-              Allocation Users, render the billing ID used for the
+              Allocation Users, display the billing ID used for the
               monthly recharge fee.
+
+        The billing IDs themselves are retrieved by
+        AllocationUserTableView.
         """
-        # User account fee billing IDs
         context["user_account_fee_billing_ids_visible"] = True
-        if context["user_account_fee_billing_ids_visible"]:
-            user_account_fee_billing_ids = {}
-            for allocation_user in allocation_users:
-                user = allocation_user.user
-                try:
-                    billing_activity = user.userprofile.billing_activity
-                    billing_id = billing_activity.full_id()
-                except (AttributeError, ValueError):
-                    billing_id = "N/A"
-                user_account_fee_billing_ids[user.username] = billing_id
-            context["user_account_fee_billing_ids"] = user_account_fee_billing_ids
-
-        # Recharge fee billing IDs
+        context["recharge_fee_billing_ids_visible"] = self._is_recharge_allocation(
+            allocation_obj
+        )
+
+    @staticmethod
+    def _annotate_with_su_usage(allocation_users):
+        """Given a queryset of AllocationUsers, annotate each instance
+        with a decimal field named 'su_usage', which denotes the usage
+        of its first "Service Units" attribute, or None."""
+        usages = (
+            AllocationUserAttribute.objects.filter(
+                allocation_user=OuterRef("pk"),
+                allocation_attribute_type__name="Service Units",
+            )
+            .order_by("pk")
+            .values("allocationuserattributeusage__value")[:1]
+        )
+        return allocation_users.annotate(su_usage=Subquery(usages))
+
+    @staticmethod
+    def _su_usage_display(usage):
+        """Return a str representing the given service units usage,
+        which may be None."""
+        if usage is None:
+            return "0.00"
+        return str(usage)
+
+    @staticmethod
+    def _get_recharge_fee_billing_id(allocation_obj):
+        """Return the billing ID used for the monthly recharge fee of
+        the Allocation, or "N/A"."""
+        billing_attribute = allocation_obj.allocationattribute_set.filter(
+            allocation_attribute_type__name="Billing Activity"
+        ).first()
+        try:
+            return BillingActivity.objects.get(
+                pk=int(billing_attribute.value)
+            ).full_id()
+        except (AttributeError, BillingActivity.DoesNotExist, ValueError):
+            return "N/A"
+
+    @staticmethod
+    def _is_recharge_allocation(allocation_obj):
+        """Return whether the Allocation is a primary cluster compute
+        allocation under a recharge allowance."""
         if not is_primary_cluster_project(allocation_obj.project):
-            return
+            return False
         computing_allowance_interface = get_computing_allowance_interface()
         allowance_resource = computing_allowance_interface.allowance_from_project(
             allocation_obj.project
         )
-        context["recharge_fee_billing_ids_visible"] = ComputingAllowance(
-            allowance_resource
-        ).is_recharge()
-        if context["recharge_fee_billing_ids_visible"]:
-            billing_activity_filter = {
-                "allocation_attribute_type__name": "Billing Activity"
-            }
-            recharge_fee_billing_ids = {}
-            for allocation_user in allocation_users:
-                attributes = allocation_obj.allocationattribute_set.filter(
-                    **billing_activity_filter
-                )
-                try:
-                    billing_attribute = attributes.first()
-                    billing_id = BillingActivity.objects.get(
-                        pk=int(billing_attribute.value)
-                    ).full_id()
-                except (
-                    AllocationUserAttribute.DoesNotExist,
-                    AttributeError,
-                    BillingActivity.DoesNotExist,
-                    ValueError,
-                ):
-                    billing_id = "N/A"
-                recharge_fee_billing_ids[allocation_user.user.username] = billing_id
-            context["recharge_fee_billing_ids"] = recharge_fee_billing_ids
+        return ComputingAllowance(allowance_resource).is_recharge()
 
     def _add_secure_dir_specific_context(self, allocation_obj, context):
         """Update the given context, given that the Allocation is a
@@ -571,6 +580,65 @@ class AllocationDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         ).exists()
 
 
+class AllocationUserTableView(ServerSideTableMixin, AllocationDetailView):
+    """Return pages of the table of non-removed Users on the detail page
+    of an Allocation, as JSON."""
+
+    table_columns = [
+        TableColumn(
+            "name",
+            ("user__first_name", "user__last_name", "user__username"),
+            ("user__first_name", "user__last_name"),
+        ),
+        TableColumn("email", ("user__email",), ("user__email",)),
+        TableColumn("cluster_username", ("user__username",), ("user__username",)),
+        TableColumn("usage", ("su_usage", "user__username"), ()),
+        TableColumn("user_account_fee_billing_id", (), ()),
+        TableColumn("recharge_fee_billing_id", (), ()),
+    ]
+
+    def get_table_queryset(self):
+        allocation_obj = get_object_or_404(Allocation, pk=self.kwargs.get("pk"))
+
+        self.user_account_fee_billing_ids_visible = flag_enabled(
+            "LRC_ONLY"
+        ) and self._is_compute_allocation(allocation_obj)
+        # The recharge fee billing ID is the same for all users.
+        self.recharge_fee_billing_id = None
+        if self.user_account_fee_billing_ids_visible and self._is_recharge_allocation(
+            allocation_obj
+        ):
+            self.recharge_fee_billing_id = self._get_recharge_fee_billing_id(
+                allocation_obj
+            )
+
+        allocation_users = allocation_obj.allocationuser_set.select_related(
+            "user__userprofile__billing_activity__billing_project"
+        ).exclude(status__name="Removed")
+        return self._annotate_with_su_usage(allocation_users)
+
+    def get_table_row(self, allocation_user):
+        user = allocation_user.user
+
+        user_account_fee_billing_id = None
+        if self.user_account_fee_billing_ids_visible:
+            try:
+                billing_activity = user.userprofile.billing_activity
+                user_account_fee_billing_id = billing_activity.full_id()
+            except (AttributeError, ValueError):
+                user_account_fee_billing_id = "N/A"
+
+        has_cluster_account = user.userprofile.cluster_uid is not None
+        return {
+            "name": f"{user.first_name} {user.last_name}",
+            "email": user.email,
+            "cluster_username": user.username if has_cluster_account else None,
+            "usage": self._su_usage_display(allocation_user.su_usage),
+            "user_account_fee_billing_id": user_account_fee_billing_id,
+            "recharge_fee_billing_id": self.recharge_fee_billing_id,
+        }
+
+
 class AllocationListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = Allocation
     template_name = "allocation/allocation_list.html"
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PortalConfig(AppConfig):
     name = "coldfront.core.portal"
+
+    def ready(self):
+        import coldfront.core.portal.signals  # noqa: F401
@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_save
+import django.dispatch
+
+from coldfront.core.allocation.models import (
+    AllocationAttribute,
+    AllocationUser,
+    AllocationUserAttribute,
+)
+from coldfront.core.portal.utils_.dashboard_utils import (
+    invalidate_dashboard_snapshots,
+    invalidate_project_dashboard_snapshots,
+)
+from coldfront.core.project.models import (
+    Project,
+    ProjectUser,
+    ProjectUserJoinRequest,
+    ProjectUserRemovalRequest,
+)
+
+
+@django.dispatch.receiver(post_delete, sender=ProjectUser)
+@django.dispatch.receiver(post_save, sender=ProjectUser)
+def project_user_changed(sender, instance, **kwargs):
+    """When a ProjectUser is created, updated, or deleted, clear the
+    user's cached dashboard snapshot."""
+    invalidate_dashboard_snapshots([instance.user_id])
+
+
+@django.dispatch.receiver(post_delete, sender=ProjectUserJoinRequest)
+@django.dispatch.receiver(post_delete, sender=ProjectUserRemovalRequest)
+@django.dispatch.receiver(post_save, sender=ProjectUserJoinRequest)
+@django.dispatch.receiver(post_save, sender=ProjectUserRemovalRequest)
+def project_user_request_changed(sender, instance, **kwargs):
+    """When a request to join or be removed from a Project is created,
+    updated, or deleted, clear the requesting user's cached dashboard
+    snapshot."""
+    user_pks = ProjectUser.objects.filter(pk=instance.project_user_id).values_list(
+        "user_id", flat=True
+    )
+    invalidate_dashboard_snapshots(list(user_pks))
+
+
+@django.dispatch.receiver(post_delete, sender=AllocationUserAttribute)
+@django.dispatch.receiver(post_save, sender=AllocationUserAttribute)
+def allocation_user_attribute_changed(sender, instance, **kwargs):
+    """When an AllocationUserAttribute (e.g., a cluster account status)
+    is created, updated, or deleted, clear the user's cached dashboard
+    snapshot."""
+    user_pks = AllocationUser.objects.filter(
+        pk=instance.allocation_user_id
+    ).values_list("user_id", flat=True)
+    invalidate_dashboard_snapshots(list(user_pks))
+
+
+@django.dispatch.receiver(post_delete, sender=Project)
+@django.dispatch.receiver(post_save, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    """When a Project is updated or deleted, clear the cached dashboard
+    snapshots of its users."""
+    if kwargs.get("created", False):
+        return
+    invalidate_project_dashboard_snapshots([instance.pk])
+
+
+@django.dispatch.receiver(post_delete, sender=AllocationAttribute)
+@django.dispatch.receiver(post_save, sender=AllocationAttribute)
+def allocation_attribute_changed(sender, instance, **kwargs):
+    """When an AllocationAttribute (e.g., a service unit allowance) is
+    created, updated, or deleted, clear the cached dashboard snapshots
+    of the users of its Allocation's Project."""
+    invalidate_project_dashboard_snapshots(
+        Project.objects.filter(allocation=instance.allocation_id).values("pk")
+    )
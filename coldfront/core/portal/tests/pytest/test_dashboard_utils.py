@@ -0,0 +1,117 @@
+"""Tests for the cached per-user dashboard snapshot."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from coldfront.api.statistics.utils import create_project_allocation
+from coldfront.core.allocation.models import AllocationAttributeUsage
+from coldfront.core.portal.utils_.dashboard_utils import (
+    DASHBOARD_SNAPSHOT_CACHE_KEY_PREFIX,
+    get_dashboard_snapshot,
+)
+from coldfront.core.project.models import (
+    ProjectUser,
+    ProjectUserRoleChoice,
+    ProjectUserStatusChoice,
+)
+
+
+@pytest.fixture
+def pi(password):
+    return User.objects.create_user(
+        username="dashboard_pi", email="dashboard_pi@example.com", password=password
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestDashboardSnapshot:
+    """Tests for get_dashboard_snapshot and its invalidation."""
+
+    def _cache_key(self, user):
+        return f"{DASHBOARD_SNAPSHOT_CACHE_KEY_PREFIX}{user.pk}"
+
+    def _get_home_num_queries(self, client, user, password):
+        client.login(username=user.username, password=password)
+        client.get(reverse("home"))
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse("home"))
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    def test_snapshot_contents(self, locmem_cache, pi, create_active_project_with_pi):
+        """Test that the snapshot lists the user's projects."""
+        create_active_project_with_pi("fc_dashboard_b", pi)
+        create_active_project_with_pi("fc_dashboard_a", pi)
+
+        snapshot = get_dashboard_snapshot(pi)
+
+        assert [p.name for p in snapshot.projects] == [
+            "fc_dashboard_a",
+            "fc_dashboard_b",
+        ]
+        assert all(p.status_name == "Active" for p in snapshot.projects)
+        assert all(p.display_status == "None" for p in snapshot.projects)
+        assert not snapshot.has_cluster_access
+        assert snapshot.num_join_requests == 0
+
+    def test_home_queries_independent_of_num_projects(
+        self, client, locmem_cache, pi, password, create_active_project_with_pi
+    ):
+        """Test that, once the snapshot is cached, the number of queries
+        made by the home page does not depend on the number of
+        projects."""
+        create_active_project_with_pi("fc_dashboard_0", pi)
+        num_queries = self._get_home_num_queries(client, pi, password)
+
+        for i in range(1, 4):
+            create_active_project_with_pi(f"fc_dashboard_{i}", pi)
+        assert self._get_home_num_queries(client, pi, password) == num_queries
+
+    def test_invalidated_on_project_user_change(
+        self, locmem_cache, pi, create_active_project_with_pi
+    ):
+        """Test that adding a user to a project clears the user's
+        snapshot."""
+        project = create_active_project_with_pi("fc_dashboard", pi)
+        user = User.objects.create_user(username="dashboard_user")
+        get_dashboard_snapshot(user)
+        assert self._cache_key(user) in locmem_cache
+
+        ProjectUser.objects.create(
+            project=project,
+            user=user,
+            role=ProjectUserRoleChoice.objects.get(name="User"),
+            status=ProjectUserStatusChoice.objects.get(name="Active"),
+        )
+
+        assert self._cache_key(user) not in locmem_cache
+        assert [p.name for p in get_dashboard_snapshot(user).projects] == [
+            "fc_dashboard"
+        ]
+
+    def test_not_invalidated_on_usage_change(
+        self, locmem_cache, pi, create_active_project_with_pi, django_assert_num_queries
+    ):
+        """Test that updating a project's service unit usage, which
+        happens whenever a job is reported, leaves the snapshots of its
+        users to expire."""
+        project = create_active_project_with_pi("fc_dashboard", pi)
+        allocation_objects = create_project_allocation(project, Decimal("1000.00"))
+        usage = AllocationAttributeUsage.objects.get(
+            allocation_attribute=allocation_objects.allocation_attribute
+        )
+        get_dashboard_snapshot(pi)
+        assert self._cache_key(pi) in locmem_cache
+
+        usage.value = Decimal("500.00")
+        # The update and its historical record.
+        with django_assert_num_queries(2):
+            usage.save()
+
+        assert self._cache_key(pi) in locmem_cache
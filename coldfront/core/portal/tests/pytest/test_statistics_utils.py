@@ -0,0 +1,108 @@
+"""Tests for the cached center-wide statistics."""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+import pytest
+
+from coldfront.core.allocation.models import Allocation, AllocationStatusChoice
+from coldfront.core.portal.utils_.statistics_utils import (
+    CENTER_STATISTICS_CACHE_KEY,
+    compute_center_statistics,
+    get_center_statistics,
+    refresh_center_statistics,
+)
+from coldfront.core.resource.models import Resource, ResourceType
+
+
+@pytest.fixture
+def resources():
+    """Return a parent Resource, a child of it, and an unallocatable
+    Resource."""
+    resource_type = ResourceType.objects.get(name="Cluster")
+    parent = Resource.objects.create(
+        name="Statistics Parent", resource_type=resource_type
+    )
+    child = Resource.objects.create(
+        name="Statistics Child", resource_type=resource_type, parent_resource=parent
+    )
+    unallocatable = Resource.objects.create(
+        name="Statistics Unallocatable",
+        resource_type=resource_type,
+        is_allocatable=False,
+    )
+    return parent, child, unallocatable
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestCenterStatistics:
+    """Tests for center-wide statistics."""
+
+    def _create_allocation(self, project, *resources):
+        allocation = Allocation.objects.create(
+            project=project, status=AllocationStatusChoice.objects.get(name="Active")
+        )
+        allocation.resources.add(*resources)
+        return allocation
+
+    def test_allocations_counted_by_parent_resource(
+        self, resources, create_active_project_with_pi
+    ):
+        """Test that Allocations are counted under their parent
+        Resources, and that PIs are counted once."""
+        parent, child, unallocatable = resources
+        pi = User.objects.create_user(username="statistics_pi")
+        project = create_active_project_with_pi("fc_statistics", pi)
+        other_project = create_active_project_with_pi("fc_statistics_other", pi)
+        self._create_allocation(project, parent)
+        self._create_allocation(project, child, unallocatable)
+        self._create_allocation(other_project, unallocatable)
+
+        statistics = compute_center_statistics()
+
+        counts = {
+            name: count for name, _, count in statistics.allocations_count_by_resource
+        }
+        assert counts["Statistics Parent"] == 2
+        assert counts["Statistics Unallocatable"] == 1
+        assert "Statistics Child" not in counts
+
+        baseline = compute_center_statistics().active_pi_count
+        create_active_project_with_pi(
+            "fc_statistics_new", User.objects.create_user(username="new_pi")
+        )
+        assert compute_center_statistics().active_pi_count == baseline + 1
+
+    def test_statistics_served_from_cache(
+        self, locmem_cache, django_assert_num_queries
+    ):
+        """Test that statistics are computed once and then served from
+        the cache."""
+        statistics = get_center_statistics()
+
+        with django_assert_num_queries(0):
+            assert get_center_statistics() == statistics
+
+    def test_refresh_does_not_replace_newer_statistics(self, locmem_cache):
+        """Test that a refresh does not replace statistics computed more
+        recently."""
+        newer = compute_center_statistics()
+        newer = newer._replace(computed_at=newer.computed_at + timedelta(hours=1))
+        locmem_cache.set(CENTER_STATISTICS_CACHE_KEY, newer)
+
+        refresh_center_statistics()
+
+        assert locmem_cache.get(CENTER_STATISTICS_CACHE_KEY) == newer
+
+    def test_command_refreshes_statistics(self, locmem_cache):
+        """Test that the management command replaces cached statistics."""
+        older = compute_center_statistics()
+        older = older._replace(computed_at=older.computed_at - timedelta(hours=1))
+        locmem_cache.set(CENTER_STATISTICS_CACHE_KEY, older)
+
+        call_command("refresh_center_statistics")
+
+        cached = locmem_cache.get(CENTER_STATISTICS_CACHE_KEY)
+        assert cached.computed_at > older.computed_at
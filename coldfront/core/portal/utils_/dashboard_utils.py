@@ -0,0 +1,177 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from coldfront.core.allocation.models import AllocationUserAttribute
+from coldfront.core.allocation.utils import get_project_compute_resource_name
+from coldfront.core.project.models import (
+    Project,
+    ProjectUser,
+    ProjectUserJoinRequest,
+    ProjectUserRemovalRequest,
+)
+
+"""Methods relating to the per-user snapshot of the data displayed on
+the portal home page.
+
+A snapshot is computed once and stored in the Django cache, so that
+rendering the home page does not require per-project queries. Snapshots
+are invalidated when objects that affect them are saved or deleted (see
+coldfront.core.portal.signals), and expire after a timeout, to account
+for updates that do not send signals (e.g., QuerySet.update).
+
+Service unit usages, which are updated whenever a job is reported, are
+the exception: they do not invalidate snapshots, so usage on the home
+page may lag by up to DASHBOARD_SNAPSHOT_CACHE_TIMEOUT seconds."""
+
+
+DASHBOARD_SNAPSHOT_CACHE_KEY_PREFIX = "portal_dashboard_snapshot:"
+
+# The number of seconds after which a snapshot expires, regardless of
+# whether it has been invalidated.
+DASHBOARD_SNAPSHOT_CACHE_TIMEOUT = 15 * 60
+
+
+# A Project, as displayed on the home page.
+#   - display_status: a str describing the user's access to the cluster
+#     under the project
+#   - rendered_compute_usage: a str describing the project's service
+#     unit usage
+DashboardProject = namedtuple(
+    "DashboardProject",
+    [
+        "pk",
+        "name",
+        "status_name",
+        "needs_review",
+        "display_status",
+        "cluster_name",
+        "rendered_compute_usage",
+    ],
+)
+
+
+# The data displayed on the home page for a particular user.
+DashboardSnapshot = namedtuple(
+    "DashboardSnapshot",
+    [
+        "projects",
+        "has_cluster_access",
+        "num_join_requests",
+        "pending_removal_request_projects",
+    ],
+)
+
+
+def _dashboard_snapshot_cache_key(user_pk):
+    return f"{DASHBOARD_SNAPSHOT_CACHE_KEY_PREFIX}{user_pk}"
+
+
+def compute_dashboard_snapshot(user):
+    """Return a DashboardSnapshot for the given User, computed from the
+    database."""
+    from coldfront.core.allocation.utils_.accounting_utils.services import (
+        ServiceUnitsUsageService,
+    )
+
+    cluster_access_attributes = list(
+        AllocationUserAttribute.objects.filter(
+            allocation_attribute_type__name="Cluster Account Status",
+            allocation_user__user=user,
+        ).values_list("allocation__project_id", "value")
+    )
+    access_states = dict(cluster_access_attributes)
+    has_cluster_access = any(
+        value == "Active" for _, value in cluster_access_attributes
+    )
+
+    pending_removal_requests = ProjectUserRemovalRequest.objects.filter(
+        project_user__user=user, status__name="Pending"
+    ).values_list("project_user__project_id", "project_user__project__name")
+    pending_removal_request_projects = []
+    for project_pk, project_name in pending_removal_requests:
+        access_states[project_pk] = "Pending - Remove"
+        pending_removal_request_projects.append(project_name)
+
+    project_list = (
+        Project.objects.filter(
+            Q(status__name__in=["New", "Active", "Inactive"])
+            & Q(projectuser__user=user)
+            & Q(projectuser__status__name__in=["Active", "Pending - Remove"])
+        )
+        .select_related("status")
+        .distinct()
+        .order_by("name")
+    )
+
+    service = ServiceUnitsUsageService()
+    projects = []
+    for project in project_list:
+        resource_name = get_project_compute_resource_name(project)
+        try:
+            rendered_compute_usage = service.get_usage_display(project)
+        except Exception:
+            rendered_compute_usage = "Unexpected error"
+        projects.append(
+            DashboardProject(
+                pk=project.pk,
+                name=project.name,
+                status_name=project.status.name,
+                needs_review=project.needs_review,
+                display_status=access_states.get(project.pk, "None"),
+                cluster_name=resource_name.replace(" Compute", ""),
+                rendered_compute_usage=rendered_compute_usage,
+            )
+        )
+
+    num_join_requests = (
+        ProjectUserJoinRequest.objects.filter(
+            project_user__status__name="Pending - Add",
+            project_user__user=user,
+        )
+        .values("project_user")
+        .distinct()
+        .count()
+    )
+
+    return DashboardSnapshot(
+        projects=projects,
+        has_cluster_access=has_cluster_access,
+        num_join_requests=num_join_requests,
+        pending_removal_request_projects=pending_removal_request_projects,
+    )
+
+
+def get_dashboard_snapshot(user):
+    """Return a DashboardSnapshot for the given User, retrieving it from
+    the cache if possible, and computing and caching it otherwise."""
+    cache_key = _dashboard_snapshot_cache_key(user.pk)
+    snapshot = cache.get(cache_key)
+    if isinstance(snapshot, DashboardSnapshot):
+        return snapshot
+    snapshot = compute_dashboard_snapshot(user)
+    cache.set(cache_key, snapshot, timeout=DASHBOARD_SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def invalidate_dashboard_snapshots(user_pks):
+    """Clear the cached DashboardSnapshots of the Users with the given
+    primary keys, both immediately and once the current transaction (if
+    any) is committed, so that other processes do not re-cache
+    uncommitted state."""
+    keys = [_dashboard_snapshot_cache_key(user_pk) for user_pk in set(user_pks)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_project_dashboard_snapshots(project_pks):
+    """Clear the cached DashboardSnapshots of all Users associated with
+    the Projects with the given primary keys."""
+    user_pks = ProjectUser.objects.filter(project_id__in=project_pks).values_list(
+        "user_id", flat=True
+    )
+    invalidate_dashboard_snapshots(list(user_pks))
@@ -0,0 +1,167 @@
+from collections import Counter, defaultdict, namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from coldfront.core.allocation.models import Allocation, AllocationUser
+from coldfront.core.portal.utils import (
+    generate_allocations_chart_data,
+    generate_resources_chart_data,
+)
+from coldfront.core.project.models import ProjectUser
+from coldfront.core.resource.models import Resource
+from coldfront.core.utils.common import utc_now_offset_aware
+
+"""Methods relating to the center-wide statistics displayed on the
+center summary pages.
+
+The statistics are computed with database-side aggregates and stored as
+a snapshot in the Django cache, along with the time at which they were
+computed. Pages read from the snapshot. It is recomputed periodically
+(see the refresh_center_statistics management command)."""
+
+
+CENTER_STATISTICS_CACHE_KEY = "portal_center_statistics"
+
+
+# A snapshot of center-wide statistics.
+#   - computed_at: the datetime at which the statistics were computed
+#   - allocations_by_fos: a dict mapping field of science to the number
+#     of active Allocations
+#   - active_users_by_fos: a dict mapping field of science to the number
+#     of active AllocationUsers
+#   - total_allocations_users: the number of distinct active users
+#   - active_pi_count: the number of distinct PIs of active or new
+#     Projects
+#   - allocations_count_by_resource: a list of tuples of the form
+#     (resource name, resource type name, number of active Allocations)
+#   - allocations_chart_data: chart data for Allocations by status
+#   - resources_chart_data: chart data for Allocations by resource type
+CenterStatistics = namedtuple(
+    "CenterStatistics",
+    [
+        "computed_at",
+        "allocations_by_fos",
+        "active_users_by_fos",
+        "total_allocations_users",
+        "active_pi_count",
+        "allocations_count_by_resource",
+        "allocations_chart_data",
+        "resources_chart_data",
+    ],
+)
+
+
+def _count_by(queryset, field):
+    """Return a dict mapping each value of the given field to the number
+    of objects in the given queryset having it."""
+    rows = queryset.values(field).annotate(count=Count("pk")).order_by(field)
+    return {row[field]: row["count"] for row in rows}
+
+
+def _count_active_allocations_by_parent_resource():
+    """Return a Counter mapping the primary key of each Resource to the
+    number of active Allocations to it, where an Allocation's Resource is
+    its parent Resource (see Allocation.get_parent_resource), or that
+    Resource's own parent, if any. Resources are retrieved in bulk,
+    rather than per Allocation."""
+    resources = {
+        resource.pk: resource
+        for resource in Resource.objects.only(
+            "pk", "name", "is_allocatable", "parent_resource"
+        )
+    }
+
+    resource_pks_by_allocation = defaultdict(list)
+    through_rows = Allocation.resources.through.objects.filter(
+        allocation__status__name="Active"
+    ).values_list("allocation_id", "resource_id")
+    for allocation_pk, resource_pk in through_rows:
+        resource_pks_by_allocation[allocation_pk].append(resource_pk)
+
+    counts = Counter()
+    for resource_pks in resource_pks_by_allocation.values():
+        if len(resource_pks) == 1:
+            resource = resources[resource_pks[0]]
+        else:
+            allocatable = [
+                resources[pk] for pk in resource_pks if resources[pk].is_allocatable
+            ]
+            if not allocatable:
+                continue
+            resource = min(allocatable, key=lambda r: r.name)
+        counts[resource.parent_resource_id or resource.pk] += 1
+    return counts
+
+
+def compute_center_statistics():
+    """Return a CenterStatistics computed from the database."""
+    computed_at = utc_now_offset_aware()
+
+    fos_field = "project__field_of_science__description"
+    allocations_by_fos = _count_by(
+        Allocation.objects.filter(status__name="Active"), fos_field
+    )
+
+    user_allocations = AllocationUser.objects.filter(
+        status__name="Active", allocation__status__name="Active"
+    )
+    active_users_by_fos = _count_by(user_allocations, f"allocation__{fos_field}")
+    total_allocations_users = user_allocations.values("user").distinct().count()
+
+    active_pi_count = (
+        ProjectUser.objects.filter(
+            project__status__name__in=["Active", "New"],
+            role__name="Principal Investigator",
+        )
+        .values("user")
+        .distinct()
+        .count()
+    )
+
+    counts_by_resource_pk = _count_active_allocations_by_parent_resource()
+    allocations_count_by_resource = []
+    allocation_count_by_resource_type = Counter()
+    for resource in Resource.objects.filter(
+        pk__in=counts_by_resource_pk
+    ).select_related("resource_type"):
+        count = counts_by_resource_pk[resource.pk]
+        resource_type_name = resource.resource_type.name
+        allocations_count_by_resource.append((resource.name, resource_type_name, count))
+        allocation_count_by_resource_type[resource_type_name] += count
+
+    return CenterStatistics(
+        computed_at=computed_at,
+        allocations_by_fos=allocations_by_fos,
+        active_users_by_fos=active_users_by_fos,
+        total_allocations_users=total_allocations_users,
+        active_pi_count=active_pi_count,
+        allocations_count_by_resource=allocations_count_by_resource,
+        allocations_chart_data=generate_allocations_chart_data(),
+        resources_chart_data=generate_resources_chart_data(
+            dict(allocation_count_by_resource_type)
+        ),
+    )
+
+
+def get_center_statistics():
+    """Return the cached CenterStatistics, computing and caching them if
+    there are none."""
+    statistics = cache.get(CENTER_STATISTICS_CACHE_KEY)
+    if isinstance(statistics, CenterStatistics):
+        return statistics
+    return refresh_center_statistics()
+
+
+def refresh_center_statistics():
+    """Compute CenterStatistics and cache them, unless the cache holds
+    statistics computed more recently (e.g., by a concurrent refresh).
+    Return the computed statistics."""
+    statistics = compute_center_statistics()
+    cached = cache.get(CENTER_STATISTICS_CACHE_KEY)
+    if (
+        not isinstance(cached, CenterStatistics)
+        or cached.computed_at <= statistics.computed_at
+    ):
+        cache.set(CENTER_STATISTICS_CACHE_KEY, statistics, timeout=None)
+    return statistics
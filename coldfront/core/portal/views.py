@@ -1,90 +1,25 @@
-from collections import Counter
-
 from django.conf import settings
 from django.db.models import Q
 from django.shortcuts import render
-from django.views.decorators.cache import cache_page
-
-from coldfront.core.allocation.models import (
-    Allocation,
-    AllocationUser,
-    AllocationUserAttribute,
-)
-from coldfront.core.allocation.utils import (
-    get_project_compute_resource_name,
-    has_cluster_access,
-)
+
+from coldfront.core.allocation.models import Allocation
 
 # from coldfront.core.grant.models import Grant
-from coldfront.core.portal.utils import (
-    generate_allocations_chart_data,
-    generate_resources_chart_data,
-)
-from coldfront.core.project.models import (
-    Project,
-    ProjectUserJoinRequest,
-    ProjectUserRemovalRequest,
-)
+from coldfront.core.portal.utils_.dashboard_utils import get_dashboard_snapshot
+from coldfront.core.portal.utils_.statistics_utils import get_center_statistics
 
 # from coldfront.core.publication.models import Publication
 # from coldfront.core.research_output.models import ResearchOutput
 
 
 def home(request):
-
-    def _compute_project_user_cluster_access_statuses(_user):
-        """Return a dict mapping each Project object that the given User
-        is associated with to a str describing the user's access to the
-        cluster under the project."""
-        statuses = {}
-
-        cluster_access_attributes = AllocationUserAttribute.objects.filter(
-            allocation_attribute_type__name="Cluster Account Status",
-            allocation_user__user=_user,
-        )
-        for attribute in cluster_access_attributes:
-            _project = attribute.allocation.project
-            statuses[_project] = attribute.value
-
-        for project_user_removal_request in ProjectUserRemovalRequest.objects.filter(
-            project_user__user=_user, status__name="Pending"
-        ):
-            _project = project_user_removal_request.project_user.project
-            statuses[_project] = "Pending - Remove"
-
-        return statuses
-
     context = {}
     if request.user.is_authenticated:
         template_name = "portal/authorized_home.html"
-        project_list = (
-            Project.objects.filter(
-                Q(status__name__in=["New", "Active", "Inactive"])
-                & Q(projectuser__user=request.user)
-                & Q(projectuser__status__name__in=["Active", "Pending - Remove"])
-            )
-            .distinct()
-            .order_by("name")
-        )
 
-        access_states = _compute_project_user_cluster_access_statuses(request.user)
+        snapshot = get_dashboard_snapshot(request.user)
 
-        from coldfront.core.allocation.utils_.accounting_utils.services import (
-            ServiceUnitsUsageService,
-        )
-
-        service = ServiceUnitsUsageService()
-        for project in project_list:
-            project.display_status = access_states.get(project, "None")
-            resource_name = get_project_compute_resource_name(project)
-            project.cluster_name = resource_name.replace(" Compute", "")
-            try:
-                rendered_compute_usage = service.get_usage_display(project)
-            except Exception:
-                rendered_compute_usage = "Unexpected error"
-            project.rendered_compute_usage = rendered_compute_usage
-
-        if has_cluster_access(request.user):
+        if snapshot.has_cluster_access:
             context["cluster_username"] = request.user.username
 
         allocation_list = (
@@ -113,27 +48,12 @@ def home(request):
             .distinct()
             .order_by("-created")
         )
-        context["project_list"] = project_list
+        context["project_list"] = snapshot.projects
         context["allocation_list"] = allocation_list
-
-        num_join_requests = (
-            ProjectUserJoinRequest.objects.filter(
-                project_user__status__name="Pending - Add",
-                project_user__user=request.user,
-            )
-            .order_by("project_user", "-created")
-            .distinct("project_user")
-            .count()
+        context["num_join_requests"] = snapshot.num_join_requests
+        context["pending_removal_request_projects"] = (
+            snapshot.pending_removal_request_projects
         )
-        context["num_join_requests"] = num_join_requests
-
-        context["pending_removal_request_projects"] = [
-            removal_request.project_user.project.name
-            for removal_request in ProjectUserRemovalRequest.objects.filter(
-                Q(project_user__user__username=request.user.username)
-                & Q(status__name="Pending")
-            )
-        ]
 
         # if flag_enabled('HARDWARE_PROCUREMENTS_ENABLED'):
         #
@@ -229,67 +149,25 @@ def center_summary(request):
     return render(request, "portal/center_summary.html", context)
 
 
-@cache_page(60 * 15)
 def allocation_by_fos(request):
-
-    allocations_by_fos = Counter(
-        list(
-            Allocation.objects.filter(status__name="Active").values_list(
-                "project__field_of_science__description", flat=True
-            )
-        )
-    )
-
-    user_allocations = AllocationUser.objects.filter(
-        status__name="Active", allocation__status__name="Active"
-    )
-
-    active_users_by_fos = Counter(
-        list(
-            user_allocations.values_list(
-                "allocation__project__field_of_science__description", flat=True
-            )
-        )
-    )
-    total_allocations_users = user_allocations.values("user").distinct().count()
-
-    pis = set()
-    for project in Project.objects.filter(status__name__in=["Active", "New"]):
-        pis.update([pi.username for pi in project.pis()])
-    active_pi_count = len(pis)
+    statistics = get_center_statistics()
 
     context = {}
-    context["allocations_by_fos"] = dict(allocations_by_fos)
-    context["active_users_by_fos"] = dict(active_users_by_fos)
-    context["total_allocations_users"] = total_allocations_users
-    context["active_pi_count"] = active_pi_count
+    context["allocations_by_fos"] = statistics.allocations_by_fos
+    context["active_users_by_fos"] = statistics.active_users_by_fos
+    context["total_allocations_users"] = statistics.total_allocations_users
+    context["active_pi_count"] = statistics.active_pi_count
+    context["statistics_computed_at"] = statistics.computed_at
     return render(request, "portal/allocation_by_fos.html", context)
 
 
-@cache_page(60 * 15)
 def allocation_summary(request):
-
-    allocation_resources = [
-        allocation.get_parent_resource.parent_resource
-        if allocation.get_parent_resource.parent_resource
-        else allocation.get_parent_resource
-        for allocation in Allocation.objects.filter(status__name="Active")
-    ]
-
-    allocations_count_by_resource = dict(Counter(allocation_resources))
-
-    allocation_count_by_resource_type = dict(
-        Counter([ele.resource_type.name for ele in allocation_resources])
-    )
-
-    allocations_chart_data = generate_allocations_chart_data()
-    resources_chart_data = generate_resources_chart_data(
-        allocation_count_by_resource_type
-    )
+    statistics = get_center_statistics()
 
     context = {}
-    context["allocations_chart_data"] = allocations_chart_data
-    context["allocations_count_by_resource"] = allocations_count_by_resource
-    context["resources_chart_data"] = resources_chart_data
+    context["allocations_chart_data"] = statistics.allocations_chart_data
+    context["allocations_count_by_resource"] = statistics.allocations_count_by_resource
+    context["resources_chart_data"] = statistics.resources_chart_data
+    context["statistics_computed_at"] = statistics.computed_at
 
     return render(request, "portal/allocation_summary.html", context)
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.15 on 2026-10-19 11:26
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+# The columns of the search document table searched by substring, each of
+# which is given a trigram index on PostgreSQL.
+SEARCHED_COLUMNS = ['name', 'title', 'field_of_science', 'pi_last_names', 'usernames']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """On PostgreSQL, enable the pg_trgm extension and create a trigram
+    index on each searched column, usable by case-insensitive substring
+    searches (i.e., UPPER(column) LIKE UPPER(...))."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCHED_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS project_search_{column}_trgm '
+            f'ON project_projectsearchdocument USING gin (UPPER({column}) gin_trgm_ops)')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """On PostgreSQL, drop the indexes created by
+    create_trigram_indexes. The extension is left in place."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCHED_COLUMNS:
+        schema_editor.execute(
+            f'DROP INDEX IF EXISTS project_search_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0026_add_reason_to_project_user_removal_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSearchDocument',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='project.project')),
+                ('name', models.TextField(blank=True)),
+                ('title', models.TextField(blank=True)),
+                ('field_of_science', models.TextField(blank=True)),
+                ('pi_last_names', models.TextField(blank=True)),
+                ('usernames', models.TextField(blank=True)),
+                ('document', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(
+            create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,73 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+# The separator between multiple values in a single column of a search
+# document (see coldfront.core.utils.search).
+SEARCH_DOCUMENT_VALUE_SEPARATOR = '\n'
+
+# The maximum number of documents to create at once.
+BATCH_SIZE = 500
+
+
+def create_project_search_documents(apps, schema_editor):
+    """On PostgreSQL, where Projects are searched by their search
+    documents, create a document for each existing Project, so that
+    Projects are found before the documents are first refreshed."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Project = apps.get_model('project', 'Project')
+    ProjectSearchDocument = apps.get_model('project', 'ProjectSearchDocument')
+    ProjectUser = apps.get_model('project', 'ProjectUser')
+
+    pi_last_names, usernames = defaultdict(list), defaultdict(list)
+    project_users = ProjectUser.objects.order_by('pk').values_list(
+        'project_id', 'user__last_name', 'user__username', 'role__name',
+        'status__name')
+    for project_pk, last_name, username, role_name, status_name in \
+            project_users:
+        is_pi = role_name == 'Principal Investigator'
+        if is_pi and last_name:
+            pi_last_names[project_pk].append(last_name)
+        if (is_pi or status_name == 'Active') and username:
+            usernames[project_pk].append(username)
+
+    documents = []
+    projects = Project.objects.order_by('pk').values_list(
+        'pk', 'name', 'title', 'field_of_science__description')
+    for project_pk, name, title, field_of_science in projects:
+        values = {
+            'name': name or '',
+            'title': title or '',
+            'field_of_science': field_of_science or '',
+            'pi_last_names': SEARCH_DOCUMENT_VALUE_SEPARATOR.join(
+                pi_last_names[project_pk]),
+            'usernames': SEARCH_DOCUMENT_VALUE_SEPARATOR.join(
+                usernames[project_pk]),
+        }
+        documents.append(
+            ProjectSearchDocument(
+                project_id=project_pk,
+                document=' '.join(value for value in values.values() if value),
+                **values))
+    ProjectSearchDocument.objects.bulk_create(
+        documents, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def delete_project_search_documents(apps, schema_editor):
+    """Delete all search documents."""
+    ProjectSearchDocument = apps.get_model('project', 'ProjectSearchDocument')
+    ProjectSearchDocument.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0027_projectsearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_project_search_documents, delete_project_search_documents),
+    ]
@@ -652,3 +652,25 @@ class ProjectUserRemovalRequest(TimeStampedModel):
     status = models.ForeignKey(
         ProjectUserRemovalRequestStatusChoice, on_delete=models.CASCADE, null=True
     )
+
+
+class ProjectSearchDocument(TimeStampedModel):
+    """A denormalized representation of the searchable values of a
+    Project, maintained on PostgreSQL (see
+    coldfront.core.project.utils_.search_utils)."""
+
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    name = models.TextField(blank=True)
+    title = models.TextField(blank=True)
+    field_of_science = models.TextField(blank=True)
+    # The last names of the Project's PIs.
+    pi_last_names = models.TextField(blank=True)
+    # The usernames of the Project's PIs and active members.
+    usernames = models.TextField(blank=True)
+    # The concatenation of the above, against which results are ranked.
+    document = models.TextField(blank=True)
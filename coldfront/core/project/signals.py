@@ -1,10 +1,21 @@
 import logging
 
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal, receiver
 
 from coldfront.core.allocation.models import AllocationRenewalRequest
-from coldfront.core.project.models import SavioProjectAllocationRequest
+from coldfront.core.field_of_science.models import FieldOfScience
+from coldfront.core.project.models import (
+    Project,
+    ProjectUser,
+    SavioProjectAllocationRequest,
+)
 from coldfront.core.project.utils_.renewal_utils import AllocationRenewalDenialRunner
+from coldfront.core.project.utils_.search_utils import (
+    refresh_project_search_documents,
+)
+from coldfront.core.utils.search import indexed_search_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -77,3 +88,45 @@ def deny_associated_allocation_renewal_request(sender, **kwargs):
         f"{request_id} was denied."
     )
     logger.info(message)
+
+
+@receiver(post_save, sender=Project)
+def refresh_search_document_on_project_save(sender, instance, **kwargs):
+    """When a Project is saved, refresh its search document."""
+    if kwargs.get("raw") or not indexed_search_enabled():
+        return
+    refresh_project_search_documents([instance.pk])
+
+
+@receiver(post_save, sender=ProjectUser)
+def refresh_search_document_on_project_user_save(sender, instance, **kwargs):
+    """When a ProjectUser is saved (e.g., its role or status changes),
+    refresh its Project's search document."""
+    if kwargs.get("raw") or not indexed_search_enabled():
+        return
+    refresh_project_search_documents([instance.project_id])
+
+
+@receiver(post_delete, sender=ProjectUser)
+def refresh_search_document_on_project_user_delete(sender, instance, **kwargs):
+    """When a ProjectUser is deleted, refresh its Project's search
+    document once the current transaction is committed, since the
+    Project may be being deleted along with it."""
+    if not indexed_search_enabled():
+        return
+    project_pk = instance.project_id
+    transaction.on_commit(
+        lambda: refresh_project_search_documents([project_pk]), robust=True
+    )
+
+
+@receiver(post_save, sender=FieldOfScience)
+def refresh_search_documents_on_field_of_science_save(sender, instance, **kwargs):
+    """When a FieldOfScience is saved, refresh the search documents of
+    its Projects."""
+    if kwargs.get("raw") or not indexed_search_enabled():
+        return
+    project_pks = Project.objects.filter(field_of_science=instance).values_list(
+        "pk", flat=True
+    )
+    refresh_project_search_documents(list(project_pks))
@@ -0,0 +1,135 @@
+"""Tests for coldfront.core.project.utils_.search_utils."""
+
+from django.contrib.auth.models import User
+import pytest
+
+from coldfront.core.project import signals as project_signals
+from coldfront.core.project.models import (
+    Project,
+    ProjectSearchDocument,
+    ProjectUser,
+    ProjectUserRoleChoice,
+    ProjectUserStatusChoice,
+)
+from coldfront.core.project.utils_.search_utils import (
+    refresh_project_search_documents,
+    search_projects,
+)
+from coldfront.core.user import signals as user_signals
+
+
+@pytest.fixture
+def indexed_search(monkeypatch):
+    """Maintain search documents via signals, as on PostgreSQL."""
+    for module in (project_signals, user_signals):
+        monkeypatch.setattr(module, "indexed_search_enabled", lambda: True)
+
+
+@pytest.fixture
+def project_with_members(create_active_project_with_pi):
+    """Return a Project with a PI, an active user, and a user pending
+    removal."""
+    pi = User.objects.create(username="pi_user", last_name="Curie")
+    project = create_active_project_with_pi("fc_search", pi)
+    project.title = "Radioactivity"
+    project.save()
+
+    user_role = ProjectUserRoleChoice.objects.get(name="User")
+    for username, status_name in (
+        ("active_user", "Active"),
+        ("leaving_user", "Pending - Remove"),
+    ):
+        ProjectUser.objects.create(
+            project=project,
+            user=User.objects.create(username=username, last_name="Other"),
+            role=user_role,
+            status=ProjectUserStatusChoice.objects.get(name=status_name),
+        )
+    return project
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestRefreshProjectSearchDocuments:
+    """Tests for refresh_project_search_documents."""
+
+    def test_document_contents(self, project_with_members):
+        """Test that a document includes the Project's values, the last
+        names of its PIs, and the usernames of its PIs and active
+        members."""
+        refresh_project_search_documents([project_with_members.pk])
+
+        document = ProjectSearchDocument.objects.get(project=project_with_members)
+        assert document.name == "fc_search"
+        assert document.title == "Radioactivity"
+        assert document.field_of_science == (
+            project_with_members.field_of_science.description
+        )
+        assert document.pi_last_names == "Curie"
+        assert document.usernames.split("\n") == ["pi_user", "active_user"]
+        assert "Curie" in document.document
+
+    def test_unchanged_documents_not_saved(
+        self, project_with_members, django_assert_num_queries
+    ):
+        """Test that refreshing an unchanged document only reads from the
+        database."""
+        assert refresh_project_search_documents() == [project_with_members.pk]
+
+        # Project primary keys, ProjectUsers, Projects, and stored documents.
+        with django_assert_num_queries(4):
+            assert refresh_project_search_documents() == []
+
+    def test_maintained_by_signals(
+        self,
+        indexed_search,
+        project_with_members,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test that documents are refreshed when the Project, its
+        ProjectUsers, or their Users change. Deletions are handled once
+        the transaction is committed."""
+        document = ProjectSearchDocument.objects.get(project=project_with_members)
+        assert document.title == "Radioactivity"
+
+        pi = User.objects.get(username="pi_user")
+        pi.last_name = "Sklodowska-Curie"
+        pi.save()
+        document.refresh_from_db()
+        assert document.pi_last_names == "Sklodowska-Curie"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProjectUser.objects.get(user__username="active_user").delete()
+        document.refresh_from_db()
+        assert "active_user" not in document.usernames.split("\n")
+
+    def test_not_maintained_without_indexed_search(self, project_with_members):
+        """Test that, on databases without indexed search, signals do not
+        create documents."""
+        assert not ProjectSearchDocument.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSearchProjects:
+    """Tests for search_projects."""
+
+    @pytest.mark.parametrize(
+        "data,matches",
+        [
+            ({"last_name": "curi"}, True),
+            ({"last_name": "other"}, False),
+            ({"username": "active_u"}, True),
+            ({"username": "leaving_user"}, False),
+            ({"project_title": "radio", "project_name": "fc_"}, True),
+            ({"project_title": "radio", "project_name": "ac_"}, False),
+        ],
+    )
+    def test_matches_documents(self, project_with_members, data, matches):
+        """Test that Projects are filtered by their documents, with the
+        same semantics as filtering the original columns."""
+        refresh_project_search_documents()
+
+        projects = search_projects(Project.objects.all(), data, rank=False)
+
+        assert (project_with_members in projects) == matches
@@ -0,0 +1,144 @@
+"""Tests for ProjectUserTableView."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+import pytest
+
+from coldfront.api.statistics.utils import create_project_allocation
+from coldfront.core.allocation.models import (
+    AllocationAttributeType,
+    AllocationUser,
+    AllocationUserAttribute,
+    AllocationUserStatusChoice,
+)
+from coldfront.core.project.models import (
+    ProjectUser,
+    ProjectUserRoleChoice,
+    ProjectUserStatusChoice,
+)
+
+NUM_USERS = 30
+
+
+@pytest.fixture
+def project(create_active_project_with_pi):
+    """Return a Project with a PI and NUM_USERS active Users, every
+    other one of which has active cluster access."""
+    pi = User.objects.create(
+        username="table_pi", email="table_pi@example.com", last_name="PI"
+    )
+    project = create_active_project_with_pi("fc_table", pi)
+    allocation = create_project_allocation(project, Decimal("1000.00")).allocation
+    cluster_account_status = AllocationAttributeType.objects.get(
+        name="Cluster Account Status"
+    )
+    for i in range(NUM_USERS):
+        user = User.objects.create(
+            username=f"table_user{i:02}",
+            email=f"table_user{i:02}@example.com",
+            first_name="Table",
+            last_name=f"User{i:02}",
+        )
+        ProjectUser.objects.create(
+            project=project,
+            user=user,
+            role=ProjectUserRoleChoice.objects.get(name="User"),
+            status=ProjectUserStatusChoice.objects.get(name="Active"),
+        )
+        if i % 2 == 0:
+            allocation_user = AllocationUser.objects.create(
+                allocation=allocation,
+                user=user,
+                status=AllocationUserStatusChoice.objects.get(name="Active"),
+            )
+            AllocationUserAttribute.objects.create(
+                allocation=allocation,
+                allocation_user=allocation_user,
+                allocation_attribute_type=cluster_account_status,
+                value="Active",
+            )
+    return project
+
+
+@pytest.fixture
+def superuser_client(client):
+    superuser = User.objects.create_superuser(
+        username="table_superuser", email="table_superuser@example.com"
+    )
+    client.force_login(superuser)
+    return client
+
+
+def get_table(client, project, **params):
+    url = reverse("project-user-table", kwargs={"pk": project.pk})
+    response = client.get(url, params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestProjectUserTableView:
+    """Tests for ProjectUserTableView."""
+
+    def test_paginated(self, project, superuser_client):
+        """Test that only the requested page of rows is returned, along
+        with the total number of rows."""
+        data = get_table(superuser_client, project, draw=3, start=10, length=10)
+        assert data["draw"] == 3
+        assert data["recordsTotal"] == NUM_USERS + 1
+        assert data["recordsFiltered"] == NUM_USERS + 1
+        assert len(data["data"]) == 10
+
+    def test_page_length_capped(self, project, superuser_client):
+        """Test that the page length cannot exceed the maximum."""
+        data = get_table(superuser_client, project, length=100000)
+        assert len(data["data"]) == NUM_USERS + 1
+
+        url = reverse("project-user-table", kwargs={"pk": project.pk})
+        response = superuser_client.get(url, {"length": "invalid"})
+        assert len(response.json()["data"]) == 25
+
+    def test_sorted(self, project, superuser_client):
+        """Test that rows are sorted by the requested column and
+        direction."""
+        params = {"order[0][column]": 3, "order[0][dir]": "desc", "length": 5}
+        data = get_table(superuser_client, project, **params)
+        assert data["data"][0]["email"] == "table_user29@example.com"
+
+        params["order[0][dir]"] = "asc"
+        data = get_table(superuser_client, project, **params)
+        assert data["data"][0]["email"] == "table_pi@example.com"
+
+    def test_filtered(self, project, superuser_client):
+        """Test that rows are filtered by each search term."""
+        data = get_table(superuser_client, project, **{"search[value]": "table user0"})
+        assert data["recordsTotal"] == NUM_USERS + 1
+        assert data["recordsFiltered"] == 10
+        assert len(data["data"]) == 10
+
+    def test_cluster_access_status(self, project, superuser_client):
+        """Test that each row includes its User's cluster access
+        status, defaulting to 'None'."""
+        data = get_table(superuser_client, project, length=100)
+        statuses = {row["email"]: row["cluster_access_status"] for row in data["data"]}
+        assert statuses["table_user00@example.com"] == "Active"
+        assert statuses["table_user01@example.com"] == "None"
+        assert statuses["table_pi@example.com"] == "None"
+
+        # Sorting by status groups Users without access first.
+        params = {"order[0][column]": 4, "order[0][dir]": "asc", "length": 100}
+        data = get_table(superuser_client, project, **params)
+        ordered = [row["cluster_access_status"] for row in data["data"]]
+        assert ordered == sorted(ordered)
+
+    def test_non_member_forbidden(self, project, client):
+        """Test that Users who cannot view the Project cannot view its
+        Users."""
+        user = User.objects.create(username="table_outsider")
+        client.force_login(user)
+        url = reverse("project-user-table", kwargs={"pk": project.pk})
+        response = client.get(url)
+        assert response.status_code == 403
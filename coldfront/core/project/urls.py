@@ -18,6 +18,11 @@ import coldfront.core.utils.views.mou_views as mou_views
 
 urlpatterns = [
     path("<int:pk>/", project_views.ProjectDetailView.as_view(), name="project-detail"),
+    path(
+        "<int:pk>/user-table/",
+        project_views.ProjectUserTableView.as_view(),
+        name="project-user-table",
+    ),
     path(
         "<int:pk>/archive",
         project_views.ProjectArchiveProjectView.as_view(),
@@ -2,12 +2,16 @@ from urllib.parse import urljoin
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Case, CharField, F, Value, When
+from django.db.models import Case, CharField, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from flags.state import flag_enabled
 
 from coldfront.api.statistics.utils import get_accounting_allocation_objects
-from coldfront.core.allocation.models import AllocationStatusChoice
+from coldfront.core.allocation.models import (
+    AllocationStatusChoice,
+    AllocationUserAttribute,
+)
 from coldfront.core.allocation.utils import get_project_compute_resource_name
 from coldfront.core.allocation.utils_.accounting_utils import set_service_units
 from coldfront.core.project.models import (
@@ -42,6 +46,36 @@ def annotate_queryset_with_cluster_name(queryset):
     )
 
 
+def annotate_project_users_with_cluster_access_status(project_users, allocation):
+    """Given a queryset of ProjectUsers, annotate each instance with a
+    character field named 'cluster_access_status', which denotes the
+    value of its User's "Cluster Account Status" attribute under the
+    given Allocation (typically the Project's compute Allocation), or
+    "None" if there is no such attribute or the Allocation is None.
+
+    The status is retrieved using a correlated subquery, rather than
+    one condition per User, so that the query does not grow with the
+    number of Users."""
+    if allocation is None:
+        return project_users.annotate(
+            cluster_access_status=Value("None", output_field=CharField())
+        )
+    statuses = (
+        AllocationUserAttribute.objects.filter(
+            allocation=allocation,
+            allocation_attribute_type__name="Cluster Account Status",
+            allocation_user__user=OuterRef("user"),
+        )
+        .order_by("-pk")
+        .values("value")[:1]
+    )
+    return project_users.annotate(
+        cluster_access_status=Coalesce(
+            Subquery(statuses), Value("None"), output_field=CharField()
+        )
+    )
+
+
 def project_join_list_url():
     domain = import_from_settings("CENTER_BASE_URL")
     view = reverse("project-join-list")
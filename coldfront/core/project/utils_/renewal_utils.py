@@ -25,6 +25,9 @@ from coldfront.core.allocation.models import (
     AllocationStatusChoice,
 )
 from coldfront.core.allocation.utils import get_project_compute_allocation
+from coldfront.core.allocation.utils_.allocation_period_utils import (
+    get_allowance_year_periods,
+)
 from coldfront.core.project.models import (
     Project,
     ProjectAllocationRequestStatusChoice,
@@ -75,9 +78,17 @@ def get_current_allowance_year_period():
           periods are found.
     """
     date = display_time_zone_current_date()
-    return AllocationPeriod.objects.get(
-        name__startswith="Allowance Year", start_date__lte=date, end_date__gte=date
-    )
+    current = get_allowance_year_periods(date).current
+    if not current:
+        raise AllocationPeriod.DoesNotExist(
+            "AllocationPeriod matching query does not exist."
+        )
+    if len(current) > 1:
+        raise AllocationPeriod.MultipleObjectsReturned(
+            f"get() returned more than one AllocationPeriod -- it returned "
+            f"{len(current)}!"
+        )
+    return current[0]
 
 
 def get_next_allowance_year_period():
@@ -94,9 +105,7 @@ def get_next_allowance_year_period():
         - None
     """
     date = display_time_zone_current_date()
-    return AllocationPeriod.objects.filter(
-        name__startswith="Allowance Year", start_date__gt=date
-    ).first()
+    return get_allowance_year_periods(date).next
 
 
 def get_previous_allowance_year_period():
@@ -113,12 +122,7 @@ def get_previous_allowance_year_period():
         - None
     """
     date = display_time_zone_current_date()
-    allocation_periods = AllocationPeriod.objects.filter(
-        name__startswith="Allowance Year", end_date__lt=date
-    )
-    if not allocation_periods.exists():
-        return None
-    return allocation_periods.latest("end_date")
+    return get_allowance_year_periods(date).previous
 
 
 def get_pi_active_unique_project(pi_user, computing_allowance, allocation_period):
@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from coldfront.core.project.models import Project, ProjectSearchDocument, ProjectUser
+from coldfront.core.utils.search import (
+    batched,
+    build_search_document_text,
+    join_search_document_values,
+    rank_by_similarity,
+    save_search_documents,
+)
+
+"""Methods relating to the indexed search of Projects (see
+coldfront.core.utils.search)."""
+
+
+# A mapping from the name of each field of ProjectSearchForm searched by
+# substring to the ProjectSearchDocument field it is searched against.
+PROJECT_SEARCH_FIELDS = {
+    "last_name": "pi_last_names",
+    "username": "usernames",
+    "field_of_science": "field_of_science",
+    "project_title": "title",
+    "project_name": "name",
+}
+
+PROJECT_SEARCH_DOCUMENT_FIELDS = [
+    "name",
+    "title",
+    "field_of_science",
+    "pi_last_names",
+    "usernames",
+    "document",
+]
+
+
+def _build_project_search_documents(project_pks):
+    """Return a list of unsaved ProjectSearchDocuments for the existing
+    Projects with the given primary keys."""
+    pi_last_names, usernames = defaultdict(list), defaultdict(list)
+    project_users = (
+        ProjectUser.objects.filter(project_id__in=project_pks)
+        .order_by("pk")
+        .values_list(
+            "project_id",
+            "user__last_name",
+            "user__username",
+            "role__name",
+            "status__name",
+        )
+    )
+    for project_pk, last_name, username, role_name, status_name in project_users:
+        is_pi = role_name == "Principal Investigator"
+        if is_pi:
+            pi_last_names[project_pk].append(last_name)
+        if is_pi or status_name == "Active":
+            usernames[project_pk].append(username)
+
+    documents = []
+    projects = Project.objects.filter(pk__in=project_pks).values_list(
+        "pk", "name", "title", "field_of_science__description"
+    )
+    for project_pk, name, title, field_of_science in projects:
+        values = {
+            "name": name or "",
+            "title": title or "",
+            "field_of_science": field_of_science or "",
+            "pi_last_names": join_search_document_values(pi_last_names[project_pk]),
+            "usernames": join_search_document_values(usernames[project_pk]),
+        }
+        documents.append(
+            ProjectSearchDocument(
+                project_id=project_pk,
+                document=build_search_document_text(*values.values()),
+                **values,
+            )
+        )
+    return documents
+
+
+def refresh_project_search_documents(project_pks=None):
+    """Create or update the ProjectSearchDocuments of the Projects with
+    the given primary keys, or of all Projects. Return the primary keys
+    of the Projects whose documents changed."""
+    if project_pks is None:
+        project_pks = Project.objects.order_by("pk").values_list("pk", flat=True)
+    refreshed_pks = []
+    for batch in batched(project_pks):
+        documents = _build_project_search_documents(batch)
+        refreshed_pks.extend(
+            save_search_documents(
+                ProjectSearchDocument, documents, PROJECT_SEARCH_DOCUMENT_FIELDS
+            )
+        )
+    return refreshed_pks
+
+
+def refresh_user_project_search_documents(user_pks):
+    """Refresh the ProjectSearchDocuments of the Projects that the Users
+    with the given primary keys are associated with."""
+    project_pks = (
+        ProjectUser.objects.filter(user_id__in=user_pks)
+        .values_list("project_id", flat=True)
+        .distinct()
+    )
+    return refresh_project_search_documents(list(project_pks))
+
+
+def search_projects(projects, data, rank=True):
+    """Return the given queryset of Projects, filtered to those whose
+    ProjectSearchDocuments match the given cleaned ProjectSearchForm
+    data, and, if rank is True, ordered by decreasing similarity to the
+    searched terms. This requires PostgreSQL."""
+    terms = []
+    for form_field, document_field in PROJECT_SEARCH_FIELDS.items():
+        value = data.get(form_field)
+        if value:
+            projects = projects.filter(
+                **{f"search_document__{document_field}__icontains": value}
+            )
+            terms.append(value)
+    if rank and terms:
+        projects = rank_by_similarity(projects, "search_document__document", terms)
+    return projects
@@ -7,10 +7,11 @@ from django.contrib.auth.models import User
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db import transaction
-from django.db.models import Case, CharField, Q, Value, When
+from django.db.models import Q
 from django.forms import formset_factory
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views import View
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
@@ -60,6 +61,7 @@ from coldfront.core.project.models import (
     SavioProjectAllocationRequest,
 )
 from coldfront.core.project.utils import (
+    annotate_project_users_with_cluster_access_status,
     annotate_queryset_with_cluster_name,
     is_primary_cluster_project,
 )
@@ -74,6 +76,7 @@ from coldfront.core.project.utils_.renewal_utils import (
     get_current_allowance_year_period,
     is_any_project_pi_renewable,
 )
+from coldfront.core.project.utils_.search_utils import search_projects
 from coldfront.core.resource.utils_.allowance_utils.computing_allowance import (
     ComputingAllowance,
 )
@@ -85,6 +88,8 @@ from coldfront.core.user.utils import CombinedUserSearch, access_agreement_signe
 from coldfront.core.utils.common import get_domain_url, import_from_settings
 from coldfront.core.utils.email.email_strategy import EnqueueEmailStrategy
 from coldfront.core.utils.mail import send_email, send_email_template
+from coldfront.core.utils.mixins.views import ServerSideTableMixin, TableColumn
+from coldfront.core.utils.search import indexed_search_enabled
 
 EMAIL_ENABLED = import_from_settings("EMAIL_ENABLED", False)
 ALLOCATION_ENABLE_ALLOCATION_RENEWAL = import_from_settings(
@@ -166,41 +171,11 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             ):
                 context["can_leave_project"] = True
 
-        # Retrieve cluster access statuses.
-        cluster_access_statuses = {}
-        try:
-            allocation_obj = get_project_compute_allocation(self.object)
-            statuses = allocation_obj.allocationuserattribute_set.select_related(
-                "allocation_user__user"
-            ).filter(allocation_attribute_type__name="Cluster Account Status")
-            for status in statuses:
-                username = status.allocation_user.user.username
-                cluster_access_statuses[username] = status.value
-        except (Allocation.DoesNotExist, Allocation.MultipleObjectsReturned):
-            pass
-
-        whens = [
-            When(user__username=username, then=Value(status))
-            for username, status in cluster_access_statuses.items()
-        ]
-
-        # Only show 'Active Users'
-        project_users = (
-            self.object.projectuser_set.select_related("user")
-            .filter(status__name="Active")
-            .annotate(
-                cluster_access_status=Case(
-                    *whens,
-                    default=Value("None"),
-                    output_field=CharField(),
-                )
-            )
-            .order_by("user__username")
-        )
-
-        context["mailto"] = "mailto:" + ",".join(
-            [user.user.email for user in project_users]
-        )
+        # Only count 'Active Users'. The table of Users is loaded separately,
+        # one page at a time, from ProjectUserTableView.
+        context["num_project_users"] = self.object.projectuser_set.filter(
+            status__name="Active"
+        ).count()
 
         is_pi = self.object.projectuser_set.filter(
             user=self.request.user,
@@ -267,7 +242,6 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         # context['research_outputs'] = ResearchOutput.objects.filter(project=self.object).order_by('-created')
         # context['grants'] = Grant.objects.filter(project=self.object, status__name__in=['Active', 'Pending'])
         context["allocations"] = allocations
-        context["project_users"] = project_users
         context["ALLOCATION_ENABLE_ALLOCATION_RENEWAL"] = (
             ALLOCATION_ENABLE_ALLOCATION_RENEWAL
         )
@@ -395,6 +369,92 @@ class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         return context
 
 
+class ProjectUserTableView(ServerSideTableMixin, ProjectDetailView):
+    """Return pages of the table of active Users on the detail page of
+    a Project, as JSON."""
+
+    table_columns = [
+        TableColumn(
+            "name",
+            ("user__first_name", "user__last_name", "user__username"),
+            ("user__first_name", "user__last_name"),
+        ),
+        TableColumn("email", ("user__email",), ("user__email",)),
+        TableColumn("role", ("role__name", "user__username"), ("role__name",)),
+        TableColumn("cluster_username", ("user__username",), ("user__username",)),
+        TableColumn(
+            "cluster_access_status", ("cluster_access_status", "user__username"), ()
+        ),
+        TableColumn("actions", (), ()),
+    ]
+
+    def get_table_queryset(self):
+        self.object = self.get_object()
+
+        self.is_allowed_to_update_project = (
+            self.request.user.is_superuser
+            or self.object.projectuser_set.filter(
+                user=self.request.user,
+                role__name__in=["Principal Investigator", "Manager"],
+            ).exists()
+        )
+
+        try:
+            self.compute_allocation = get_project_compute_allocation(self.object)
+        except (Allocation.DoesNotExist, Allocation.MultipleObjectsReturned):
+            self.compute_allocation = None
+
+        # Render each distinct cluster access badge once.
+        self.cluster_access_badges = {}
+
+        project_users = self.object.projectuser_set.select_related(
+            "role", "user__userprofile"
+        ).filter(status__name="Active")
+        return annotate_project_users_with_cluster_access_status(
+            project_users, self.compute_allocation
+        )
+
+    def get_table_row(self, project_user):
+        user = project_user.user
+        status = project_user.cluster_access_status
+
+        if status not in self.cluster_access_badges:
+            self.cluster_access_badges[status] = render_to_string(
+                "allocation/cluster_access_badge.html", {"status": status}
+            )
+
+        request_cluster_access_url = None
+        if (
+            status == "None"
+            and project_user.role.name in ("Principal Investigator", "Manager")
+            and self.compute_allocation is not None
+            and self.is_allowed_to_update_project
+        ):
+            request_cluster_access_url = reverse(
+                "allocation-request-cluster-account",
+                kwargs={"pk": self.compute_allocation.pk, "user_pk": user.pk},
+            )
+
+        detail_url = None
+        if self.is_allowed_to_update_project:
+            detail_url = reverse(
+                "project-user-detail",
+                kwargs={"pk": self.object.pk, "project_user_pk": project_user.pk},
+            )
+
+        has_cluster_account = user.userprofile.cluster_uid is not None
+        return {
+            "name": f"{user.first_name} {user.last_name}",
+            "email": user.email,
+            "role": project_user.role.name,
+            "cluster_username": user.username if has_cluster_account else None,
+            "cluster_access_status": status,
+            "cluster_access_badge": self.cluster_access_badges[status],
+            "request_cluster_access_url": request_cluster_access_url,
+            "detail_url": detail_url,
+        }
+
+
 class ProjectListView(LoginRequiredMixin, ListView):
     model = Project
     template_name = "project/project_list.html"
@@ -464,41 +524,48 @@ class ProjectListView(LoginRequiredMixin, ListView):
                 )
                 projects = annotate_queryset_with_cluster_name(projects)
 
-            # Last Name
-            if data.get("last_name"):
-                pi_project_users = ProjectUser.objects.filter(
-                    project__in=projects,
-                    role__name="Principal Investigator",
-                    user__last_name__icontains=data.get("last_name"),
+            if indexed_search_enabled():
+                projects = search_projects(
+                    projects, data, rank=not self.request.GET.get("order_by")
                 )
-                project_ids = pi_project_users.values_list("project_id", flat=True)
-                projects = projects.filter(id__in=project_ids)
-
-            # Username
-            if data.get("username"):
-                projects = projects.filter(
-                    Q(projectuser__user__username__icontains=data.get("username"))
-                    & (
-                        Q(projectuser__role__name="Principal Investigator")
-                        | Q(projectuser__status__name="Active")
+            else:
+                # Last Name
+                if data.get("last_name"):
+                    pi_project_users = ProjectUser.objects.filter(
+                        project__in=projects,
+                        role__name="Principal Investigator",
+                        user__last_name__icontains=data.get("last_name"),
+                    )
+                    project_ids = pi_project_users.values_list("project_id", flat=True)
+                    projects = projects.filter(id__in=project_ids)
+
+                # Username
+                if data.get("username"):
+                    projects = projects.filter(
+                        Q(projectuser__user__username__icontains=data.get("username"))
+                        & (
+                            Q(projectuser__role__name="Principal Investigator")
+                            | Q(projectuser__status__name="Active")
+                        )
                     )
-                )
 
-            # Field of Science
-            if data.get("field_of_science"):
-                projects = projects.filter(
-                    field_of_science__description__icontains=data.get(
-                        "field_of_science"
+                # Field of Science
+                if data.get("field_of_science"):
+                    projects = projects.filter(
+                        field_of_science__description__icontains=data.get(
+                            "field_of_science"
+                        )
                     )
-                )
 
-            # Project Title
-            if data.get("project_title"):
-                projects = projects.filter(title__icontains=data.get("project_title"))
+                # Project Title
+                if data.get("project_title"):
+                    projects = projects.filter(
+                        title__icontains=data.get("project_title")
+                    )
 
-            # Project Name
-            if data.get("project_name"):
-                projects = projects.filter(name__icontains=data.get("project_name"))
+                # Project Name
+                if data.get("project_name"):
+                    projects = projects.filter(name__icontains=data.get("project_name"))
 
             # Cluster Name
             if data.get("cluster_name"):
@@ -506,6 +573,11 @@ class ProjectListView(LoginRequiredMixin, ListView):
                     cluster_name__icontains=data.get("cluster_name")
                 )
 
+            if indexed_search_enabled():
+                # Each Project matches at most once, so there are no
+                # duplicates to remove.
+                return projects
+
         else:
             projects = (
                 Project.objects.prefetch_related(
@@ -538,8 +610,7 @@ class ProjectListView(LoginRequiredMixin, ListView):
             self.request.user.userprofile.access_agreement_signed_date is not None
         )
 
-        projects_count = self.get_queryset().count()
-        context["projects_count"] = projects_count
+        context["projects_count"] = context["paginator"].count
 
         project_search_form = ProjectSearchForm(self.request.GET)
         if project_search_form.is_valid():
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+import django.dispatch
+
+from coldfront.core.resource.models import (
+    Resource,
+    ResourceAttribute,
+    TimedResourceAttribute,
+)
+from coldfront.core.resource.utils_.allowance_utils.interface import (
+    get_computing_allowance_interface,
+    invalidate_computing_allowance_interface,
+)
+
+
+@django.dispatch.receiver(post_delete, sender=Resource)
+@django.dispatch.receiver(post_delete, sender=ResourceAttribute)
+@django.dispatch.receiver(post_delete, sender=TimedResourceAttribute)
+@django.dispatch.receiver(post_save, sender=Resource)
+@django.dispatch.receiver(post_save, sender=ResourceAttribute)
+@django.dispatch.receiver(post_save, sender=TimedResourceAttribute)
+def resource_changed(sender, **kwargs):
+    """When a Resource or one of its attributes is created, updated, or
+    deleted, discard this process's ComputingAllowanceInterface, so
+    that it is rebuilt from the database until the change is committed,
+    and, once it is, signal other processes to rebuild theirs."""
+    get_computing_allowance_interface.cache_clear()
+    transaction.on_commit(invalidate_computing_allowance_interface)
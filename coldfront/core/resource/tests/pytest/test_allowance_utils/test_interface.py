@@ -1,11 +1,17 @@
 """Tests for ComputingAllowanceInterface and get_computing_allowance_interface."""
 
+from unittest.mock import patch
+
+from django.core.cache import cache
 import pytest
 
+from coldfront.core.resource.models import Resource, ResourceAttribute
 from coldfront.core.resource.utils_.allowance_utils.interface import (
     ComputingAllowanceInterface,
+    ComputingAllowanceInterfaceCache,
     ComputingAllowanceInterfaceError,
     get_computing_allowance_interface,
+    invalidate_computing_allowance_interface,
 )
 
 # ---------------------------------------------------------------------------
@@ -114,3 +120,111 @@ class TestGetComputingAllowanceInterface:
         assert sorted(a.name for a in cached.allowances()) == sorted(
             a.name for a in fresh.allowances()
         )
+
+
+# ---------------------------------------------------------------------------
+# ComputingAllowanceInterfaceCache
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.component
+@pytest.mark.django_db
+class TestComputingAllowanceInterfaceCache:
+    def test_reuses_instance_until_version_changes(self, locmem_cache):
+        interface_cache = ComputingAllowanceInterfaceCache()
+        interface_cache.VERSION_CHECK_INTERVAL = 0
+
+        instance1 = interface_cache.get()
+        assert interface_cache.get() is instance1
+
+        # Simulate another process signaling a change.
+        interface_cache.__class__().invalidate()
+
+        assert interface_cache.get() is not instance1
+
+    def test_uses_shared_snapshot_for_current_version(self, locmem_cache):
+        builder = ComputingAllowanceInterfaceCache()
+        built = builder.get()
+
+        other = ComputingAllowanceInterfaceCache()
+        with patch.object(
+            ComputingAllowanceInterface, "__init__", side_effect=AssertionError
+        ):
+            loaded = other.get()
+
+        assert loaded is not built
+        assert sorted(a.name for a in loaded.allowances()) == sorted(
+            a.name for a in built.allowances()
+        )
+
+    def test_resource_change_clears_process_instance(self):
+        instance1 = get_computing_allowance_interface()
+        resource = Resource.objects.filter(
+            resource_type__name="Computing Allowance"
+        ).first()
+        resource.save()
+        assert get_computing_allowance_interface() is not instance1
+
+
+@pytest.mark.component
+@pytest.mark.django_db
+class TestComputingAllowanceInterfaceCacheInTransaction:
+    """Tests that changes to computing allowances are visible in the
+    transaction that made them, without leaking into the shared
+    snapshot before they are committed."""
+
+    @pytest.fixture
+    def name_long_attribute(self, locmem_cache):
+        """Build the shared snapshot, and return the name_long
+        ResourceAttribute of an allowance."""
+        # As if an earlier change had been committed.
+        invalidate_computing_allowance_interface()
+        get_computing_allowance_interface()
+        return ResourceAttribute.objects.filter(
+            resource__resource_type__name="Computing Allowance",
+            resource_attribute_type__name="name_long",
+        ).first()
+
+    @staticmethod
+    def _snapshot():
+        return cache.get(ComputingAllowanceInterfaceCache.SNAPSHOT_CACHE_KEY)
+
+    def test_change_visible_before_commit(self, name_long_attribute):
+        """Test that a change is visible in the same transaction, and
+        that the shared snapshot is left as it was."""
+        name = name_long_attribute.resource.name
+        _, snapshot = self._snapshot()
+        name_long_attribute.value = "Changed Allowance"
+        name_long_attribute.save()
+
+        interface = get_computing_allowance_interface()
+        assert interface.name_long_from_name(name) == "Changed Allowance"
+        assert get_computing_allowance_interface() is interface
+        _, unchanged = self._snapshot()
+        assert unchanged.name_long_from_name(name) == snapshot.name_long_from_name(name)
+
+    def test_no_snapshot_written_before_commit(self, name_long_attribute):
+        """Test that an instance built from uncommitted changes is not
+        stored as the shared snapshot."""
+        cache.delete(ComputingAllowanceInterfaceCache.SNAPSHOT_CACHE_KEY)
+        name_long_attribute.save()
+        get_computing_allowance_interface()
+        assert self._snapshot() is None
+
+    def test_snapshot_rebuilt_after_commit(
+        self, name_long_attribute, django_capture_on_commit_callbacks
+    ):
+        """Test that, once the change is committed, a snapshot for the
+        new version is stored."""
+        old_version, _ = self._snapshot()
+        with django_capture_on_commit_callbacks(execute=True):
+            name_long_attribute.value = "Changed Allowance"
+            name_long_attribute.save()
+
+        get_computing_allowance_interface()
+        version, snapshot = self._snapshot()
+        assert version != old_version
+        assert (
+            snapshot.name_long_from_name(name_long_attribute.resource.name)
+            == "Changed Allowance"
+        )
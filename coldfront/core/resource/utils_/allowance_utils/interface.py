@@ -1,5 +1,9 @@
-import functools
+import threading
+import time
+import uuid
 
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import Prefetch
 
 from coldfront.core.allocation.models import AllocationPeriod
@@ -159,13 +163,126 @@ class ComputingAllowanceInterfaceError(Exception):
     pass
 
 
-@functools.lru_cache(maxsize=1)
+class ComputingAllowanceInterfaceCache:
+    """A per-process cache of a ComputingAllowanceInterface that is
+    invalidated across processes.
+
+    A version token is stored in the shared Django cache and replaced
+    whenever computing allowances change (see
+    coldfront.core.resource.signals). Each process compares its local
+    instance's version against the shared one, at most once every
+    VERSION_CHECK_INTERVAL seconds, and only rebuilds when it differs.
+
+    To avoid every process rebuilding from the database, the most
+    recently built instance is also stored, serialized, in the shared
+    cache, tagged with the version it was built for.
+
+    Clearing the cache in a transaction marks the thread as dirty: until
+    the transaction is committed (and invalidate is called) or rolled
+    back, instances are built from the database, so that the thread sees
+    its own uncommitted changes, and the shared snapshot is neither read
+    nor written.
+    """
+
+    VERSION_CACHE_KEY = "computing_allowance_interface_version"
+    SNAPSHOT_CACHE_KEY = "computing_allowance_interface_snapshot"
+
+    # The maximum number of seconds a process may go without checking
+    # the shared version.
+    VERSION_CHECK_INTERVAL = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._interface = None
+        self._version = None
+        self._last_checked = None
+        # The instance built by the current thread from uncommitted
+        # changes, and whether the thread has made any.
+        self._local = threading.local()
+
+    def clear(self):
+        """Discard this process's instance, so that the next call to
+        get retrieves or builds a new one. Until the current
+        transaction, if any, ends, build instances from the database,
+        without using the shared snapshot."""
+        with self._lock:
+            self._interface = None
+            self._version = None
+            self._last_checked = None
+        self._local.dirty = True
+        self._local.interface = None
+
+    def get(self):
+        """Return a ComputingAllowanceInterface for the current shared
+        version, retrieving or building one if needed."""
+        if getattr(self._local, "dirty", False):
+            if connection.in_atomic_block:
+                if self._local.interface is None:
+                    self._local.interface = ComputingAllowanceInterface()
+                return self._local.interface
+            # The transaction that made changes ended without calling
+            # invalidate, i.e., it was rolled back.
+            self._local.dirty = False
+            self._local.interface = None
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._interface is not None
+                and now - self._last_checked < self.VERSION_CHECK_INTERVAL
+            ):
+                return self._interface
+
+            # Retrieve the version before reading from the database, so that
+            # changes made while building invalidate the result.
+            version = cache.get(self.VERSION_CACHE_KEY)
+            if self._interface is None or self._version != version:
+                self._interface = self._get_or_build_snapshot(version)
+                self._version = version
+            self._last_checked = now
+            return self._interface
+
+    def invalidate(self):
+        """Discard this process's instance, and replace the shared
+        version, so that all processes rebuild their instances."""
+        self.clear()
+        self._local.dirty = False
+        cache.set(self.VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+
+    def _get_or_build_snapshot(self, version):
+        """Return the shared snapshot if it was built for the given
+        version. Otherwise, build a new instance and store it as the
+        shared snapshot."""
+        snapshot = cache.get(self.SNAPSHOT_CACHE_KEY)
+        if snapshot is not None:
+            snapshot_version, interface = snapshot
+            if snapshot_version == version:
+                return interface
+        interface = ComputingAllowanceInterface()
+        cache.set(self.SNAPSHOT_CACHE_KEY, (version, interface), timeout=None)
+        return interface
+
+
+_computing_allowance_interface_cache = ComputingAllowanceInterfaceCache()
+
+
 def get_computing_allowance_interface():
     """Return a cached ComputingAllowanceInterface instance.
 
-    The cache lives for the lifetime of the process (one entry per gunicorn
-    worker). Computing allowances change extremely rarely; if they do change,
-    call get_computing_allowance_interface.cache_clear() on each worker, or
-    simply restart the server.
+    The instance is cached per process, and is rebuilt (or retrieved
+    from a snapshot in the shared cache) when computing allowances
+    change. Call get_computing_allowance_interface.cache_clear() to
+    discard this process's instance.
     """
-    return ComputingAllowanceInterface()
+    return _computing_allowance_interface_cache.get()
+
+
+get_computing_allowance_interface.cache_clear = (
+    _computing_allowance_interface_cache.clear
+)
+
+
+def invalidate_computing_allowance_interface():
+    """Signal to all processes that computing allowances have changed,
+    so that their cached instances are rebuilt."""
+    _computing_allowance_interface_cache.invalidate()
@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+# The separator between multiple values in a single column of a search
+# document (see coldfront.core.utils.search).
+SEARCH_DOCUMENT_VALUE_SEPARATOR = '\n'
+
+# The maximum number of documents to create at once.
+BATCH_SIZE = 500
+
+
+def create_user_search_documents(apps, schema_editor):
+    """On PostgreSQL, where Users are searched by their search
+    documents, create a document for each existing User, so that Users
+    are found before the documents are first refreshed."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    EmailAddress = apps.get_model('account', 'EmailAddress')
+    User = apps.get_model('auth', 'User')
+    UserSearchDocument = apps.get_model('user', 'UserSearchDocument')
+
+    other_emails = defaultdict(list)
+    email_addresses = EmailAddress.objects.filter(primary=False).order_by(
+        'pk').values_list('user_id', 'email')
+    for user_pk, email in email_addresses:
+        if email:
+            other_emails[user_pk].append(email)
+
+    documents = []
+    users = User.objects.order_by('pk').values_list(
+        'pk', 'first_name', 'userprofile__middle_name', 'last_name',
+        'username', 'email')
+    for user_pk, first_name, middle_name, last_name, username, email in users:
+        values = {
+            'first_name': first_name,
+            'middle_name': middle_name or '',
+            'last_name': last_name,
+            'username': username,
+            'emails': SEARCH_DOCUMENT_VALUE_SEPARATOR.join(
+                value for value in [email, *other_emails[user_pk]] if value),
+        }
+        documents.append(
+            UserSearchDocument(
+                user_id=user_pk,
+                document=' '.join(value for value in values.values() if value),
+                **values))
+    UserSearchDocument.objects.bulk_create(
+        documents, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def delete_user_search_documents(apps, schema_editor):
+    """Delete all search documents."""
+    UserSearchDocument = apps.get_model('user', 'UserSearchDocument')
+    UserSearchDocument.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_emailaddress_unique_primary_email'),
+        ('user', '0015_usersearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_user_search_documents, delete_user_search_documents),
+    ]
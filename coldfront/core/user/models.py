@@ -118,3 +118,24 @@ class IdentityLinkingRequest(TimeStampedModel):
     status = models.ForeignKey(
         IdentityLinkingRequestStatusChoice, on_delete=models.CASCADE
     )
+
+
+class UserSearchDocument(TimeStampedModel):
+    """A denormalized representation of the searchable values of a
+    User, maintained on PostgreSQL (see
+    coldfront.core.user.utils_.search_utils)."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    first_name = models.TextField(blank=True)
+    middle_name = models.TextField(blank=True)
+    last_name = models.TextField(blank=True)
+    username = models.TextField(blank=True)
+    # The User's email address and non-primary EmailAddresses.
+    emails = models.TextField(blank=True)
+    # The concatenation of the above, against which results are ranked.
+    document = models.TextField(blank=True)
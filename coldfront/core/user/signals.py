@@ -1,8 +1,16 @@
+from allauth.account.models import EmailAddress
 from django.contrib.auth.models import Group, User
-from django.db.models.signals import m2m_changed, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from coldfront.core.user.models import UserProfile
+from coldfront.api.user.authentication import invalidate_cached_tokens
+from coldfront.core.project.utils_.search_utils import (
+    refresh_user_project_search_documents,
+)
+from coldfront.core.user.models import ExpiringToken, UserProfile
+from coldfront.core.user.utils_.search_utils import refresh_user_search_documents
+from coldfront.core.utils.search import indexed_search_enabled
 
 
 @receiver(post_save, sender=User)
@@ -65,3 +73,72 @@ def sync_staff_to_group(instance, action, **kwargs):
             raise LookupError(
                 "Queried staff group does not exist. Examine core/user/signals.py"
             )
+
+
+def _refresh_search_documents(user_pks):
+    """Refresh the search documents of the Users with the given primary
+    keys and, for those whose documents changed, of their Projects."""
+    changed_user_pks = refresh_user_search_documents(user_pks)
+    if changed_user_pks:
+        refresh_user_project_search_documents(changed_user_pks)
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_search_documents_on_profile_save(sender, instance, **kwargs):
+    """When a UserProfile is saved (including whenever its User is
+    saved), refresh the User's search documents."""
+    if kwargs.get("raw") or not indexed_search_enabled():
+        return
+    _refresh_search_documents([instance.user_id])
+
+
+@receiver(post_save, sender=EmailAddress)
+def refresh_search_documents_on_email_address_save(sender, instance, **kwargs):
+    """When an EmailAddress is saved, refresh its User's search
+    documents."""
+    if kwargs.get("raw") or not indexed_search_enabled():
+        return
+    _refresh_search_documents([instance.user_id])
+
+
+@receiver(post_delete, sender=EmailAddress)
+def refresh_search_documents_on_email_address_delete(sender, instance, **kwargs):
+    """When an EmailAddress is deleted, refresh its User's search
+    documents once the current transaction is committed, since the User
+    may be being deleted along with it."""
+    if not indexed_search_enabled():
+        return
+    user_pk = instance.user_id
+    transaction.on_commit(lambda: _refresh_search_documents([user_pk]), robust=True)
+
+
+def _invalidate_cached_tokens_now_and_on_commit(keys):
+    """Discard the cached ExpiringTokens with the given keys now and,
+    in case they were re-cached from stale data in the meantime, once
+    the current transaction is committed."""
+    keys = list(keys)
+    if not keys:
+        return
+    invalidate_cached_tokens(keys)
+    transaction.on_commit(lambda: invalidate_cached_tokens(keys), robust=True)
+
+
+@receiver(post_delete, sender=ExpiringToken)
+@receiver(post_save, sender=ExpiringToken)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """When an ExpiringToken is created, updated (e.g., its expiration
+    is extended), or deleted (e.g., rotated), discard its cached
+    copy."""
+    if kwargs.get("raw"):
+        return
+    _invalidate_cached_tokens_now_and_on_commit([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_tokens(sender, instance, created, **kwargs):
+    """When a User is updated (e.g., deactivated), discard the cached
+    copies of their ExpiringTokens, which include the User."""
+    if created or kwargs.get("raw"):
+        return
+    keys = ExpiringToken.objects.filter(user=instance).values_list("key", flat=True)
+    _invalidate_cached_tokens_now_and_on_commit(keys)
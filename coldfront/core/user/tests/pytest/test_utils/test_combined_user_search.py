@@ -0,0 +1,131 @@
+"""Tests for coldfront.core.user.utils.CombinedUserSearch."""
+
+import threading
+import time
+
+from django.contrib.auth.models import User
+import pytest
+
+from coldfront.core.user.utils import CombinedUserSearch, UserSearch
+
+MODULE = __name__
+
+
+class FakeUserSearch(UserSearch):
+    """A search backend that returns a fixed set of users, recording
+    the number of searches performed."""
+
+    search_source = "Fake"
+    usernames = ["local_user", "remote_user"]
+    num_searches = 0
+
+    def search_a_user(self, user_search_string=None, search_by="all_fields"):
+        type(self).num_searches += 1
+        return [
+            {
+                "last_name": "",
+                "first_name": "",
+                "username": username,
+                "email": f"{username}@example.com",
+                "source": self.search_source,
+            }
+            for username in self.usernames
+        ]
+
+
+class SlowUserSearch(UserSearch):
+    """A search backend that does not return until released."""
+
+    search_source = "Slow"
+    release = threading.Event()
+
+    def search_a_user(self, user_search_string=None, search_by="all_fields"):
+        self.release.wait(timeout=5)
+        return []
+
+
+class FailingUserSearch(UserSearch):
+    """A search backend that raises an exception."""
+
+    search_source = "Failing"
+
+    def search_a_user(self, user_search_string=None, search_by="all_fields"):
+        raise ConnectionError("Directory unavailable.")
+
+
+@pytest.fixture
+def backends(settings, locmem_cache):
+    """Configure additional search backends, using an in-memory cache
+    and a short timeout, and return a function that sets them."""
+    settings.USER_SEARCH_BACKEND_TIMEOUT = 0.5
+    FakeUserSearch.num_searches = 0
+    SlowUserSearch.release.clear()
+
+    def _set(*class_names):
+        settings.ADDITIONAL_USER_SEARCH_CLASSES = [
+            f"{MODULE}.{class_name}" for class_name in class_names
+        ]
+
+    yield _set
+    SlowUserSearch.release.set()
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestCombinedUserSearch:
+    """Tests for CombinedUserSearch."""
+
+    @pytest.fixture(autouse=True)
+    def local_user(self):
+        return User.objects.create(username="local_user", email="local@example.com")
+
+    def test_results_combined_and_deduplicated(self, backends):
+        """Test that local results come first, and that users found by
+        multiple sources or excluded are omitted."""
+        backends("FakeUserSearch")
+
+        context = CombinedUserSearch("user", "all_fields", ["excluded"]).search()
+
+        assert [(m["username"], m["source"]) for m in context["matches"]] == [
+            ("local_user", "local"),
+            ("remote_user", "Fake"),
+        ]
+        assert context["unavailable_search_sources"] == []
+
+    def test_slow_and_failing_backends_reported(self, backends):
+        """Test that backends that time out or fail are reported as
+        unavailable, without delaying results from the others."""
+        backends("SlowUserSearch", "FailingUserSearch", "FakeUserSearch")
+
+        start = time.monotonic()
+        context = CombinedUserSearch("user", "all_fields").search()
+
+        assert time.monotonic() - start < 2
+        assert context["unavailable_search_sources"] == ["Slow", "Failing"]
+        assert [m["username"] for m in context["matches"]] == [
+            "local_user",
+            "remote_user",
+        ]
+
+    def test_backend_results_cached(self, backends):
+        """Test that results from additional backends are cached per
+        search string and search type."""
+        backends("FakeUserSearch")
+
+        CombinedUserSearch("user", "all_fields").search()
+        context = CombinedUserSearch("user", "all_fields").search()
+        assert FakeUserSearch.num_searches == 1
+        assert len(context["matches"]) == 2
+
+        CombinedUserSearch("user", "username_only").search()
+        assert FakeUserSearch.num_searches == 2
+
+    def test_settings_not_modified(self, backends, settings):
+        """Test that the configured search classes are not modified."""
+        backends("FakeUserSearch")
+        configured = list(settings.ADDITIONAL_USER_SEARCH_CLASSES)
+
+        CombinedUserSearch("user", "all_fields").search()
+        CombinedUserSearch("user", "all_fields").search()
+
+        assert settings.ADDITIONAL_USER_SEARCH_CLASSES == configured
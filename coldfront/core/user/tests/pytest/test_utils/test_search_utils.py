@@ -0,0 +1,74 @@
+"""Tests for coldfront.core.user.utils_.search_utils."""
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+import pytest
+
+from coldfront.core.user import signals as user_signals
+from coldfront.core.user.models import UserSearchDocument
+from coldfront.core.user.utils_.search_utils import (
+    refresh_user_search_documents,
+    search_users,
+)
+
+
+@pytest.fixture
+def user():
+    """Return a User with a middle name and a non-primary
+    EmailAddress."""
+    user = User.objects.create(
+        username="ada", first_name="Ada", last_name="Lovelace", email="ada@a.org"
+    )
+    user.userprofile.middle_name = "King"
+    user.userprofile.save()
+    EmailAddress.objects.create(user=user, email="countess@b.org", primary=False)
+    return user
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestUserSearchDocuments:
+    """Tests for the maintenance and search of UserSearchDocuments."""
+
+    def test_document_contents(self, user):
+        """Test that a document includes the User's names, username, and
+        email addresses."""
+        assert refresh_user_search_documents([user.pk]) == [user.pk]
+
+        document = UserSearchDocument.objects.get(user=user)
+        assert document.middle_name == "King"
+        assert document.emails.split("\n") == ["ada@a.org", "countess@b.org"]
+        assert document.document == "Ada King Lovelace ada ada@a.org\ncountess@b.org"
+
+    def test_maintained_by_signals(
+        self, monkeypatch, user, django_capture_on_commit_callbacks
+    ):
+        """Test that documents are refreshed when a UserProfile or an
+        EmailAddress changes."""
+        monkeypatch.setattr(user_signals, "indexed_search_enabled", lambda: True)
+
+        user.userprofile.middle_name = "Byron"
+        user.userprofile.save()
+        document = UserSearchDocument.objects.get(user=user)
+        assert document.middle_name == "Byron"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            EmailAddress.objects.filter(email="countess@b.org").delete()
+        document.refresh_from_db()
+        assert document.emails == "ada@a.org"
+
+    @pytest.mark.parametrize(
+        "data,matches",
+        [
+            ({"middle_name": "kin"}, True),
+            ({"email": "COUNTESS"}, True),
+            ({"first_name": "ada", "last_name": "byron"}, False),
+        ],
+    )
+    def test_search_users(self, user, data, matches):
+        """Test that Users are filtered by their documents."""
+        refresh_user_search_documents()
+
+        users = search_users(User.objects.all(), data, rank=False)
+
+        assert (user in users) == matches
@@ -1,9 +1,15 @@
+from copy import deepcopy
 import datetime
 from decimal import Decimal
+from http import HTTPStatus
 
 from bs4 import BeautifulSoup
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from flags.state import flag_enabled
 import pytz
@@ -46,7 +52,12 @@ from coldfront.core.resource.utils_.allowance_utils.interface import (
 )
 from coldfront.core.user.models import UserProfile
 from coldfront.core.utils.common import utc_now_offset_aware
-from coldfront.core.utils.tests.test_base import TestBase
+from coldfront.core.utils.tests.test_base import LOCMEM_CACHES, TestBase
+
+_LAZY_SECTIONS_FLAGS = deepcopy(settings.FLAGS)
+_LAZY_SECTIONS_FLAGS["REQUEST_HUB_LAZY_SECTIONS_ENABLED"] = [
+    {"condition": "boolean", "value": True}
+]
 
 
 class TestRequestHubView(TestBase):
@@ -709,3 +720,76 @@ class TestRequestHubView(TestBase):
         self.assert_no_requests(self.user1, self.url)
         self.assert_no_requests(self.staff, self.url)
         self.assert_no_requests(self.admin, self.url)
+
+
+@override_settings(FLAGS=_LAZY_SECTIONS_FLAGS)
+class TestRequestHubViewLazySections(TestRequestHubView):
+    """A class for testing RequestHubView when its sections are loaded
+    separately from RequestHubSectionView."""
+
+    def get_response(self, user, url):
+        """Return the response for the given URL, with the shell of each
+        section replaced by the section loaded from its own URL."""
+        response = super().get_response(user, url)
+        soup = BeautifulSoup(response.content, "html.parser")
+        shells = soup.find_all("div", {"class": "request-hub-section-shell"})
+        self.assertTrue(shells)
+        for shell in shells:
+            section_response = self.client.get(shell["data-url"])
+            self.assertEqual(section_response.status_code, HTTPStatus.OK)
+            shell.replace_with(BeautifulSoup(section_response.content, "html.parser"))
+        response.content = str(soup).encode("utf-8")
+        return response
+
+    def test_sections_not_built_by_hub(self):
+        """Test that the hub itself only renders section shells."""
+        self.client.login(username=self.admin.username, password=self.password)
+        response = self.client.get(self.admin_url)
+        soup = BeautifulSoup(response.content, "html.parser")
+        self.assertIsNotNone(soup.find(id="cluster_account_request_shell"))
+        self.assertIsNone(soup.find(id="cluster_access_request_section"))
+
+    def test_section_access(self):
+        """Test that only admins and staff may load sections showing all
+        requests."""
+        url = reverse("request-hub-section", kwargs={"section": "project_join_request"})
+        admin_url = reverse(
+            "request-hub-admin-section", kwargs={"section": "project_join_request"}
+        )
+        for user in User.objects.all():
+            self.assert_has_access(url, user, True)
+        self.assert_has_access(admin_url, self.admin, True)
+        self.assert_has_access(admin_url, self.staff, True)
+        self.assert_has_access(admin_url, self.user0, False)
+
+    def test_unknown_section(self):
+        """Test that requesting an unknown section returns a 404."""
+        url = reverse("request-hub-section", kwargs={"section": "nonexistent"})
+        self.client.login(username=self.user0.username, password=self.password)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_sections_cached_per_user_and_page(self):
+        """Test that a rendered section is served from the cache, which
+        is keyed by user and by page."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        url = reverse(
+            "request-hub-section", kwargs={"section": "cluster_account_request"}
+        )
+
+        def get_num_queries(user, url):
+            self.client.login(username=user.username, password=self.password)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            return len(context.captured_queries)
+
+        get_num_queries(self.user0, url)
+        cached = get_num_queries(self.user0, url)
+        # Other users and pages of the section are cached separately, but
+        # pages of other sections do not affect the section.
+        self.assertGreater(get_num_queries(self.user1, url), cached)
+        self.assertGreater(get_num_queries(self.user1, url + "?page0=2"), cached)
+        self.assertEqual(get_num_queries(self.user1, url + "?page2=2"), cached)
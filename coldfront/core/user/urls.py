@@ -207,7 +207,19 @@ urlpatterns += [
     ),
     path(
         "request-hub-admin",
-        request_hub_views.RequestHubView.as_view(show_all_requests=True),
+        request_hub_views.RequestHubView.as_view(
+            show_all_requests=True, section_url_name="request-hub-admin-section"
+        ),
         name="request-hub-admin",
     ),
+    path(
+        "request-hub/section/<str:section>",
+        request_hub_views.RequestHubSectionView.as_view(show_all_requests=False),
+        name="request-hub-section",
+    ),
+    path(
+        "request-hub-admin/section/<str:section>",
+        request_hub_views.RequestHubSectionView.as_view(show_all_requests=True),
+        name="request-hub-admin-section",
+    ),
 ]
@@ -1,11 +1,16 @@
 import abc
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, time
+import hashlib
 import logging
+from time import monotonic
 from urllib.parse import urljoin
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import Q
 from django.urls import reverse
 from django.utils.crypto import constant_time_compare
@@ -14,6 +19,7 @@ from django.utils.http import base36_to_int, urlsafe_base64_encode
 from django.utils.module_loading import import_string
 
 from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.instrumentation import external_call
 from coldfront.core.utils.mail import send_email_template
 
 logger = logging.getLogger(__name__)
@@ -87,33 +93,44 @@ class LocalUserSearch(UserSearch):
 
 
 class CombinedUserSearch:
+    """Search for users in the local database and in each additional
+    search backend (e.g., LDAP), combining the results.
+
+    Additional backends are searched concurrently, each for at most
+    USER_SEARCH_BACKEND_TIMEOUT seconds. Backends that fail or time out
+    are reported, and results from the others are returned. Successful
+    results from additional backends are cached for
+    USER_SEARCH_CACHE_TIMEOUT seconds, keyed by the search string and
+    search type."""
+
+    LOCAL_USER_SEARCH_CLASS = "coldfront.core.user.utils.LocalUserSearch"
+
+    CACHE_KEY_PREFIX = "combined_user_search:"
+
     def __init__(self, user_search_string, search_by, usernames_names_to_exclude=[]):
-        self.USER_SEARCH_CLASSES = import_from_settings(
-            "ADDITIONAL_USER_SEARCH_CLASSES", []
-        )
-        self.USER_SEARCH_CLASSES.insert(0, "coldfront.core.user.utils.LocalUserSearch")
+        self.USER_SEARCH_CLASSES = [
+            self.LOCAL_USER_SEARCH_CLASS,
+            *import_from_settings("ADDITIONAL_USER_SEARCH_CLASSES", []),
+        ]
+        self.backend_timeout = import_from_settings("USER_SEARCH_BACKEND_TIMEOUT", 10)
+        self.cache_timeout = import_from_settings("USER_SEARCH_CACHE_TIMEOUT", 60)
         self.user_search_string = user_search_string
         self.search_by = search_by
         self.usernames_names_to_exclude = usernames_names_to_exclude
 
     def search(self):
+        results_by_class, unavailable_search_sources = self._search_all_classes()
 
         matches = []
-        usernames_not_found = []
-        usernames_found = []
-
+        usernames_found = set()
+        usernames_to_exclude = set(self.usernames_names_to_exclude)
         for search_class in self.USER_SEARCH_CLASSES:
-            cls = import_string(search_class)
-            search_class_obj = cls(self.user_search_string, self.search_by)
-            users = search_class_obj.search()
-
-            for user in users:
+            for user in results_by_class.get(search_class, []):
                 username = user.get("username")
-                if (
-                    username not in usernames_found
-                    and username not in self.usernames_names_to_exclude
+                if username not in usernames_found and username not in (
+                    usernames_to_exclude
                 ):
-                    usernames_found.append(username)
+                    usernames_found.add(username)
                     matches.append(user)
 
         if len(self.user_search_string.split()) > 1:
@@ -121,8 +138,8 @@ class CombinedUserSearch:
             number_of_usernames_found = len(usernames_found)
             usernames_not_found = list(
                 set(self.user_search_string.split())
-                - set(usernames_found)
-                - set(self.usernames_names_to_exclude)
+                - usernames_found
+                - usernames_to_exclude
             )
         else:
             number_of_usernames_searched = None
@@ -134,9 +151,104 @@ class CombinedUserSearch:
             "number_of_usernames_searched": number_of_usernames_searched,
             "number_of_usernames_found": number_of_usernames_found,
             "usernames_not_found": usernames_not_found,
+            "unavailable_search_sources": unavailable_search_sources,
         }
         return context
 
+    def _search_all_classes(self):
+        """Run the search using each search class, and return a dict
+        mapping each class to its results, along with a list of the
+        sources of the classes that failed or timed out.
+
+        The local search runs in the current thread, while additional
+        backends without cached results run concurrently in separate
+        threads."""
+        results_by_class = {}
+        unavailable_search_sources = []
+
+        uncached_classes = []
+        for search_class in self.USER_SEARCH_CLASSES[1:]:
+            cached = cache.get(self._cache_key(search_class))
+            if cached is None:
+                uncached_classes.append(search_class)
+            else:
+                results_by_class[search_class] = cached
+
+        if not uncached_classes:
+            results_by_class[self.LOCAL_USER_SEARCH_CLASS] = self._search_with_class(
+                self.LOCAL_USER_SEARCH_CLASS
+            )
+            return results_by_class, unavailable_search_sources
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(uncached_classes), thread_name_prefix="user_search"
+        )
+        try:
+            deadline = monotonic() + self.backend_timeout
+            futures = {
+                executor.submit(self._search_with_class_in_thread, search_class): (
+                    search_class
+                )
+                for search_class in uncached_classes
+            }
+            results_by_class[self.LOCAL_USER_SEARCH_CLASS] = self._search_with_class(
+                self.LOCAL_USER_SEARCH_CLASS
+            )
+            with external_call("user_search"):
+                done, _ = wait(futures, timeout=max(deadline - monotonic(), 0))
+            for future, search_class in futures.items():
+                source = self._search_source(search_class)
+                if future not in done:
+                    logger.warning(
+                        f"User search using {search_class} timed out after "
+                        f"{self.backend_timeout} seconds."
+                    )
+                    unavailable_search_sources.append(source)
+                elif future.exception() is not None:
+                    logger.error(
+                        f"User search using {search_class} failed. Details:\n"
+                        f"{future.exception()}"
+                    )
+                    unavailable_search_sources.append(source)
+                else:
+                    results_by_class[search_class] = future.result()
+        finally:
+            # Do not wait for backends that timed out.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results_by_class, unavailable_search_sources
+
+    def _search_with_class(self, search_class):
+        """Return the results of the search using the given class."""
+        cls = import_string(search_class)
+        search_class_obj = cls(self.user_search_string, self.search_by)
+        return search_class_obj.search()
+
+    def _search_with_class_in_thread(self, search_class):
+        """Return the results of the search using the given class,
+        caching them. This is intended to be run in a separate thread."""
+        try:
+            users = self._search_with_class(search_class)
+            cache.set(self._cache_key(search_class), users, self.cache_timeout)
+            return users
+        finally:
+            # Close the thread's database connection, if any.
+            connection.close()
+
+    def _cache_key(self, search_class):
+        """Return the cache key for the results of the search using the
+        given class."""
+        key = "\0".join([search_class, self.search_by or "", self.user_search_string])
+        return self.CACHE_KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _search_source(search_class):
+        """Return the name of the source searched by the given class."""
+        try:
+            return import_string(search_class).search_source
+        except (AttributeError, ImportError):
+            return search_class
+
 
 class ExpiringTokenGenerator(PasswordResetTokenGenerator):
     """An object used to generate and check expiring tokens for various
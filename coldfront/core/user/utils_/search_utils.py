@@ -0,0 +1,110 @@
+from collections import defaultdict
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+
+from coldfront.core.user.models import UserSearchDocument
+from coldfront.core.utils.search import (
+    batched,
+    build_search_document_text,
+    join_search_document_values,
+    rank_by_similarity,
+    save_search_documents,
+)
+
+"""Methods relating to the indexed search of Users (see
+coldfront.core.utils.search)."""
+
+
+# A mapping from the name of each field of UserSearchListForm searched by
+# substring to the UserSearchDocument field it is searched against.
+USER_SEARCH_FIELDS = {
+    "first_name": "first_name",
+    "middle_name": "middle_name",
+    "last_name": "last_name",
+    "username": "username",
+    "email": "emails",
+}
+
+USER_SEARCH_DOCUMENT_FIELDS = [
+    "first_name",
+    "middle_name",
+    "last_name",
+    "username",
+    "emails",
+    "document",
+]
+
+
+def _build_user_search_documents(user_pks):
+    """Return a list of unsaved UserSearchDocuments for the existing
+    Users with the given primary keys."""
+    other_emails = defaultdict(list)
+    email_addresses = (
+        EmailAddress.objects.filter(user_id__in=user_pks, primary=False)
+        .order_by("pk")
+        .values_list("user_id", "email")
+    )
+    for user_pk, email in email_addresses:
+        other_emails[user_pk].append(email)
+
+    documents = []
+    users = User.objects.filter(pk__in=user_pks).values_list(
+        "pk",
+        "first_name",
+        "userprofile__middle_name",
+        "last_name",
+        "username",
+        "email",
+    )
+    for user_pk, first_name, middle_name, last_name, username, email in users:
+        values = {
+            "first_name": first_name,
+            "middle_name": middle_name or "",
+            "last_name": last_name,
+            "username": username,
+            "emails": join_search_document_values([email, *other_emails[user_pk]]),
+        }
+        documents.append(
+            UserSearchDocument(
+                user_id=user_pk,
+                document=build_search_document_text(*values.values()),
+                **values,
+            )
+        )
+    return documents
+
+
+def refresh_user_search_documents(user_pks=None):
+    """Create or update the UserSearchDocuments of the Users with the
+    given primary keys, or of all Users. Return the primary keys of the
+    Users whose documents changed."""
+    if user_pks is None:
+        user_pks = User.objects.order_by("pk").values_list("pk", flat=True)
+    refreshed_pks = []
+    for batch in batched(user_pks):
+        documents = _build_user_search_documents(batch)
+        refreshed_pks.extend(
+            save_search_documents(
+                UserSearchDocument, documents, USER_SEARCH_DOCUMENT_FIELDS
+            )
+        )
+    return refreshed_pks
+
+
+def search_users(users, data, rank=True):
+    """Return the given queryset of Users, filtered to those whose
+    UserSearchDocuments match the given cleaned UserSearchListForm data,
+    and, if rank is True, ordered by decreasing similarity to the
+    searched terms. This requires PostgreSQL."""
+    terms = []
+    for form_field, document_field in USER_SEARCH_FIELDS.items():
+        value = data.get(form_field)
+        if value:
+            users = users.filter(
+                **{f"search_document__{document_field}__icontains": value}
+            )
+            terms.append(value)
+    if rank and terms:
+        users = rank_by_similarity(users, "search_document__document", terms)
+    return users
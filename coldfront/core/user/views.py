@@ -46,7 +46,9 @@ from coldfront.core.user.utils import (
     send_account_already_active_email,
 )
 from coldfront.core.user.utils_.host_user_utils import is_lbl_employee
+from coldfront.core.user.utils_.search_utils import search_users
 from coldfront.core.utils.common import import_from_settings, utc_now_offset_aware
+from coldfront.core.utils.search import indexed_search_enabled
 
 logger = logging.getLogger(__name__)
 EMAIL_ENABLED = import_from_settings("EMAIL_ENABLED", False)
@@ -468,6 +470,13 @@ class UserSearchAll(LoginRequiredMixin, ListView):
             data = user_search_form.cleaned_data
             users = User.objects.order_by(order_by)
 
+            if indexed_search_enabled():
+                # Each User matches at most once, so there are no duplicates
+                # to remove.
+                return search_users(
+                    users, data, rank=not self.request.GET.get("order_by")
+                )
+
             if data.get("first_name"):
                 users = users.filter(first_name__icontains=data.get("first_name"))
 
@@ -503,8 +512,7 @@ class UserSearchAll(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user_count = self.get_queryset().count()
-        context["user_count"] = user_count
+        context["user_count"] = context["paginator"].count
 
         user_search_form = UserSearchListForm(self.request.GET)
         if user_search_form.is_valid():
@@ -1,7 +1,11 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db.models import Q
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.views.generic.base import TemplateView
 from flags.state import flag_enabled
 
@@ -26,6 +30,11 @@ from coldfront.core.project.utils_.permissions_utils import (
     is_user_manager_or_pi_of_project,
 )
 
+REQUEST_HUB_SECTION_CACHE_KEY_PREFIX = "request_hub_section"
+
+# The number of seconds for which a rendered request hub section is cached.
+REQUEST_HUB_SECTION_CACHE_TIMEOUT = 60
+
 
 class RequestListItem:
     """
@@ -46,6 +55,7 @@ class RequestListItem:
         self.button_text = None
         self.id = None
         self.help_text = None
+        self.fragment_url = None
 
 
 class RequestHubView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
@@ -53,6 +63,25 @@ class RequestHubView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     paginate_by = 10
     paginators = 0
     show_all_requests = False
+    section_url_name = "request-hub-section"
+
+    # The names of sections, in the order in which their paginators are
+    # numbered, paired with the flag, if any, that must be enabled for the
+    # section to be displayed.
+    sections = (
+        ("cluster_account_request", None),
+        ("project_removal_request", None),
+        ("savio_project_request", None),
+        ("vector_project_request", None),
+        ("project_join_request", None),
+        ("project_renewal_request", None),
+        ("su_purchase_request", None),
+        ("secure_dir_request", "SECURE_DIRS_REQUESTABLE"),
+        ("secure_dir_join_request", "SECURE_DIRS_REQUESTABLE"),
+        ("secure_dir_remove_request", "SECURE_DIRS_REQUESTABLE"),
+        ("faculty_storage_allocation_request", "FACULTY_STORAGE_ALLOCATIONS_ENABLED"),
+        ("hardware_procurement_request", "HARDWARE_PROCUREMENTS_ENABLED"),
+    )
 
     def test_func(self):
         """UserPassesTestMixin Tests"""
@@ -781,41 +810,26 @@ class RequestHubView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Add your existing request types to this list.
-        requests = [
-            "cluster_account_request",
-            "project_removal_request",
-            "savio_project_request",
-            "vector_project_request",
-            "project_join_request",
-            "project_renewal_request",
-            "su_purchase_request",
-        ]
-
-        if flag_enabled("SECURE_DIRS_REQUESTABLE"):
-            requests += [
-                "secure_dir_request",
-                "secure_dir_join_request",
-                "secure_dir_remove_request",
-            ]
-
-        if flag_enabled("FACULTY_STORAGE_ALLOCATIONS_ENABLED"):
-            requests.append("faculty_storage_allocation_request")
-
-        if flag_enabled("HARDWARE_PROCUREMENTS_ENABLED"):
-            requests.append("hardware_procurement_request")
-
-        context["show_all"] = (
-            self.request.user.is_superuser or self.request.user.is_staff
-        ) and self.show_all_requests
+        context["show_all"] = self.is_showing_all_requests()
 
-        for req in requests:
-            request_obj = eval(f"self.get_{req}()")
-            if context["show_all"]:
-                request_obj.help_text = (
-                    f"Showing all {request_obj.title} in {settings.PORTAL_NAME}."
+        lazy_sections = flag_enabled("REQUEST_HUB_LAZY_SECTIONS_ENABLED")
+        if lazy_sections:
+            context["section_template"] = "request_hub/request_section_shell.html"
+        else:
+            context["section_template"] = "request_hub/request_section.html"
+
+        for section in self.get_enabled_sections():
+            if lazy_sections:
+                # Only render a shell, whose contents are loaded separately
+                # from RequestHubSectionView.
+                request_obj = RequestListItem()
+                request_obj.id = f"{section}_shell"
+                request_obj.fragment_url = reverse(
+                    self.section_url_name, kwargs={"section": section}
                 )
-            context[f"{req}_obj"] = request_obj
+            else:
+                request_obj = self.get_request_obj(section)
+            context[f"{section}_obj"] = request_obj
 
         context["admin_staff"] = (
             self.request.user.is_superuser or self.request.user.is_staff
@@ -823,3 +837,73 @@ class RequestHubView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         context["hide_table_sorter"] = True
 
         return context
+
+    def get_enabled_sections(self):
+        """Return the names of the sections whose flags, if any, are
+        enabled, in order."""
+        return [
+            section
+            for section, flag in self.sections
+            if flag is None or flag_enabled(flag)
+        ]
+
+    def get_request_obj(self, section):
+        """Return a RequestListItem for the section with the given name,
+        which must be enabled."""
+        # Each section creates two paginators. Number them based on the
+        # section's position, so that page parameters are the same
+        # whether sections are built together or individually.
+        self.paginators = 2 * self.get_enabled_sections().index(section)
+        request_obj = getattr(self, f"get_{section}")()
+        if self.is_showing_all_requests():
+            request_obj.help_text = (
+                f"Showing all {request_obj.title} in {settings.PORTAL_NAME}."
+            )
+        return request_obj
+
+    def is_showing_all_requests(self):
+        """Return whether all requests, rather than only those of the
+        requesting user, are shown."""
+        user = self.request.user
+        return (user.is_superuser or user.is_staff) and self.show_all_requests
+
+
+class RequestHubSectionView(RequestHubView):
+    """Render a single section of the request hub, to be loaded on
+    demand into a shell rendered by RequestHubView.
+
+    Rendered sections are cached for a short time, keyed by the section,
+    the user (unless all requests are shown), and the section's page
+    parameters, so that a section that is slow to build (e.g., one
+    backed by an external data source) is not rebuilt on every page load
+    and does not delay other sections."""
+
+    template_name = "request_hub/request_section.html"
+
+    def get(self, request, *args, **kwargs):
+        section = kwargs["section"]
+        if section not in self.get_enabled_sections():
+            raise Http404(f"Unknown or disabled request section: {section}.")
+
+        cache_key = self.get_cache_key(section)
+        content = cache.get(cache_key)
+        if content is None:
+            context = {
+                "request_obj": self.get_request_obj(section),
+                "admin_staff": request.user.is_superuser or request.user.is_staff,
+                "hide_table_sorter": True,
+            }
+            content = render_to_string(self.template_name, context, request=request)
+            cache.set(cache_key, content, timeout=REQUEST_HUB_SECTION_CACHE_TIMEOUT)
+        return HttpResponse(content)
+
+    def get_cache_key(self, section):
+        """Return the key under which the rendered section is cached."""
+        if self.is_showing_all_requests():
+            # The section is the same for all admins and staff.
+            owner = "all"
+        else:
+            owner = f"user_{self.request.user.pk}"
+        num = 2 * self.get_enabled_sections().index(section)
+        pages = [self.request.GET.get(f"page{i}", "") for i in (num, num + 1)]
+        return ":".join([REQUEST_HUB_SECTION_CACHE_KEY_PREFIX, section, owner, *pages])
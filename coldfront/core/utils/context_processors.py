@@ -3,26 +3,12 @@ import logging
 from constance import config
 from django.conf import settings
 from django.db.models import Q
-from flags.state import flag_enabled
-
-from coldfront.core.allocation.models import (
-    AllocationAdditionRequest,
-    AllocationRenewalRequest,
-    ClusterAccessRequest,
-    SecureDirAddUserRequest,
-    SecureDirRemoveUserRequest,
-    SecureDirRequest,
-)
-from coldfront.core.project.models import (
-    ProjectUser,
-    ProjectUserJoinRequest,
-    ProjectUserRemovalRequest,
-    SavioProjectAllocationRequest,
-    VectorProjectAllocationRequest,
-)
+
+from coldfront.core.project.models import ProjectUser
 from coldfront.core.project.utils_.renewal_utils import (
     get_current_allowance_year_period,
 )
+from coldfront.core.utils.request_alert_counts import get_request_alert_counts
 
 logger = logging.getLogger(__name__)
 
@@ -93,70 +79,7 @@ def primary_cluster_name(request):
 
 def request_alert_counts(request):
     if request.user.is_superuser or request.user.is_staff:
-        context = {
-            "cluster_account_req_count": ClusterAccessRequest.objects.filter(
-                status__name__in=["Pending - Add", "Processing"]
-            ).count(),
-            "project_removal_req_count": ProjectUserRemovalRequest.objects.filter(
-                status__name__in=["Pending", "Processing"]
-            ).count(),
-            "savio_project_req_count": SavioProjectAllocationRequest.objects.filter(
-                status__name__in=["Under Review", "Approved - Processing"]
-            ).count(),
-            "project_join_req_count": ProjectUserJoinRequest.objects.filter(
-                project_user__status__name="Pending - Add"
-            ).count(),
-            "project_renewal_req_count": AllocationRenewalRequest.objects.filter(
-                status__name__in=["Under Review"]
-            ).count(),
-            "secure_dir_join_req_count": SecureDirAddUserRequest.objects.filter(
-                status__name__in=["Pending", "Processing"]
-            ).count(),
-            "secure_dir_remove_req_count": SecureDirRemoveUserRequest.objects.filter(
-                status__name__in=["Pending", "Processing"]
-            ).count(),
-            "secure_dir_req_count": SecureDirRequest.objects.filter(
-                status__name__in=["Under Review", "Approved - Processing"]
-            ).count(),
-        }
-
-        if flag_enabled("FACULTY_STORAGE_ALLOCATIONS_ENABLED"):
-            from coldfront.plugins.faculty_storage_allocations.models import (
-                FacultyStorageAllocationRequest,
-            )
-
-            context["faculty_storage_allocations_req_count"] = (
-                FacultyStorageAllocationRequest.objects.filter(
-                    status__name__in=[
-                        "Under Review",
-                        "Approved - Queued",
-                        "Approved - Processing",
-                    ]
-                ).count()
-            )
-
-        if flag_enabled("HARDWARE_PROCUREMENTS_ENABLED"):
-            from coldfront.plugins.hardware_procurements.utils.data_sources import (
-                fetch_hardware_procurements,
-            )
-
-            context["hardware_procurement_req_count"] = len(
-                list(fetch_hardware_procurements(status="Pending"))
-            )
-
-        if flag_enabled("SERVICE_UNITS_PURCHASABLE"):
-            context["su_purchase_req_count"] = AllocationAdditionRequest.objects.filter(
-                status__name__in=["Under Review"]
-            ).count()
-
-        if flag_enabled("BRC_ONLY"):
-            context["vector_project_req_count"] = (
-                VectorProjectAllocationRequest.objects.filter(
-                    status__name__in=["Under Review", "Approved - Processing"]
-                ).count()
-            )
-
-        context = {k: v for k, v in context.items() if v > 0}
+        context = {k: v for k, v in get_request_alert_counts().items() if v > 0}
         req_count_sum = sum(context.values())
         context["request_counts"] = req_count_sum
 
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+"""Methods relating to recording per-request performance metrics.
+
+Metrics for the current request are held in a RequestMetrics object,
+which is stored in a context variable while the request is being
+handled by InstrumentationMiddleware. Outside of an instrumented
+request, the recording methods below do nothing, so they are safe to
+call from code that also runs in management commands and tasks.
+
+Metrics are only recorded in the thread handling the request; work
+handed to other threads should be timed by the request thread (e.g.,
+while waiting for results) using external_call."""
+
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Aggregate metrics for a single request."""
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.sql_count = 0
+        self.sql_duration = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.external_count = 0
+        self.external_duration = 0.0
+        # Map each SQL statement (with placeholders for parameters) to a
+        # two-element list: the number of times it was executed, and the
+        # total number of seconds taken.
+        self.sql_statements = defaultdict(lambda: [0, 0.0])
+        # Map the name of each external service to a two-element list: the
+        # number of calls made, and the total number of seconds taken.
+        self.external_calls = defaultdict(lambda: [0, 0.0])
+
+    @property
+    def duration(self):
+        """The number of seconds elapsed since the request started."""
+        return perf_counter() - self.start
+
+    def record_query(self, sql, duration):
+        self.sql_count += 1
+        self.sql_duration += duration
+        statement = self.sql_statements[sql]
+        statement[0] += 1
+        statement[1] += duration
+
+    def record_cache_lookups(self, hits, misses):
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+    def record_external_call(self, name, duration):
+        self.external_count += 1
+        self.external_duration += duration
+        call = self.external_calls[name]
+        call[0] += 1
+        call[1] += duration
+
+    def top_queries(self, n):
+        """Return a list of up to n dicts describing the SQL statements
+        that took the most total time, in descending order."""
+        statements = sorted(
+            self.sql_statements.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return [
+            {"sql": sql, "count": count, "duration_ms": round(duration * 1000, 2)}
+            for sql, (count, duration) in statements[:n]
+        ]
+
+    def as_dict(self):
+        """Return a dict of the aggregate metrics, with durations in
+        milliseconds."""
+        return {
+            "duration_ms": round(self.duration * 1000, 2),
+            "sql_count": self.sql_count,
+            "sql_duration_ms": round(self.sql_duration * 1000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "external_count": self.external_count,
+            "external_duration_ms": round(self.external_duration * 1000, 2),
+        }
+
+    def server_timing(self):
+        """Return the value of a Server-Timing header describing the
+        metrics."""
+        entries = [
+            f'db;dur={self.sql_duration * 1000:.1f};desc="{self.sql_count} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        for name, (count, duration) in sorted(self.external_calls.items()):
+            entries.append(f'ext-{name};dur={duration * 1000:.1f};desc="{count} calls"')
+        entries.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(entries)
+
+
+class InstrumentedCache:
+    """A proxy for a cache that records hits and misses of lookups in
+    the given RequestMetrics."""
+
+    _missing = object()
+
+    def __init__(self, cache, metrics):
+        self._cache = cache
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def get(self, key, default=None, version=None):
+        value = self._cache.get(key, self._missing, version=version)
+        if value is self._missing:
+            self._metrics.record_cache_lookups(0, 1)
+            return default
+        self._metrics.record_cache_lookups(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self._cache.get_many(keys, version=version)
+        self._metrics.record_cache_lookups(len(values), len(keys) - len(values))
+        return values
+
+    def get_or_set(self, key, default, timeout=None, version=None):
+        value = self.get(key, self._missing, version=version)
+        if value is self._missing:
+            return self._cache.get_or_set(key, default, timeout, version=version)
+        return value
+
+
+def current_request_metrics():
+    """Return the RequestMetrics of the current request, or None if it
+    is not being instrumented."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def instrument_request():
+    """Record metrics for the duration of the block, in which the
+    yielded RequestMetrics is the current one.
+
+    SQL queries are recorded on all database connections, and cache
+    lookups on all configured caches."""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_query_recorder(metrics)))
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            caches[alias] = InstrumentedCache(cache, metrics)
+            stack.callback(caches.__setitem__, alias, cache)
+        try:
+            yield metrics
+        finally:
+            _current_metrics.reset(token)
+
+
+def _query_recorder(metrics):
+    def wrapper(execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(sql, perf_counter() - start)
+
+    return wrapper
+
+
+@contextmanager
+def external_call(name):
+    """Record the time taken by the block as a call to the external
+    service with the given name (e.g., "ldap"), if the current request
+    is being instrumented."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record_external_call(name, perf_counter() - start)
@@ -0,0 +1,169 @@
+from contextlib import contextmanager
+import logging
+import os
+import threading
+from time import monotonic
+
+from ldap3 import BASE
+from ldap3.core.exceptions import LDAPException
+
+from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.instrumentation import external_call
+
+"""Methods relating to pooling connections to LDAP servers.
+
+Establishing an LDAP connection requires a network (and possibly TLS)
+handshake and a bind (possibly a SASL/Kerberos exchange). A pool keeps
+bound connections open between uses, so that a search reuses an existing
+connection. Pools are per process and are shared by all threads in it.
+
+Before an idle connection is reused, it is rebound if it has been closed
+or unbound, and, if it has been idle for some time, checked by reading
+the server's root DSE. Connections that fail either check, or that raise
+an LDAP error while in use, are discarded."""
+
+
+logger = logging.getLogger(__name__)
+
+
+class LDAPConnectionPoolTimeout(Exception):
+    """Raised when no connection becomes available in time."""
+
+
+class LDAPConnectionPool:
+    """A thread-safe pool of at most max_size bound ldap3 Connections,
+    each created by calling connection_factory, which takes no
+    arguments."""
+
+    def __init__(
+        self,
+        connection_factory,
+        max_size=None,
+        health_check_interval=None,
+        acquire_timeout=None,
+    ):
+        self._connection_factory = connection_factory
+        if max_size is None:
+            max_size = import_from_settings("LDAP_CONNECTION_POOL_MAX_SIZE", 4)
+        # The number of seconds after which an idle connection is checked
+        # before being reused.
+        if health_check_interval is None:
+            health_check_interval = import_from_settings(
+                "LDAP_CONNECTION_POOL_HEALTH_CHECK_INTERVAL", 60
+            )
+        # The number of seconds to wait for a connection when all of them
+        # are in use.
+        if acquire_timeout is None:
+            acquire_timeout = import_from_settings(
+                "LDAP_CONNECTION_POOL_ACQUIRE_TIMEOUT", 10
+            )
+        self._health_check_interval = health_check_interval
+        self._acquire_timeout = acquire_timeout
+
+        # Idle connections, with the times at which they were last used, in
+        # the order in which they were returned.
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def connection(self):
+        """Yield a bound connection for exclusive use, and return it to
+        the pool afterward, unless an LDAP error is raised while it is
+        in use, in which case discard it.
+
+        Raises:
+            - LDAPConnectionPoolTimeout, if no connection becomes
+              available in time
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise LDAPConnectionPoolTimeout(
+                f"No LDAP connection became available within "
+                f"{self._acquire_timeout} seconds."
+            )
+        connection = None
+        try:
+            with external_call("ldap"):
+                connection = self._checkout()
+                yield connection
+        except LDAPException:
+            if connection is not None:
+                self._discard(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                with self._lock:
+                    self._idle.append((connection, monotonic()))
+            self._slots.release()
+
+    def close(self):
+        """Unbind and discard all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _checkout(self):
+        """Return the most recently used idle connection that passes
+        health checks, discarding those that do not, or a new connection
+        if there are none."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used = self._idle.pop()
+            if self._is_healthy(connection, last_used):
+                return connection
+            self._discard(connection)
+        return self._connection_factory()
+
+    def _is_healthy(self, connection, last_used):
+        """Return whether the given connection may be reused, rebinding
+        it if needed."""
+        try:
+            if connection.closed or not connection.bound:
+                return connection.bind()
+            if monotonic() - last_used < self._health_check_interval:
+                return True
+            return connection.search(
+                "", "(objectClass=*)", search_scope=BASE, attributes=["1.1"]
+            )
+        except LDAPException as e:
+            logger.info(f"Discarding unhealthy LDAP connection. Details:\n{e}")
+            return False
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.unbind()
+        except LDAPException:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_ldap_connection_pool(key, connection_factory, **kwargs):
+    """Return the pool of this process with the given hashable key
+    (e.g., identifying a server and bind identity), creating it with
+    the given connection factory and keyword arguments if needed.
+
+    Pools are keyed by process ID as well, so that processes forked
+    after a pool is created do not share its connections."""
+    key = (os.getpid(), key)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = LDAPConnectionPool(connection_factory, **kwargs)
+        return pool
+
+
+def close_ldap_connection_pools():
+    """Close and forget all pools of this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,74 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.core.utils.request_alert_counts import refresh_request_alert_counts
+
+"""An admin command that recomputes the cached numbers of pending
+requests displayed as alerts to staff."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the cached numbers of pending requests displayed as "
+        "alerts to staff, or schedule a recomputation to occur at a set "
+        "interval."
+    )
+
+    logger = logging.getLogger("coldfront.commands")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            default=False,
+            help="Schedule this command periodically.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=15,
+            help="The number of minutes between scheduled runs.",
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            self._handle_schedule(options["interval"])
+        else:
+            self._handle_synchronous()
+
+    def _handle_schedule(self, interval):
+        """Schedule a synchronous run of this command at the given
+        interval, in minutes. Do nothing if there is already a schedule
+        in place."""
+        # Identify existing tasks by a static name, as opposed to the command
+        # name, which may change.
+        task_name = "refresh_request_alert_counts"
+        command_name = __name__.rsplit(".", maxsplit=1)[-1]
+
+        task_exists = Schedule.objects.filter(name=task_name).exists()
+        if task_exists:
+            return
+
+        func = "django.core.management.call_command"
+        args = (command_name,)
+        kwargs = {
+            "schedule_type": "I",
+            "minutes": interval,
+            "name": task_name,
+        }
+        schedule(func, *args, **kwargs)
+
+        message = (
+            f"Scheduled a task to refresh request alert counts every "
+            f'{interval} minutes, under the name "{task_name}".'
+        )
+        self.logger.info(message)
+
+    def _handle_synchronous(self):
+        """Refresh the counts."""
+        refresh_request_alert_counts()
+
+        self.logger.info("Request alert counts refreshed.")
@@ -0,0 +1,92 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.core.project.utils_.search_utils import (
+    refresh_project_search_documents,
+)
+from coldfront.core.user.utils_.search_utils import refresh_user_search_documents
+from coldfront.core.utils.search import indexed_search_enabled
+
+"""An admin command that creates or updates the search documents of all
+Projects and Users, to backfill them and to account for updates that do
+not send signals (e.g., QuerySet.update)."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update the search documents of all Projects and Users, "
+        "or schedule a refresh to occur at a set interval."
+    )
+
+    logger = logging.getLogger("coldfront.commands")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            default=False,
+            help="Schedule this command periodically.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=60,
+            help="The number of minutes between scheduled runs.",
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            self._handle_schedule(options["interval"])
+        else:
+            self._handle_synchronous()
+
+    def _handle_schedule(self, interval):
+        """Schedule a synchronous run of this command at the given
+        interval, in minutes. Do nothing if there is already a schedule
+        in place."""
+        # Identify existing tasks by a static name, as opposed to the command
+        # name, which may change.
+        task_name = "refresh_search_documents"
+        command_name = __name__.rsplit(".", maxsplit=1)[-1]
+
+        task_exists = Schedule.objects.filter(name=task_name).exists()
+        if task_exists:
+            return
+
+        func = "django.core.management.call_command"
+        args = (command_name,)
+        kwargs = {
+            "schedule_type": "I",
+            "minutes": interval,
+            "name": task_name,
+        }
+        schedule(func, *args, **kwargs)
+
+        message = (
+            f"Scheduled a task to refresh search documents every {interval} "
+            f'minutes, under the name "{task_name}".'
+        )
+        self.logger.info(message)
+
+    def _handle_synchronous(self):
+        """Refresh the documents, if the database supports indexed
+        search."""
+        if not indexed_search_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "The database does not support indexed search. Skipping."
+                )
+            )
+            return
+
+        num_projects = len(refresh_project_search_documents())
+        num_users = len(refresh_user_search_documents())
+
+        message = (
+            f"Search documents refreshed. Updated {num_projects} Project "
+            f"document(s) and {num_users} User document(s)."
+        )
+        self.logger.info(message)
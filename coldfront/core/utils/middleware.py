@@ -1,4 +1,8 @@
 import logging
+import random
+
+from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.instrumentation import instrument_request
 
 logger = logging.getLogger(__name__)
 
@@ -22,3 +26,62 @@ class ExceptionMiddleware:
         logger.error(message)
         logger.exception(exception)
         return None
+
+
+class InstrumentationMiddleware:
+    """Record the wall time, SQL queries, cache lookups, and external
+    calls of each request.
+
+    Metrics are logged as a structured line per request, and, if
+    REQUEST_INSTRUMENTATION_SERVER_TIMING is True, returned in a
+    Server-Timing header. A sample of requests that take at least
+    REQUEST_INSTRUMENTATION_SLOW_REQUEST_THRESHOLD milliseconds is
+    logged separately, along with the statements that took the most
+    time."""
+
+    metrics_logger = logging.getLogger("coldfront.instrumentation")
+    slow_request_logger = logging.getLogger("coldfront.instrumentation.slow")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = import_from_settings(
+            "REQUEST_INSTRUMENTATION_SERVER_TIMING", True
+        )
+        self.slow_request_threshold = import_from_settings(
+            "REQUEST_INSTRUMENTATION_SLOW_REQUEST_THRESHOLD", 1000
+        )
+        self.slow_request_sample_rate = import_from_settings(
+            "REQUEST_INSTRUMENTATION_SLOW_REQUEST_SAMPLE_RATE", 1.0
+        )
+        self.num_top_queries = import_from_settings(
+            "REQUEST_INSTRUMENTATION_NUM_TOP_QUERIES", 10
+        )
+
+    def __call__(self, request):
+        with instrument_request() as metrics:
+            response = self.get_response(request)
+
+        data = {
+            "method": request.method,
+            "path": request.path,
+            "status_code": response.status_code,
+            "view": getattr(request.resolver_match, "view_name", None),
+            **metrics.as_dict(),
+        }
+        self.metrics_logger.info("request_metrics", extra=data)
+
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing()
+
+        if (
+            data["duration_ms"] >= self.slow_request_threshold
+            and random.random() < self.slow_request_sample_rate
+        ):
+            data["top_queries"] = metrics.top_queries(self.num_top_queries)
+            data["external_calls"] = {
+                name: {"count": count, "duration_ms": round(duration * 1000, 2)}
+                for name, (count, duration) in metrics.external_calls.items()
+            }
+            self.slow_request_logger.warning("slow_request", extra=data)
+
+        return response
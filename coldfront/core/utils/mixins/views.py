@@ -1,10 +1,11 @@
+from collections import namedtuple
 import re
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Model, QuerySet
-from django.http import HttpResponseRedirect
+from django.db.models import Model, Q, QuerySet
+from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
@@ -68,6 +69,104 @@ class ListFilterMixin:
         return page_obj
 
 
+# A column of a server-side table. order_by is a tuple of fields to order
+# by (empty if the column is not sortable), and search_fields is a tuple of
+# fields to match search terms against.
+TableColumn = namedtuple("TableColumn", ["name", "order_by", "search_fields"])
+
+
+class ServerSideTableMixin:
+    """Mixin for views that return pages of a table's rows as JSON, in
+    the format expected by DataTables in server-side processing mode.
+
+    Subclasses set ``table_columns`` to a list of ``TableColumn``, in
+    the order of the columns in the table, and implement
+    ``get_table_queryset`` and ``get_table_row``. Only the requested
+    page of objects is fetched, so the cost of a request does not grow
+    with the number of rows.
+    """
+
+    table_columns = []
+    default_page_length = 25
+    max_page_length = 100
+
+    def get_table_queryset(self):
+        """Return a QuerySet of all objects in the table."""
+        raise NotImplementedError
+
+    def get_table_row(self, obj):
+        """Return a dict mapping column names to values for the given
+        object."""
+        raise NotImplementedError
+
+    def get_table_search_filter(self, search):
+        """Return a Q matching objects with any search field containing
+        each whitespace-separated term in the given search string."""
+        search_fields = [
+            field for column in self.table_columns for field in column.search_fields
+        ]
+        query = Q()
+        for term in search.split():
+            term_query = Q()
+            for field in search_fields:
+                term_query |= Q(**{f"{field}__icontains": term})
+            query &= term_query
+        return query
+
+    def get_table_order_by(self):
+        """Return the fields to order by, based on the requested column
+        and direction. Fall back on the first sortable column."""
+        try:
+            column = self.table_columns[int(self.request.GET.get("order[0][column]"))]
+        except (IndexError, TypeError, ValueError):
+            column = None
+        if column is None or not column.order_by:
+            column = next(column for column in self.table_columns if column.order_by)
+        prefix = "-" if self.request.GET.get("order[0][dir]") == "desc" else ""
+        return [prefix + field for field in column.order_by]
+
+    def get_table_page_bounds(self):
+        """Return the start and stop indices of the requested page."""
+        try:
+            start = max(int(self.request.GET.get("start", 0)), 0)
+        except ValueError:
+            start = 0
+        try:
+            length = int(self.request.GET.get("length", self.default_page_length))
+        except ValueError:
+            length = self.default_page_length
+        if length <= 0:
+            length = self.default_page_length
+        return start, start + min(length, self.max_page_length)
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_table_queryset()
+        num_total = queryset.count()
+
+        search = request.GET.get("search[value]", "").strip()
+        if search:
+            queryset = queryset.filter(self.get_table_search_filter(search))
+            num_filtered = queryset.count()
+        else:
+            num_filtered = num_total
+
+        start, stop = self.get_table_page_bounds()
+        objects = queryset.order_by(*self.get_table_order_by())[start:stop]
+
+        try:
+            draw = int(request.GET.get("draw", 0))
+        except ValueError:
+            draw = 0
+        return JsonResponse(
+            {
+                "draw": draw,
+                "recordsTotal": num_total,
+                "recordsFiltered": num_filtered,
+                "data": [self.get_table_row(obj) for obj in objects],
+            }
+        )
+
+
 class SnakeCaseTemplateNameMixin:
     # by default:
     # Django converts the model class name to simply lowercase (i.e. not snake_case)
@@ -0,0 +1,238 @@
+from collections import namedtuple
+import logging
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from flags.state import flag_enabled
+
+"""Methods relating to the numbers of pending requests of each type,
+displayed as alerts to staff in the navigation bar.
+
+Each count is stored in the Django cache, so that rendering the alerts
+costs a single cache lookup. Counts are refreshed when objects that
+affect them are saved or deleted (see coldfront.core.utils.signals),
+and periodically reconciled (see the refresh_request_alert_counts
+management command), to account for updates that do not send signals
+(e.g., QuerySet.update) and for data sources outside the database."""
+
+
+logger = logging.getLogger(__name__)
+
+
+# A type of pending request to count.
+#   - name: the name of the template context variable holding the count
+#   - flag: the name of a flag that must be enabled for the count to be
+#     displayed, or None
+#   - count: a function that takes no arguments and returns the count
+#   - senders: labels ("app_label.ModelName") of models whose changes
+#     may affect the count
+#   - external: whether the count comes from a data source outside the
+#     database, in which case it is too slow to compute while rendering
+#     a page, and is only computed when refreshed
+RequestAlertCounter = namedtuple(
+    "RequestAlertCounter",
+    ["name", "flag", "count", "senders", "external"],
+    defaults=(False,),
+)
+
+
+CACHE_KEY_PREFIX = "request_alert_count:"
+# The last count successfully computed for each external counter, which
+# does not expire, displayed when the current count is missing.
+LAST_KNOWN_CACHE_KEY_PREFIX = "request_alert_count_last_known:"
+
+# The number of seconds after which a count expires, regardless of
+# whether it has been refreshed.
+CACHE_TIMEOUT = 60 * 60
+
+
+def _status_count(model_label, statuses):
+    """Return a function that counts the objects of the given model
+    having any of the given status names."""
+
+    def count():
+        model = apps.get_model(model_label)
+        return model.objects.filter(status__name__in=statuses).count()
+
+    return count
+
+
+def _count_project_join_requests():
+    model = apps.get_model("project.ProjectUserJoinRequest")
+    return model.objects.filter(project_user__status__name="Pending - Add").count()
+
+
+def _count_hardware_procurements():
+    from coldfront.plugins.hardware_procurements.utils.data_sources import (
+        fetch_hardware_procurements,
+    )
+
+    return sum(1 for _ in fetch_hardware_procurements(status="Pending"))
+
+
+COUNTERS = (
+    RequestAlertCounter(
+        "cluster_account_req_count",
+        None,
+        _status_count(
+            "allocation.ClusterAccessRequest", ["Pending - Add", "Processing"]
+        ),
+        ["allocation.ClusterAccessRequest"],
+    ),
+    RequestAlertCounter(
+        "project_removal_req_count",
+        None,
+        _status_count("project.ProjectUserRemovalRequest", ["Pending", "Processing"]),
+        ["project.ProjectUserRemovalRequest"],
+    ),
+    RequestAlertCounter(
+        "savio_project_req_count",
+        None,
+        _status_count(
+            "project.SavioProjectAllocationRequest",
+            ["Under Review", "Approved - Processing"],
+        ),
+        ["project.SavioProjectAllocationRequest"],
+    ),
+    RequestAlertCounter(
+        "project_join_req_count",
+        None,
+        _count_project_join_requests,
+        ["project.ProjectUserJoinRequest", "project.ProjectUser"],
+    ),
+    RequestAlertCounter(
+        "project_renewal_req_count",
+        None,
+        _status_count("allocation.AllocationRenewalRequest", ["Under Review"]),
+        ["allocation.AllocationRenewalRequest"],
+    ),
+    RequestAlertCounter(
+        "secure_dir_join_req_count",
+        None,
+        _status_count("allocation.SecureDirAddUserRequest", ["Pending", "Processing"]),
+        ["allocation.SecureDirAddUserRequest"],
+    ),
+    RequestAlertCounter(
+        "secure_dir_remove_req_count",
+        None,
+        _status_count(
+            "allocation.SecureDirRemoveUserRequest", ["Pending", "Processing"]
+        ),
+        ["allocation.SecureDirRemoveUserRequest"],
+    ),
+    RequestAlertCounter(
+        "secure_dir_req_count",
+        None,
+        _status_count(
+            "allocation.SecureDirRequest", ["Under Review", "Approved - Processing"]
+        ),
+        ["allocation.SecureDirRequest"],
+    ),
+    RequestAlertCounter(
+        "faculty_storage_allocations_req_count",
+        "FACULTY_STORAGE_ALLOCATIONS_ENABLED",
+        _status_count(
+            "faculty_storage_allocations.FacultyStorageAllocationRequest",
+            ["Under Review", "Approved - Queued", "Approved - Processing"],
+        ),
+        ["faculty_storage_allocations.FacultyStorageAllocationRequest"],
+    ),
+    RequestAlertCounter(
+        "hardware_procurement_req_count",
+        "HARDWARE_PROCUREMENTS_ENABLED",
+        _count_hardware_procurements,
+        [],
+        external=True,
+    ),
+    RequestAlertCounter(
+        "su_purchase_req_count",
+        "SERVICE_UNITS_PURCHASABLE",
+        _status_count("allocation.AllocationAdditionRequest", ["Under Review"]),
+        ["allocation.AllocationAdditionRequest"],
+    ),
+    RequestAlertCounter(
+        "vector_project_req_count",
+        "BRC_ONLY",
+        _status_count(
+            "project.VectorProjectAllocationRequest",
+            ["Under Review", "Approved - Processing"],
+        ),
+        ["project.VectorProjectAllocationRequest"],
+    ),
+)
+
+
+def get_enabled_counters():
+    """Return the RequestAlertCounters whose flags, if any, are
+    enabled."""
+    return [
+        counter
+        for counter in COUNTERS
+        if counter.flag is None or flag_enabled(counter.flag)
+    ]
+
+
+def get_request_alert_counts():
+    """Return a dict mapping the name of each enabled counter to its
+    count, retrieving counts from the cache in a single lookup, and
+    computing and caching any that are missing.
+
+    Missing external counts are not computed, but replaced by the last
+    known count, or 0, until they are next refreshed."""
+    counters = get_enabled_counters()
+    keys = {CACHE_KEY_PREFIX + counter.name: counter for counter in counters}
+    last_known_keys = [
+        LAST_KNOWN_CACHE_KEY_PREFIX + counter.name
+        for counter in counters
+        if counter.external
+    ]
+    cached = cache.get_many([*keys, *last_known_keys])
+
+    counts, missing = {}, {}
+    for key, counter in keys.items():
+        if key in cached:
+            counts[counter.name] = cached[key]
+        elif counter.external:
+            counts[counter.name] = cached.get(
+                LAST_KNOWN_CACHE_KEY_PREFIX + counter.name, 0
+            )
+        else:
+            count = counter.count()
+            counts[counter.name] = missing[key] = count
+    if missing:
+        cache.set_many(missing, timeout=CACHE_TIMEOUT)
+    return counts
+
+
+def refresh_request_alert_counts(names=None):
+    """Recompute and cache the counts of the enabled counters, or only
+    those with the given names."""
+    counts, last_known_counts = {}, {}
+    for counter in get_enabled_counters():
+        if names is not None and counter.name not in names:
+            continue
+        try:
+            count = counter.count()
+        except Exception as e:
+            # Drop the stale count, so that it is recomputed when read, or,
+            # if external, replaced by the last known count.
+            cache.delete(CACHE_KEY_PREFIX + counter.name)
+            logger.exception(
+                f"Failed to refresh request alert count {counter.name}. Details:\n{e}"
+            )
+            continue
+        counts[CACHE_KEY_PREFIX + counter.name] = count
+        if counter.external:
+            last_known_counts[LAST_KNOWN_CACHE_KEY_PREFIX + counter.name] = count
+    cache.set_many(counts, timeout=CACHE_TIMEOUT)
+    if last_known_counts:
+        cache.set_many(last_known_counts, timeout=None)
+
+
+def refresh_request_alert_counts_on_commit(names):
+    """Refresh the counts of the counters with the given names once the
+    current transaction, if any, is committed."""
+    transaction.on_commit(
+        lambda: refresh_request_alert_counts(names=names), robust=True
+    )
@@ -0,0 +1,90 @@
+from django.db import connection
+
+"""Methods relating to indexed search, shared by the searchable list
+views (e.g., of Projects and Users).
+
+Each searchable object has a search document: a row in a separate table
+that denormalizes the values searched for it (e.g., the last names of a
+Project's PIs) into text columns, so that searches do not require joins.
+On PostgreSQL, these columns have pg_trgm indexes (created by the
+migrations that create the documents), so that substring searches use
+index scans rather than sequential scans, and results are ranked by
+trigram similarity. On other databases, documents are not maintained,
+and views fall back to filtering the original columns.
+
+Searches only find objects that have documents. Documents are created
+for existing objects by the migrations that follow those creating the
+tables, kept up to date by signals, and reconciled periodically by the
+refresh_search_documents management command, which also creates any
+that are missing (e.g., for objects created by bulk_create)."""
+
+
+# The separator between multiple values (e.g., multiple last names) in a
+# single column of a search document.
+SEARCH_DOCUMENT_VALUE_SEPARATOR = "\n"
+
+# The maximum number of documents to refresh at once.
+SEARCH_DOCUMENT_BATCH_SIZE = 500
+
+
+def indexed_search_enabled():
+    """Return whether the database supports indexed search, in which
+    case search documents are maintained and searched."""
+    return connection.vendor == "postgresql"
+
+
+def join_search_document_values(values):
+    """Return a single str containing the given values, for storage in
+    a single column of a search document."""
+    return SEARCH_DOCUMENT_VALUE_SEPARATOR.join(value for value in values if value)
+
+
+def build_search_document_text(*values):
+    """Return the full text of a search document, against which results
+    are ranked, given the values of its columns."""
+    return " ".join(value for value in values if value)
+
+
+def batched(pks, batch_size=SEARCH_DOCUMENT_BATCH_SIZE):
+    """Yield lists of at most the given size from the given primary
+    keys."""
+    pks = list(pks)
+    for i in range(0, len(pks), batch_size):
+        yield pks[i : i + batch_size]
+
+
+def save_search_documents(model, documents, fields):
+    """Create or update the given unsaved instances of the given search
+    document model, skipping those whose given fields are identical to
+    those already stored. Return the primary keys of those saved."""
+    pks = [document.pk for document in documents]
+    stored = {
+        row[0]: row[1:]
+        for row in model.objects.filter(pk__in=pks).values_list("pk", *fields)
+    }
+    changed = [
+        document
+        for document in documents
+        if stored.get(document.pk)
+        != tuple(getattr(document, field) for field in fields)
+    ]
+    if changed:
+        model.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=[*fields, "modified"],
+        )
+    return [document.pk for document in changed]
+
+
+def rank_by_similarity(queryset, field, terms):
+    """Return the given queryset ordered by decreasing trigram
+    similarity between the given field and the given search terms.
+    This requires PostgreSQL."""
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    query = " ".join(terms)
+    return queryset.annotate(search_rank=TrigramSimilarity(field, query)).order_by(
+        "-search_rank", "pk"
+    )
@@ -0,0 +1,38 @@
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from coldfront.core.utils.request_alert_counts import (
+    COUNTERS,
+    refresh_request_alert_counts_on_commit,
+)
+
+
+def _connect_request_alert_count_receivers():
+    """For each model whose changes may affect request alert counts,
+    connect a receiver that refreshes the affected counts when an object
+    is saved or deleted. Skip models of apps that are not installed."""
+    counter_names_by_model = defaultdict(set)
+    for counter in COUNTERS:
+        for label in counter.senders:
+            try:
+                model = apps.get_model(label)
+            except LookupError:
+                continue
+            counter_names_by_model[model].add(counter.name)
+
+    for model, counter_names in counter_names_by_model.items():
+        names = sorted(counter_names)
+
+        def receiver(sender, names=names, **kwargs):
+            refresh_request_alert_counts_on_commit(names)
+
+        dispatch_uid = f"request_alert_counts:{model._meta.label}"
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(
+            receiver, sender=model, weak=False, dispatch_uid=dispatch_uid
+        )
+
+
+_connect_request_alert_count_receivers()
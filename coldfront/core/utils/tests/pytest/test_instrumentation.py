@@ -0,0 +1,135 @@
+"""Tests for coldfront.core.utils.instrumentation and
+InstrumentationMiddleware."""
+
+import logging
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+import pytest
+
+from coldfront.core.utils.instrumentation import (
+    current_request_metrics,
+    external_call,
+    instrument_request,
+)
+from coldfront.core.utils.middleware import InstrumentationMiddleware
+
+
+def _view(request):
+    """A view that queries the database, looks up two cache keys, and
+    makes an external call."""
+    list(User.objects.all())
+    list(User.objects.all())
+    cache.set("present", 1)
+    cache.get("present")
+    cache.get("absent")
+    with external_call("ldap"):
+        pass
+    return HttpResponse("OK")
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestInstrumentRequest:
+    """Tests for instrument_request."""
+
+    def test_metrics_recorded(self, locmem_cache):
+        """Test that queries, cache lookups, and external calls made in
+        the block are recorded."""
+        with instrument_request() as metrics:
+            assert current_request_metrics() is metrics
+            _view(None)
+
+        assert current_request_metrics() is None
+        assert metrics.sql_count == 2
+        assert len(metrics.sql_statements) == 1
+        assert metrics.cache_hits == 1
+        assert metrics.cache_misses == 1
+        assert metrics.external_count == 1
+        assert dict(metrics.external_calls)["ldap"][0] == 1
+
+        top_queries = metrics.top_queries(5)
+        assert len(top_queries) == 1
+        assert top_queries[0]["count"] == 2
+
+    def test_nothing_recorded_outside_request(self, locmem_cache):
+        """Test that recording outside of an instrumented request is a
+        no-op."""
+        with external_call("ldap"):
+            pass
+        cache.get("absent")
+        assert current_request_metrics() is None
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestInstrumentationMiddleware:
+    """Tests for InstrumentationMiddleware."""
+
+    def _get(self, middleware):
+        request = RequestFactory().get("/instrumented/")
+        return middleware(request)
+
+    def test_metrics_logged_and_returned(self, caplog, locmem_cache, settings):
+        """Test that a structured line is logged and a Server-Timing
+        header is set for each request."""
+        settings.REQUEST_INSTRUMENTATION_SLOW_REQUEST_THRESHOLD = 60 * 1000
+        middleware = InstrumentationMiddleware(_view)
+
+        with caplog.at_level(logging.INFO, logger="coldfront.instrumentation"):
+            response = self._get(middleware)
+
+        [record] = [r for r in caplog.records if r.name == "coldfront.instrumentation"]
+        assert record.path == "/instrumented/"
+        assert record.status_code == 200
+        assert record.sql_count == 2
+        assert record.cache_hits == 1
+        assert record.cache_misses == 1
+        assert record.external_count == 1
+        assert not any(
+            r.name == "coldfront.instrumentation.slow" for r in caplog.records
+        )
+
+        server_timing = response["Server-Timing"]
+        assert "db;dur=" in server_timing
+        assert 'desc="2 queries"' in server_timing
+        assert "ext-ldap;dur=" in server_timing
+        assert "total;dur=" in server_timing
+
+    def test_server_timing_disabled(self, locmem_cache, settings):
+        """Test that the Server-Timing header can be disabled."""
+        settings.REQUEST_INSTRUMENTATION_SERVER_TIMING = False
+        response = self._get(InstrumentationMiddleware(_view))
+        assert "Server-Timing" not in response
+
+    def test_slow_request_logged(self, caplog, locmem_cache, settings):
+        """Test that requests over the threshold are logged with their
+        top queries and external calls."""
+        settings.REQUEST_INSTRUMENTATION_SLOW_REQUEST_THRESHOLD = 0
+        settings.REQUEST_INSTRUMENTATION_SLOW_REQUEST_SAMPLE_RATE = 1.0
+        settings.REQUEST_INSTRUMENTATION_NUM_TOP_QUERIES = 1
+
+        with caplog.at_level(logging.INFO, logger="coldfront.instrumentation"):
+            self._get(InstrumentationMiddleware(_view))
+
+        [record] = [
+            r for r in caplog.records if r.name == "coldfront.instrumentation.slow"
+        ]
+        assert len(record.top_queries) == 1
+        assert record.top_queries[0]["count"] == 2
+        assert record.external_calls["ldap"]["count"] == 1
+
+    def test_slow_request_not_sampled(self, caplog, locmem_cache, settings):
+        """Test that slow requests are not logged if the sample rate is
+        zero."""
+        settings.REQUEST_INSTRUMENTATION_SLOW_REQUEST_THRESHOLD = 0
+        settings.REQUEST_INSTRUMENTATION_SLOW_REQUEST_SAMPLE_RATE = 0
+
+        with caplog.at_level(logging.INFO, logger="coldfront.instrumentation"):
+            self._get(InstrumentationMiddleware(_view))
+
+        assert not any(
+            r.name == "coldfront.instrumentation.slow" for r in caplog.records
+        )
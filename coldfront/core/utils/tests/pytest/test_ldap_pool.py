@@ -0,0 +1,151 @@
+"""Tests for coldfront.core.utils.ldap_pool."""
+
+import threading
+
+from ldap3.core.exceptions import LDAPSocketOpenError
+import pytest
+
+from coldfront.core.utils.ldap_pool import (
+    LDAPConnectionPool,
+    LDAPConnectionPoolTimeout,
+    close_ldap_connection_pools,
+    get_ldap_connection_pool,
+)
+
+
+class FakeConnection:
+    """A stand-in for a bound ldap3 Connection."""
+
+    def __init__(self):
+        self.bound = True
+        self.closed = False
+        self.healthy = True
+        self.num_binds = 0
+        self.num_searches = 0
+
+    def bind(self):
+        self.num_binds += 1
+        self.bound, self.closed = True, False
+        return True
+
+    def search(self, *args, **kwargs):
+        self.num_searches += 1
+        if not self.healthy:
+            raise LDAPSocketOpenError("Connection reset.")
+        return True
+
+    def unbind(self):
+        self.bound, self.closed = False, True
+
+
+@pytest.fixture
+def factory():
+    """Return a connection factory that records the connections it
+    creates."""
+    created = []
+
+    def _create():
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    _create.created = created
+    return _create
+
+
+@pytest.mark.unit
+class TestLDAPConnectionPool:
+    """Tests for LDAPConnectionPool."""
+
+    def test_connection_reused(self, factory):
+        """Test that a returned connection is reused without being
+        checked or rebound."""
+        pool = LDAPConnectionPool(factory, max_size=2, health_check_interval=60)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert len(factory.created) == 1
+        assert first.num_binds == 0
+        assert first.num_searches == 0
+
+    def test_unbound_connection_rebound(self, factory):
+        """Test that a connection that was closed while idle is rebound
+        before reuse."""
+        pool = LDAPConnectionPool(factory, max_size=1)
+        with pool.connection() as connection:
+            pass
+        connection.unbind()
+
+        with pool.connection() as reused:
+            assert reused.bound
+
+        assert reused is connection
+        assert connection.num_binds == 1
+
+    def test_unhealthy_idle_connection_replaced(self, factory):
+        """Test that a connection idle past the health check interval is
+        checked, and replaced if the check fails."""
+        pool = LDAPConnectionPool(factory, max_size=1, health_check_interval=0)
+        with pool.connection() as connection:
+            pass
+        connection.healthy = False
+
+        with pool.connection() as replacement:
+            pass
+
+        assert replacement is not connection
+        assert connection.closed
+        assert len(factory.created) == 2
+
+    def test_connection_discarded_on_ldap_error(self, factory):
+        """Test that a connection that raises an LDAP error while in use
+        is discarded, and that the slot is released."""
+        pool = LDAPConnectionPool(factory, max_size=1)
+
+        with pytest.raises(LDAPSocketOpenError):
+            with pool.connection() as connection:
+                connection.healthy = False
+                connection.search()
+
+        with pool.connection() as replacement:
+            pass
+        assert replacement is not connection
+
+    def test_max_size_enforced(self, factory):
+        """Test that at most max_size connections are in use at once,
+        and that waiting for a connection times out."""
+        pool = LDAPConnectionPool(factory, max_size=1, acquire_timeout=0.1)
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold():
+            with pool.connection():
+                acquired.set()
+                release.wait(timeout=5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        try:
+            acquired.wait(timeout=5)
+            with pytest.raises(LDAPConnectionPoolTimeout):
+                with pool.connection():
+                    pass
+        finally:
+            release.set()
+            thread.join()
+
+        with pool.connection():
+            pass
+        assert len(factory.created) == 1
+
+    def test_pools_shared_by_key(self, factory):
+        """Test that pools are shared by key within the process."""
+        try:
+            pool = get_ldap_connection_pool(("server", "dn"), factory)
+            assert get_ldap_connection_pool(("server", "dn"), factory) is pool
+            assert get_ldap_connection_pool(("server", "other"), factory) is not pool
+        finally:
+            close_ldap_connection_pools()
@@ -0,0 +1,105 @@
+"""Tests for the cached request alert counts."""
+
+from django.db.models.signals import post_delete, post_save
+import pytest
+
+from coldfront.core.allocation.models import ClusterAccessRequest
+from coldfront.core.project.models import ProjectUser, ProjectUserJoinRequest
+from coldfront.core.utils import request_alert_counts
+from coldfront.core.utils.request_alert_counts import (
+    CACHE_KEY_PREFIX,
+    RequestAlertCounter,
+    get_enabled_counters,
+    get_request_alert_counts,
+    refresh_request_alert_counts,
+    refresh_request_alert_counts_on_commit,
+)
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestRequestAlertCounts:
+    """Tests for request alert counts."""
+
+    def test_counts_served_from_cache(self, locmem_cache, django_assert_num_queries):
+        """Test that counts are computed once, then served from the
+        cache without querying the database."""
+        counts = get_request_alert_counts()
+        assert set(counts) == {counter.name for counter in get_enabled_counters()}
+
+        with django_assert_num_queries(0):
+            assert get_request_alert_counts() == counts
+
+    def test_missing_counts_computed(self, locmem_cache):
+        """Test that a count missing from the cache is recomputed."""
+        get_request_alert_counts()
+        key = CACHE_KEY_PREFIX + "cluster_account_req_count"
+        locmem_cache.delete(key)
+
+        counts = get_request_alert_counts()
+
+        assert counts["cluster_account_req_count"] == locmem_cache.get(key)
+
+    def test_missing_external_counts_not_computed(self, locmem_cache, monkeypatch):
+        """Test that a missing external count is not computed when read,
+        but replaced by the last known count, which survives a failed
+        refresh."""
+        results = [3, ConnectionError("The data source is unavailable.")]
+
+        def count():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        counter = RequestAlertCounter("external_count", None, count, [], True)
+        monkeypatch.setattr(request_alert_counts, "COUNTERS", (counter,))
+
+        assert get_request_alert_counts() == {"external_count": 0}
+        assert len(results) == 2
+
+        refresh_request_alert_counts()
+        assert get_request_alert_counts() == {"external_count": 3}
+
+        refresh_request_alert_counts()
+        assert locmem_cache.get(CACHE_KEY_PREFIX + "external_count") is None
+        assert get_request_alert_counts() == {"external_count": 3}
+        assert results == []
+
+    def test_refresh_replaces_stale_counts(self, locmem_cache):
+        """Test that refreshing replaces stale counts with accurate
+        ones."""
+        key = CACHE_KEY_PREFIX + "cluster_account_req_count"
+        locmem_cache.set(key, 12345)
+
+        refresh_request_alert_counts()
+
+        assert (
+            locmem_cache.get(key)
+            == ClusterAccessRequest.objects.filter(
+                status__name__in=["Pending - Add", "Processing"]
+            ).count()
+        )
+
+    def test_refresh_on_commit_only_refreshes_given_counts(
+        self, locmem_cache, django_capture_on_commit_callbacks
+    ):
+        """Test that a refresh scheduled on commit only refreshes the
+        given counts, and only once the transaction is committed."""
+        refreshed_key = CACHE_KEY_PREFIX + "cluster_account_req_count"
+        other_key = CACHE_KEY_PREFIX + "project_removal_req_count"
+        locmem_cache.set_many({refreshed_key: 12345, other_key: 12345})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            refresh_request_alert_counts_on_commit(["cluster_account_req_count"])
+            assert locmem_cache.get(refreshed_key) == 12345
+
+        assert locmem_cache.get(refreshed_key) != 12345
+        assert locmem_cache.get(other_key) == 12345
+
+    def test_receivers_connected(self):
+        """Test that changes to models affecting the counts send
+        signals to refresh them."""
+        for model in (ClusterAccessRequest, ProjectUser, ProjectUserJoinRequest):
+            assert post_save.has_listeners(model)
+            assert post_delete.has_listeners(model)
@@ -34,6 +34,15 @@ from coldfront.core.resource.utils_.allowance_utils.interface import (
 )
 from coldfront.core.utils.common import utc_now_offset_aware
 
+# Settings for an in-memory cache, for tests of caching, which the
+# default (dummy) cache disables.
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test",
+    }
+}
+
 
 class BaseTestMixin:
     """A mixin with useful methods for testing the application, to be
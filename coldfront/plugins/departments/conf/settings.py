@@ -9,3 +9,16 @@ DEPARTMENT_DATA_SOURCE = getattr(
     "DEPARTMENTS_DEPARTMENT_DATA_SOURCE",
     "coldfront.plugins.departments.utils.data_sources.backends.dummy.DummyDataSourceBackend",
 )
+
+# The number of users whose departments are fetched together by
+# load_user_departments, and the number of batches fetched concurrently.
+USER_BATCH_SIZE = getattr(django_settings, "DEPARTMENTS_USER_BATCH_SIZE", 50)
+MAX_WORKERS = getattr(django_settings, "DEPARTMENTS_MAX_WORKERS", 4)
+
+# The number of seconds for which the departments fetched for a user are
+# cached, and for which an empty result (e.g., for a user unknown to the
+# data source) is cached. 0 disables caching.
+CACHE_TIMEOUT = getattr(django_settings, "DEPARTMENTS_CACHE_TIMEOUT", 3600)
+NEGATIVE_CACHE_TIMEOUT = getattr(
+    django_settings, "DEPARTMENTS_NEGATIVE_CACHE_TIMEOUT", 300
+)
@@ -2,13 +2,15 @@ from django.contrib.auth.models import User
 from django.core.management import BaseCommand
 
 from coldfront.core.utils.common import add_argparse_dry_run_argument
-from coldfront.plugins.departments.models import UserDepartment
+from coldfront.plugins.departments.conf import settings
 from coldfront.plugins.departments.utils import UserInfoDict
 from coldfront.plugins.departments.utils.data_sources import (
-    fetch_departments_for_user,
+    fetch_departments_for_users,
     get_data_source,
 )
-from coldfront.plugins.departments.utils.queries import create_or_update_department
+from coldfront.plugins.departments.utils.queries import (
+    set_authoritative_user_departments,
+)
 
 
 class Command(BaseCommand):
@@ -23,43 +25,65 @@ class Command(BaseCommand):
             action="store_true",
             help="Only populate the departments of users who are PIs.",
         )
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=settings.USER_BATCH_SIZE,
+            help="The number of users whose departments are fetched together.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.MAX_WORKERS,
+            help="The number of batches of users to fetch concurrently.",
+        )
         add_argparse_dry_run_argument(parser)
 
     def handle(self, *args, **options):
         only_pis = options["only_pis"]
         dry_run = options["dry_run"]
-        users = User.objects.select_related("userprofile")
+        users = User.objects.select_related("userprofile").order_by("pk")
         if only_pis:
             users = users.filter(userprofile__is_pi=True)
-
-        # TODO: Account for dry_run.
+        user_by_pk = {user.pk: user for user in users}
 
         data_source = get_data_source()
 
         # A mapping from Department code to the corresponding object.
         department_by_code = {}
 
-        for user in users:
-            # TODO: This is going to get duplicated. Make a function.
-            user_data = UserInfoDict.from_user(user)
-            user_department_data = fetch_departments_for_user(
-                user_data, data_source=data_source
+        num_associations, num_created, num_updated = 0, 0, 0
+        for department_data_by_user_pk in fetch_departments_for_users(
+            UserInfoDict.for_users(users),
+            data_source=data_source,
+            batch_size=options["batch_size"],
+            max_workers=options["workers"],
+        ):
+            department_data_by_user = {
+                user_by_pk[user_pk]: department_data
+                for user_pk, department_data in department_data_by_user_pk.items()
+            }
+            num_associations += sum(map(len, department_data_by_user.values()))
+            if dry_run:
+                continue
+            created, updated = set_authoritative_user_departments(
+                department_data_by_user, department_by_code
             )
+            num_created += created
+            num_updated += updated
 
-            for code, name in user_department_data:
-                if code not in department_by_code:
-                    department, department_created = create_or_update_department(
-                        code, name
-                    )
-                    department_by_code[code] = department
-                department = department_by_code[code]
-
-                user_department, user_department_created = (
-                    UserDepartment.objects.update_or_create(
-                        user=user,
-                        department=department,
-                        defaults={
-                            "is_authoritative": True,
-                        },
-                    )
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Would set {num_associations} authoritative UserDepartments "
+                    f"for {len(user_by_pk)} users."
                 )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Set {num_associations} authoritative UserDepartments for "
+                    f"{len(user_by_pk)} users: created {num_created}, updated "
+                    f"{num_updated}."
+                )
+            )
@@ -0,0 +1,75 @@
+"""Shared pytest fixtures for departments plugin tests."""
+
+from ldap3 import MOCK_SYNC, Connection, Server
+import pytest
+
+from coldfront.core.utils.ldap_pool import close_ldap_connection_pools
+from coldfront.plugins.departments.utils.data_sources.backends.calnet_ldap import (
+    CalNetLdapDataSourceBackend,
+)
+
+PEOPLE = [
+    # (uid, emails, first name, last name, department numbers)
+    ("1", ["alice@berkeley.edu"], "Alice", "Smith", ["JICCS"]),
+    ("2", ["bob@cs.berkeley.edu"], "Bob", "Jones", ["JICCS", "JJCNS"]),
+    ("3", [], "Carol", "White", ["JJCNS"]),
+    ("4", [], "Dan", "Brown", ["JICCS"]),
+    ("5", [], "Dan", "Brown", ["JJCNS"]),
+    ("6", ["erin@berkeley.edu"], "Erin", "Black", ["NOPE"]),
+]
+
+ORG_UNITS = [
+    # (hierarchy string, description)
+    ("UCBKL-AVCIS-VRIST-JICCS", "Research IT"),
+    ("UCBKL-AVCIS-VRIST-JJCNS", "Networking"),
+]
+
+
+class MockCalNetLdapDataSourceBackend(CalNetLdapDataSourceBackend):
+    """A CalNetLdapDataSourceBackend backed by an in-memory directory,
+    which records the search filter of each search."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.search_filters = []
+
+    @classmethod
+    def _create_connection(cls):
+        connection = Connection(Server("calnet"), client_strategy=MOCK_SYNC)
+        for uid, emails, first_name, last_name, department_numbers in PEOPLE:
+            attributes = {
+                "objectClass": ["person"],
+                "givenName": [first_name],
+                "sn": [last_name],
+            }
+            if emails:
+                attributes["mail"] = emails
+            if department_numbers:
+                attributes["departmentNumber"] = department_numbers
+            connection.strategy.add_entry(f"uid={uid},{cls.PEOPLE_DN}", attributes)
+        for hierarchy_string, description in ORG_UNITS:
+            ou = hierarchy_string.split("-")[-1]
+            connection.strategy.add_entry(
+                f"ou={ou},{cls.ORG_UNITS_OU}",
+                {
+                    "objectClass": ["organizationalUnit"],
+                    "ou": [ou],
+                    "berkeleyEduOrgUnitHierarchyString": [hierarchy_string],
+                    "description": [description],
+                },
+            )
+        connection.bind()
+        return connection
+
+    def _search(self, search_base, search_filter, attributes):
+        self.search_filters.append(search_filter)
+        return super()._search(search_base, search_filter, attributes)
+
+
+@pytest.fixture
+def calnet_ldap():
+    """Return a CalNetLdapDataSourceBackend backed by an in-memory
+    directory of PEOPLE and ORG_UNITS."""
+    close_ldap_connection_pools()
+    yield MockCalNetLdapDataSourceBackend()
+    close_ldap_connection_pools()
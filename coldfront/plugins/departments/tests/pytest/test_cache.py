@@ -0,0 +1,77 @@
+"""Tests for caching the departments fetched for a user."""
+
+from django.core.cache import cache
+import pytest
+
+from coldfront.plugins.departments.conf import settings
+from coldfront.plugins.departments.utils import UserInfoDict
+from coldfront.plugins.departments.utils.data_sources import (
+    fetch_cached_departments_for_user,
+)
+from coldfront.plugins.departments.utils.data_sources.backends.dummy import (
+    DummyDataSourceBackend,
+)
+
+
+class CountingDataSourceBackend(DummyDataSourceBackend):
+    """A DummyDataSourceBackend that counts lookups of users."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_lookups = 0
+
+    def fetch_departments_for_user(self, user_data):
+        self.num_lookups += 1
+        return super().fetch_departments_for_user(user_data)
+
+
+@pytest.fixture
+def data_source(locmem_cache):
+    return CountingDataSourceBackend()
+
+
+@pytest.mark.unit
+class TestFetchCachedDepartmentsForUser:
+    """Tests for fetch_cached_departments_for_user."""
+
+    def test_cached(self, data_source):
+        """Test that a user's departments are fetched once, and that
+        users are cached separately."""
+        user_data = UserInfoDict(emails=["a@x.edu"], first_name="Jo", last_name="Su")
+        for _ in range(3):
+            departments = fetch_cached_departments_for_user(user_data, data_source)
+            assert departments == [("DEPTJ", "Department J"), ("DEPTS", "Department S")]
+        assert data_source.num_lookups == 1
+
+        other_user_data = UserInfoDict(emails=[], first_name="Jo", last_name="Li")
+        fetch_cached_departments_for_user(other_user_data, data_source)
+        assert data_source.num_lookups == 2
+
+    def test_negative_cached(self, data_source, monkeypatch):
+        """Test that an empty result is cached for NEGATIVE_CACHE_TIMEOUT
+        seconds, and not at all if it is 0."""
+        user_data = UserInfoDict(emails=[], first_name="", last_name="")
+        fetch_cached_departments_for_user(user_data, data_source)
+        assert fetch_cached_departments_for_user(user_data, data_source) == []
+        assert data_source.num_lookups == 1
+
+        cache.clear()
+        monkeypatch.setattr(settings, "NEGATIVE_CACHE_TIMEOUT", 0)
+        fetch_cached_departments_for_user(user_data, data_source)
+        fetch_cached_departments_for_user(user_data, data_source)
+        assert data_source.num_lookups == 1 + 2
+
+    def test_failure_not_cached(self, data_source, monkeypatch):
+        """Test that a failed lookup is not cached."""
+        user_data = UserInfoDict(emails=[], first_name="Jo", last_name="Su")
+
+        def fail(_user_data):
+            raise ConnectionError("The data source is unavailable.")
+
+        monkeypatch.setattr(data_source, "fetch_departments_for_user", fail)
+        with pytest.raises(ConnectionError):
+            fetch_cached_departments_for_user(user_data, data_source)
+        monkeypatch.undo()
+
+        assert len(fetch_cached_departments_for_user(user_data, data_source)) == 2
+        assert data_source.num_lookups == 1
@@ -0,0 +1,74 @@
+"""Tests for looking up departments in bulk from CalNet LDAP."""
+
+import pytest
+
+from coldfront.plugins.departments.utils import UserInfoDict
+from coldfront.plugins.departments.utils.data_sources.backends.calnet_ldap import (
+    CalNetLdapDataSourceBackend,
+)
+
+from .conftest import MockCalNetLdapDataSourceBackend
+
+USERS_DATA = {
+    "alice": UserInfoDict(
+        emails=["ALICE@berkeley.edu", "alice@example.com"],
+        first_name="Alice",
+        last_name="Smith",
+    ),
+    "bob": UserInfoDict(emails=["bob@cs.berkeley.edu"], first_name="", last_name=""),
+    "carol": UserInfoDict(emails=[], first_name="carol", last_name="WHITE"),
+    "dan": UserInfoDict(emails=[], first_name="Dan", last_name="Brown"),
+    "erin": UserInfoDict(emails=["erin@berkeley.edu"], first_name="E", last_name="B"),
+    "frank": UserInfoDict(emails=["f*@berkeley.edu"], first_name="F", last_name="*"),
+}
+
+JICCS = ("JICCS", "Research IT")
+JJCNS = ("JJCNS", "Networking")
+
+
+@pytest.mark.unit
+class TestFetchDepartmentsForUsers:
+    """Tests for CalNetLdapDataSourceBackend.fetch_departments_for_users."""
+
+    def test_results(self, calnet_ldap):
+        """Test that people are found by email, or else by a unique
+        name, and that unknown org units are skipped."""
+        results = calnet_ldap.fetch_departments_for_users(USERS_DATA)
+        assert {key: sorted(departments) for key, departments in results.items()} == {
+            "alice": [JICCS],
+            "bob": [JICCS, JJCNS],
+            "carol": [JJCNS],
+            "dan": [],
+            "erin": [],
+            "frank": [],
+        }
+
+    def test_batched(self, calnet_ldap):
+        """Test that emails, names, and org units are each looked up in
+        a single search, and that org units are not looked up again."""
+        calnet_ldap.fetch_departments_for_users(USERS_DATA)
+        assert len(calnet_ldap.search_filters) == 3
+
+        calnet_ldap.fetch_departments_for_users({"alice": USERS_DATA["alice"]})
+        assert len(calnet_ldap.search_filters) == 3 + 1
+
+    def test_batch_size(self, calnet_ldap, monkeypatch):
+        """Test that searches match at most SEARCH_BATCH_SIZE values."""
+        monkeypatch.setattr(CalNetLdapDataSourceBackend, "SEARCH_BATCH_SIZE", 1)
+        calnet_ldap.fetch_departments_for_users(USERS_DATA)
+        # Four emails, the names of the three people not found by email,
+        # and three org units.
+        assert len(calnet_ldap.search_filters) == 4 + 3 + 3
+
+    def test_consistent_with_single_user(self, calnet_ldap):
+        """Test that the results match those of looking up each user
+        individually."""
+        results = calnet_ldap.fetch_departments_for_users(USERS_DATA)
+        single = MockCalNetLdapDataSourceBackend()
+        for key, user_data in USERS_DATA.items():
+            if key == "frank":
+                # Unescaped, the wildcards match other people.
+                continue
+            assert sorted(results[key]) == sorted(
+                single.fetch_departments_for_user(user_data)
+            )
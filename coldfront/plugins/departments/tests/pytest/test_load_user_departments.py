@@ -0,0 +1,97 @@
+"""Tests for the load_user_departments management command."""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+import pytest
+
+from coldfront.plugins.departments.models import Department, UserDepartment
+
+NUM_USERS = 12
+
+
+def user_departments():
+    return set(
+        UserDepartment.objects.values_list(
+            "user__username", "department__code", "is_authoritative"
+        )
+    )
+
+
+@pytest.fixture
+def users(db):
+    """Create NUM_USERS users, whose first and last names start with
+    "A" and "B", "B" and "C", etc., the first of whom is
+    non-authoritatively associated with Department "DEPTA", and the
+    second of whom is non-authoritatively associated with Department
+    "DEPTZ". With the dummy data source, each user has two
+    authoritative departments."""
+    users = []
+    for i in range(NUM_USERS):
+        first, last = chr(ord("A") + i), chr(ord("B") + i)
+        users.append(
+            User.objects.create(
+                username=f"user{i:02d}",
+                email=f"user{i:02d}@x.edu",
+                first_name=f"{first}first",
+                last_name=f"{last}last",
+            )
+        )
+    department_a = Department.objects.create(code="DEPTA", name="Old Name")
+    department_z = Department.objects.create(code="DEPTZ", name="Department Z")
+    UserDepartment.objects.create(user=users[0], department=department_a)
+    UserDepartment.objects.create(user=users[1], department=department_z)
+    return users
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestLoadUserDepartments:
+    """Tests for load_user_departments."""
+
+    @pytest.mark.parametrize("batch_size", [1, 5, 50])
+    def test_loaded(self, users, batch_size):
+        """Test that each user is authoritatively associated with their
+        departments, regardless of batch size, and that other
+        associations are left as they are."""
+        out = StringIO()
+        call_command(
+            "load_user_departments", batch_size=batch_size, workers=3, stdout=out
+        )
+
+        expected = set()
+        for i in range(NUM_USERS):
+            for letter in (chr(ord("A") + i), chr(ord("B") + i)):
+                expected.add((f"user{i:02d}", f"DEPT{letter}", True))
+        expected.add(("user01", "DEPTZ", False))
+        assert user_departments() == expected
+        assert Department.objects.get(code="DEPTA").name == "Department A"
+        assert f"created {2 * NUM_USERS - 1}, updated 1" in out.getvalue(), (
+            out.getvalue()
+        )
+
+        user_department = UserDepartment.objects.get(
+            user__username="user00", department__code="DEPTA"
+        )
+        assert user_department.history.count() == 2
+
+    def test_idempotent(self, users):
+        """Test that loading again makes no changes."""
+        call_command("load_user_departments", stdout=StringIO())
+        before = user_departments()
+        num_history = UserDepartment.history.count()
+
+        out = StringIO()
+        call_command("load_user_departments", stdout=out)
+        assert user_departments() == before
+        assert UserDepartment.history.count() == num_history
+        assert "created 0, updated 0" in out.getvalue()
+
+    def test_dry_run(self, users):
+        """Test that, with dry_run, nothing is changed."""
+        before = user_departments()
+        out = StringIO()
+        call_command("load_user_departments", dry_run=True, stdout=out)
+        assert user_departments() == before
+        assert f"Would set {2 * NUM_USERS}" in out.getvalue()
@@ -343,7 +343,8 @@ class TestUpdateDepartmentsView(TransactionTestBase):
             raise Exception("Test exception.")
 
         method_to_patch = (
-            "coldfront.plugins.departments.utils.queries.fetch_departments_for_user"
+            "coldfront.plugins.departments.utils.queries."
+            "fetch_cached_departments_for_user"
         )
         with patch(method_to_patch) as patched_method:
             patched_method.side_effect = raise_exception
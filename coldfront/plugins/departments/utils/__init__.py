@@ -28,3 +28,22 @@ class UserInfoDict(dict):
             "last_name": user.last_name,
         }
         return cls(**user_data)
+
+    @classmethod
+    def for_users(cls, users):
+        """Return a dict mapping the primary key of each of the given
+        Users (e.g., a QuerySet) to an instance, fetching emails in a
+        single query."""
+        emails_by_user_pk = {}
+        for user_pk, email in EmailAddress.objects.filter(user__in=users).values_list(
+            "user_id", "email"
+        ):
+            emails_by_user_pk.setdefault(user_pk, []).append(email)
+        return {
+            user.pk: cls(
+                emails=emails_by_user_pk.get(user.pk, []),
+                first_name=user.first_name,
+                last_name=user.last_name,
+            )
+            for user in users
+        }
@@ -1,3 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+
+from django.core.cache import cache
 from django.utils.module_loading import import_string
 
 from coldfront.plugins.departments.conf import settings
@@ -6,8 +11,10 @@ from coldfront.plugins.departments.conf import settings
 
 
 __all__ = [
+    "fetch_cached_departments_for_user",
     "fetch_departments",
     "fetch_departments_for_user",
+    "fetch_departments_for_users",
     "get_data_source",
 ]
 
@@ -25,3 +32,71 @@ def fetch_departments(data_source=None):
 def fetch_departments_for_user(user_data, data_source=None):
     data_source = data_source or get_data_source()
     return data_source.fetch_departments_for_user(user_data)
+
+
+def fetch_cached_departments_for_user(user_data, data_source=None):
+    """Return a list of the departments associated with the given user
+    dict, fetched from the data source, or from the shared cache if they
+    were fetched recently.
+
+    Results are cached for CACHE_TIMEOUT seconds, or, if there are none
+    (e.g., the user is unknown to the data source), for
+    NEGATIVE_CACHE_TIMEOUT seconds. Failures are not cached."""
+    data_source = data_source or get_data_source()
+    key = _departments_for_user_cache_key(user_data, data_source)
+    departments = cache.get(key)
+    if departments is not None:
+        return departments
+
+    departments = list(data_source.fetch_departments_for_user(user_data))
+    timeout = settings.CACHE_TIMEOUT if departments else settings.NEGATIVE_CACHE_TIMEOUT
+    if timeout:
+        cache.set(key, departments, timeout)
+    return departments
+
+
+def _departments_for_user_cache_key(user_data, data_source):
+    """Return the shared cache key for the departments of the given user
+    dict from the given data source, which is hashed so that user
+    information is not stored in plain text."""
+    identity = [
+        f"{type(data_source).__module__}.{type(data_source).__qualname__}",
+        sorted(email.lower() for email in user_data["emails"]),
+        user_data["first_name"],
+        user_data["last_name"],
+    ]
+    digest = hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+    return f"departments:user:{digest}"
+
+
+def fetch_departments_for_users(
+    users_data, data_source=None, batch_size=None, max_workers=None
+):
+    """Return a generator of dicts, each mapping the keys of a batch of
+    at most batch_size entries of the given dict, which maps keys to
+    dicts representing users, to a list of the user's departments.
+
+    Batches are fetched concurrently, by up to max_workers threads
+    sharing the data source, and yielded as they complete."""
+    data_source = data_source or get_data_source()
+    batch_size = batch_size or settings.USER_BATCH_SIZE
+    max_workers = max_workers or settings.MAX_WORKERS
+
+    keys = list(users_data)
+    batches = [
+        {key: users_data[key] for key in keys[i : i + batch_size]}
+        for i in range(0, len(keys), batch_size)
+    ]
+    if not batches:
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(batches)),
+        thread_name_prefix="departments",
+    ) as executor:
+        futures = [
+            executor.submit(data_source.fetch_departments_for_users, batch)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            yield future.result()
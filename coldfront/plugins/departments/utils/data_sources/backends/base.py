@@ -38,3 +38,27 @@ class BaseDataSourceBackend(ABC):
               (str), department description (str))
         """
         pass
+
+    def fetch_departments_for_users(self, users_data):
+        """Return a dict mapping each key of the given dict, which maps
+        keys (e.g., User primary keys) to dicts representing users, to a
+        list of departments associated with the user, as tuples of the
+        form (department identifier (str), department description
+        (str)).
+
+        Backends that can look up many users at once should override
+        this, which looks up one user at a time.
+
+        Parameters:
+            - users_data (dict): A dict mapping keys to dicts of the
+              format accepted by fetch_departments_for_user
+
+        Returns:
+            - Dict mapping each key to a list of tuples of the form
+              (department identifier (str), department description
+              (str))
+        """
+        return {
+            key: list(self.fetch_departments_for_user(user_data))
+            for key, user_data in users_data.items()
+        }
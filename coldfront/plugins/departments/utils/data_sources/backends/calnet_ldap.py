@@ -1,4 +1,7 @@
 from ldap3 import Connection
+from ldap3.utils.conv import escape_filter_chars
+
+from coldfront.core.utils.ldap_pool import get_ldap_connection_pool
 
 from .base import BaseDataSourceBackend
 
@@ -19,16 +22,25 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
     PEOPLE_DN = "ou=people,dc=berkeley,dc=edu"
     # The distinguished name (DN) of the "org units" organizational unit.
     ORG_UNITS_OU = "ou=org units,dc=berkeley,dc=edu"
+    # The maximum number of values combined into a single search filter.
+    SEARCH_BATCH_SIZE = 50
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._connection = Connection(
-            self.DIRECTORY_URL, auto_bind=True, auto_range=True
+        # Connections are pooled, so that lookups, including those made by
+        # other instances, skip connecting and binding.
+        self._connection_pool = get_ldap_connection_pool(
+            ("calnet_ldap", self.DIRECTORY_URL), self._create_connection
         )
         # A mapping from the name of an "org units" OU to a tuple of the
         # identifier and description for the OU's department.
         self._cache_department_data_by_ou = {}
 
+    @classmethod
+    def _create_connection(cls):
+        """Return a new Connection, bound anonymously to the directory."""
+        return Connection(cls.DIRECTORY_URL, auto_bind=True, auto_range=True)
+
     def fetch_departments(self):
         """Return a generator of UC Berkeley departments, represented as
         tuples.
@@ -75,7 +87,47 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
             user_data["first_name"], user_data["last_name"]
         )
 
-        for department_number in results:
+        yield from self._departments_for_department_numbers(results)
+
+    def fetch_departments_for_users(self, users_data):
+        """Return a dict mapping each key of the given dict, which maps
+        keys to dicts representing people, to a list of UC Berkeley
+        departments, represented as tuples, associated with the person.
+
+        People are looked up as in fetch_departments_for_user, but with
+        searches that each match up to SEARCH_BATCH_SIZE emails or names
+        at once. The org units of the resulting department numbers that
+        are not already cached are then looked up in batches as well.
+        """
+        department_numbers_by_key = self._lookup_people_department_numbers_from_emails(
+            users_data
+        )
+        unmatched_users_data = {
+            key: user_data
+            for key, user_data in users_data.items()
+            if not department_numbers_by_key.get(key)
+        }
+        department_numbers_by_key.update(
+            self._lookup_people_department_numbers_from_names(unmatched_users_data)
+        )
+
+        self._cache_departments_for_org_units(
+            set().union(*department_numbers_by_key.values())
+        )
+        return {
+            key: list(
+                self._departments_for_department_numbers(
+                    department_numbers_by_key.get(key, ())
+                )
+            )
+            for key in users_data
+        }
+
+    def _departments_for_department_numbers(self, department_numbers):
+        """Return a generator of the departments of the L4 org units with
+        the given department numbers, looking up those not cached in this
+        instance, and skipping those with no matching org unit."""
+        for department_number in department_numbers:
             if department_number not in self._cache_department_data_by_ou:
                 identifier, description = self._lookup_department_info_for_org_unit(
                     department_number
@@ -90,6 +142,61 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
             if identifier is not None and description is not None:
                 yield identifier, description
 
+    def _cache_departments_for_org_units(self, ous):
+        """Look up the departments of the given org units that are not
+        already cached in this instance, in batches, and cache them,
+        caching None for both the identifier and description of those
+        with no matching OU.
+
+        Raises:
+            - ValueError, if one of the OUs is not at least as deep as
+              the department (L4) level.
+        """
+        ous = sorted(ou for ou in ous if ou not in self._cache_department_data_by_ou)
+        for batch in self._batches(ous):
+            found = {}
+            search_filter = (
+                f"(&(objectClass=organizationalUnit){self._any_filter('ou', batch)})"
+            )
+            for identifier, description in self._lookup_org_units(search_filter):
+                # The hierarchy string ends with the org unit itself.
+                ou = identifier.split("-")[-1]
+                if identifier.count("-") < 3:
+                    raise ValueError(
+                        f'Org unit "{ou}" is broader than the department level.'
+                    )
+                found[ou.upper()] = identifier.split("-")[3], description
+            for ou in batch:
+                self._cache_department_data_by_ou[ou] = found.get(
+                    ou.upper(), (None, None)
+                )
+
+    @classmethod
+    def _batches(cls, values):
+        """Return a generator of lists of at most SEARCH_BATCH_SIZE of the
+        given values."""
+        values = list(values)
+        for i in range(0, len(values), cls.SEARCH_BATCH_SIZE):
+            yield values[i : i + cls.SEARCH_BATCH_SIZE]
+
+    @staticmethod
+    def _any_filter(attribute, values):
+        """Return an LDAP search filter matching entries whose given
+        attribute is equal to any of the given values, which are
+        escaped."""
+        return "(|{})".format(
+            "".join(f"({attribute}={escape_filter_chars(value)})" for value in values)
+        )
+
+    def _search(self, search_base, search_filter, attributes):
+        """Search the directory using a pooled connection, and return a
+        list of the resulting entries, which is empty if there are
+        none."""
+        with self._connection_pool.connection() as connection:
+            if not connection.search(search_base, search_filter, attributes=attributes):
+                return []
+            return connection.entries
+
     def _lookup_department_info_for_org_unit(self, ou):
         """Given the identifier for an org unit at the department (L4)
         level or above (higher levels are deeper in the org tree),
@@ -142,13 +249,11 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
         description_attr = "description"
         attributes = [hierarchy_string_attr, description_attr]
 
-        results_found = self._connection.search(
-            search_base, search_filter, attributes=attributes
-        )
-        if not results_found:
+        entries = self._search(search_base, search_filter, attributes)
+        if not entries:
             return []
 
-        for entry in self._connection.entries:
+        for entry in entries:
             hierarchy_string = getattr(entry, hierarchy_string_attr).value
             description = getattr(entry, description_attr).value
             yield hierarchy_string, description
@@ -179,19 +284,17 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
         department_number_attr = "departmentNumber"
         attributes = [department_number_attr]
 
-        results_found = self._connection.search(
-            search_base, search_filter, attributes=attributes
-        )
-        if not results_found:
+        entries = self._search(search_base, search_filter, attributes)
+        if not entries:
             return set()
 
         if assert_one_person:
             message = "More than one matching person found."
-            assert len(self._connection.entries) == 1, message
+            assert len(entries) == 1, message
             # The for loop below will run once.
 
         results = set()
-        for entry in self._connection.entries:
+        for entry in entries:
             department_numbers = getattr(entry, department_number_attr).values
             for department_number in department_numbers:
                 results.add(department_number)
@@ -250,3 +353,101 @@ class CalNetLdapDataSourceBackend(BaseDataSourceBackend):
             for department_number in department_numbers:
                 results.add(department_number)
         return results
+
+    def _lookup_people_department_numbers_from_emails(self, users_data):
+        """Given a dict mapping keys to dicts representing people, return
+        a dict mapping each key to a set of department numbers associated
+        with all entries in the "people" OU matching the person's emails,
+        as in _lookup_person_department_numbers_from_emails, searching
+        for up to SEARCH_BATCH_SIZE emails at once.
+
+        Parameters:
+            - users_data (dict): A dict mapping keys to dicts of the
+              format accepted by fetch_departments_for_user
+
+        Returns:
+            - Dict mapping each key with matching entries to a set of
+              strs representing department numbers
+        """
+        berkeley_email_suffix = "berkeley.edu"
+        keys_by_email = {}
+        for key, user_data in users_data.items():
+            for email in user_data["emails"]:
+                if not email.endswith(berkeley_email_suffix):
+                    continue
+                keys_by_email.setdefault(email.lower(), set()).add(key)
+
+        mail_attr = "mail"
+        department_number_attr = "departmentNumber"
+        attributes = [mail_attr, department_number_attr]
+
+        results = {}
+        for batch in self._batches(sorted(keys_by_email)):
+            search_filter = (
+                f"(&(objectClass=person){self._any_filter(mail_attr, batch)})"
+            )
+            for entry in self._search(self.PEOPLE_DN, search_filter, attributes):
+                department_numbers = getattr(entry, department_number_attr).values
+                for email in getattr(entry, mail_attr).values:
+                    for key in keys_by_email.get(email.lower(), ()):
+                        results.setdefault(key, set()).update(department_numbers)
+        return results
+
+    def _lookup_people_department_numbers_from_names(self, users_data):
+        """Given a dict mapping keys to dicts representing people, return
+        a dict mapping each key to a set of department numbers associated
+        with the single entry in the "people" OU matching the person's
+        first and last name, as in
+        _lookup_person_department_numbers_from_name, searching for up to
+        SEARCH_BATCH_SIZE names at once. People without both a first and
+        last name, or whose name matches multiple entries, are omitted.
+
+        Parameters:
+            - users_data (dict): A dict mapping keys to dicts of the
+              format accepted by fetch_departments_for_user
+
+        Returns:
+            - Dict mapping each key with a single matching entry to a
+              set of strs representing department numbers
+        """
+        keys_by_name = {}
+        for key, user_data in users_data.items():
+            first_name, last_name = user_data["first_name"], user_data["last_name"]
+            if not first_name or not last_name:
+                continue
+            name = (first_name.lower(), last_name.lower())
+            keys_by_name.setdefault(name, set()).add(key)
+
+        first_name_attr = "givenName"
+        last_name_attr = "sn"
+        department_number_attr = "departmentNumber"
+        attributes = [first_name_attr, last_name_attr, department_number_attr]
+
+        # A mapping from name to a list of the department numbers of each
+        # matching entry.
+        entries_by_name = {}
+        for batch in self._batches(sorted(keys_by_name)):
+            search_filter = "(|{})".format(
+                "".join(
+                    f"(&({first_name_attr}={escape_filter_chars(first_name)})"
+                    f"({last_name_attr}={escape_filter_chars(last_name)}))"
+                    for first_name, last_name in batch
+                )
+            )
+            for entry in self._search(self.PEOPLE_DN, search_filter, attributes):
+                department_numbers = set(getattr(entry, department_number_attr).values)
+                names = {
+                    (first_name.lower(), last_name.lower())
+                    for first_name in getattr(entry, first_name_attr).values
+                    for last_name in getattr(entry, last_name_attr).values
+                }
+                for name in names & keys_by_name.keys():
+                    entries_by_name.setdefault(name, []).append(department_numbers)
+
+        results = {}
+        for name, entries in entries_by_name.items():
+            if len(entries) != 1:
+                continue
+            for key in keys_by_name[name]:
+                results[key] = set(entries[0])
+        return results
@@ -1,10 +1,13 @@
 import logging
 
 from django.db import transaction
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from coldfront.plugins.departments.models import Department, UserDepartment
 from coldfront.plugins.departments.utils import UserInfoDict
-from coldfront.plugins.departments.utils.data_sources import fetch_departments_for_user
+from coldfront.plugins.departments.utils.data_sources import (
+    fetch_cached_departments_for_user,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +22,66 @@ def create_or_update_department(code, name):
     return department, created
 
 
+def set_authoritative_user_departments(department_data_by_user, department_by_code):
+    """Given a dict mapping Users to lists of department data, as tuples
+    of the form (code, name), fetched from the data source, authoritatively
+    associate each User with those Departments, in bulk.
+
+    Departments are created or updated as needed, unless already present
+    in the given dict mapping codes to Departments, to which they are
+    added. Existing non-authoritative associations are made
+    authoritative. Other associations are left as they are.
+
+    Return the numbers of UserDepartments created and updated."""
+    names_by_code = {
+        code: name
+        for department_data in department_data_by_user.values()
+        for code, name in department_data
+    }
+    new_codes = names_by_code.keys() - department_by_code.keys()
+    with transaction.atomic():
+        if new_codes:
+            Department.objects.bulk_create(
+                [Department(code=code, name=names_by_code[code]) for code in new_codes],
+                update_conflicts=True,
+                unique_fields=["code"],
+                update_fields=["name"],
+            )
+            department_by_code.update(
+                (department.code, department)
+                for department in Department.objects.filter(code__in=new_codes)
+            )
+
+        pairs = {
+            (user, department_by_code[code])
+            for user, department_data in department_data_by_user.items()
+            for code, _ in department_data
+        }
+        existing = {
+            (user_department.user_id, user_department.department_id): user_department
+            for user_department in UserDepartment.objects.filter(
+                user__in=department_data_by_user,
+                department__in={department for _, department in pairs},
+            )
+        }
+        to_create, to_update = [], []
+        for user, department in pairs:
+            user_department = existing.get((user.pk, department.pk))
+            if user_department is None:
+                to_create.append(
+                    UserDepartment(
+                        user=user, department=department, is_authoritative=True
+                    )
+                )
+            elif not user_department.is_authoritative:
+                user_department.is_authoritative = True
+                to_update.append(user_department)
+        bulk_create_with_history(to_create, UserDepartment)
+        bulk_update_with_history(to_update, UserDepartment, ["is_authoritative"])
+
+    return len(to_create), len(to_update)
+
+
 def get_departments_for_user(user, strs_only=False):
     """Return two lists: Departments the given User is (a)
     authoritatively and (b) non-authoritatively associated with. Each
@@ -83,10 +146,11 @@ class UserDepartmentUpdater:
                 self._update_non_authoritative_user_departments()
 
     def _fetch_authoritative_user_departments(self):
-        """Fetch department data for the User from the data source."""
+        """Fetch department data for the User from the data source, or
+        from the cache if it was fetched recently."""
         try:
             user_data = UserInfoDict.from_user(self._user)
-            return fetch_departments_for_user(user_data)
+            return fetch_cached_departments_for_user(user_data)
         except Exception as e:
             logger.error(
                 f"Failed to fetch department data for User {self._user.pk}. Details:"
@@ -0,0 +1,257 @@
+"""Audit, in bulk, the membership of users in the FreeIPA unix groups of
+allocations.
+
+Instead of querying SSSD for the groups of each user, the members of
+every managed group and the status of every user are fetched from
+FreeIPA with "batch" calls, each of which runs up to FREEIPA_BATCH_SIZE
+"group_show" or "user_show" commands. The expected memberships of all
+users are computed with a fixed number of database queries, and the
+differences are applied with one "group_add_member" or
+"group_remove_member" call per group and chunk of users.
+
+This module takes the FreeIPA API commands (ipalib's api.Command) as an
+argument, and does not import ipalib itself, so that it may be used
+with a stand-in for FreeIPA.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+import logging
+
+from coldfront.core.allocation.models import AllocationAttribute, AllocationUser
+from coldfront.core.utils.common import import_from_settings
+
+FREEIPA_BATCH_SIZE = import_from_settings("FREEIPA_BATCH_SIZE", 100)
+
+# Removed users of allocations with these statuses keep their groups.
+SKIPPED_ALLOCATION_STATUSES = ("New", "Renewal Requested")
+
+# The messages with which FreeIPA reports no-op membership changes.
+ALREADY_MEMBER_MESSAGE = "This entry is already a member"
+NOT_MEMBER_MESSAGE = "This entry is not a member"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MembershipChange:
+    """The addition (add=True) or removal of a user to or from a group,
+    along with the status of the user in FreeIPA."""
+
+    username: str
+    group: str
+    add: bool
+    freeipa_status: str
+
+
+class GroupMembershipAudit:
+    """Compare the membership of active users in the unix groups of
+    allocations, stored in the allocation attribute with the given name,
+    with that in FreeIPA, using the given FreeIPA API commands."""
+
+    def __init__(self, ipa, group_attribute_name, batch_size=None):
+        self.ipa = ipa
+        self.group_attribute_name = group_attribute_name
+        self.batch_size = batch_size or FREEIPA_BATCH_SIZE
+
+    def expected_memberships(self, usernames=None, groups=None, active_only=True):
+        """Return a dict mapping the username of each active user (or
+        each user, if `active_only` is False) with an allocation with
+        groups, or only those with the given usernames, to a pair of
+        sets: the groups the user should be a member of, and the groups
+        the user should not be a member of. Optionally consider only
+        the given groups."""
+        attributes = AllocationAttribute.objects.filter(
+            allocation_attribute_type__name=self.group_attribute_name
+        )
+        groups_by_allocation = defaultdict(set)
+        for allocation_id, value in attributes.values_list("allocation_id", "value"):
+            if groups is None or value in groups:
+                groups_by_allocation[allocation_id].add(value)
+
+        allocation_users = AllocationUser.objects.filter(
+            allocation_id__in=attributes.values("allocation_id")
+        )
+        if active_only:
+            allocation_users = allocation_users.filter(user__is_active=True)
+        if usernames is not None:
+            allocation_users = allocation_users.filter(user__username__in=usernames)
+
+        memberships = {}
+        for (
+            user,
+            status,
+            allocation_status,
+            allocation_id,
+        ) in allocation_users.values_list(
+            "user__username",
+            "status__name",
+            "allocation__status__name",
+            "allocation_id",
+        ):
+            active, removed = memberships.setdefault(user, (set(), set()))
+            groups = groups_by_allocation.get(allocation_id, ())
+            if status == "Active" and allocation_status == "Active":
+                active.update(groups)
+            elif allocation_status not in SKIPPED_ALLOCATION_STATUSES:
+                removed.update(groups)
+
+        for active, removed in memberships.values():
+            removed -= active
+        return memberships
+
+    def fetch_group_members(self, groups):
+        """Return a dict mapping each of the given groups that exists in
+        FreeIPA to a pair of sets: its direct members, and all of its
+        members, including indirect ones."""
+        members = {}
+        results = self._batch("group_show", sorted(groups))
+        for group, result in results.items():
+            direct = set(result.get("member_user", ()))
+            indirect = set(result.get("memberindirect_user", ()))
+            members[group] = (direct, direct | indirect)
+        return members
+
+    def fetch_user_statuses(self, usernames):
+        """Return a dict mapping each of the given usernames that exists
+        in FreeIPA to "Enabled" or "Disabled"."""
+        statuses = {}
+        for username, result in self._batch("user_show", sorted(usernames)).items():
+            locked = result.get("nsaccountlock", False)
+            if isinstance(locked, (list, tuple)):
+                locked = locked[0] if locked else False
+            if isinstance(locked, str):
+                locked = locked.upper() == "TRUE"
+            statuses[username] = "Disabled" if locked else "Enabled"
+        return statuses
+
+    def run(self, usernames=None, groups=None, active_only=True):
+        """Return a list of the MembershipChanges needed to make FreeIPA
+        match ColdFront, sorted by user, and a list of the usernames of
+        users that are disabled in FreeIPA. The arguments are passed to
+        expected_memberships."""
+        memberships = self.expected_memberships(
+            usernames=usernames, groups=groups, active_only=active_only
+        )
+        groups = set()
+        for active, removed in memberships.values():
+            groups |= active | removed
+        members = self.fetch_group_members(groups)
+        statuses = self.fetch_user_statuses(memberships)
+
+        changes, disabled = [], []
+        for user in sorted(memberships):
+            active, removed = memberships[user]
+            status = statuses.get(user)
+            if status is None:
+                logger.warn("User %s not found in FreeIPA", user)
+                continue
+            if status == "Disabled":
+                logger.warn(
+                    "User is active in coldfront but disabled in FreeIPA: %s", user
+                )
+                disabled.append(user)
+
+            for g in sorted(active):
+                if g not in members:
+                    logger.error("Group %s not found in FreeIPA", g)
+                elif user not in members[g][1]:
+                    logger.warn("User %s should be added to freeipa group: %s", user, g)
+                    changes.append(MembershipChange(user, g, True, status))
+
+            for g in sorted(removed):
+                if g in members and user in members[g][0]:
+                    logger.warn(
+                        "User %s should be removed from freeipa group: %s", user, g
+                    )
+                    changes.append(MembershipChange(user, g, False, status))
+
+        return changes, disabled
+
+    def apply(self, changes):
+        """Apply the given MembershipChanges, with one call per group
+        and chunk of users. Return the list of changes that failed."""
+        usernames_by_group = defaultdict(list)
+        changes_by_key = {}
+        for change in changes:
+            usernames_by_group[change.group, change.add].append(change.username)
+            changes_by_key[change.group, change.add, change.username] = change
+
+        failed = []
+        for (group, add), usernames in sorted(usernames_by_group.items()):
+            if add:
+                command = self.ipa.group_add_member
+                action, preposition = "adding", "to"
+            else:
+                command = self.ipa.group_remove_member
+                action, preposition = "removing", "from"
+            for chunk in self._chunks(sorted(usernames)):
+                try:
+                    errors = dict(self._member_failures(command(group, user=chunk)))
+                except Exception as e:
+                    logger.error(
+                        "Failed %s users %s %s group %s: %s",
+                        action,
+                        ",".join(chunk),
+                        preposition,
+                        group,
+                        e,
+                    )
+                    failed.extend(changes_by_key[group, add, u] for u in chunk)
+                    continue
+
+                for username in chunk:
+                    error = errors.get(username)
+                    if error is None:
+                        logger.info(
+                            "Finished %s user %s %s group %s successfully",
+                            action,
+                            username,
+                            preposition,
+                            group,
+                        )
+                    elif error in (ALREADY_MEMBER_MESSAGE, NOT_MEMBER_MESSAGE):
+                        logger.warn("User %s in group %s: %s", username, group, error)
+                    else:
+                        logger.error(
+                            "Failed %s user %s %s group %s: %s",
+                            action,
+                            username,
+                            preposition,
+                            group,
+                            error,
+                        )
+                        failed.append(changes_by_key[group, add, username])
+        return failed
+
+    def _batch(self, method, keys):
+        """Run the given "show" command for each of the given keys, in
+        batches, and return a dict mapping each key that was found to
+        its result. Log other errors."""
+        results = {}
+        for chunk in self._chunks(keys):
+            res = self.ipa.batch(
+                *[{"method": method, "params": [[key], {}]} for key in chunk]
+            )
+            for key, item in zip(chunk, res["results"], strict=True):
+                if item.get("error"):
+                    if item.get("error_name") != "NotFound":
+                        logger.error(
+                            "FreeIPA %s %s failed: %s", method, key, item["error"]
+                        )
+                    continue
+                results[key] = item["result"]
+        return results
+
+    def _chunks(self, items):
+        items = list(items)
+        for i in range(0, len(items), self.batch_size):
+            yield items[i : i + self.batch_size]
+
+    @staticmethod
+    def _member_failures(res):
+        """Return (username, message) pairs for each user that FreeIPA
+        failed to add to or remove from a group."""
+        if not res:
+            raise ValueError("Missing FreeIPA response")
+        return res.get("failed", {}).get("member", {}).get("user", ())
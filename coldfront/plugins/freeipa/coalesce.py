@@ -0,0 +1,190 @@
+"""Coalesce changes to the membership of users in FreeIPA groups.
+
+Instead of running a task that makes individual FreeIPA calls for each
+activated or removed AllocationUser, signal receivers call
+schedule_flush, which schedules a single flush to run
+FREEIPA_COALESCE_SECONDS seconds later, unless one is already pending.
+
+The flush finds the AllocationUsers that changed since the first change
+it covers, using their history, and compares the groups of their users
+in ColdFront and FreeIPA with a GroupMembershipAudit. Since only the
+final state is compared, a user activated and then removed within the
+window is left alone. As with the per-user tasks, only active users of
+active allocations are added, and only removed users of active, pending,
+or renewed allocations are removed. The differences are applied with one call per
+group and chunk of users. If any fail, the flush is retried after
+FREEIPA_FLUSH_RETRY_SECONDS seconds, doubling each time, up to
+FREEIPA_FLUSH_MAX_RETRIES times, after which the AllocationUsers whose
+groups could not be updated are set to "Error".
+"""
+
+from datetime import timedelta
+import logging
+
+from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.core.allocation.models import AllocationAttribute, AllocationUser
+from coldfront.core.allocation.utils import set_allocation_user_status_to_error
+from coldfront.core.utils.common import import_from_settings
+from coldfront.plugins.freeipa.audit import GroupMembershipAudit
+
+FREEIPA_COALESCE_SECONDS = import_from_settings("FREEIPA_COALESCE_SECONDS", 30)
+FREEIPA_FLUSH_MAX_RETRIES = import_from_settings("FREEIPA_FLUSH_MAX_RETRIES", 3)
+FREEIPA_FLUSH_RETRY_SECONDS = import_from_settings("FREEIPA_FLUSH_RETRY_SECONDS", 60)
+
+FLUSH_SCHEDULE_NAME = "freeipa_flush_group_changes"
+FLUSH_TASK = "coldfront.plugins.freeipa.tasks.flush_group_changes"
+# Removed users of allocations with these statuses are removed from
+# groups, as by tasks.remove_user_group.
+REMOVABLE_ALLOCATION_STATUSES = ("Active", "Pending", "Inactive (Renewed)")
+# Changes are looked up starting this many seconds before the first one,
+# to allow for clock differences between hosts.
+FLUSH_OVERLAP_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_flush():
+    """Schedule a flush of the changes made up to now to run in
+    FREEIPA_COALESCE_SECONDS seconds, unless one is already pending,
+    in which case it covers them."""
+    if Schedule.objects.filter(name=FLUSH_SCHEDULE_NAME).exists():
+        return
+    now = timezone.now()
+    since = now - timedelta(seconds=FLUSH_OVERLAP_SECONDS)
+    try:
+        schedule(
+            FLUSH_TASK,
+            since=since.isoformat(),
+            name=FLUSH_SCHEDULE_NAME,
+            schedule_type=Schedule.ONCE,
+            next_run=now + timedelta(seconds=FREEIPA_COALESCE_SECONDS),
+        )
+    except IntegrityError:
+        # Another process scheduled a flush concurrently.
+        pass
+
+
+def flush_group_changes(ipa, group_attribute_name, since, attempt=0, noop=False):
+    """Make the FreeIPA groups of the users of AllocationUsers changed
+    since the given time (an ISO 8601 string) match ColdFront, using the
+    given FreeIPA API commands. Retry failures later, or, after the last
+    attempt, set the AllocationUsers concerned to "Error". Return the
+    list of MembershipChanges made.
+
+    As with the per-user tasks, only active users of active allocations
+    are added to groups, and only removed users of allocations with one
+    of REMOVABLE_ALLOCATION_STATUSES are removed from them. Other
+    changes, such as an AllocationUser set to "Error", are left alone."""
+    changed_pks = set(
+        AllocationUser.history.filter(
+            history_date__gte=parse_datetime(since)
+        ).values_list("id", flat=True)
+    )
+    if not changed_pks:
+        return []
+
+    # (pk, username, allocation_id, add) for each AllocationUser to add
+    # to or remove from the groups of its allocation.
+    candidates = []
+    for (
+        pk,
+        username,
+        allocation_id,
+        status,
+        allocation_status,
+    ) in AllocationUser.objects.filter(pk__in=changed_pks).values_list(
+        "pk",
+        "user__username",
+        "allocation_id",
+        "status__name",
+        "allocation__status__name",
+    ):
+        if status == "Active" and allocation_status == "Active":
+            candidates.append((pk, username, allocation_id, True))
+        elif status == "Removed" and allocation_status in REMOVABLE_ALLOCATION_STATUSES:
+            candidates.append((pk, username, allocation_id, False))
+    if not candidates:
+        return []
+
+    groups_by_allocation = {}
+    for allocation_id, group in AllocationAttribute.objects.filter(
+        allocation_id__in={allocation_id for _, _, allocation_id, _ in candidates},
+        allocation_attribute_type__name=group_attribute_name,
+    ).values_list("allocation_id", "value"):
+        groups_by_allocation.setdefault(allocation_id, set()).add(group)
+    groups = set().union(*groups_by_allocation.values())
+    if not groups:
+        return []
+
+    allowed = {
+        (username, group, add)
+        for _, username, allocation_id, add in candidates
+        for group in groups_by_allocation.get(allocation_id, ())
+    }
+
+    audit = GroupMembershipAudit(ipa, group_attribute_name)
+    try:
+        changes, _ = audit.run(
+            usernames={username for _, username, _, _ in candidates},
+            groups=groups,
+            active_only=False,
+        )
+        changes = [
+            change
+            for change in changes
+            if (change.username, change.group, change.add) in allowed
+        ]
+        if noop:
+            for change in changes:
+                logger.warn(
+                    "NOOP - FreeIPA %s user %s %s group %s",
+                    "adding" if change.add else "removing",
+                    change.username,
+                    "to" if change.add else "from",
+                    change.group,
+                )
+            return changes
+        failed = audit.apply(changes)
+    except Exception as e:
+        logger.error("Failed updating FreeIPA groups: %s", e)
+        changes = []
+        failed = None
+
+    if failed == []:
+        return changes
+
+    if attempt < FREEIPA_FLUSH_MAX_RETRIES:
+        delay = FREEIPA_FLUSH_RETRY_SECONDS * 2**attempt
+        logger.warn(
+            "Retrying FreeIPA group changes since %s in %s seconds", since, delay
+        )
+        schedule(
+            FLUSH_TASK,
+            since=since,
+            attempt=attempt + 1,
+            schedule_type=Schedule.ONCE,
+            next_run=timezone.now() + timedelta(seconds=delay),
+        )
+        return changes
+
+    # Give up, flagging the AllocationUsers whose groups were not updated.
+    if failed is not None:
+        failed_keys = {(change.username, change.group, change.add) for change in failed}
+    error_pks = set()
+    for allocation_user_pk, username, allocation_id, add in candidates:
+        for group in groups_by_allocation.get(allocation_id, ()):
+            if failed is None or (username, group, add) in failed_keys:
+                logger.error(
+                    "Giving up updating FreeIPA group %s of user %s", group, username
+                )
+                error_pks.add(allocation_user_pk)
+    for allocation_user_pk in AllocationUser.objects.filter(
+        pk__in=error_pks
+    ).values_list("pk", flat=True):
+        set_allocation_user_status_to_error(allocation_user_pk)
+    return changes
@@ -8,6 +8,7 @@ from django.core.management.base import BaseCommand
 from ipalib import api
 
 from coldfront.core.allocation.models import AllocationUser
+from coldfront.plugins.freeipa.audit import GroupMembershipAudit
 from coldfront.plugins.freeipa.utils import (
     CLIENT_KTNAME,
     FREEIPA_NOOP,
@@ -38,6 +39,15 @@ class Command(BaseCommand):
         parser.add_argument(
             "-x", "--header", help="Include header in output", action="store_true"
         )
+        parser.add_argument(
+            "-b",
+            "--bulk",
+            help=(
+                "Fetch group membership from FreeIPA in bulk, instead of from "
+                "SSSD for each user, and apply changes in batches"
+            ),
+            action="store_true",
+        )
 
     def write(self, data):
         try:
@@ -219,6 +229,29 @@ class Command(BaseCommand):
 
         self.check_user_freeipa(user, active_groups, removed_groups)
 
+    def process_bulk(self):
+        audit = GroupMembershipAudit(api.Command, UNIX_GROUP_ATTRIBUTE_NAME)
+        changes, disabled = audit.run(
+            usernames=[self.filter_user] if self.filter_user else None,
+            groups=[self.filter_group] if self.filter_group else None,
+        )
+
+        for user in User.objects.filter(username__in=disabled):
+            self.sync_user_status(user, active=False)
+        if self.sync and not self.noop:
+            audit.apply(changes)
+
+        inactive = set(disabled) if self.sync and not self.noop else set()
+        for change in changes:
+            row = [
+                change.username,
+                change.group if change.add else "",
+                "" if change.add else change.group,
+                change.freeipa_status,
+                "Inactive" if change.username in inactive else "Active",
+            ]
+            self.write("\t".join(row))
+
     def handle(self, *args, **options):
         os.environ["KRB5_CLIENT_KTNAME"] = CLIENT_KTNAME
 
@@ -254,6 +287,19 @@ class Command(BaseCommand):
         if options["header"]:
             self.write("\t".join(header))
 
+        self.filter_user = ""
+        self.filter_group = ""
+        if options["username"]:
+            logger.info("Filtering output by username: %s", options["username"])
+            self.filter_user = options["username"]
+        if options["group"]:
+            logger.info("Filtering output by group: %s", options["group"])
+            self.filter_group = options["group"]
+
+        if options["bulk"]:
+            self.process_bulk()
+            return
+
         bus = dbus.SystemBus()
         infopipe_obj = bus.get_object(
             "org.freedesktop.sssd.infopipe", "/org/freedesktop/sssd/infopipe"
@@ -265,14 +311,5 @@ class Command(BaseCommand):
         users = User.objects.filter(is_active=True)
         logger.info("Processing %s active users", len(users))
 
-        self.filter_user = ""
-        self.filter_group = ""
-        if options["username"]:
-            logger.info("Filtering output by username: %s", options["username"])
-            self.filter_user = options["username"]
-        if options["group"]:
-            logger.info("Filtering output by group: %s", options["group"])
-            self.filter_group = options["group"]
-
         for user in users:
             self.process_user(user)
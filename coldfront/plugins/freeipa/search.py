@@ -8,6 +8,7 @@ from ldap3 import KERBEROS, SASL, Connection, Server
 
 from coldfront.core.user.utils import UserSearch
 from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.ldap_pool import get_ldap_connection_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,31 +24,35 @@ class LDAPUserSearch(UserSearch):
         )
         self.FREEIPA_KTNAME = import_from_settings("FREEIPA_KTNAME", "")
 
-        self.server = Server(
+        self.pool = get_ldap_connection_pool(
+            ("freeipa", self.FREEIPA_SERVER, self.FREEIPA_KTNAME),
+            self._create_connection,
+        )
+
+    def _create_connection(self):
+        """Return a new Connection, bound to the server."""
+        server = Server(
             f"ldap://{self.FREEIPA_SERVER}", use_ssl=True, connect_timeout=1
         )
         if len(self.FREEIPA_KTNAME) > 0:
             logger.info("Kerberos bind enabled: %s", self.FREEIPA_KTNAME)
             # kerberos SASL/GSSAPI bind
             os.environ["KRB5_CLIENT_KTNAME"] = self.FREEIPA_KTNAME
-            self.conn = Connection(
-                self.server,
+            conn = Connection(
+                server,
                 authentication=SASL,
                 sasl_mechanism=KERBEROS,
                 auto_bind=True,
             )
         else:
             # anonomous bind
-            self.conn = Connection(self.server, auto_bind=True)
+            conn = Connection(server, auto_bind=True)
 
-        if not self.conn.bind():
-            raise ImproperlyConfigured(
-                f"Failed to bind to LDAP server: {self.conn.result}"
-            )
+        if not conn.bind():
+            raise ImproperlyConfigured(f"Failed to bind to LDAP server: {conn.result}")
         else:
-            logger.info(
-                "LDAP bind successful: %s", self.conn.extend.standard.who_am_i()
-            )
+            logger.info("LDAP bind successful: %s", conn.extend.standard.who_am_i())
+        return conn
 
     def parse_ldap_entry(self, entry):
         entry_dict = json.loads(entry.entry_to_json()).get("attributes")
@@ -88,9 +93,11 @@ class LDAPUserSearch(UserSearch):
             "attributes": ["uid", "sn", "givenName", "mail"],
             "size_limit": size_limit,
         }
-        self.conn.search(**searchParameters)
+        with self.pool.connection() as conn:
+            conn.search(**searchParameters)
+            entries = conn.entries
         users = []
-        for idx, entry in enumerate(self.conn.entries, 1):
+        for idx, entry in enumerate(entries, 1):
             user_dict = self.parse_ldap_entry(entry)
             users.append(user_dict)
 
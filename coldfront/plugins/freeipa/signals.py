@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.dispatch import receiver
 from django_q.tasks import async_task
 
@@ -12,12 +13,16 @@ from coldfront.core.allocation.views import (
     AllocationRenewView,
 )
 from coldfront.core.project.views import ProjectAddUsersView, ProjectRemoveUsersView
+from coldfront.plugins.freeipa.coalesce import FREEIPA_COALESCE_SECONDS, schedule_flush
 
 
 @receiver(allocation_activate_user, sender=ProjectAddUsersView)
 @receiver(allocation_activate_user, sender=AllocationActivateRequestView)
 @receiver(allocation_activate_user, sender=AllocationAddUsersView)
 def activate_user(sender, **kwargs):
+    if FREEIPA_COALESCE_SECONDS:
+        transaction.on_commit(schedule_flush)
+        return
     allocation_user_pk = kwargs.get("allocation_user_pk")
     async_task("coldfront.plugins.freeipa.tasks.add_user_group", allocation_user_pk)
 
@@ -26,5 +31,8 @@ def activate_user(sender, **kwargs):
 @receiver(allocation_remove_user, sender=AllocationRemoveUsersView)
 @receiver(allocation_remove_user, sender=AllocationRenewView)
 def remove_user(sender, **kwargs):
+    if FREEIPA_COALESCE_SECONDS:
+        transaction.on_commit(schedule_flush)
+        return
     allocation_user_pk = kwargs.get("allocation_user_pk")
     async_task("coldfront.plugins.freeipa.tasks.remove_user_group", allocation_user_pk)
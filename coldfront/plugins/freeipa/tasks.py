@@ -5,6 +5,7 @@ from ipalib import api
 
 from coldfront.core.allocation.models import Allocation, AllocationUser
 from coldfront.core.allocation.utils import set_allocation_user_status_to_error
+from coldfront.plugins.freeipa import coalesce
 from coldfront.plugins.freeipa.utils import (
     CLIENT_KTNAME,
     FREEIPA_NOOP,
@@ -150,3 +151,16 @@ def remove_user_group(allocation_user_pk):
                 allocation_user.user.username,
                 g,
             )
+
+
+def flush_group_changes(since, attempt=0):
+    """Apply the group changes of AllocationUsers changed since the
+    given time, coalesced by coldfront.plugins.freeipa.coalesce."""
+    os.environ["KRB5_CLIENT_KTNAME"] = CLIENT_KTNAME
+    coalesce.flush_group_changes(
+        api.Command,
+        UNIX_GROUP_ATTRIBUTE_NAME,
+        since,
+        attempt=attempt,
+        noop=FREEIPA_NOOP,
+    )
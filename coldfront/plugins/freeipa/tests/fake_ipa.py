@@ -0,0 +1,120 @@
+"""A stand-in for the FreeIPA API commands (ipalib's api.Command), for
+testing code that manages group membership."""
+
+
+class FakeIPANotFound(Exception):
+    """Raised, like ipalib.errors.NotFound, for a missing entry."""
+
+    name = "NotFound"
+    code = 4001
+
+
+class FakeIPACommands:
+    """FreeIPA users and groups held in memory, exposing the subset of
+    api.Command used by ColdFront: batch, group_show, user_show,
+    group_add_member, and group_remove_member.
+
+    `groups` maps each group to a dict with the sets "member_user" and
+    "memberindirect_user". `users` maps each username to whether the
+    account is locked (disabled). Each call is recorded in `calls`, as a
+    (command name, args, kwargs) tuple; the commands run by a batch are
+    not recorded separately. While `unavailable` is True, every call
+    raises a ConnectionError. Changes to the membership of the users in
+    `member_errors` fail with the message it maps them to.
+    """
+
+    def __init__(self, groups=None, users=None):
+        self.groups = {}
+        for group, members in (groups or {}).items():
+            self.add_group(group, members)
+        self.users = dict(users or {})
+        self.calls = []
+        self.unavailable = False
+        self.member_errors = {}
+
+    def add_group(self, group, members=(), indirect_members=()):
+        self.groups[group] = {
+            "member_user": set(members),
+            "memberindirect_user": set(indirect_members),
+        }
+
+    def _record(self, call):
+        self.calls.append(call)
+        if self.unavailable:
+            raise ConnectionError("FreeIPA is unavailable")
+
+    def calls_to(self, name):
+        return [call for call in self.calls if call[0] == name]
+
+    def batch(self, *methods):
+        self._record(("batch", methods, {}))
+        results = []
+        for method in methods:
+            args, kwargs = method["params"]
+            try:
+                result = getattr(self, f"_{method['method']}")(*args, **kwargs)
+            except FakeIPANotFound as e:
+                results.append(
+                    {"error": str(e), "error_name": e.name, "error_code": e.code}
+                )
+            else:
+                results.append(dict(result, error=None))
+        return {"count": len(results), "results": results}
+
+    def group_show(self, cn, **kwargs):
+        self._record(("group_show", (cn,), kwargs))
+        return self._group_show(cn, **kwargs)
+
+    def user_show(self, uid, **kwargs):
+        self._record(("user_show", (uid,), kwargs))
+        return self._user_show(uid, **kwargs)
+
+    def group_add_member(self, cn, user=()):
+        self._record(("group_add_member", (cn,), {"user": list(user)}))
+        return self._change_members(cn, user, add=True)
+
+    def group_remove_member(self, cn, user=()):
+        self._record(("group_remove_member", (cn,), {"user": list(user)}))
+        return self._change_members(cn, user, add=False)
+
+    def _group_show(self, cn, **kwargs):
+        if cn not in self.groups:
+            raise FakeIPANotFound(f"{cn}: group not found")
+        group = self.groups[cn]
+        result = {"cn": [cn]}
+        for key in ("member_user", "memberindirect_user"):
+            if group[key]:
+                result[key] = sorted(group[key])
+        return {"result": result, "value": cn, "summary": None}
+
+    def _user_show(self, uid, **kwargs):
+        if uid not in self.users:
+            raise FakeIPANotFound(f"{uid}: user not found")
+        result = {"uid": [uid], "nsaccountlock": self.users[uid]}
+        return {"result": result, "value": uid, "summary": None}
+
+    def _change_members(self, cn, usernames, add):
+        if cn not in self.groups:
+            raise FakeIPANotFound(f"{cn}: group not found")
+        members = self.groups[cn]["member_user"]
+        completed, failed = 0, []
+        for username in usernames:
+            if username in self.member_errors:
+                failed.append((username, self.member_errors[username]))
+            elif username not in self.users:
+                failed.append((username, "no such entry"))
+            elif add and username in members:
+                failed.append((username, "This entry is already a member"))
+            elif not add and username not in members:
+                failed.append((username, "This entry is not a member"))
+            else:
+                if add:
+                    members.add(username)
+                else:
+                    members.remove(username)
+                completed += 1
+        return {
+            "completed": completed,
+            "failed": {"member": {"group": [], "user": failed}},
+            "result": self._group_show(cn)["result"],
+        }
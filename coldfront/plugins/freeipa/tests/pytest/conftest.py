@@ -0,0 +1,48 @@
+"""Shared pytest fixtures for FreeIPA plugin tests."""
+
+from datetime import date
+
+import pytest
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationAttributeType,
+    AllocationStatusChoice,
+    AllocationUser,
+    AllocationUserStatusChoice,
+)
+
+GROUP_ATTRIBUTE_NAME = "freeipa_group"
+
+
+@pytest.fixture
+def create_group_allocation(db):
+    """Factory fixture for creating Allocations with unix groups."""
+
+    def _create(project, status, groups, users):
+        """Create an Allocation with the given status, unix groups, and
+        users, given as a dict mapping each User to its status."""
+        allocation = Allocation.objects.create(
+            project=project,
+            status=AllocationStatusChoice.objects.get(name=status),
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31),
+        )
+        for group in groups:
+            AllocationAttribute.objects.create(
+                allocation=allocation,
+                allocation_attribute_type=AllocationAttributeType.objects.get(
+                    name=GROUP_ATTRIBUTE_NAME
+                ),
+                value=group,
+            )
+        for user, user_status in users.items():
+            AllocationUser.objects.create(
+                allocation=allocation,
+                user=user,
+                status=AllocationUserStatusChoice.objects.get(name=user_status),
+            )
+        return allocation
+
+    return _create
@@ -0,0 +1,122 @@
+"""Tests for auditing FreeIPA group membership in bulk."""
+
+from django.contrib.auth.models import User
+import pytest
+
+from coldfront.plugins.freeipa.audit import GroupMembershipAudit, MembershipChange
+from coldfront.plugins.freeipa.tests.fake_ipa import FakeIPACommands
+
+GROUP_ATTRIBUTE_NAME = "freeipa_group"
+
+
+@pytest.fixture
+def ipa(create_active_project_with_pi, create_group_allocation):
+    """Return a FakeIPACommands that has drifted from ColdFront.
+
+    In ColdFront, "alice" and "carol" are active on an Allocation with
+    group "lab", from which "bob" was removed, and "alice" was on an
+    expired Allocation with group "old". "dave" is not in FreeIPA, and
+    "carol" is disabled in FreeIPA.
+    """
+    users = {
+        username: User.objects.create(username=username, email=f"{username}@x.edu")
+        for username in ("pi", "alice", "bob", "carol", "dave")
+    }
+    project = create_active_project_with_pi("fc_ipa", users["pi"])
+    create_group_allocation(
+        project,
+        "Active",
+        ["lab"],
+        {
+            users["alice"]: "Active",
+            users["bob"]: "Removed",
+            users["carol"]: "Active",
+            users["dave"]: "Active",
+        },
+    )
+    create_group_allocation(project, "Expired", ["old"], {users["alice"]: "Active"})
+    create_group_allocation(project, "New", ["new"], {users["bob"]: "Removed"})
+
+    ipa = FakeIPACommands(
+        groups={"lab": {"bob"}, "old": {"alice"}, "new": {"bob"}},
+        users={"pi": False, "alice": False, "bob": False, "carol": True},
+    )
+    return ipa
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestGroupMembershipAudit:
+    """Tests for GroupMembershipAudit."""
+
+    def test_expected_memberships(self, ipa, django_assert_num_queries):
+        """Test that expected memberships are computed in a fixed number
+        of queries."""
+        audit = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME)
+        with django_assert_num_queries(2):
+            memberships = audit.expected_memberships()
+        assert memberships == {
+            "alice": ({"lab"}, {"old"}),
+            "bob": (set(), {"lab"}),
+            "carol": ({"lab"}, set()),
+            "dave": ({"lab"}, set()),
+        }
+
+    def test_run(self, ipa):
+        """Test that the differences are found with one batch call for
+        groups and one for users."""
+        changes, disabled = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME).run()
+        assert changes == [
+            MembershipChange("alice", "lab", True, "Enabled"),
+            MembershipChange("alice", "old", False, "Enabled"),
+            MembershipChange("bob", "lab", False, "Enabled"),
+            MembershipChange("carol", "lab", True, "Disabled"),
+        ]
+        assert disabled == ["carol"]
+        assert [call[0] for call in ipa.calls] == ["batch", "batch"]
+
+    def test_run_filtered(self, ipa):
+        """Test that the audit may be limited to a user and a group."""
+        audit = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME)
+        changes, _ = audit.run(usernames=["alice"], groups=["old"])
+        assert changes == [MembershipChange("alice", "old", False, "Enabled")]
+
+    def test_indirect_members_not_added(self, ipa):
+        """Test that indirect members of a group are not added to it."""
+        ipa.add_group("lab", members={"bob"}, indirect_members={"alice", "carol"})
+        changes, _ = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME).run()
+        assert [change.group for change in changes if change.add] == []
+
+    def test_batch_size(self, ipa):
+        """Test that lookups are split into batches of the given size."""
+        GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME, batch_size=1).run()
+        # Two groups ("new" is skipped) and four users.
+        assert len(ipa.calls_to("batch")) == 2 + 4
+
+    def test_apply(self, ipa):
+        """Test that changes are applied with one call per group, after
+        which FreeIPA matches ColdFront."""
+        audit = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME)
+        changes, _ = audit.run()
+        assert audit.apply(changes) == []
+        assert ipa.calls_to("group_add_member") == [
+            ("group_add_member", ("lab",), {"user": ["alice", "carol"]})
+        ]
+        assert len(ipa.calls_to("group_remove_member")) == 2
+        assert ipa.groups["lab"]["member_user"] == {"alice", "carol"}
+        assert ipa.groups["new"]["member_user"] == {"bob"}
+
+        assert audit.run() == ([], ["carol"])
+
+    def test_apply_failures(self, ipa):
+        """Test that changes that FreeIPA rejects are returned, while
+        those that are already made are not."""
+        audit = GroupMembershipAudit(ipa, GROUP_ATTRIBUTE_NAME)
+        changes = [
+            MembershipChange("alice", "lab", True, "Enabled"),
+            MembershipChange("bob", "lab", True, "Enabled"),
+            MembershipChange("eve", "lab", True, "Enabled"),
+            MembershipChange("alice", "missing", True, "Enabled"),
+        ]
+        assert audit.apply(changes) == [changes[2], changes[3]]
+        assert ipa.groups["lab"]["member_user"] == {"alice", "bob"}
@@ -0,0 +1,149 @@
+"""Tests for coalescing changes to FreeIPA group membership."""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django_q.models import Schedule
+import pytest
+
+from coldfront.core.allocation.models import AllocationUser, AllocationUserStatusChoice
+from coldfront.plugins.freeipa import coalesce
+from coldfront.plugins.freeipa.coalesce import flush_group_changes, schedule_flush
+from coldfront.plugins.freeipa.tests.fake_ipa import FakeIPACommands
+
+GROUP_ATTRIBUTE_NAME = "freeipa_group"
+NUM_NEW_USERS = 30
+
+
+def flush_schedules():
+    return Schedule.objects.filter(func=coalesce.FLUSH_TASK)
+
+
+def set_status(allocation_user, name):
+    allocation_user.status = AllocationUserStatusChoice.objects.get(name=name)
+    allocation_user.save()
+
+
+@pytest.fixture
+def changes(create_active_project_with_pi, create_group_allocation):
+    """Make changes to the users of an Allocation with group "lab",
+    after an earlier, unrelated change, and return the time (as an ISO
+    8601 string) after which they were made, and a FakeIPACommands as
+    of before them.
+
+    NUM_NEW_USERS users are activated, "bob", a member of "lab", is
+    removed, and "carol" is activated and then removed. "dave", who was
+    activated before, is not in "lab", but is not a change to flush.
+    """
+    new_usernames = [f"user{i:02d}" for i in range(NUM_NEW_USERS)]
+    users = {
+        username: User.objects.create(username=username, email=f"{username}@x.edu")
+        for username in ["pi", "bob", "carol", "dave", *new_usernames]
+    }
+    project = create_active_project_with_pi("fc_ipa", users["pi"])
+    allocation = create_group_allocation(
+        project,
+        "Active",
+        ["lab"],
+        {users["bob"]: "Active", users["dave"]: "Active"},
+    )
+
+    since = timezone.now().isoformat()
+    for username in [*new_usernames, "carol"]:
+        AllocationUser.objects.create(
+            allocation=allocation,
+            user=users[username],
+            status=AllocationUserStatusChoice.objects.get(name="Active"),
+        )
+    set_status(AllocationUser.objects.get(user__username="bob"), "Removed")
+    set_status(AllocationUser.objects.get(user__username="carol"), "Removed")
+
+    ipa = FakeIPACommands(
+        groups={"lab": {"bob"}},
+        users=dict.fromkeys(users, False),
+    )
+    return since, ipa
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestFlushGroupChanges:
+    """Tests for flush_group_changes."""
+
+    def test_coalesced(self, changes):
+        """Test that the changes are applied with one call per group and
+        kind of change, and that opposing changes cancel out."""
+        since, ipa = changes
+        flush_group_changes(ipa, GROUP_ATTRIBUTE_NAME, since)
+
+        new_usernames = [f"user{i:02d}" for i in range(NUM_NEW_USERS)]
+        assert ipa.calls_to("group_add_member") == [
+            ("group_add_member", ("lab",), {"user": new_usernames})
+        ]
+        assert ipa.calls_to("group_remove_member") == [
+            ("group_remove_member", ("lab",), {"user": ["bob"]})
+        ]
+        assert len(ipa.calls) == 2 + 2
+        assert not flush_schedules().exists()
+
+    def test_error_user_keeps_group(self, changes):
+        """Test that a user whose AllocationUser is set to "Error" is
+        not removed from the groups of the allocation."""
+        since, ipa = changes
+        set_status(AllocationUser.objects.get(user__username="dave"), "Error")
+        ipa.groups["lab"]["member_user"].add("dave")
+        flush_group_changes(ipa, GROUP_ATTRIBUTE_NAME, since)
+
+        assert ipa.calls_to("group_remove_member") == [
+            ("group_remove_member", ("lab",), {"user": ["bob"]})
+        ]
+        assert "dave" in ipa.groups["lab"]["member_user"]
+
+    def test_noop(self, changes):
+        """Test that, with noop, changes are returned but not made."""
+        since, ipa = changes
+        made = flush_group_changes(ipa, GROUP_ATTRIBUTE_NAME, since, noop=True)
+        assert len(made) == NUM_NEW_USERS + 1
+        assert ipa.calls_to("group_add_member") == []
+        assert ipa.groups["lab"]["member_user"] == {"bob"}
+
+    def test_retried(self, changes):
+        """Test that a failed flush is retried later."""
+        since, ipa = changes
+        ipa.unavailable = True
+        flush_group_changes(ipa, GROUP_ATTRIBUTE_NAME, since)
+
+        [retry] = flush_schedules()
+        assert "'attempt': 1" in retry.kwargs
+        assert retry.next_run > timezone.now() + timedelta(seconds=30)
+        assert not AllocationUser.objects.filter(status__name="Error").exists()
+
+    def test_given_up(self, changes):
+        """Test that, after the last attempt, the AllocationUsers whose
+        groups could not be updated are set to "Error"."""
+        since, ipa = changes
+        ipa.member_errors["user00"] = "Insufficient access"
+        flush_group_changes(
+            ipa, GROUP_ATTRIBUTE_NAME, since, attempt=coalesce.FREEIPA_FLUSH_MAX_RETRIES
+        )
+        assert not flush_schedules().exists()
+        assert list(
+            AllocationUser.objects.filter(status__name="Error").values_list(
+                "user__username", flat=True
+            )
+        ) == ["user00"]
+        assert len(ipa.groups["lab"]["member_user"]) == NUM_NEW_USERS - 1
+
+
+@pytest.mark.django_db
+def test_schedule_flush():
+    """Test that a flush is scheduled once, after the window."""
+    schedule_flush()
+    schedule_flush()
+    [flush] = flush_schedules()
+    assert flush.name == coalesce.FLUSH_SCHEDULE_NAME
+    assert "'since'" in flush.kwargs
+    assert flush.next_run > timezone.now() + timedelta(
+        seconds=coalesce.FREEIPA_COALESCE_SECONDS - 5
+    )
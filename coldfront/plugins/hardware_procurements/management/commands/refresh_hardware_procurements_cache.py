@@ -5,6 +5,8 @@ from django.utils.module_loading import import_string
 from django_q.models import Schedule
 from django_q.tasks import schedule
 
+from coldfront.core.utils.request_alert_counts import refresh_request_alert_counts
+
 from ...conf import settings
 from ...utils.data_sources.backends.cached import CachedDataSourceBackend
 
@@ -79,5 +81,6 @@ class Command(BaseCommand):
         data_source = CachedDataSourceBackend(**data_source_config["OPTIONS"])
         data_source.clear_cache()
         data_source.populate_cache_if_needed()
+        refresh_request_alert_counts(names=["hardware_procurement_req_count"])
 
         self.logger.info("Hardware procurements cache refreshed.")
@@ -0,0 +1,90 @@
+"""Shared pytest fixtures for iquota plugin tests."""
+
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+GIGABYTE = 1000**3
+
+
+def pytest_configure(config):
+    """Stub the kerberos module, which the plugin imports, but which is
+    not installed for tests. Tests replace the negotiation of tokens
+    instead."""
+    sys.modules["kerberos"] = MagicMock()
+
+
+class FakeIquotaSession:
+    """A stand-in for the requests Session shared by the plugin, which
+    answers requests to the iquota API from a dict mapping each user or
+    group to its (used, limit) in bytes, or to None, if it has no quota.
+
+    Requests with one of the tokens in `rejected_tokens` are answered
+    with a 401. If `barrier` is set, each request waits on it before
+    being answered."""
+
+    def __init__(self, quotas):
+        self.quotas = quotas
+        self.rejected_tokens = set()
+        self.barrier = None
+        self.requests = []
+
+    def get(self, url, headers=None, verify=None, timeout=None):
+        token = headers["Authorization"].removeprefix("Negotiate ")
+        self.requests.append((url, token))
+        if self.barrier is not None:
+            self.barrier.wait()
+        if token in self.rejected_tokens:
+            return self._response(401, {"code": "AEC_UNAUTHORIZED"})
+
+        params = dict(param.split("=", 1) for param in url.split("?", 1)[1].split("&"))
+        name = params["group"] if "/quota/group" in url else params["user"]
+        quota = self.quotas.get(name)
+        if quota is None:
+            return self._response(404, {"code": "AEC_NOT_FOUND"})
+        used, limit = quota
+        return self._response(
+            200,
+            {"quotas": [{"usage": {"logical": used}, "thresholds": {"soft": limit}}]},
+        )
+
+    @staticmethod
+    def _response(status_code, data):
+        response = MagicMock(status_code=status_code)
+        response.json.return_value = data
+        return response
+
+
+@pytest.fixture
+def iquota_session(monkeypatch, settings):
+    """Configure the plugin, and direct its requests to a
+    FakeIquotaSession, in which "alice" has a quota, as do groups "lab"
+    and "shared", but group "empty" does not. Tokens are negotiated as
+    "token1", "token2", etc., and are recorded in the `tokens` list
+    attribute of the session."""
+    from coldfront.plugins.iquota import utils as iquota_utils
+
+    settings.IQUOTA_API_HOST = "iquota.example.edu"
+    settings.IQUOTA_API_PORT = 8443
+    settings.IQUOTA_CA_CERT = "/etc/ssl/ca.pem"
+    settings.IQUOTA_USER_PATH = "/home"
+    settings.IQUOTA_GROUP_PATH = "/groups"
+    settings.IQUOTA_KEYTAB = "/etc/iquota.keytab"
+
+    session = FakeIquotaSession(
+        {
+            "alice": (GIGABYTE, 10 * GIGABYTE),
+            "lab": (5 * GIGABYTE, 10 * GIGABYTE),
+            "shared": (GIGABYTE, 4 * GIGABYTE),
+        }
+    )
+    session.tokens = []
+
+    def gssclient_token(self):
+        session.tokens.append(f"token{len(session.tokens) + 1}")
+        return session.tokens[-1]
+
+    monkeypatch.setattr(iquota_utils, "get_iquota_session", lambda: session)
+    monkeypatch.setattr(iquota_utils.Iquota, "gssclient_token", gssclient_token)
+    return session
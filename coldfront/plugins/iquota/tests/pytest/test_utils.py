@@ -0,0 +1,77 @@
+"""Tests for fetching quotas from the iquota API."""
+
+import threading
+
+import pytest
+
+from coldfront.plugins.iquota.utils import Iquota
+
+ALICE_QUOTA = {
+    "username": "alice",
+    "used": "1.0 GB",
+    "limit": "10.0 GB",
+    "percent_used": 10,
+}
+GROUP_QUOTAS = {
+    "lab": {"used": "5.0 GB", "limit": "10.0 GB", "percent_used": 50},
+    "shared": {"used": "1.0 GB", "limit": "4.0 GB", "percent_used": 25},
+}
+
+
+@pytest.mark.unit
+class TestGetQuotas:
+    """Tests for Iquota.get_quotas."""
+
+    def test_fetched_concurrently(self, iquota_session):
+        """Test that the user and group quotas are fetched concurrently,
+        with a single token, and that groups without quotas are
+        omitted."""
+        groups = ["lab", "empty", "shared"]
+        # Each request waits until all of them have been made, which
+        # times out if they are made one at a time.
+        iquota_session.barrier = threading.Barrier(len(groups) + 1, timeout=5)
+
+        user_quota, group_quotas = Iquota("alice", groups).get_quotas()
+
+        assert user_quota == ALICE_QUOTA
+        assert group_quotas == GROUP_QUOTAS
+        assert len(iquota_session.requests) == len(groups) + 1
+        assert iquota_session.tokens == ["token1"]
+        assert {token for _, token in iquota_session.requests} == {"token1"}
+
+    def test_rejected_token_retried(self, iquota_session):
+        """Test that a request whose shared token is rejected is retried
+        once with a fresh token."""
+        iquota_session.rejected_tokens.add("token1")
+
+        user_quota, group_quotas = Iquota("alice", ["lab"]).get_quotas()
+
+        assert user_quota == ALICE_QUOTA
+        assert group_quotas == {"lab": GROUP_QUOTAS["lab"]}
+        # One shared token, and a fresh one for each retry.
+        assert len(iquota_session.tokens) == 3
+        assert len(iquota_session.requests) == 4
+
+    def test_missing_quotas_cached(self, iquota_session, locmem_cache):
+        """Test that quotas, including the absence of one, are cached,
+        so that neither requests nor tokens are needed again."""
+        assert Iquota("alice", ["lab", "empty"]).get_quotas() == (
+            ALICE_QUOTA,
+            {"lab": GROUP_QUOTAS["lab"]},
+        )
+        assert len(iquota_session.requests) == 3
+
+        assert Iquota("alice", ["lab", "empty"]).get_quotas() == (
+            ALICE_QUOTA,
+            {"lab": GROUP_QUOTAS["lab"]},
+        )
+        assert len(iquota_session.requests) == 3
+        assert iquota_session.tokens == ["token1"]
+
+    def test_group_quotas(self, iquota_session):
+        """Test that get_group_quotas does not fetch the user quota."""
+        assert Iquota("alice", ["lab"]).get_group_quotas() == {
+            "lab": GROUP_QUOTAS["lab"]
+        }
+        [(url, _)] = iquota_session.requests
+        assert "/quota/group?" in url
@@ -0,0 +1,67 @@
+"""Tests for the iquota views."""
+
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.test import RequestFactory
+import pytest
+
+from coldfront.plugins.iquota import views
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Record the template and context of each rendered response."""
+    calls = []
+
+    def render(request, template_name, context):
+        calls.append((template_name, context))
+        return views.HttpResponse()
+
+    monkeypatch.setattr(views, "render", render)
+    return calls
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestGetIsilonQuota:
+    """Tests for get_isilon_quota."""
+
+    def test_quotas_rendered(self, iquota_session, rendered):
+        """Test that the quotas of the user and of the groups of the
+        user are fetched in one batch and rendered."""
+        user = User.objects.create(username="alice")
+        user.groups.add(
+            Group.objects.create(name="lab"), Group.objects.create(name="empty")
+        )
+        request = RequestFactory().post("/iquota/get-isilon-quota/")
+        request.user = user
+
+        response = views.get_isilon_quota(request)
+
+        assert response.status_code == 200
+        [(template_name, context)] = rendered
+        assert template_name == "iquota/iquota.html"
+        assert context["user_quota"]["username"] == "alice"
+        assert list(context["group_quotas"]) == ["lab"]
+        assert len(iquota_session.requests) == 3
+        assert iquota_session.tokens == ["token1"]
+
+    def test_no_groups(self, iquota_session, rendered):
+        """Test that group quotas are omitted for a user in no groups."""
+        request = RequestFactory().post("/iquota/get-isilon-quota/")
+        request.user = User.objects.create(username="alice")
+
+        views.get_isilon_quota(request)
+
+        [(_, context)] = rendered
+        assert context["user_quota"]["username"] == "alice"
+        assert context["group_quotas"] is None
+        assert len(iquota_session.requests) == 1
+
+    def test_unauthenticated(self, iquota_session, rendered):
+        """Test that quotas are not fetched for anonymous users."""
+        request = RequestFactory().post("/iquota/get-isilon-quota/")
+        request.user = AnonymousUser()
+
+        assert views.get_isilon_quota(request).status_code == 401
+        assert iquota_session.requests == []
+        assert rendered == []
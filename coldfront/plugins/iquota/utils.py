@@ -1,12 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
 
+from django.core.cache import cache
 import humanize
 import kerberos
 import requests
+from requests.adapters import HTTPAdapter
 
 from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.instrumentation import external_call
 from coldfront.plugins.iquota.exceptions import KerberosError, MissingQuotaError
 
+# The maximum number of concurrent requests to the iquota API, per page.
+IQUOTA_MAX_WORKERS = import_from_settings("IQUOTA_MAX_WORKERS", 8)
+# The number of seconds for which quotas are cached.
+IQUOTA_CACHE_TIMEOUT = import_from_settings("IQUOTA_CACHE_TIMEOUT", 60)
+IQUOTA_REQUEST_TIMEOUT = import_from_settings("IQUOTA_REQUEST_TIMEOUT", 10)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_iquota_session():
+    """Return the requests Session shared by the process, whose pool
+    keeps connections to the iquota API open between requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=IQUOTA_MAX_WORKERS)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+        return _session
+
 
 class Iquota:
     def __init__(self, username, groups):
@@ -19,6 +45,11 @@ class Iquota:
         self.IQUOTA_KEYTAB = import_from_settings("IQUOTA_KEYTAB")
         self.username = username
         self.groups = groups
+        # While fetching a batch of quotas, a token negotiated once, on
+        # first use, and shared by the requests of the batch.
+        self._in_batch = False
+        self._token = None
+        self._token_lock = threading.Lock()
 
     def gssclient_token(self):
         os.environ["KRB5_CLIENT_KTNAME"] = self.IQUOTA_KEYTAB
@@ -32,6 +63,44 @@ class Iquota:
         except kerberos.GSSError:
             raise KerberosError("error initializing GSS client")
 
+    def _batch_token(self):
+        with self._token_lock:
+            if self._token is None:
+                self._token = self.gssclient_token()
+            return self._token
+
+    def _get(self, url):
+        """Return the response to a GET request to the given URL of the
+        iquota API, authenticated with the token of the current batch,
+        if any. If the API rejects a shared token (e.g., as a replay),
+        retry once with a fresh one."""
+        if not self._in_batch:
+            return self._request(url, self.gssclient_token())
+        r = self._request(url, self._batch_token())
+        if r.status_code == 401:
+            r = self._request(url, self.gssclient_token())
+        return r
+
+    def _request(self, url, token):
+        headers = {"Authorization": "Negotiate " + token}
+        return get_iquota_session().get(
+            url,
+            headers=headers,
+            verify=self.IQUOTA_CA_CERT,
+            timeout=IQUOTA_REQUEST_TIMEOUT,
+        )
+
+    @staticmethod
+    def _cached(key, fetch):
+        """Return the value cached under the given key, or fetch it with
+        the given function, and cache it, even if it is None."""
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["value"]
+        value = fetch()
+        cache.set(key, {"value": value}, IQUOTA_CACHE_TIMEOUT)
+        return value
+
     def _humanize_user_quota(self, user_used, user_limit):
 
         user_quota = {
@@ -44,13 +113,15 @@ class Iquota:
         return user_quota
 
     def get_user_quota(self):
+        key = f"iquota:user:{self.username}:{self.IQUOTA_USER_PATH}"
+        return self._cached(key, self._fetch_user_quota)
 
-        token = self.gssclient_token()
+    def _fetch_user_quota(self):
 
-        headers = {"Authorization": "Negotiate " + token}
         url = f"https://{self.IQUOTA_API_HOST}:{self.IQUOTA_API_PORT}/quota/user?user={self.username}&path={self.IQUOTA_USER_PATH}"
 
-        r = requests.get(url, headers=headers, verify=self.IQUOTA_CA_CERT)
+        with external_call("iquota"):
+            r = self._get(url)
 
         try:
             usage = r.json()["quotas"][0]
@@ -74,14 +145,15 @@ class Iquota:
         return group_quota
 
     def _get_group_quota(self, group):
+        key = f"iquota:group:{group}:{self.IQUOTA_GROUP_PATH}"
+        return self._cached(key, lambda: self._fetch_group_quota(group))
 
-        token = self.gssclient_token()
-
-        headers = {"Authorization": "Negotiate " + token}
+    def _fetch_group_quota(self, group):
 
         url = f"https://{self.IQUOTA_API_HOST}:{self.IQUOTA_API_PORT}/quota/group?user={self.username}&path={self.IQUOTA_GROUP_PATH}&group={group}"
 
-        r = requests.get(url, headers=headers, verify=self.IQUOTA_CA_CERT)
+        with external_call("iquota"):
+            r = self._get(url)
 
         if "code" in r.json() and r.json()["code"] == "AEC_NOT_FOUND":
             return None
@@ -104,10 +176,44 @@ class Iquota:
         if not self.groups:
             return None
 
-        group_quotas = {}
-        for group in self.groups:
-            group_quota = self._get_group_quota(group)
-            if group_quota:
-                group_quotas[group] = group_quota
+        return self.get_quotas(include_user=False)[1]
 
-        return group_quotas
+    def get_quotas(self, include_user=True):
+        """Return the user quota (or None if `include_user` is False)
+        and a dict mapping each group with a quota to its quota.
+
+        Quotas that are not cached are fetched concurrently, by up to
+        IQUOTA_MAX_WORKERS threads, over pooled connections, with a
+        single token, negotiated only if a quota is not cached. A
+        MissingQuotaError for the user quota is raised."""
+        groups = list(dict.fromkeys(self.groups or []))
+        num_requests = len(groups) + bool(include_user)
+        if not num_requests:
+            return None, {}
+
+        self._in_batch = True
+        try:
+            with (
+                external_call("iquota"),
+                ThreadPoolExecutor(
+                    max_workers=min(IQUOTA_MAX_WORKERS, num_requests),
+                    thread_name_prefix="iquota",
+                ) as executor,
+            ):
+                user_future = None
+                if include_user:
+                    user_future = executor.submit(self.get_user_quota)
+                group_futures = [
+                    executor.submit(self._get_group_quota, group) for group in groups
+                ]
+                group_quotas = {}
+                for group, future in zip(groups, group_futures, strict=True):
+                    group_quota = future.result()
+                    if group_quota:
+                        group_quotas[group] = group_quota
+                user_quota = user_future.result() if user_future else None
+        finally:
+            self._in_batch = False
+            self._token = None
+
+        return user_quota, group_quotas
@@ -11,11 +11,11 @@ def get_isilon_quota(request):
     username = request.user.username
     groups = [group.name for group in request.user.groups.all()]
 
-    iquota = Iquota(username, groups)
+    user_quota, group_quotas = Iquota(username, groups).get_quotas()
 
     context = {
-        "user_quota": iquota.get_user_quota(),
-        "group_quotas": iquota.get_group_quotas(),
+        "user_quota": user_quota,
+        "group_quotas": group_quotas if groups else None,
     }
 
     return render(request, "iquota/iquota.html", context)
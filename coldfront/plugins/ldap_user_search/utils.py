@@ -6,6 +6,7 @@ from ldap3 import Connection, Server
 
 from coldfront.core.user.utils import UserSearch
 from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.ldap_pool import get_ldap_connection_pool
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,16 @@ class LDAPUserSearch(UserSearch):
         self.LDAP_BIND_DN = import_from_settings("LDAP_BIND_DN", None)
         self.LDAP_BIND_PASSWORD = import_from_settings("LDAP_BIND_PASSWORD", None)
 
-        self.server = Server(self.LDAP_SERVER_URI, use_ssl=True, connect_timeout=1)
-        self.conn = Connection(
-            self.server, self.LDAP_BIND_DN, self.LDAP_BIND_PASSWORD, auto_bind=True
+        self.pool = get_ldap_connection_pool(
+            ("ldap_user_search", self.LDAP_SERVER_URI, self.LDAP_BIND_DN),
+            self._create_connection,
+        )
+
+    def _create_connection(self):
+        """Return a new Connection, bound to the server."""
+        server = Server(self.LDAP_SERVER_URI, use_ssl=True, connect_timeout=1)
+        return Connection(
+            server, self.LDAP_BIND_DN, self.LDAP_BIND_PASSWORD, auto_bind=True
         )
 
     def parse_ldap_entry(self, entry):
@@ -59,9 +67,11 @@ class LDAPUserSearch(UserSearch):
             "attributes": ["uid", "sn", "givenName", "mail"],
             "size_limit": size_limit,
         }
-        self.conn.search(**searchParameters)
+        with self.pool.connection() as conn:
+            conn.search(**searchParameters)
+            entries = conn.entries
         users = []
-        for idx, entry in enumerate(self.conn.entries, 1):
+        for idx, entry in enumerate(entries, 1):
             user_dict = self.parse_ldap_entry(entry)
             users.append(user_dict)
 
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
 
+from coldfront.core.utils.common import import_from_settings
+
+SLURM_ENABLE_SIGNALS = import_from_settings("SLURM_ENABLE_SIGNALS", False)
+
 
 class SlurmConfig(AppConfig):
     name = "coldfront.plugins.slurm"
+
+    def ready(self):
+        if SLURM_ENABLE_SIGNALS:
+            import coldfront.plugins.slurm.signals  # noqa: F401
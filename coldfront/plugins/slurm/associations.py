@@ -4,7 +4,15 @@ import os
 import re
 import sys
 
-from coldfront.core.resource.models import Resource
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationUser,
+)
+from coldfront.core.resource.models import Resource, ResourceAttribute
 from coldfront.plugins.slurm.utils import (
     SLURM_ACCOUNT_ATTRIBUTE_NAME,
     SLURM_CLUSTER_ATTRIBUTE_NAME,
@@ -108,33 +116,27 @@ class SlurmCluster(SlurmBase):
 
     @staticmethod
     def new_from_resource(resource):
-        """Create a new SlurmCluster from a ColdFront Resource model."""
-        name = resource.get_attribute(SLURM_CLUSTER_ATTRIBUTE_NAME)
-        specs = resource.get_attribute_list(SLURM_SPECS_ATTRIBUTE_NAME)
-        user_specs = resource.get_attribute_list(SLURM_USER_SPECS_ATTRIBUTE_NAME)
-        if not name:
-            raise (SlurmError(f"Resource {resource} missing slurm_cluster"))
-
-        cluster = SlurmCluster(name, specs)
-
-        # Process allocations
-        for allocation in resource.allocation_set.filter(status__name="Active"):
-            cluster.add_allocation(allocation, user_specs=user_specs)
-
-        # Process child resources
-        children = Resource.objects.filter(
-            parent_resource_id=resource.id, resource_type__name="Cluster Partition"
-        )
-        for r in children:
-            partition_specs = r.get_attribute_list(SLURM_SPECS_ATTRIBUTE_NAME)
-            partition_user_specs = r.get_attribute_list(SLURM_USER_SPECS_ATTRIBUTE_NAME)
-            for allocation in r.allocation_set.filter(status__name="Active"):
-                cluster.add_allocation(
-                    allocation, specs=partition_specs, user_specs=partition_user_specs
-                )
-
+        """Create a new SlurmCluster from a ColdFront Resource model.
+
+        The cluster's associations are loaded in a fixed number of
+        queries (see SlurmAssociationExport)."""
+        export = SlurmAssociationExport(resource)
+        cluster = SlurmCluster(export.cluster_name, export.cluster_specs)
+        for name, specs in export.accounts.items():
+            cluster.accounts[name] = SlurmAccount(name, specs=list(specs))
+        for account_name, user_name, user_specs in export.iter_users():
+            cluster.accounts[account_name].add_user(
+                SlurmUser(user_name, specs=user_specs)
+            )
         return cluster
 
+    @staticmethod
+    def write_from_resource(resource, out):
+        """Write the sacctmgr dump of the given ColdFront Resource model
+        to the given stream, without creating a SlurmCluster. Users are
+        written as they are read from the database."""
+        SlurmAssociationExport(resource).write(out)
+
     def add_allocation(self, allocation, specs=None, user_specs=None):
         if specs is None:
             specs = []
@@ -274,3 +276,176 @@ class SlurmUser(SlurmBase):
             out,
             f"User - '{self.name}':{self.format_specs()}\n",
         )
+
+
+class SlurmAssociationExport(SlurmBase):
+    """The Slurm associations of a cluster Resource and its partition
+    Resources, loaded in a fixed number of queries, regardless of the
+    number of Allocations and users.
+
+    Resource attributes, active Allocations, and Allocation attributes
+    are loaded into memory on creation. Active AllocationUsers are only
+    loaded by iter_users, which streams them, ordered by account and
+    username, so that each user's specs can be merged across
+    Allocations without holding every user in memory.
+
+    The result is equivalent to adding each active Allocation of the
+    Resource and its partitions to a SlurmCluster one at a time."""
+
+    # The number of AllocationUsers fetched from the database at once.
+    USER_CHUNK_SIZE = 2000
+
+    ATTRIBUTE_NAMES = (
+        SLURM_ACCOUNT_ATTRIBUTE_NAME,
+        SLURM_CLUSTER_ATTRIBUTE_NAME,
+        SLURM_SPECS_ATTRIBUTE_NAME,
+        SLURM_USER_SPECS_ATTRIBUTE_NAME,
+    )
+
+    def __init__(self, resource):
+        partition_ids = list(
+            Resource.objects.filter(
+                parent_resource_id=resource.id, resource_type__name="Cluster Partition"
+            ).values_list("id", flat=True)
+        )
+        resource_ids = [resource.id, *partition_ids]
+        resource_attributes = self._attributes_by_id(
+            ResourceAttribute.objects.filter(
+                resource_id__in=resource_ids,
+                resource_attribute_type__name__in=self.ATTRIBUTE_NAMES,
+            ).values_list("resource_id", "resource_attribute_type__name", "value")
+        )
+
+        cluster_attributes = resource_attributes.get(resource.id, {})
+        names = cluster_attributes.get(SLURM_CLUSTER_ATTRIBUTE_NAME)
+        if not names or not names[0]:
+            raise (SlurmError(f"Resource {resource} missing slurm_cluster"))
+        super().__init__(names[0], cluster_attributes.get(SLURM_SPECS_ATTRIBUTE_NAME))
+        self.cluster_name = self.name
+        self.cluster_specs = self.specs
+
+        self._active_allocations = Allocation.objects.filter(
+            resources__id__in=resource_ids, status__name="Active"
+        ).values("id")
+        allocation_attributes = self._attributes_by_id(
+            AllocationAttribute.objects.filter(
+                allocation_id__in=self._active_allocations,
+                allocation_attribute_type__name__in=self.ATTRIBUTE_NAMES,
+            ).values_list("allocation_id", "allocation_attribute_type__name", "value")
+        )
+
+        # Map each account name to its specs, and each Allocation to the
+        # specs of each of its users. Allocations of partitions contribute
+        # the partition's specs to the account, and those of the cluster do
+        # not, as in SlurmCluster.add_allocation.
+        self.accounts = {}
+        self._allocation_user_specs = {}
+        allocation_resources = (
+            Allocation.resources.through.objects.filter(
+                resource_id__in=resource_ids, allocation__status__name="Active"
+            )
+            .order_by("allocation_id")
+            .values_list("allocation_id", "resource_id")
+        )
+        for allocation_id, resource_id in allocation_resources:
+            attributes = allocation_attributes.get(allocation_id, {})
+            account_name = self._account_name(attributes)
+            account_specs = self.accounts.setdefault(account_name, [])
+            account_specs += attributes.get(SLURM_SPECS_ATTRIBUTE_NAME, [])
+            if resource_id != resource.id:
+                account_specs += resource_attributes.get(resource_id, {}).get(
+                    SLURM_SPECS_ATTRIBUTE_NAME, []
+                )
+
+            user_specs = self._allocation_user_specs.setdefault(allocation_id, [])
+            user_specs += attributes.get(SLURM_USER_SPECS_ATTRIBUTE_NAME, [])
+            user_specs += resource_attributes.get(resource_id, {}).get(
+                SLURM_USER_SPECS_ATTRIBUTE_NAME, []
+            )
+
+    @staticmethod
+    def _account_name(attributes):
+        """Return the name of the Slurm account of an Allocation with
+        the given attributes, defaulting to "root"."""
+        names = attributes.get(SLURM_ACCOUNT_ATTRIBUTE_NAME)
+        if not names or not names[0]:
+            return "root"
+        return names[0]
+
+    @staticmethod
+    def _attributes_by_id(rows):
+        """Given (object ID, attribute name, value) rows, return a dict
+        mapping each object ID to a dict mapping each attribute name to
+        a list of values, in the order of the rows."""
+        attributes = {}
+        for object_id, name, value in rows.order_by("pk"):
+            attributes.setdefault(object_id, {}).setdefault(name, []).append(value)
+        return attributes
+
+    def iter_users(self, account_names=None):
+        """Yield an (account name, username, specs) tuple for each user
+        of each account, or of each of the given accounts, ordered by
+        account name and username, with specs merged across the user's
+        Allocations."""
+        first_account_name = Subquery(
+            AllocationAttribute.objects.filter(
+                allocation_id=OuterRef("allocation_id"),
+                allocation_attribute_type__name=SLURM_ACCOUNT_ATTRIBUTE_NAME,
+            )
+            .order_by("pk")
+            .values("value")[:1]
+        )
+        rows = AllocationUser.objects.filter(
+            allocation_id__in=self._active_allocations, status__name="Active"
+        ).annotate(
+            account_name=Coalesce(NullIf(first_account_name, Value("")), Value("root"))
+        )
+        if account_names is not None:
+            rows = rows.filter(account_name__in=account_names)
+        rows = (
+            rows.order_by("account_name", "user__username")
+            .values_list("account_name", "user__username", "allocation_id")
+            .iterator(chunk_size=self.USER_CHUNK_SIZE)
+        )
+
+        current, specs = None, []
+        for account_name, username, allocation_id in rows:
+            if (account_name, username) != current:
+                if current is not None:
+                    yield (*current, specs)
+                current, specs = (account_name, username), []
+            specs += self._allocation_user_specs.get(allocation_id, [])
+        if current is not None:
+            yield (*current, specs)
+
+    def write(self, out):
+        """Write the associations to the given stream in sacctmgr dump
+        format, as in SlurmCluster.write."""
+        self._write(
+            out,
+            f"# ColdFront Allocation Slurm associations dump {datetime.datetime.now().date()}\n",
+        )
+        self._write(out, f"Cluster - '{self.name}':{self.format_specs()}\n")
+        if "root" not in self.accounts:
+            self._write(out, "Parent - 'root'\n")
+            self._write(
+                out,
+                "User - 'root':DefaultAccount='root':AdminLevel='Administrator':Fairshare=1\n",
+            )
+
+        for name, specs in self.accounts.items():
+            if name != "root":
+                SlurmAccount(name, specs=specs).write(out)
+
+        # Users are grouped by account, so write a Parent line whenever the
+        # account changes, and then one for each account without users.
+        written, current = set(), None
+        for account_name, username, specs in self.iter_users():
+            if account_name != current:
+                self._write(out, f"Parent - '{account_name}'\n")
+                written.add(account_name)
+                current = account_name
+            SlurmUser(username, specs=specs).write(out)
+        for name in self.accounts:
+            if name not in written:
+                self._write(out, f"Parent - '{name}'\n")
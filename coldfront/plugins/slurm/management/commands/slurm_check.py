@@ -10,6 +10,7 @@ from coldfront.core.utils.common import import_from_settings
 from coldfront.plugins.slurm.associations import SlurmCluster
 from coldfront.plugins.slurm.utils import (
     SLURM_CLUSTER_ATTRIBUTE_NAME,
+    SlurmBatch,
     SlurmError,
     slurm_dump_cluster,
     slurm_remove_account,
@@ -43,6 +44,22 @@ class Command(BaseCommand):
             help="Remove associations in Slurm that no longer exist in ColdFront",
             action="store_true",
         )
+        parser.add_argument(
+            "-b",
+            "--batch",
+            help=(
+                "With --sync, apply all changes with a single sacctmgr process "
+                "instead of one process per change"
+            ),
+            action="store_true",
+        )
+        parser.add_argument(
+            "--script",
+            help=(
+                "With --batch, also write the sacctmgr commands to the given path, "
+                "e.g., to preview them with --noop"
+            ),
+        )
         parser.add_argument(
             "-n",
             "--noop",
@@ -97,7 +114,9 @@ class Command(BaseCommand):
         if self._skip_user(user, account):
             return
 
-        if self.sync:
+        if self.sync and self.batch is not None:
+            self.batch.remove_assoc(user, cluster, account)
+        elif self.sync:
             try:
                 slurm_remove_assoc(user, cluster, account, noop=self.noop)
             except SlurmError as e:
@@ -129,7 +148,9 @@ class Command(BaseCommand):
         if self._skip_account(account):
             return
 
-        if self.sync:
+        if self.sync and self.batch is not None:
+            self.batch.remove_account(cluster, account)
+        elif self.sync:
             try:
                 slurm_remove_account(cluster, account, noop=self.noop)
             except SlurmError as e:
@@ -157,7 +178,9 @@ class Command(BaseCommand):
         if self._skip_user(user, account):
             return
 
-        if self.sync:
+        if self.sync and self.batch is not None:
+            self.batch.remove_qos(user, cluster, account, qos)
+        elif self.sync:
             try:
                 slurm_remove_qos(user, cluster, account, qos, noop=self.noop)
                 pass
@@ -242,34 +265,48 @@ class Command(BaseCommand):
             )
 
     def _diff(self, cluster_a, cluster_b):
-        for name, account in cluster_a.accounts.items():
-            if name == "root":
-                continue
-
-            if name in cluster_b.accounts:
-                total = 0
-                for uid, user in account.users.items():
-                    if uid == "root":
-                        continue
-                    if uid not in cluster_b.accounts[name].users:
-                        self.remove_user(uid, name, cluster_a.name)
-                        total += 1
-                    else:
-                        self._diff_qos(
-                            name,
-                            cluster_a.name,
-                            user,
-                            cluster_b.accounts[name].users[uid],
-                        )
-
-                if total == len(account.users):
-                    self.remove_account(name, cluster_a.name)
-            else:
-                for uid, user in account.users.items():
-                    self.remove_user(uid, name, cluster_a.name)
+        names_a = cluster_a.accounts.keys() - {"root"}
+        for name in sorted(names_a - cluster_b.accounts.keys()):
+            for uid in sorted(cluster_a.accounts[name].users):
+                self.remove_user(uid, name, cluster_a.name)
 
+            self.remove_account(name, cluster_a.name)
+
+        for name in sorted(names_a & cluster_b.accounts.keys()):
+            users_a = cluster_a.accounts[name].users
+            users_b = cluster_b.accounts[name].users
+            uids_a = users_a.keys() - {"root"}
+
+            removed = uids_a - users_b.keys()
+            for uid in sorted(removed):
+                self.remove_user(uid, name, cluster_a.name)
+
+            for uid in sorted(uids_a & users_b.keys()):
+                self._diff_qos(name, cluster_a.name, users_a[uid], users_b[uid])
+
+            if len(removed) == len(users_a):
                 self.remove_account(name, cluster_a.name)
 
+    def apply_batch(self, script_path=None):
+        if script_path:
+            with open(script_path, "w") as fh:
+                fh.write(self.batch.script())
+
+        if not self.batch:
+            logger.info("No Slurm changes to apply")
+            return
+
+        try:
+            self.batch.apply(noop=self.noop)
+        except SlurmError as e:
+            logger.error("Failed applying batched Slurm changes: %s", e)
+            sys.exit(1)
+        else:
+            logger.error(
+                "Applied %d batched Slurm commands successfully",
+                len(self.batch.commands()),
+            )
+
     def check_consistency(self, slurm_cluster, coldfront_cluster):
         # Check for accounts in Slurm NOT in ColdFront
         self._diff(slurm_cluster, coldfront_cluster)
@@ -304,6 +341,10 @@ class Command(BaseCommand):
             self.sync = True
             logger.warn("Syncing Slurm with ColdFront")
 
+        self.batch = None
+        if options["batch"]:
+            self.batch = SlurmBatch()
+
         self.noop = SLURM_NOOP
         if options["noop"]:
             self.noop = True
@@ -355,3 +396,6 @@ class Command(BaseCommand):
         coldfront_cluster = SlurmCluster.new_from_resource(resource)
 
         self.check_consistency(slurm_cluster, coldfront_cluster)
+
+        if self.sync and self.batch is not None:
+            self.apply_batch(script_path=options["script"])
@@ -45,10 +45,9 @@ class Command(BaseCommand):
             if options["cluster"] and options["cluster"] != attr.value:
                 continue
 
-            cluster = SlurmCluster.new_from_resource(attr.resource)
             if not out_dir:
-                cluster.write(self.stdout)
+                SlurmCluster.write_from_resource(attr.resource, self.stdout)
                 continue
 
-            with open(os.path.join(out_dir, f"{cluster.name}.cfg"), "w") as fh:
-                cluster.write(fh)
+            with open(os.path.join(out_dir, f"{attr.value}.cfg"), "w") as fh:
+                SlurmCluster.write_from_resource(attr.resource, fh)
@@ -0,0 +1,125 @@
+import logging
+import sys
+
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.core.resource.models import ResourceAttribute
+from coldfront.core.utils.common import import_from_settings
+from coldfront.plugins.slurm.sync import sync_cluster
+from coldfront.plugins.slurm.utils import SLURM_CLUSTER_ATTRIBUTE_NAME, SlurmError
+
+SLURM_NOOP = import_from_settings("SLURM_NOOP", False)
+
+"""An admin command that pushes changes to Slurm associations from
+ColdFront to Slurm, incrementally, with a periodic full reconcile (see
+coldfront.plugins.slurm.sync)."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Push the changes to Slurm associations since the last sync from "
+        "ColdFront to Slurm, or schedule a sync to occur at a set interval."
+    )
+
+    logger = logging.getLogger(__name__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c", "--cluster", help="Sync only the Slurm cluster with this name"
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            default=False,
+            help="Reconcile all associations, instead of only changed ones.",
+        )
+        parser.add_argument(
+            "-n",
+            "--noop",
+            action="store_true",
+            default=False,
+            help="Print commands only. Do not run any commands.",
+        )
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            default=False,
+            help="Schedule this command periodically.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=5,
+            help="The number of minutes between scheduled runs.",
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            self._handle_schedule(options["interval"])
+        else:
+            self._handle_synchronous(
+                options["cluster"], options["full"], options["noop"] or SLURM_NOOP
+            )
+
+    def _handle_schedule(self, interval):
+        """Schedule a synchronous run of this command at the given
+        interval, in minutes. Do nothing if there is already a schedule
+        in place."""
+        task_name = "slurm_sync"
+        command_name = __name__.rsplit(".", maxsplit=1)[-1]
+
+        task_exists = Schedule.objects.filter(name=task_name).exists()
+        if task_exists:
+            return
+
+        func = "django.core.management.call_command"
+        args = (command_name,)
+        kwargs = {
+            "schedule_type": "I",
+            "minutes": interval,
+            "name": task_name,
+        }
+        schedule(func, *args, **kwargs)
+
+        message = (
+            f"Scheduled a task to sync Slurm associations every {interval} "
+            f'minutes, under the name "{task_name}".'
+        )
+        self.logger.info(message)
+
+    def _handle_synchronous(self, cluster_name, full, noop):
+        """Sync each cluster, or the one with the given name. Exit with
+        an error if any cluster fails to sync."""
+        cluster_attributes = ResourceAttribute.objects.filter(
+            resource_attribute_type__name=SLURM_CLUSTER_ATTRIBUTE_NAME
+        ).select_related("resource")
+        if cluster_name:
+            cluster_attributes = cluster_attributes.filter(value=cluster_name)
+            if not cluster_attributes.exists():
+                self.logger.error("No Slurm cluster resource named %s.", cluster_name)
+                sys.exit(1)
+
+        failed = False
+        for attribute in cluster_attributes:
+            try:
+                batch = sync_cluster(attribute.resource, full=full, noop=noop)
+            except SlurmError as e:
+                self.logger.error(
+                    "Failed syncing Slurm cluster %s: %s", attribute.value, e
+                )
+                failed = True
+                continue
+            if batch is None:
+                continue
+            for command in batch.commands():
+                self.stdout.write(command)
+            self.logger.info(
+                "Synced Slurm cluster %s with %d command(s).",
+                attribute.value,
+                len(batch.commands()),
+            )
+
+        if failed:
+            sys.exit(1)
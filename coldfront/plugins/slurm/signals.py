@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django_q.tasks import async_task
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationUser,
+)
+from coldfront.plugins.slurm.sync import SYNC_ATTRIBUTE_NAMES, schedule_flush
+
+
+@receiver(pre_save, sender=Allocation)
+def record_allocation_status(sender, instance, **kwargs):
+    """Record the status of the Allocation before it is saved, so that
+    sync_allocation can tell whether it changed."""
+    if instance.pk is None:
+        instance._slurm_previous_status_id = None
+        return
+    instance._slurm_previous_status_id = (
+        Allocation.objects.filter(pk=instance.pk)
+        .values_list("status_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Allocation)
+def sync_allocation(sender, instance, created, **kwargs):
+    """Push the accounts of an existing Allocation whose status changed.
+    A new Allocation has no Resources yet; adding them is handled by
+    sync_allocation_resources."""
+    previous_status_id = getattr(instance, "_slurm_previous_status_id", None)
+    if not created and previous_status_id != instance.status_id:
+        transaction.on_commit(schedule_flush)
+
+
+@receiver(m2m_changed, sender=Allocation.resources.through)
+def sync_allocation_resources(sender, instance, action, reverse, pk_set, **kwargs):
+    """Push the accounts of Allocations added to Resources. Since this
+    is not recorded in history, each Allocation is synced by its own
+    task. Accounts left on clusters that Allocations were removed from
+    are removed by the next full reconcile."""
+    if action != "post_add":
+        return
+    allocation_pks = sorted(pk_set) if reverse else [instance.pk]
+    for allocation_pk in allocation_pks:
+        transaction.on_commit(
+            lambda allocation_pk=allocation_pk: async_task(
+                "coldfront.plugins.slurm.tasks.sync_allocation_associations",
+                allocation_pk,
+            )
+        )
+
+
+@receiver(post_save, sender=AllocationUser)
+@receiver(post_delete, sender=AllocationUser)
+def sync_allocation_user(sender, instance, **kwargs):
+    transaction.on_commit(schedule_flush)
+
+
+@receiver(post_save, sender=AllocationAttribute)
+@receiver(post_delete, sender=AllocationAttribute)
+def sync_allocation_attribute(sender, instance, **kwargs):
+    if instance.allocation_attribute_type.name in SYNC_ATTRIBUTE_NAMES:
+        transaction.on_commit(schedule_flush)
@@ -0,0 +1,352 @@
+"""Push changes to Slurm associations from ColdFront to Slurm.
+
+A full reconcile compares the associations of a cluster Resource with a
+sacctmgr dump of the cluster. An incremental sync instead compares only
+the accounts of Allocations that changed since the last sync, which are
+found using the history of Allocations, AllocationUsers, and Slurm
+AllocationAttributes, and lists only those accounts in Slurm.
+
+The time of the last sync of each cluster is stored in the default
+cache, which must therefore be shared between processes and persistent
+(e.g., Redis). If it is missing, e.g., because the cache is a DummyCache
+or the entry was evicted, or if the last full reconcile was more than
+SLURM_SYNC_FULL_RECONCILE_HOURS hours ago, a full reconcile is run
+instead, to catch changes that history does not record (e.g., to the
+Resources of an Allocation).
+
+Signal receivers call schedule_flush, which schedules a single
+sync_changed_allocations to run SLURM_SYNC_COALESCE_SECONDS seconds
+later, unless one is already pending. It pushes the accounts of all
+Allocations changed since the first change it covers, listing them in
+Slurm once per cluster.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+import logging
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationUser,
+)
+from coldfront.core.resource.models import Resource
+from coldfront.core.utils.common import import_from_settings
+from coldfront.plugins.slurm.associations import SlurmAssociationExport, SlurmCluster
+from coldfront.plugins.slurm.utils import (
+    SLURM_ACCOUNT_ATTRIBUTE_NAME,
+    SLURM_CLUSTER_ATTRIBUTE_NAME,
+    SLURM_SPECS_ATTRIBUTE_NAME,
+    SLURM_USER_SPECS_ATTRIBUTE_NAME,
+    SlurmBatch,
+    slurm_dump_cluster,
+    slurm_list_account_users,
+)
+
+SLURM_IGNORE_USERS = import_from_settings("SLURM_IGNORE_USERS", [])
+SLURM_IGNORE_ACCOUNTS = import_from_settings("SLURM_IGNORE_ACCOUNTS", [])
+SLURM_IGNORE_CLUSTERS = import_from_settings("SLURM_IGNORE_CLUSTERS", [])
+SLURM_SYNC_FULL_RECONCILE_HOURS = import_from_settings(
+    "SLURM_SYNC_FULL_RECONCILE_HOURS", 24
+)
+# Changes are looked up starting this many seconds before the last sync,
+# to include those made in transactions that were still open at the time.
+SLURM_SYNC_OVERLAP_SECONDS = import_from_settings("SLURM_SYNC_OVERLAP_SECONDS", 300)
+SLURM_SYNC_COALESCE_SECONDS = import_from_settings("SLURM_SYNC_COALESCE_SECONDS", 30)
+
+FLUSH_SCHEDULE_NAME = "slurm_sync_changed_allocations"
+FLUSH_TASK = "coldfront.plugins.slurm.tasks.flush_allocation_changes"
+# Changes are looked up starting this many seconds before the first one
+# that a flush covers, to allow for clock differences between hosts.
+FLUSH_OVERLAP_SECONDS = 60
+
+SYNC_ATTRIBUTE_NAMES = (
+    SLURM_ACCOUNT_ATTRIBUTE_NAME,
+    SLURM_SPECS_ATTRIBUTE_NAME,
+    SLURM_USER_SPECS_ATTRIBUTE_NAME,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SlurmAssociationSync:
+    """Push the associations of a cluster Resource, or of some of its
+    accounts, from ColdFront to Slurm, as a single SlurmBatch.
+
+    Accounts and users that are in ColdFront but not in Slurm are
+    created with their specs, and those that are in Slurm but not in
+    ColdFront are removed. The specs of existing associations are not
+    modified; slurm_check reports differences in QOS.
+    """
+
+    def __init__(self, resource, noop=False):
+        self.export = SlurmAssociationExport(resource)
+        self.cluster_name = self.export.cluster_name
+        self.noop = noop
+        self.batch = SlurmBatch()
+
+    def sync_accounts(self, account_names):
+        """Push the given accounts, and return the applied batch."""
+        account_names = self._filter_accounts(account_names)
+        if account_names:
+            actual = slurm_list_account_users(self.cluster_name, account_names)
+            self._diff(self._desired(account_names), actual, account_names)
+            self.batch.apply(noop=self.noop)
+        return self.batch
+
+    def sync_all(self):
+        """Push all accounts, and return the applied batch."""
+        actual = self._dumped_account_users()
+        account_names = self._filter_accounts(set(self.export.accounts) | set(actual))
+        self._diff(self._desired(), actual, account_names)
+        self.batch.apply(noop=self.noop)
+        return self.batch
+
+    def _desired(self, account_names=None):
+        """Return a dict mapping each account in ColdFront, or each of
+        the given ones, to a dict mapping each of its users to specs."""
+        desired = {
+            name: {}
+            for name in self.export.accounts
+            if account_names is None or name in account_names
+        }
+        if account_names is not None:
+            account_names = sorted(account_names)
+        for name, username, specs in self.export.iter_users(account_names):
+            desired[name][username] = specs
+        return desired
+
+    def _diff(self, desired, actual, account_names):
+        """Add changes to the batch that make the given accounts in
+        Slurm (actual) match those in ColdFront (desired)."""
+        cluster = self.cluster_name
+        for name in sorted(account_names):
+            wanted, existing = desired.get(name), actual.get(name)
+            if wanted is None:
+                if existing is not None:
+                    for username in sorted(self._filter_users(existing)):
+                        self.batch.remove_assoc(username, cluster, name)
+                    self.batch.remove_account(cluster, name)
+                continue
+
+            if existing is None:
+                self.batch.add_account(
+                    cluster, name, specs=self._spec_list(self.export.accounts[name])
+                )
+                existing = set()
+            for username in sorted(self._filter_users(wanted.keys() - existing)):
+                self.batch.add_assoc(
+                    username, cluster, name, specs=self._spec_list(wanted[username])
+                )
+            for username in sorted(self._filter_users(existing - wanted.keys())):
+                self.batch.remove_assoc(username, cluster, name)
+
+    def _dumped_account_users(self):
+        """Return a dict mapping each account in a sacctmgr dump of the
+        cluster to the set of its users."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "cluster.cfg")
+            slurm_dump_cluster(self.cluster_name, fname)
+            with open(fname) as fh:
+                slurm_cluster = SlurmCluster.new_from_stream(fh)
+        return {
+            name: set(account.users) for name, account in slurm_cluster.accounts.items()
+        }
+
+    @staticmethod
+    def _filter_accounts(account_names):
+        return set(account_names) - {"root", ""} - set(SLURM_IGNORE_ACCOUNTS)
+
+    @staticmethod
+    def _filter_users(usernames):
+        return set(usernames) - {"root"} - set(SLURM_IGNORE_USERS)
+
+    @staticmethod
+    def _spec_list(specs):
+        """Return the sorted, unique, colon-separated Slurm specs in the
+        given list."""
+        return sorted({item for spec in specs for item in spec.split(":") if item})
+
+
+def account_names_of_allocations(allocation_ids):
+    """Return the names of the Slurm accounts that the Allocations with
+    the given IDs have, or have had."""
+    allocation_ids = list(allocation_ids)
+    kwargs = {
+        "allocation_id__in": allocation_ids,
+        "allocation_attribute_type__name": SLURM_ACCOUNT_ATTRIBUTE_NAME,
+    }
+    names = set(
+        AllocationAttribute.history.filter(**kwargs).values_list("value", flat=True)
+    )
+    names |= set(
+        AllocationAttribute.objects.filter(**kwargs).values_list("value", flat=True)
+    )
+    return names - {""}
+
+
+def changed_allocation_ids(since):
+    """Return the IDs of the Allocations that were changed, or had users
+    or Slurm attributes changed, after the given time."""
+    allocation_ids = set(
+        Allocation.history.filter(history_date__gt=since).values_list("id", flat=True)
+    )
+    allocation_ids |= set(
+        AllocationUser.history.filter(history_date__gt=since).values_list(
+            "allocation_id", flat=True
+        )
+    )
+    allocation_ids |= set(
+        AllocationAttribute.history.filter(
+            history_date__gt=since,
+            allocation_attribute_type__name__in=SYNC_ATTRIBUTE_NAMES,
+        ).values_list("allocation_id", flat=True)
+    )
+    return allocation_ids
+
+
+def changed_account_names(since):
+    """Return the names of the Slurm accounts of Allocations that were
+    changed, or had users or Slurm attributes changed, after the given
+    time."""
+    allocation_ids = changed_allocation_ids(since)
+    if not allocation_ids:
+        return set()
+    return account_names_of_allocations(allocation_ids)
+
+
+def sync_cluster(resource, full=False, noop=False):
+    """Push the changes to the associations of the given cluster
+    Resource since its last sync, or all of its associations, if `full`
+    is True or a full reconcile is due. Return the applied SlurmBatch,
+    or None if the cluster is ignored. Raise a SlurmError if Slurm
+    cannot be read or updated, in which case the changes are retried by
+    the next sync."""
+    started = timezone.now()
+    cache_key = _sync_state_cache_key(resource)
+    state = cache.get(cache_key) or {}
+    last_synced = state.get("last_synced")
+    last_full_sync = state.get("last_full_sync")
+    if not full and last_synced is None:
+        logger.warning(
+            "No previous sync of resource %s found in the cache; running a full "
+            "reconcile. The cache must be shared and persistent for "
+            "incremental syncs.",
+            resource,
+        )
+    if not full:
+        full = (
+            last_synced is None
+            or last_full_sync is None
+            or started - last_full_sync
+            >= timedelta(hours=SLURM_SYNC_FULL_RECONCILE_HOURS)
+        )
+
+    if full:
+        account_names = None
+    else:
+        account_names = changed_account_names(
+            last_synced - timedelta(seconds=SLURM_SYNC_OVERLAP_SECONDS)
+        )
+
+    if full or account_names:
+        sync = SlurmAssociationSync(resource, noop=noop)
+        if sync.cluster_name in SLURM_IGNORE_CLUSTERS:
+            logger.warning("Ignoring cluster %s.", sync.cluster_name)
+            return None
+        if full:
+            batch = sync.sync_all()
+        else:
+            batch = sync.sync_accounts(account_names)
+    else:
+        batch = SlurmBatch()
+
+    if not noop:
+        state["last_synced"] = started
+        if full:
+            state["last_full_sync"] = started
+        cache.set(cache_key, state, timeout=None)
+    return batch
+
+
+def sync_allocations(allocation_ids, noop=False):
+    """Push the accounts of the Allocations with the given IDs to each
+    Slurm cluster that they, or the partitions they are for, belong to,
+    listing the accounts in each cluster once. Raise a SlurmError if
+    Slurm cannot be read or updated."""
+    allocation_ids_by_resource = defaultdict(set)
+    for (
+        allocation_id,
+        resource_id,
+        parent_id,
+    ) in Allocation.resources.through.objects.filter(
+        allocation_id__in=set(allocation_ids)
+    ).values_list("allocation_id", "resource_id", "resource__parent_resource_id"):
+        allocation_ids_by_resource[resource_id].add(allocation_id)
+        if parent_id is not None:
+            allocation_ids_by_resource[parent_id].add(allocation_id)
+    if not allocation_ids_by_resource:
+        return
+
+    clusters = Resource.objects.filter(
+        id__in=allocation_ids_by_resource,
+        resourceattribute__resource_attribute_type__name=SLURM_CLUSTER_ATTRIBUTE_NAME,
+    ).distinct()
+    for resource in clusters:
+        account_names = account_names_of_allocations(
+            allocation_ids_by_resource[resource.pk]
+        )
+        if not account_names:
+            continue
+        sync = SlurmAssociationSync(resource, noop=noop)
+        if sync.cluster_name not in SLURM_IGNORE_CLUSTERS:
+            sync.sync_accounts(account_names)
+
+
+def sync_allocation(allocation_id, noop=False):
+    """Push the accounts of the Allocation with the given ID to each
+    Slurm cluster that it, or the partition it is for, belongs to.
+    Raise a SlurmError if Slurm cannot be read or updated."""
+    sync_allocations([allocation_id], noop=noop)
+
+
+def sync_changed_allocations(since, noop=False):
+    """Push the accounts of the Allocations changed after the given
+    time (an ISO 8601 string), as sync_allocations does."""
+    allocation_ids = changed_allocation_ids(parse_datetime(since))
+    if allocation_ids:
+        sync_allocations(allocation_ids, noop=noop)
+
+
+def schedule_flush():
+    """Schedule a sync of the Allocations changed up to now to run in
+    SLURM_SYNC_COALESCE_SECONDS seconds, unless one is already pending,
+    in which case it covers them."""
+    if Schedule.objects.filter(name=FLUSH_SCHEDULE_NAME).exists():
+        return
+    now = timezone.now()
+    since = now - timedelta(seconds=FLUSH_OVERLAP_SECONDS)
+    try:
+        schedule(
+            FLUSH_TASK,
+            since=since.isoformat(),
+            name=FLUSH_SCHEDULE_NAME,
+            schedule_type=Schedule.ONCE,
+            next_run=now + timedelta(seconds=SLURM_SYNC_COALESCE_SECONDS),
+        )
+    except IntegrityError:
+        # Another process scheduled a flush concurrently.
+        pass
+
+
+def _sync_state_cache_key(resource):
+    return f"slurm_sync:{resource.pk}"
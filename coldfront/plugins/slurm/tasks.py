@@ -0,0 +1,36 @@
+import logging
+
+from coldfront.core.utils.common import import_from_settings
+from coldfront.plugins.slurm.sync import sync_allocation, sync_changed_allocations
+from coldfront.plugins.slurm.utils import SlurmError
+
+SLURM_NOOP = import_from_settings("SLURM_NOOP", False)
+
+logger = logging.getLogger(__name__)
+
+
+def sync_allocation_associations(allocation_pk):
+    """Push the Slurm accounts of the Allocation with the given primary
+    key. Failures are left to the next scheduled sync."""
+    try:
+        sync_allocation(allocation_pk, noop=SLURM_NOOP)
+    except SlurmError as e:
+        logger.error(
+            "Failed syncing Slurm associations for allocation %s: %s",
+            allocation_pk,
+            e,
+        )
+
+
+def flush_allocation_changes(since):
+    """Push the Slurm accounts of Allocations changed after the given
+    time (an ISO 8601 string), as scheduled by sync.schedule_flush.
+    Failures are left to the next scheduled sync."""
+    try:
+        sync_changed_allocations(since, noop=SLURM_NOOP)
+    except SlurmError as e:
+        logger.error(
+            "Failed syncing Slurm associations of allocations changed since %s: %s",
+            since,
+            e,
+        )
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""A stand-in for sacctmgr, for testing commands that run it.
+
+The state of the cluster is the sacctmgr dump file named by
+FAKE_SACCTMGR_DUMP. The fake supports:
+    - "dump <cluster> file=<path>", which copies the dump to <path>;
+    - "list associations Cluster=<cluster> Account=<accounts>", which
+      prints "account|user" rows, as with -n -P Format=Account,User; and
+    - commands read from standard input, one per line, which create and
+      delete accounts and users, and remove QOS from users, updating the
+      dump.
+
+Each invocation is appended, as a JSON object with its arguments and
+standard input, to the file named by FAKE_SACCTMGR_LOG. If
+FAKE_SACCTMGR_EXIT_STATUS is set to a nonzero value, the fake writes
+FAKE_SACCTMGR_STDOUT to standard output and FAKE_SACCTMGR_STDERR to
+standard error, and exits with that status, without doing anything else.
+
+To use it in place of sacctmgr, set SLURM_SACCTMGR_PATH to this file.
+"""
+
+import json
+import os
+import re
+import shlex
+import shutil
+import sys
+
+
+class FakeCluster:
+    """The accounts and users in a sacctmgr dump file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = []
+        # Map each account to its "Account" line, and each parent account
+        # to a dict mapping each of its users to its "User" line.
+        self.accounts = {}
+        self.parents = {"root": {}}
+        if not os.path.exists(path):
+            return
+        parent = None
+        with open(path) as fh:
+            for line in fh:
+                line = line.rstrip("\n")
+                name = self._name(line)
+                if line.startswith("Account - "):
+                    self.accounts[name] = line
+                elif line.startswith("Parent - "):
+                    parent = name
+                    self.parents.setdefault(parent, {})
+                elif line.startswith("User - "):
+                    self.parents[parent][name] = line
+                elif line:
+                    self.header.append(line)
+
+    def save(self):
+        lines = list(self.header)
+        lines.append("Parent - 'root'")
+        lines.extend(self.parents["root"].values())
+        lines.extend(self.accounts.values())
+        for parent, users in self.parents.items():
+            if parent != "root":
+                lines.append(f"Parent - '{parent}'")
+                lines.extend(users.values())
+        with open(self.path, "w") as fh:
+            fh.write("".join(f"{line}\n" for line in lines))
+
+    def run(self, command):
+        """Apply the given command. Return an error message, or None."""
+        tokens = shlex.split(command)
+        if len(tokens) < 2:
+            return f"Unknown command: {command}"
+        action, entity = tokens[0].lower(), tokens[1].lower()
+        conditions, settings, specs = {}, {}, []
+        target = conditions
+        for token in tokens[2:]:
+            if token.lower() == "where":
+                continue
+            if token.lower() == "set":
+                target = settings
+                continue
+            key, _, value = token.partition("=")
+            if key.lower() in ("name", "cluster", "account") and target is conditions:
+                conditions[key.lower()] = value.split(",")
+            elif target is settings:
+                settings[key] = value
+            else:
+                specs.append(token)
+
+        names = conditions.get("name", [])
+        account = conditions.get("account", [None])[0]
+        if (action, entity) == ("create", "account"):
+            for name in names:
+                self.accounts[name] = ":".join([f"Account - '{name}'", *specs])
+                self.parents.setdefault(name, {})
+        elif (action, entity) == ("create", "user"):
+            if account not in self.parents:
+                return f"Account {account} does not exist"
+            for name in names:
+                self.parents[account][name] = ":".join([f"User - '{name}'", *specs])
+        elif (action, entity) == ("delete", "user"):
+            for name in names:
+                self.parents.get(account, {}).pop(name, None)
+        elif (action, entity) == ("delete", "account"):
+            for name in names:
+                self.accounts.pop(name, None)
+                self.parents.pop(name, None)
+        elif (action, entity) == ("modify", "user"):
+            removed = set(settings.get("QOS-", "").split(","))
+            for name in names:
+                line = self.parents.get(account, {}).get(name)
+                if line is not None:
+                    self.parents[account][name] = self._remove_qos(line, removed)
+        else:
+            return f"Unknown command: {command}"
+        return None
+
+    def list_associations(self, accounts):
+        rows = []
+        for account in accounts:
+            if account in self.accounts:
+                rows.append(f"{account}|")
+                rows.extend(f"{account}|{user}" for user in self.parents[account])
+        return "".join(f"{row}\n" for row in rows)
+
+    @staticmethod
+    def _name(line):
+        match = re.match(r"^\w+ - '([^']+)'", line)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _remove_qos(line, removed):
+        parts = line.split(":")
+        for i, part in enumerate(parts):
+            if part.startswith("QOS="):
+                qos = [
+                    q
+                    for q in part[len("QOS=") :].strip("'").split(",")
+                    if q.lstrip("+") not in removed
+                ]
+                parts[i] = "QOS='" + ",".join(qos) + "'"
+        return ":".join(parts)
+
+
+def main(argv):
+    stdin = "" if sys.stdin.isatty() else sys.stdin.read()
+
+    log_path = os.environ.get("FAKE_SACCTMGR_LOG")
+    if log_path:
+        with open(log_path, "a") as fh:
+            fh.write(json.dumps({"args": argv, "stdin": stdin}) + "\n")
+
+    exit_status = int(os.environ.get("FAKE_SACCTMGR_EXIT_STATUS", 0))
+    if exit_status:
+        sys.stdout.write(os.environ.get("FAKE_SACCTMGR_STDOUT", ""))
+        sys.stderr.write(os.environ.get("FAKE_SACCTMGR_STDERR", ""))
+        return exit_status
+
+    dump_path = os.environ["FAKE_SACCTMGR_DUMP"]
+    args = [arg for arg in argv if not arg.startswith("-")]
+    if args and args[0] == "dump":
+        for arg in args[1:]:
+            if arg.startswith("file="):
+                shutil.copyfile(dump_path, arg[len("file=") :])
+        return 0
+
+    cluster = FakeCluster(dump_path)
+    if args[:2] == ["list", "associations"]:
+        for arg in args[2:]:
+            key, _, value = arg.partition("=")
+            if key.lower() == "account":
+                sys.stdout.write(cluster.list_associations(value.split(",")))
+        return 0
+
+    for command in stdin.splitlines():
+        error = cluster.run(command)
+        if error:
+            sys.stderr.write(f"{error}\n")
+            return 1
+    cluster.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,188 @@
+"""Shared pytest fixtures for Slurm plugin tests."""
+
+import json
+import os
+
+from django.contrib.auth.models import User
+import pytest
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationAttributeType,
+    AllocationStatusChoice,
+    AllocationUser,
+    AllocationUserStatusChoice,
+)
+from coldfront.core.project.models import Project, ProjectStatusChoice
+from coldfront.core.resource.models import (
+    AttributeType,
+    Resource,
+    ResourceAttribute,
+    ResourceAttributeType,
+    ResourceType,
+)
+from coldfront.plugins.slurm import utils as slurm_utils
+
+FAKE_SACCTMGR_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fake_sacctmgr.py"
+)
+
+
+def _resource_attribute_type(name):
+    return ResourceAttributeType.objects.get_or_create(
+        name=name, defaults={"attribute_type": AttributeType.objects.get(name="Text")}
+    )[0]
+
+
+def build_cluster(num_accounts, users_per_account):
+    """Create a cluster Resource with one partition, and, for each of
+    the given number of accounts, an active Allocation to the cluster
+    with the given number of active users, and every other one also
+    allocated to the partition. Return the cluster Resource."""
+    cluster = Resource.objects.create(
+        name="export-cluster",
+        description="",
+        resource_type=ResourceType.objects.get(name="Cluster"),
+    )
+    partition = Resource.objects.create(
+        name="export-partition",
+        description="",
+        parent_resource=cluster,
+        resource_type=ResourceType.objects.get(name="Cluster Partition"),
+    )
+    ResourceAttribute.objects.bulk_create(
+        [
+            ResourceAttribute(
+                resource=resource,
+                resource_attribute_type=_resource_attribute_type(name),
+                value=value,
+            )
+            for resource, name, value in [
+                (cluster, "slurm_cluster", "export"),
+                (cluster, "slurm_specs", "Fairshare=1"),
+                (cluster, "slurm_user_specs", "Fairshare=parent"),
+                (partition, "slurm_specs", "QOS=+gpu"),
+                (partition, "slurm_user_specs", "QOS=+gpu_user"),
+            ]
+        ]
+    )
+
+    project = Project.objects.create(
+        name="export_project",
+        title="export_project",
+        status=ProjectStatusChoice.objects.get(name="Active"),
+    )
+    active = AllocationStatusChoice.objects.get(name="Active")
+    allocations = Allocation.objects.bulk_create(
+        [Allocation(project=project, status=active) for _ in range(num_accounts + 1)]
+    )
+    # The last Allocation is inactive, and should be excluded.
+    allocations[-1].status = AllocationStatusChoice.objects.get(name="Expired")
+    allocations[-1].save()
+
+    Through = Allocation.resources.through
+    Through.objects.bulk_create(
+        [Through(allocation=a, resource=cluster) for a in allocations]
+        + [Through(allocation=a, resource=partition) for a in allocations[::2]]
+    )
+
+    attribute_types = {
+        name: AllocationAttributeType.objects.get(name=name)
+        for name in ("slurm_account_name", "slurm_specs", "slurm_user_specs")
+    }
+    AllocationAttribute.objects.bulk_create(
+        [
+            AllocationAttribute(
+                allocation=allocation,
+                allocation_attribute_type=attribute_types[name],
+                value=value,
+            )
+            for i, allocation in enumerate(allocations)
+            for name, value in [
+                ("slurm_account_name", f"account_{i:06}"),
+                ("slurm_specs", f"Description='account {i}'"),
+                ("slurm_user_specs", f"DefaultAccount=account_{i:06}"),
+            ]
+        ]
+    )
+
+    users = User.objects.bulk_create(
+        [User(username=f"export_user{i:06}") for i in range(users_per_account * 2)]
+    )
+    active_user = AllocationUserStatusChoice.objects.get(name="Active")
+    removed_user = AllocationUserStatusChoice.objects.get(name="Removed")
+    AllocationUser.objects.bulk_create(
+        [
+            AllocationUser(
+                allocation=allocation,
+                # Overlap users between adjacent accounts.
+                user=users[(i + j) % len(users)],
+                status=active_user,
+            )
+            for i, allocation in enumerate(allocations)
+            for j in range(users_per_account)
+        ]
+        # A removed user, who should be excluded.
+        + [
+            AllocationUser(
+                allocation=allocations[0], user=users[-1], status=removed_user
+            )
+        ]
+    )
+    return cluster
+
+
+@pytest.fixture
+def build_slurm_cluster():
+    """Return a function that creates a cluster Resource, with
+    Allocations and users, for the Slurm cluster named "export"."""
+    return build_cluster
+
+
+class FakeSacctmgr:
+    """A handle on the fake sacctmgr, for configuring its behavior and
+    inspecting its invocations."""
+
+    def __init__(self, monkeypatch, tmp_path):
+        self._monkeypatch = monkeypatch
+        self.log_path = tmp_path / "sacctmgr.log"
+        self.dump_path = tmp_path / "sacctmgr.dump"
+        monkeypatch.setenv("FAKE_SACCTMGR_LOG", str(self.log_path))
+        monkeypatch.setenv("FAKE_SACCTMGR_DUMP", str(self.dump_path))
+
+    @property
+    def invocations(self):
+        """Return a list of (args, stdin) pairs, one per invocation."""
+        if not self.log_path.exists():
+            return []
+        with open(self.log_path) as fh:
+            return [(entry["args"], entry["stdin"]) for entry in map(json.loads, fh)]
+
+    @property
+    def dump(self):
+        """Return the current state of the cluster, as a dump."""
+        return self.dump_path.read_text()
+
+    def set_dump(self, contents):
+        """Set the initial state of the cluster, as a dump."""
+        self.dump_path.write_text(contents)
+
+    def set_exit_status(self, status, stdout="", stderr=""):
+        self._monkeypatch.setenv("FAKE_SACCTMGR_EXIT_STATUS", str(status))
+        self._monkeypatch.setenv("FAKE_SACCTMGR_STDOUT", stdout)
+        self._monkeypatch.setenv("FAKE_SACCTMGR_STDERR", stderr)
+
+
+@pytest.fixture
+def fake_sacctmgr(monkeypatch, tmp_path):
+    """Run the fake sacctmgr in place of sacctmgr."""
+    for name in ("SLURM_CMD_DUMP_CLUSTER", "SLURM_CMD_LIST_ACCOUNT_ASSOCIATIONS"):
+        command = getattr(slurm_utils, name)
+        monkeypatch.setattr(
+            slurm_utils,
+            name,
+            command.replace(slurm_utils.SLURM_SACCTMGR_PATH, FAKE_SACCTMGR_PATH, 1),
+        )
+    monkeypatch.setattr(slurm_utils, "SLURM_SACCTMGR_PATH", FAKE_SACCTMGR_PATH)
+    return FakeSacctmgr(monkeypatch, tmp_path)
@@ -0,0 +1,145 @@
+"""Tests for the bulk export of Slurm associations from ColdFront
+Resources (SlurmAssociationExport)."""
+
+from io import StringIO
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from coldfront.core.project.models import Project
+from coldfront.core.resource.models import Resource, ResourceType
+from coldfront.plugins.slurm.associations import SlurmCluster
+
+# Set to a number of associations (e.g., 100000) to run the benchmark.
+BENCHMARK_ASSOCIATIONS = int(os.environ.get("SLURM_EXPORT_BENCHMARK_ASSOCIATIONS", 0))
+
+
+def build_reference_cluster(resource):
+    """Return a SlurmCluster built one Allocation at a time."""
+    cluster = SlurmCluster(
+        resource.get_attribute("slurm_cluster"),
+        resource.get_attribute_list("slurm_specs"),
+    )
+    for allocation in resource.allocation_set.filter(status__name="Active"):
+        cluster.add_allocation(
+            allocation, user_specs=resource.get_attribute_list("slurm_user_specs")
+        )
+    for partition in Resource.objects.filter(parent_resource=resource):
+        for allocation in partition.allocation_set.filter(status__name="Active"):
+            cluster.add_allocation(
+                allocation,
+                specs=partition.get_attribute_list("slurm_specs"),
+                user_specs=partition.get_attribute_list("slurm_user_specs"),
+            )
+    return cluster
+
+
+def summarize(cluster):
+    """Return a comparable summary of the accounts, users, and specs of
+    the given SlurmCluster."""
+    return (
+        cluster.name,
+        sorted(cluster.spec_list()),
+        {
+            name: (
+                sorted(account.spec_list()),
+                {
+                    user_name: sorted(user.spec_list())
+                    for user_name, user in account.users.items()
+                },
+            )
+            for name, account in cluster.accounts.items()
+        },
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSlurmAssociationExport:
+    """Tests for exporting Slurm associations in bulk."""
+
+    def test_matches_per_allocation_export(self, build_slurm_cluster):
+        """Test that the bulk export is equivalent to adding each
+        Allocation individually."""
+        resource = build_slurm_cluster(num_accounts=6, users_per_account=3)
+        expected = summarize(build_reference_cluster(resource))
+
+        cluster = SlurmCluster.new_from_resource(resource)
+        assert summarize(cluster) == expected
+        assert "account_000006" not in cluster.accounts
+        assert "export_user000005" not in cluster.accounts["account_000000"].users
+
+    def test_streamed_dump_round_trips(self, build_slurm_cluster):
+        """Test that the streamed dump parses to the same cluster."""
+        resource = build_slurm_cluster(num_accounts=6, users_per_account=3)
+        expected = summarize(build_reference_cluster(resource))
+
+        out = StringIO()
+        SlurmCluster.write_from_resource(resource, out)
+        parsed = SlurmCluster.new_from_stream(StringIO(out.getvalue()))
+
+        # The parsed dump also includes the default root account and user.
+        parsed.accounts.pop("root")
+        assert summarize(parsed) == expected
+
+    @pytest.mark.parametrize("write", [False, True])
+    def test_fixed_number_of_queries(self, build_slurm_cluster, write):
+        """Test that the number of queries does not depend on the number
+        of Allocations or users."""
+        counts = []
+        for num_accounts in (2, 20):
+            Resource.objects.filter(name__startswith="export-").delete()
+            Project.objects.filter(name="export_project").delete()
+            User.objects.filter(username__startswith="export_user").delete()
+            resource = build_slurm_cluster(
+                num_accounts=num_accounts, users_per_account=5
+            )
+            with CaptureQueriesContext(connection) as context:
+                if write:
+                    SlurmCluster.write_from_resource(resource, StringIO())
+                else:
+                    SlurmCluster.new_from_resource(resource)
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1]
+
+    def test_missing_cluster_name(self):
+        """Test that a Resource without a cluster name is rejected."""
+        resource = Resource.objects.create(
+            name="export-unnamed",
+            description="",
+            resource_type=ResourceType.objects.get(name="Cluster"),
+        )
+        with pytest.raises(Exception, match="missing slurm_cluster"):
+            SlurmCluster.new_from_resource(resource)
+
+
+@pytest.mark.skipif(
+    not BENCHMARK_ASSOCIATIONS,
+    reason="Set SLURM_EXPORT_BENCHMARK_ASSOCIATIONS to run the benchmark.",
+)
+@pytest.mark.django_db
+@pytest.mark.component
+def test_benchmark_export(build_slurm_cluster, capsys):
+    """Time the streamed export of BENCHMARK_ASSOCIATIONS associations
+    (e.g., 100000), split across accounts of 50 users each."""
+    users_per_account = 50
+    resource = build_slurm_cluster(
+        num_accounts=max(BENCHMARK_ASSOCIATIONS // users_per_account, 1),
+        users_per_account=users_per_account,
+    )
+    out = StringIO()
+    with CaptureQueriesContext(connection) as context:
+        start = time.perf_counter()
+        SlurmCluster.write_from_resource(resource, out)
+        elapsed = time.perf_counter() - start
+    num_users = out.getvalue().count("\nUser - ")
+    with capsys.disabled():
+        print(
+            f"\nExported {num_users} associations in {elapsed:.2f}s with "
+            f"{len(context.captured_queries)} queries."
+        )
+    assert num_users >= BENCHMARK_ASSOCIATIONS
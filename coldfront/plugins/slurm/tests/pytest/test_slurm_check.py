@@ -0,0 +1,137 @@
+"""Tests for the slurm_check management command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from coldfront.plugins.slurm import utils as slurm_utils
+from coldfront.plugins.slurm.associations import SlurmCluster
+from coldfront.plugins.slurm.management.commands.slurm_check import Command
+
+# A dump of the "export" cluster, which, compared to ColdFront (see
+# build_cluster), has an extra QOS, an extra user in an active account, and
+# two accounts that do not exist in ColdFront.
+SLURM_DUMP = """\
+Cluster - 'export':Fairshare=1
+Parent - 'root'
+User - 'root':DefaultAccount='root':AdminLevel='Administrator':Fairshare=1
+Account - 'account_000000'
+Account - 'account_000001'
+Account - 'stale_a'
+Account - 'stale_b'
+Parent - 'account_000000'
+User - 'export_user000000':QOS='+gpu_user,+old'
+User - 'export_user000001'
+User - 'intruder'
+Parent - 'account_000001'
+User - 'export_user000001'
+User - 'export_user000002'
+Parent - 'stale_a'
+User - 'intruder'
+User - 'export_user000000'
+Parent - 'stale_b'
+User - 'intruder'
+"""
+
+EXPECTED_SCRIPT = """\
+modify user where name=export_user000000 cluster=export account=account_000000 set QOS-=old
+delete user where name=intruder cluster=export account=account_000000
+delete user where name=export_user000000,intruder cluster=export account=stale_a
+delete user where name=intruder cluster=export account=stale_b
+delete account where name=stale_a,stale_b cluster=export
+"""
+
+
+@pytest.fixture
+def dump_path(build_slurm_cluster, tmp_path):
+    build_slurm_cluster(num_accounts=3, users_per_account=2)
+    path = tmp_path / "export.cfg"
+    path.write_text(SLURM_DUMP)
+    return str(path)
+
+
+def slurm_check(**options):
+    # The plugin is not necessarily installed, so pass the command itself.
+    out = StringIO()
+    call_command(Command(), stdout=out, **options)
+    return sorted(out.getvalue().splitlines())
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSlurmCheckBatch:
+    """Tests for applying the changes found by slurm_check in a single
+    sacctmgr process."""
+
+    def test_batch_applied_once(self, dump_path, fake_sacctmgr):
+        """Test that all changes are passed to a single sacctmgr
+        process, and that the same changes are reported as without
+        syncing."""
+        expected_rows = slurm_check(input=dump_path)
+        assert len(expected_rows) == 7
+
+        rows = slurm_check(input=dump_path, sync=True, batch=True)
+        assert rows == expected_rows
+
+        [(args, stdin)] = fake_sacctmgr.invocations
+        assert args == ["-Q", "-i"]
+        assert stdin == EXPECTED_SCRIPT
+
+    def test_batch_chunked(self, dump_path, fake_sacctmgr, monkeypatch):
+        """Test that commands list a limited number of names."""
+        monkeypatch.setattr(slurm_utils, "SLURM_BATCH_MAX_NAMES", 1)
+        slurm_check(input=dump_path, sync=True, batch=True)
+
+        [(_, stdin)] = fake_sacctmgr.invocations
+        commands = stdin.splitlines()
+        assert len(commands) == 7
+        assert "delete account where name=stale_a cluster=export" in commands
+        assert "delete account where name=stale_b cluster=export" in commands
+
+    def test_noop_preview(self, dump_path, fake_sacctmgr, tmp_path):
+        """Test that, with --noop, the script is written but not run."""
+        script_path = tmp_path / "script.txt"
+        slurm_check(
+            input=dump_path, sync=True, batch=True, noop=True, script=str(script_path)
+        )
+        assert script_path.read_text() == EXPECTED_SCRIPT
+        assert fake_sacctmgr.invocations == []
+
+    def test_nothing_to_apply(self, build_slurm_cluster, fake_sacctmgr, tmp_path):
+        """Test that sacctmgr is not run if there are no changes."""
+        resource = build_slurm_cluster(num_accounts=3, users_per_account=2)
+        path = tmp_path / "export.cfg"
+        with open(path, "w") as fh:
+            SlurmCluster.write_from_resource(resource, fh)
+
+        assert slurm_check(input=str(path), sync=True, batch=True) == []
+        assert fake_sacctmgr.invocations == []
+
+    def test_failure(self, dump_path, fake_sacctmgr):
+        """Test that the command fails if sacctmgr fails."""
+        fake_sacctmgr.set_exit_status(1, stdout="Error")
+        with pytest.raises(SystemExit):
+            slurm_check(input=dump_path, sync=True, batch=True)
+        assert len(fake_sacctmgr.invocations) == 1
+
+    def test_benign_failure(self, dump_path, fake_sacctmgr):
+        """Test that the command succeeds if sacctmgr only reports
+        commands that had nothing to do."""
+        fake_sacctmgr.set_exit_status(
+            1, stdout=" Nothing deleted\n Nothing new added\n"
+        )
+        slurm_check(input=dump_path, sync=True, batch=True)
+        assert len(fake_sacctmgr.invocations) == 1
+
+    def test_benign_and_real_failure(self, dump_path, fake_sacctmgr):
+        """Test that the command fails if sacctmgr reports a real error
+        along with a command that had nothing to do."""
+        fake_sacctmgr.set_exit_status(
+            1,
+            stdout=" Nothing deleted\n",
+            stderr=" Error: Account stale_a does not exist\n",
+        )
+        with pytest.raises(SystemExit):
+            slurm_check(input=dump_path, sync=True, batch=True)
+        assert len(fake_sacctmgr.invocations) == 1
@@ -0,0 +1,332 @@
+"""Tests for pushing Slurm associations from ColdFront to Slurm."""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils import timezone
+from django_q.models import Schedule
+import pytest
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationStatusChoice,
+    AllocationUser,
+    AllocationUserStatusChoice,
+)
+from coldfront.core.resource.models import Resource
+from coldfront.plugins.slurm import sync as slurm_sync
+from coldfront.plugins.slurm.associations import SlurmCluster
+from coldfront.plugins.slurm.management.commands.slurm_sync import Command
+from coldfront.plugins.slurm.sync import (
+    sync_allocation,
+    sync_changed_allocations,
+    sync_cluster,
+)
+from coldfront.plugins.slurm.utils import SlurmError
+
+# The "export" cluster in Slurm, which, compared to ColdFront (see
+# build_cluster), has an extra user in an account, is missing two accounts,
+# and has an account that does not exist in ColdFront.
+SLURM_DUMP = """\
+Cluster - 'export':Fairshare=1
+Parent - 'root'
+User - 'root':DefaultAccount='root':AdminLevel='Administrator':Fairshare=1
+Account - 'account_000000'
+Account - 'stale'
+Parent - 'account_000000'
+User - 'export_user000000'
+User - 'intruder'
+Parent - 'stale'
+User - 'intruder'
+"""
+
+
+@pytest.fixture
+def resource(build_slurm_cluster, fake_sacctmgr, locmem_cache, monkeypatch):
+    """Return a cluster Resource, whose cluster in Slurm has drifted."""
+    # Only consider changes made by the test.
+    monkeypatch.setattr(slurm_sync, "SLURM_SYNC_OVERLAP_SECONDS", 0)
+    fake_sacctmgr.set_dump(SLURM_DUMP)
+    return build_slurm_cluster(num_accounts=3, users_per_account=2)
+
+
+@pytest.fixture
+def slurm_signals():
+    """Connect the signal receivers of the plugin for the duration of a
+    test, and return their module."""
+    # The receivers are connected on import, which only happens when
+    # SLURM_ENABLE_SIGNALS is set, so the module is not imported above.
+    from coldfront.plugins.slurm import signals
+
+    receivers = [
+        (pre_save, Allocation, signals.record_allocation_status),
+        (post_save, Allocation, signals.sync_allocation),
+        (m2m_changed, Allocation.resources.through, signals.sync_allocation_resources),
+        (post_save, AllocationUser, signals.sync_allocation_user),
+        (post_delete, AllocationUser, signals.sync_allocation_user),
+        (post_save, AllocationAttribute, signals.sync_allocation_attribute),
+        (post_delete, AllocationAttribute, signals.sync_allocation_attribute),
+    ]
+    for signal, sender, func in receivers:
+        signal.connect(func, sender=sender)
+    yield signals
+    for signal, sender, func in receivers:
+        signal.disconnect(func, sender=sender)
+
+
+def flush_schedules():
+    return Schedule.objects.filter(name=slurm_sync.FLUSH_SCHEDULE_NAME)
+
+
+def account_users(cluster):
+    return {
+        name: set(account.users)
+        for name, account in cluster.accounts.items()
+        if name != "root"
+    }
+
+
+def assert_in_sync(resource, fake_sacctmgr):
+    slurm_cluster = SlurmCluster.new_from_stream(StringIO(fake_sacctmgr.dump))
+    coldfront_cluster = SlurmCluster.new_from_resource(resource)
+    assert account_users(slurm_cluster) == account_users(coldfront_cluster)
+
+
+def add_allocation_user(account_name, username):
+    allocation = AllocationAttribute.objects.get(value=account_name).allocation
+    return AllocationUser.objects.create(
+        allocation=allocation,
+        user=User.objects.create(username=username),
+        status=AllocationUserStatusChoice.objects.get(name="Active"),
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSyncCluster:
+    """Tests for sync_cluster."""
+
+    def test_first_sync_is_full(self, resource, fake_sacctmgr):
+        """Test that, without a previous sync, all associations are
+        reconciled, in one sacctmgr process after the dump."""
+        batch = sync_cluster(resource)
+        assert batch.commands() == [
+            (
+                "create account name=account_000001 cluster=export "
+                "Description='account 1'"
+            ),
+            (
+                "create account name=account_000002 cluster=export "
+                "Description='account 2' QOS=+gpu"
+            ),
+            (
+                "create user name=export_user000001 cluster=export "
+                "account=account_000000 DefaultAccount=account_000000 "
+                "Fairshare=parent QOS=+gpu_user"
+            ),
+            (
+                "create user name=export_user000001,export_user000002 "
+                "cluster=export account=account_000001 "
+                "DefaultAccount=account_000001 Fairshare=parent"
+            ),
+            (
+                "create user name=export_user000002,export_user000003 "
+                "cluster=export account=account_000002 "
+                "DefaultAccount=account_000002 Fairshare=parent QOS=+gpu_user"
+            ),
+            "delete user where name=intruder cluster=export account=account_000000",
+            "delete user where name=intruder cluster=export account=stale",
+            "delete account where name=stale cluster=export",
+        ]
+        [dump, apply] = fake_sacctmgr.invocations
+        assert dump[0][0] == "dump"
+        assert apply[0] == ["-Q", "-i"]
+        assert_in_sync(resource, fake_sacctmgr)
+
+        # A full reconcile of a cluster in sync does nothing.
+        assert not sync_cluster(resource, full=True)
+
+    def test_incremental(self, resource, fake_sacctmgr):
+        """Test that, after a full reconcile, only changed accounts are
+        listed and updated."""
+        sync_cluster(resource)
+        num_invocations = len(fake_sacctmgr.invocations)
+
+        add_allocation_user("account_000001", "new_user")
+        removed = AllocationUser.objects.get(
+            allocation__allocationattribute__value="account_000002",
+            user__username="export_user000003",
+        )
+        removed.status = AllocationUserStatusChoice.objects.get(name="Removed")
+        removed.save()
+
+        batch = sync_cluster(resource)
+        assert batch.commands() == [
+            (
+                "create user name=new_user cluster=export account=account_000001 "
+                "DefaultAccount=account_000001 Fairshare=parent"
+            ),
+            (
+                "delete user where name=export_user000003 cluster=export "
+                "account=account_000002"
+            ),
+        ]
+        [list_, _] = fake_sacctmgr.invocations[num_invocations:]
+        assert "Account=account_000001,account_000002" in list_[0]
+        assert_in_sync(resource, fake_sacctmgr)
+
+        # Without changes, Slurm is not read.
+        num_invocations = len(fake_sacctmgr.invocations)
+        assert not sync_cluster(resource)
+        assert len(fake_sacctmgr.invocations) == num_invocations
+
+    def test_full_reconcile_due(self, resource, fake_sacctmgr, monkeypatch):
+        """Test that a full reconcile runs periodically."""
+        sync_cluster(resource)
+        monkeypatch.setattr(slurm_sync, "SLURM_SYNC_FULL_RECONCILE_HOURS", 0)
+        num_invocations = len(fake_sacctmgr.invocations)
+        sync_cluster(resource)
+        [(args, _)] = fake_sacctmgr.invocations[num_invocations:]
+        assert args[0] == "dump"
+
+    def test_failure_retried(self, resource, fake_sacctmgr):
+        """Test that changes that fail to be pushed are retried."""
+        sync_cluster(resource)
+        add_allocation_user("account_000001", "new_user")
+
+        fake_sacctmgr.set_exit_status(1)
+        with pytest.raises(SlurmError):
+            sync_cluster(resource)
+
+        fake_sacctmgr.set_exit_status(0)
+        assert len(sync_cluster(resource).commands()) == 1
+        assert_in_sync(resource, fake_sacctmgr)
+
+    def test_noop(self, resource, fake_sacctmgr):
+        """Test that, with noop, nothing is changed, and the next sync
+        is still full."""
+        assert sync_cluster(resource, noop=True)
+        assert fake_sacctmgr.dump == SLURM_DUMP
+        assert cache.get(f"slurm_sync:{resource.pk}") is None
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSyncAllocation:
+    """Tests for sync_allocation, which runs after an Allocation
+    changes."""
+
+    def test_partition_allocation(self, resource, fake_sacctmgr):
+        """Test that the accounts of an Allocation of a partition are
+        pushed to its cluster."""
+        allocation_user = add_allocation_user("account_000000", "new_user")
+        sync_allocation(allocation_user.allocation_id)
+
+        [(list_args, _), (_, script)] = fake_sacctmgr.invocations
+        assert "Account=account_000000" in list_args
+        assert script.splitlines() == [
+            (
+                "create user name=export_user000001,new_user cluster=export "
+                "account=account_000000 DefaultAccount=account_000000 "
+                "Fairshare=parent QOS=+gpu_user"
+            ),
+            "delete user where name=intruder cluster=export account=account_000000",
+        ]
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestSyncChangedAllocations:
+    """Tests for sync_changed_allocations, which runs after Allocations
+    change, if signals are enabled."""
+
+    def test_one_sync_per_cluster(self, resource, fake_sacctmgr):
+        """Test that the accounts of all changed Allocations, whether
+        of the cluster or of its partition, are listed and updated in
+        one sacctmgr process each."""
+        since = timezone.now().isoformat()
+        add_allocation_user("account_000001", "new_user")
+        add_allocation_user("account_000002", "other_user")
+        sync_changed_allocations(since)
+
+        [(list_args, _), (_, script)] = fake_sacctmgr.invocations
+        assert "Account=account_000001,account_000002" in list_args
+        assert "new_user" in script
+        assert "other_user" in script
+
+    def test_no_changes(self, resource, fake_sacctmgr):
+        """Test that, without changes, Slurm is not read."""
+        sync_changed_allocations(timezone.now().isoformat())
+        assert not fake_sacctmgr.invocations
+
+
+@pytest.mark.django_db
+class TestSignals:
+    """Tests for the signal receivers, which push changes to Slurm."""
+
+    def test_coalesced(
+        self, resource, slurm_signals, django_capture_on_commit_callbacks
+    ):
+        """Test that changes to many users schedule a single sync, which
+        also covers changes made while it is pending."""
+        with django_capture_on_commit_callbacks(execute=True):
+            for i in range(5):
+                add_allocation_user("account_000001", f"new_user{i}")
+        assert flush_schedules().count() == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            add_allocation_user("account_000002", "other_user")
+        [flush] = flush_schedules()
+        assert flush.func == slurm_sync.FLUSH_TASK
+        assert flush.schedule_type == Schedule.ONCE
+
+    def test_allocation_status_changed(
+        self, resource, slurm_signals, django_capture_on_commit_callbacks
+    ):
+        """Test that saving an Allocation only schedules a sync if its
+        status changed."""
+        allocation = AllocationAttribute.objects.get(value="account_000001").allocation
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            allocation.justification = "Updated"
+            allocation.save()
+        assert not callbacks
+        assert not flush_schedules().exists()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            allocation.status = AllocationStatusChoice.objects.get(name="Expired")
+            allocation.save()
+        assert flush_schedules().count() == 1
+
+    def test_resource_added(
+        self, resource, slurm_signals, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        """Test that adding a Resource to an Allocation syncs it."""
+        tasks = []
+        monkeypatch.setattr(
+            slurm_signals, "async_task", lambda *args: tasks.append(args)
+        )
+        allocation = AllocationAttribute.objects.get(value="account_000001").allocation
+        partition = Resource.objects.get(parent_resource=resource)
+        with django_capture_on_commit_callbacks(execute=True):
+            allocation.resources.add(partition)
+        assert tasks == [
+            (
+                "coldfront.plugins.slurm.tasks.sync_allocation_associations",
+                allocation.pk,
+            )
+        ]
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+def test_command(resource, fake_sacctmgr):
+    """Test that the command syncs each cluster, and prints the
+    commands run."""
+    out = StringIO()
+    call_command(Command(), stdout=out)
+    assert len(out.getvalue().splitlines()) == 8
+    assert_in_sync(resource, fake_sacctmgr)
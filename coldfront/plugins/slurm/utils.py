@@ -1,3 +1,4 @@
+from collections import defaultdict
 import csv
 from io import StringIO
 import logging
@@ -42,6 +43,15 @@ SLURM_CMD_BLOCK_ACCOUNT = (
     + " -Q -i modify account {} where Cluster={} set GrpSubmitJobs=0"
 )
 SLURM_CMD_DUMP_CLUSTER = SLURM_SACCTMGR_PATH + " dump {} file={}"
+SLURM_CMD_LIST_ACCOUNT_ASSOCIATIONS = (
+    SLURM_SACCTMGR_PATH
+    + " -n -P list associations Cluster={} Account={} Format=Account,User"
+)
+# The maximum number of names listed in a single batched sacctmgr command.
+SLURM_BATCH_MAX_NAMES = import_from_settings("SLURM_BATCH_MAX_NAMES", 100)
+# Messages that sacctmgr reports, with a nonzero exit status, for commands
+# that had nothing to do, rather than for commands that failed.
+SLURM_BENIGN_MESSAGES = ("Nothing deleted", "Nothing new added")
 
 logger = logging.getLogger(__name__)
 
@@ -145,3 +155,181 @@ def slurm_check_assoc(user, cluster, account):
 def slurm_dump_cluster(cluster, fname, noop=False):
     cmd = SLURM_CMD_DUMP_CLUSTER.format(shlex.quote(cluster), shlex.quote(fname))
     _run_slurm_cmd(cmd, noop=noop)
+
+
+def slurm_list_account_users(cluster, accounts):
+    """Return a dict mapping each of the given accounts that exists in
+    the given cluster to the set of its users, listing up to
+    SLURM_BATCH_MAX_NAMES accounts per sacctmgr command."""
+    users = {}
+    for names in SlurmBatch._chunks(accounts):
+        cmd = SLURM_CMD_LIST_ACCOUNT_ASSOCIATIONS.format(shlex.quote(cluster), names)
+        output = _run_slurm_cmd(cmd, noop=False)
+        for line in output.decode("UTF-8").splitlines():
+            if not line.strip():
+                continue
+            account, user = line.split("|")[:2]
+            account_users = users.setdefault(account, set())
+            if user:
+                account_users.add(user)
+    return users
+
+
+class SlurmBatch:
+    """A set of changes to Slurm associations, applied by a single
+    sacctmgr process instead of one process per change.
+
+    Changes are grouped so that each sacctmgr command applies to up to
+    SLURM_BATCH_MAX_NAMES users or accounts: accounts created with the
+    same specs, users added to the same account with the same specs,
+    users whose associations are removed from the same account, users
+    who lose the same QOS in the same account, and accounts removed from
+    the same cluster. Commands are run in that order, so that accounts
+    exist before users are added to them, and associations are removed
+    before their accounts.
+
+    sacctmgr commits each command as it runs, so applying a batch is not
+    atomic. If applying fails part way through, rerunning the check
+    recomputes and applies only the changes that remain.
+    """
+
+    def __init__(self):
+        # Map (cluster, specs) to the accounts to create with them.
+        self._new_accounts = defaultdict(set)
+        # Map (cluster, account, specs) to the users to add to it.
+        self._new_assocs = defaultdict(set)
+        # Map (cluster, account) to the users to remove from it.
+        self._assocs = defaultdict(set)
+        # Map (cluster, account, qos) to the users to modify.
+        self._qos = defaultdict(set)
+        # Map each cluster to the accounts to remove from it.
+        self._accounts = defaultdict(set)
+
+    def __bool__(self):
+        return bool(
+            self._new_accounts
+            or self._new_assocs
+            or self._assocs
+            or self._qos
+            or self._accounts
+        )
+
+    def add_account(self, cluster, account, specs=None):
+        self._new_accounts[(cluster, tuple(sorted(specs or [])))].add(account)
+
+    def add_assoc(self, user, cluster, account, specs=None):
+        self._new_assocs[(cluster, account, tuple(sorted(specs or [])))].add(user)
+
+    def remove_assoc(self, user, cluster, account):
+        self._assocs[(cluster, account)].add(user)
+
+    def remove_qos(self, user, cluster, account, qos):
+        self._qos[(cluster, account, qos)].add(user)
+
+    def remove_account(self, cluster, account):
+        self._accounts[cluster].add(account)
+
+    def commands(self):
+        """Return the list of sacctmgr commands, without the path to
+        sacctmgr, that apply the batch."""
+        commands = []
+        for (cluster, specs), accounts in sorted(self._new_accounts.items()):
+            for names in self._chunks(accounts):
+                commands.append(
+                    self._with_specs(
+                        f"create account name={names} cluster={shlex.quote(cluster)}",
+                        specs,
+                    )
+                )
+        for (cluster, account, specs), users in sorted(self._new_assocs.items()):
+            for names in self._chunks(users):
+                commands.append(
+                    self._with_specs(
+                        f"create user name={names} cluster={shlex.quote(cluster)} "
+                        f"account={shlex.quote(account)}",
+                        specs,
+                    )
+                )
+        for (cluster, account, qos), users in sorted(self._qos.items()):
+            for names in self._chunks(users):
+                commands.append(
+                    f"modify user where name={names} cluster={shlex.quote(cluster)} "
+                    f"account={shlex.quote(account)} set {shlex.quote(qos)}"
+                )
+        for (cluster, account), users in sorted(self._assocs.items()):
+            for names in self._chunks(users):
+                commands.append(
+                    f"delete user where name={names} cluster={shlex.quote(cluster)} "
+                    f"account={shlex.quote(account)}"
+                )
+        for cluster, accounts in sorted(self._accounts.items()):
+            for names in self._chunks(accounts):
+                commands.append(
+                    f"delete account where name={names} cluster={shlex.quote(cluster)}"
+                )
+        return commands
+
+    def script(self):
+        """Return the batch as a script that may be passed to sacctmgr
+        on standard input."""
+        return "".join(f"{command}\n" for command in self.commands())
+
+    def apply(self, noop=False):
+        """Apply the batch by passing its script to a single sacctmgr
+        process. Raise a SlurmError if sacctmgr fails.
+
+        Unlike a single command, a batch may fail part way through, so a
+        nonzero exit status is only tolerated if every line that
+        sacctmgr output reports a command that had nothing to do."""
+        if not self:
+            return
+        cmd = SLURM_SACCTMGR_PATH + " -Q -i"
+        script = self.script()
+        if noop:
+            logger.warn("NOOP - Slurm cmd: %s", cmd)
+            logger.warn("NOOP - Slurm cmd input:\n%s", script)
+            return
+
+        result = subprocess.run(
+            shlex.split(cmd),
+            input=script.encode("UTF-8"),
+            capture_output=True,
+            check=False,
+        )
+        logger.debug("Slurm cmd output: %s", result.stdout)
+        if result.returncode == 0:
+            return
+
+        lines = [
+            line
+            for output in (result.stdout, result.stderr)
+            for line in output.decode("UTF-8", "replace").splitlines()
+            if line.strip()
+        ]
+        if lines and all(
+            any(message in line for message in SLURM_BENIGN_MESSAGES) for line in lines
+        ):
+            logger.warn("Nothing to do for some batched Slurm commands: %s", lines)
+            return
+
+        logger.error("Batched Slurm commands failed: %s", cmd)
+        raise SlurmError(
+            f"return_value={result.returncode} stdout={result.stdout} "
+            f"stderr={result.stderr}"
+        )
+
+    @staticmethod
+    def _with_specs(command, specs):
+        """Return the given command with the given Slurm specs, which
+        are already in sacctmgr syntax, appended."""
+        return " ".join([command, *specs])
+
+    @staticmethod
+    def _chunks(names):
+        """Yield comma-separated lists of up to SLURM_BATCH_MAX_NAMES of
+        the given names, in sorted order."""
+        names = sorted(names)
+        for i in range(0, len(names), SLURM_BATCH_MAX_NAMES):
+            yield ",".join(
+                shlex.quote(name) for name in names[i : i + SLURM_BATCH_MAX_NAMES]
+            )
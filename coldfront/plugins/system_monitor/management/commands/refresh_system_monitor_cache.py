@@ -0,0 +1,75 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+from django_q.tasks import schedule
+
+from coldfront.plugins.system_monitor.utils import refresh_system_monitor_cache
+
+"""An admin command that fetches the system status page and caches the
+data displayed in the system monitor panel."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch the system status page and cache the data displayed in the "
+        "system monitor panel, or schedule a refresh to occur at a set "
+        "interval."
+    )
+
+    logger = logging.getLogger("coldfront.commands")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            default=False,
+            help="Schedule this command periodically.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=5,
+            help="The number of minutes between scheduled runs.",
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            self._handle_schedule(options["interval"])
+        else:
+            self._handle_synchronous()
+
+    def _handle_schedule(self, interval):
+        """Schedule a synchronous run of this command at the given
+        interval, in minutes. Do nothing if there is already a schedule
+        in place."""
+        # Identify existing tasks by a static name, as opposed to the command
+        # name, which may change.
+        task_name = "refresh_system_monitor_cache"
+        command_name = __name__.rsplit(".", maxsplit=1)[-1]
+
+        task_exists = Schedule.objects.filter(name=task_name).exists()
+        if task_exists:
+            return
+
+        func = "django.core.management.call_command"
+        args = (command_name,)
+        kwargs = {
+            "schedule_type": "I",
+            "minutes": interval,
+            "name": task_name,
+        }
+        schedule(func, *args, **kwargs)
+
+        message = (
+            f"Scheduled a task to refresh the system monitor cache every "
+            f'{interval} minutes, under the name "{task_name}".'
+        )
+        self.logger.info(message)
+
+    def _handle_synchronous(self):
+        """Refresh the cache."""
+        if refresh_system_monitor_cache():
+            self.logger.info("System monitor cache refreshed.")
+        else:
+            self.logger.error("Failed to refresh the system monitor cache.")
@@ -0,0 +1,121 @@
+"""Tests for the cached system monitor data."""
+
+from datetime import timedelta
+
+import pytest
+
+from coldfront.core.utils.common import utc_now_offset_aware
+from coldfront.plugins.system_monitor import utils
+from coldfront.plugins.system_monitor.utils import (
+    SYSTEM_MONITOR_CACHE_KEY,
+    SYSTEM_MONITOR_STALE_AFTER,
+    get_cached_system_monitor_data,
+    refresh_system_monitor_cache,
+)
+
+DATA = {"utilization_data": {}, "jobs_data": {}, "last_updated": "now"}
+
+
+@pytest.fixture
+def async_tasks(monkeypatch):
+    """Record the names of functions passed to async_task instead of
+    running them."""
+    tasks = []
+    monkeypatch.setattr(utils, "async_task", lambda func, *args: tasks.append(func))
+    return tasks
+
+
+@pytest.fixture
+def shared_cache(locmem_cache, monkeypatch):
+    """Use an in-memory cache, treated as shared between processes."""
+    monkeypatch.setattr(utils, "_is_cache_shared", lambda: True)
+    return locmem_cache
+
+
+@pytest.fixture
+def async_q(settings):
+    """Have django-q run tasks asynchronously."""
+    settings.Q_CLUSTER = {**settings.Q_CLUSTER, "sync": False}
+
+
+@pytest.fixture
+def status_page_data(monkeypatch, settings):
+    """Replace the data returned from the status page with the returned
+    dict, which may be modified."""
+    settings.SYSTEM_MONITOR_ENDPOINT = "http://localhost/status/status.html"
+    settings.SYSTEM_MONITOR_PANEL_TITLE = "HPC Cluster Status"
+    data = dict(DATA)
+    monkeypatch.setattr(utils.SystemMonitor, "get_data", lambda self: data)
+    return data
+
+
+@pytest.mark.unit
+class TestSystemMonitorCache:
+    """Tests for refresh_system_monitor_cache and
+    get_cached_system_monitor_data."""
+
+    def test_refresh_caches_data(self, locmem_cache, status_page_data):
+        """Test that a successful refresh caches the data with the time
+        of the refresh."""
+        assert refresh_system_monitor_cache()
+
+        cached = locmem_cache.get(SYSTEM_MONITOR_CACHE_KEY)
+        assert cached["data"] == DATA
+        assert utc_now_offset_aware() - cached["last_success"] < timedelta(minutes=1)
+
+    def test_failed_refresh_retains_stale_data(self, locmem_cache, status_page_data):
+        """Test that a failed refresh retains previously cached data."""
+        refresh_system_monitor_cache()
+        status_page_data.clear()
+
+        assert not refresh_system_monitor_cache()
+        assert locmem_cache.get(SYSTEM_MONITOR_CACHE_KEY)["data"] == DATA
+
+    def test_fresh_data_returned_without_refresh(
+        self, shared_cache, async_q, status_page_data, async_tasks
+    ):
+        """Test that fresh cached data are returned without requesting
+        a refresh."""
+        refresh_system_monitor_cache()
+
+        assert get_cached_system_monitor_data()["data"] == DATA
+        assert async_tasks == []
+
+    def test_stale_data_returned_and_refresh_requested_once(
+        self, shared_cache, async_q, async_tasks
+    ):
+        """Test that stale cached data are returned, and that a refresh
+        is requested in the background only once."""
+        last_success = (
+            utc_now_offset_aware() - SYSTEM_MONITOR_STALE_AFTER - timedelta(1)
+        )
+        shared_cache.set(
+            SYSTEM_MONITOR_CACHE_KEY, {"data": DATA, "last_success": last_success}
+        )
+
+        assert get_cached_system_monitor_data()["data"] == DATA
+        assert get_cached_system_monitor_data()["data"] == DATA
+        assert async_tasks == [
+            "coldfront.plugins.system_monitor.utils.refresh_system_monitor_cache"
+        ]
+
+    def test_missing_data_requests_refresh(self, shared_cache, async_q, async_tasks):
+        """Test that, if there are no cached data, None is returned and
+        a refresh is requested."""
+        assert get_cached_system_monitor_data() is None
+        assert len(async_tasks) == 1
+
+    def test_no_refresh_requested_with_sync_q(
+        self, shared_cache, status_page_data, async_tasks
+    ):
+        """Test that, if django-q runs tasks synchronously, rendering
+        does not request a refresh, which would run inline, but leaves
+        it to the scheduled refresh."""
+        assert get_cached_system_monitor_data() is None
+        assert async_tasks == []
+
+    def test_fetched_if_cache_not_shared(self, status_page_data, async_tasks):
+        """Test that, if the cache is not shared (by default, it is a
+        dummy cache), the data are fetched instead."""
+        assert get_cached_system_monitor_data()["data"] == DATA
+        assert async_tasks == []
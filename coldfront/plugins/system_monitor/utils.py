@@ -1,21 +1,57 @@
+from datetime import timedelta
+import logging
 import re
 
 from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django_q.tasks import async_task
 import requests
 
-from coldfront.core.utils.common import import_from_settings
+from coldfront.core.utils.common import import_from_settings, utc_now_offset_aware
+
+"""Methods relating to the system monitor panel on the home page.
+
+The status page is fetched and parsed by a scheduled task (see the
+refresh_system_monitor_cache management command), which stores the
+parsed data in the Django cache. Rendering the panel only reads the
+cache. If the cached data are stale, they are still displayed, and, if
+django-q runs tasks asynchronously, a refresh is requested in the
+background.
+
+If the cache is not shared between processes (e.g., the default dummy
+cache), data cached by the task are not visible when rendering, so the
+status page is fetched while rendering instead."""
+
+
+logger = logging.getLogger(__name__)
+
+
+SYSTEM_MONITOR_CACHE_KEY = "system_monitor_data"
+
+# The key of a short-lived entry that limits how often a background
+# refresh may be requested, e.g., while the status page is unavailable.
+SYSTEM_MONITOR_REFRESH_LOCK_CACHE_KEY = "system_monitor_refresh_lock"
+SYSTEM_MONITOR_REFRESH_LOCK_TIMEOUT = 60
+
+# The age after which cached data are considered stale.
+SYSTEM_MONITOR_STALE_AFTER = timedelta(minutes=10)
 
 
 def get_system_monitor_context():
     context = {}
-    system_monitor = SystemMonitor()
-    system_monitor_data = system_monitor.get_data()
-    system_monitor_panel_title = system_monitor.get_panel_title()
+    cached = get_cached_system_monitor_data()
+    system_monitor_data = cached["data"] if cached else {}
 
     context["last_updated"] = system_monitor_data.get("last_updated")
     context["utilization_data"] = system_monitor_data.get("utilization_data")
     context["jobs_data"] = system_monitor_data.get("jobs_data")
-    context["system_monitor_panel_title"] = system_monitor_panel_title
+    context["system_monitor_last_success"] = cached["last_success"] if cached else None
+    context["system_monitor_panel_title"] = import_from_settings(
+        "SYSTEM_MONITOR_PANEL_TITLE"
+    )
     context["SYSTEM_MONITOR_DISPLAY_XDMOD_LINK"] = import_from_settings(
         "SYSTEM_MONITOR_DISPLAY_XDMOD_LINK", None
     )
@@ -26,8 +62,86 @@ def get_system_monitor_context():
     return context
 
 
+def get_cached_system_monitor_data():
+    """Return the cached system monitor data, a dict with keys "data"
+    (the parsed data) and "last_success" (the datetime at which they
+    were fetched), or None if there are none.
+
+    If the data are missing or stale, request a refresh in the
+    background, without waiting for it, unless django-q runs tasks
+    synchronously, in which case leave it to the scheduled refresh.
+
+    If the cache is not shared, fetch the data instead."""
+    if not _is_cache_shared():
+        data = _fetch_system_monitor_data()
+        return {"data": data, "last_success": utc_now_offset_aware()} if data else None
+
+    cached = cache.get(SYSTEM_MONITOR_CACHE_KEY)
+    is_stale = (
+        cached is None
+        or utc_now_offset_aware() - cached["last_success"] > SYSTEM_MONITOR_STALE_AFTER
+    )
+    if (
+        is_stale
+        and not settings.Q_CLUSTER.get("sync", False)
+        and cache.add(
+            SYSTEM_MONITOR_REFRESH_LOCK_CACHE_KEY,
+            True,
+            timeout=SYSTEM_MONITOR_REFRESH_LOCK_TIMEOUT,
+        )
+    ):
+        try:
+            async_task(
+                "coldfront.plugins.system_monitor.utils.refresh_system_monitor_cache"
+            )
+        except Exception as e:
+            logger.exception(
+                f"Failed to request a system monitor refresh. Details:\n{e}"
+            )
+    return cached
+
+
+def _is_cache_shared():
+    """Return whether the default cache is shared between processes,
+    i.e., whether data cached by the scheduled refresh are visible."""
+    return not isinstance(caches["default"], (DummyCache, LocMemCache))
+
+
+def refresh_system_monitor_cache():
+    """Fetch and parse the status page, and, if successful, store the
+    parsed data in the cache, along with the current time. Otherwise,
+    retain any previously cached data.
+
+    Returns:
+        - bool: whether the refresh succeeded
+    """
+    data = _fetch_system_monitor_data()
+    if not data:
+        logger.warning("Failed to refresh system monitor data. Retaining stale data.")
+        return False
+
+    cache.set(
+        SYSTEM_MONITOR_CACHE_KEY,
+        {"data": data, "last_success": utc_now_offset_aware()},
+        timeout=None,
+    )
+    return True
+
+
+def _fetch_system_monitor_data():
+    """Fetch and parse the status page, and return the parsed data, or
+    an empty dict if unsuccessful."""
+    try:
+        return SystemMonitor().get_data()
+    except Exception as e:
+        logger.exception(f"Failed to fetch system monitor data. Details:\n{e}")
+        return {}
+
+
 class SystemMonitor:
-    """If anything fails, the home page will still work"""
+    """Fetch and parse the status page. Since this may be slow, it
+    should only be used to refresh cached data (see
+    refresh_system_monitor_cache)."""
 
     RESPONSE_PARSER_FUNCTION = "parse_html_using_beautiful_soup"
     primary_color = "#002f56"
@@ -42,7 +156,6 @@ class SystemMonitor:
         self.response = None
         self.data = {}
         self.parse_function = getattr(self, self.RESPONSE_PARSER_FUNCTION)
-        self.fetch_data()
 
     def fetch_data(self):
         try:
@@ -159,7 +272,9 @@ class SystemMonitor:
         self.parse_function()
 
     def get_data(self):
-        self.parse_response()
+        self.fetch_data()
+        if self.response is not None:
+            self.parse_response()
         return self.data
 
     def get_panel_title(self):
@@ -1,18 +1,32 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 import logging
 import os
 import sys
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
-from coldfront.core.allocation.models import Allocation
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationAttributeUsage,
+)
 from coldfront.plugins.xdmod.utils import (
     XDMOD_ACCOUNT_ATTRIBUTE_NAME,
     XDMOD_CLOUD_CORE_TIME_ATTRIBUTE_NAME,
     XDMOD_CLOUD_PROJECT_ATTRIBUTE_NAME,
     XDMOD_CPU_HOURS_ATTRIBUTE_NAME,
+    XDMOD_MAX_CONNECTIONS_PER_HOST,
     XDMOD_RESOURCE_ATTRIBUTE_NAME,
     XdmodNotFoundError,
+    get_xdmod_client,
+    xdmod_fetch_all_cloud_core_time,
+    xdmod_fetch_all_total_cpu_hours,
     xdmod_fetch_cloud_core_time,
     xdmod_fetch_total_cpu_hours,
 )
@@ -51,6 +65,25 @@ class Command(BaseCommand):
             help="XDMoD statistic (default total_cpu_hours)",
             required=True,
         )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            help=(
+                "Number of concurrent requests to XDMoD (default "
+                "XDMOD_MAX_CONNECTIONS_PER_HOST)"
+            ),
+            type=int,
+            default=XDMOD_MAX_CONNECTIONS_PER_HOST,
+        )
+        parser.add_argument(
+            "--per-allocation",
+            action="store_true",
+            help=(
+                "Query XDMoD once per allocation, instead of once per period "
+                "and set of resources, grouped by account or project"
+            ),
+            default=False,
+        )
 
     def write(self, data):
         try:
@@ -60,6 +93,161 @@ class Command(BaseCommand):
             os.dup2(devnull, sys.stdout.fileno())
             sys.exit(1)
 
+    @staticmethod
+    def _pi_usernames(allocation):
+        """Return the comma-separated usernames of the PIs of the given
+        Allocation's Project."""
+        return ",".join(allocation.project.pis().values_list("username", flat=True))
+
+    def fetch_all(self, fetch, queries):
+        """Given a list of (allocation, name, resources, limit) tuples,
+        yield each tuple along with its usage, as returned by the given
+        fetch function, or None if XDMoD has no data for it, in order.
+
+        Usage is fetched concurrently by up to self.workers threads,
+        which share a client, and so its connections and cache. Only
+        the calling thread accesses the database."""
+        client = get_xdmod_client()
+        with self._executor() as executor:
+            futures = [
+                executor.submit(
+                    fetch,
+                    allocation.start_date,
+                    allocation.end_date,
+                    name,
+                    resources=resources,
+                    client=client,
+                )
+                for allocation, name, resources, _ in queries
+            ]
+            for query, future in zip(queries, futures, strict=True):
+                try:
+                    usage = future.result()
+                except XdmodNotFoundError:
+                    usage = None
+                yield query, usage
+
+    def fetch_grouped(self, fetch, queries):
+        """Like fetch_all, but fetch usage with a single request for
+        each distinct period and set of resources in the queries, using
+        the given fetch function, which returns a dict mapping each
+        account or project to its usage, and look up each query's
+        usage in the result by its account or project name.
+
+        Log the allocations without a matching row, and, as an error,
+        requests whose rows match no allocation, which suggests that
+        XDMoD labels rows with something other than account or project
+        names."""
+        client = get_xdmod_client()
+        keys = [
+            (allocation.start_date, allocation.end_date, tuple(sorted(resources)))
+            for allocation, _, resources, _ in queries
+        ]
+        with self._executor() as executor:
+            futures = {
+                key: executor.submit(
+                    fetch, key[0], key[1], resources=list(key[2]), client=client
+                )
+                for key in dict.fromkeys(keys)
+            }
+            logger.info(
+                "Fetching usage of %d allocations in %d requests",
+                len(queries),
+                len(futures),
+            )
+            unmatched = {key: [] for key in futures}
+            num_queries = Counter(keys)
+            for query, key in zip(queries, keys, strict=True):
+                usage = futures[key].result().get(query[1])
+                if usage is None:
+                    unmatched[key].append(query)
+                yield query, usage
+
+        for key, future in futures.items():
+            if not unmatched[key]:
+                continue
+            start, end, resources = key
+            logger.warn(
+                "No row of grouped XDMoD usage for %s to %s on %s matched "
+                "allocations: %s",
+                start,
+                end,
+                ",".join(resources),
+                ", ".join(
+                    f"{allocation.pk} ({name})"
+                    for allocation, name, _, _ in unmatched[key]
+                ),
+            )
+            rows = future.result()
+            if rows and len(unmatched[key]) == num_queries[key]:
+                logger.error(
+                    "None of the %d rows of grouped XDMoD usage for %s to %s on "
+                    "%s matched an allocation. Rows are matched by their labels "
+                    "(e.g., %s), which must be account or project names. Use "
+                    "--per-allocation if they are not.",
+                    len(rows),
+                    start,
+                    end,
+                    ",".join(resources),
+                    next(iter(rows)),
+                )
+
+    def fetch(self, fetch, fetch_grouped, queries, filtered):
+        """Fetch the usage of the given queries, one at a time with
+        the first function if grouping is disabled or the allocations
+        are filtered by account or project, and grouped with the second
+        function otherwise."""
+        if self.per_allocation or filtered:
+            return self.fetch_all(fetch, queries)
+        return self.fetch_grouped(fetch_grouped, queries)
+
+    def _executor(self):
+        return ThreadPoolExecutor(
+            max_workers=max(self.workers, 1), thread_name_prefix="xdmod_usage"
+        )
+
+    @staticmethod
+    def set_usages(name, usages):
+        """Given a list of (allocation, usage) pairs, set the usage of
+        each allocation's attribute with the given name, as
+        Allocation.set_usage does, in a fixed number of queries."""
+        values = {allocation.pk: Decimal(usage) for allocation, usage in usages}
+        attributes = {}
+        for attribute in (
+            AllocationAttribute.objects.filter(
+                allocation_id__in=values,
+                allocation_attribute_type__name=name,
+                allocation_attribute_type__has_usage=True,
+            )
+            .select_related("allocationattributeusage")
+            .order_by("pk")
+        ):
+            attributes.setdefault(attribute.allocation_id, attribute)
+
+        now = timezone.now()
+        created, updated = [], []
+        for allocation_id, attribute in attributes.items():
+            try:
+                usage = attribute.allocationattributeusage
+            except AllocationAttributeUsage.DoesNotExist:
+                created.append(
+                    AllocationAttributeUsage(
+                        allocation_attribute=attribute, value=values[allocation_id]
+                    )
+                )
+                continue
+            usage.value = values[allocation_id]
+            usage.modified = now
+            updated.append(usage)
+
+        with transaction.atomic():
+            if created:
+                bulk_create_with_history(created, AllocationAttributeUsage)
+            if updated:
+                bulk_update_with_history(
+                    updated, AllocationAttributeUsage, ["value", "modified"]
+                )
+
     def process_total_cpu_hours(self):
         header = [
             "allocation_id",
@@ -89,7 +277,10 @@ class Command(BaseCommand):
         )
 
         if self.filter_user:
-            allocations = allocations.filter(project__pi__username=self.filter_user)
+            allocations = allocations.filter(
+                project__projectuser__user__username=self.filter_user,
+                project__projectuser__role__name="Principal Investigator",
+            )
 
         if self.filter_account:
             allocations = allocations.filter(
@@ -99,6 +290,7 @@ class Command(BaseCommand):
                 & Q(allocationattribute__value=self.filter_account)
             )
 
+        queries = []
         for s in allocations.distinct():
             account_name = s.get_attribute(XDMOD_ACCOUNT_ATTRIBUTE_NAME)
             if not account_name:
@@ -142,11 +334,16 @@ class Command(BaseCommand):
                 )
                 continue
 
-            try:
-                usage = xdmod_fetch_total_cpu_hours(
-                    s.start_date, s.end_date, account_name, resources=resources
-                )
-            except XdmodNotFoundError:
+            queries.append((s, account_name, resources, cpu_hours))
+
+        usages = []
+        for (s, account_name, resources, cpu_hours), usage in self.fetch(
+            xdmod_fetch_total_cpu_hours,
+            xdmod_fetch_all_total_cpu_hours,
+            queries,
+            filtered=bool(self.filter_account),
+        ):
+            if usage is None:
                 logger.warn(
                     "No data in XDMoD found for allocation %s account %s resources %s",
                     s,
@@ -163,14 +360,13 @@ class Command(BaseCommand):
                 cpu_hours,
                 resources,
             )
-            if self.sync:
-                s.set_usage(XDMOD_CPU_HOURS_ATTRIBUTE_NAME, usage)
+            usages.append((s, usage))
 
             self.write(
                 "\t".join(
                     [
                         str(s.id),
-                        s.project.pi.username,
+                        self._pi_usernames(s),
                         account_name,
                         ",".join(resources),
                         str(cpu_hours),
@@ -179,6 +375,9 @@ class Command(BaseCommand):
                 )
             )
 
+        if self.sync:
+            self.set_usages(XDMOD_CPU_HOURS_ATTRIBUTE_NAME, usages)
+
     def process_cloud_core_time(self):
         header = [
             "allocation_id",
@@ -208,7 +407,10 @@ class Command(BaseCommand):
         )
 
         if self.filter_user:
-            allocations = allocations.filter(project__pi__username=self.filter_user)
+            allocations = allocations.filter(
+                project__projectuser__user__username=self.filter_user,
+                project__projectuser__role__name="Principal Investigator",
+            )
 
         if self.filter_project:
             allocations = allocations.filter(
@@ -218,6 +420,7 @@ class Command(BaseCommand):
                 & Q(allocationattribute__value=self.filter_project)
             )
 
+        queries = []
         for s in allocations.distinct():
             project_name = s.get_attribute(XDMOD_CLOUD_PROJECT_ATTRIBUTE_NAME)
             if not project_name:
@@ -261,11 +464,16 @@ class Command(BaseCommand):
                 )
                 continue
 
-            try:
-                usage = xdmod_fetch_cloud_core_time(
-                    s.start_date, s.end_date, project_name, resources=resources
-                )
-            except XdmodNotFoundError:
+            queries.append((s, project_name, resources, core_time))
+
+        usages = []
+        for (s, project_name, resources, core_time), usage in self.fetch(
+            xdmod_fetch_cloud_core_time,
+            xdmod_fetch_all_cloud_core_time,
+            queries,
+            filtered=bool(self.filter_project),
+        ):
+            if usage is None:
                 logger.warn(
                     "No data in XDMoD found for allocation %s project %s resources %s",
                     s,
@@ -282,14 +490,13 @@ class Command(BaseCommand):
                 core_time,
                 resources,
             )
-            if self.sync:
-                s.set_usage(XDMOD_CLOUD_CORE_TIME_ATTRIBUTE_NAME, usage)
+            usages.append((s, usage))
 
             self.write(
                 "\t".join(
                     [
                         str(s.id),
-                        s.project.pi.username,
+                        self._pi_usernames(s),
                         project_name,
                         ",".join(resources),
                         str(core_time),
@@ -298,6 +505,9 @@ class Command(BaseCommand):
                 )
             )
 
+        if self.sync:
+            self.set_usages(XDMOD_CLOUD_CORE_TIME_ATTRIBUTE_NAME, usages)
+
     def handle(self, *args, **options):
         verbosity = int(options["verbosity"])
         root_logger = logging.getLogger("")
@@ -337,6 +547,8 @@ class Command(BaseCommand):
             self.print_header = True
         if options["statistic"]:
             statistic = options["statistic"]
+        self.workers = options["workers"]
+        self.per_allocation = options["per_allocation"]
 
         if statistic == "total_cpu_hours":
             self.process_total_cpu_hours()
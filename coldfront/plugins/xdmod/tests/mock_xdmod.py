@@ -0,0 +1,111 @@
+"""A local stand-in for the XDMoD API, for testing."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+
+class MockXdmodServer:
+    """An HTTP server, run in a background thread, that answers XDMoD
+    get_data queries from the usage in a dict mapping (realm, name) to
+    a value, where name is the PI (e.g., the Slurm account) for the
+    "Jobs" realm and the project for the "Cloud" realm. Queries not
+    filtered by name get a row for each name in the realm.
+
+    Each query is recorded. The server can be made to fail a number of
+    requests with a 503 status, and to delay each response, to test
+    retries and concurrency limits.
+    """
+
+    ENDPOINT = "/controllers/user_interface.php"
+
+    def __init__(self, usage=None):
+        self.usage = dict(usage or {})
+        self.queries = []
+        self.num_failures = 0
+        self.delay = 0
+        self.max_concurrent_requests = 0
+
+        self._lock = threading.Lock()
+        self._num_concurrent_requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def respond(self, path, query):
+        """Return the status and body of the response to a request for
+        the given path with the given query parameters."""
+        with self._lock:
+            self.queries.append(query)
+            if self.num_failures > 0:
+                self.num_failures -= 1
+                return 503, "Service Unavailable"
+
+        if path != self.ENDPOINT or query.get("operation") != "get_data":
+            return 404, "Not Found"
+
+        realm = query.get("realm")
+        if realm == "Jobs":
+            name = query.get("pi_filter", "").strip('"')
+        else:
+            name = query.get("project_filter", "")
+        if name:
+            names = [name] if (realm, name) in self.usage else []
+        else:
+            # Without a filter, return a row for each name in the realm.
+            names = sorted(n for r, n in self.usage if r == realm)
+
+        rows = "".join(
+            f"<row><cell><value>{escape(n)}</value></cell>"
+            f"<cell><value>{escape(str(self.usage[realm, n]))}</value></cell></row>"
+            for n in names
+        )
+        return 200, f"<xdmod-xml-dataset><rows>{rows}</rows></xdmod-xml-dataset>"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server._num_concurrent_requests += 1
+                    server.max_concurrent_requests = max(
+                        server.max_concurrent_requests,
+                        server._num_concurrent_requests,
+                    )
+                try:
+                    time.sleep(server.delay)
+                    parts = urlsplit(self.path)
+                    query = {
+                        key: values[0] for key, values in parse_qs(parts.query).items()
+                    }
+                    status, body = server.respond(parts.path, query)
+                finally:
+                    with server._lock:
+                        server._num_concurrent_requests -= 1
+
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,32 @@
+"""Shared pytest fixtures for XDMoD plugin tests."""
+
+import pytest
+
+
+def pytest_configure(config):
+    """Set XDMOD_API_URL, which the plugin requires on import, if it is
+    not already set. Tests point it at a MockXdmodServer instead."""
+    from django.conf import settings
+
+    if not hasattr(settings, "XDMOD_API_URL"):
+        settings.XDMOD_API_URL = "http://localhost"
+
+
+@pytest.fixture
+def mock_xdmod(monkeypatch, tmp_path):
+    """Run a MockXdmodServer, and direct requests from a fresh shared
+    client, which retries without backoff and caches responses under
+    tmp_path, to it."""
+    from coldfront.plugins.xdmod import utils as xdmod_utils
+    from coldfront.plugins.xdmod.tests.mock_xdmod import MockXdmodServer
+
+    server = MockXdmodServer()
+    server.start()
+    monkeypatch.setattr(xdmod_utils, "XDMOD_API_URL", server.url)
+    monkeypatch.setattr(
+        xdmod_utils,
+        "_client",
+        xdmod_utils.XdmodClient(backoff_factor=0, cache_dir=str(tmp_path / "cache")),
+    )
+    yield server
+    server.stop()
@@ -0,0 +1,201 @@
+"""Tests for the xdmod_usage management command."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+import pytest
+
+from coldfront.core.allocation.models import (
+    Allocation,
+    AllocationAttribute,
+    AllocationAttributeType,
+    AllocationAttributeUsage,
+    AllocationStatusChoice,
+)
+from coldfront.core.resource.models import (
+    AttributeType,
+    Resource,
+    ResourceAttribute,
+    ResourceAttributeType,
+    ResourceType,
+)
+from coldfront.plugins.xdmod import utils as xdmod_utils
+from coldfront.plugins.xdmod.management.commands.xdmod_usage import Command
+
+NUM_ALLOCATIONS = 6
+
+
+@pytest.fixture
+def allocations(create_active_project_with_pi):
+    """Return NUM_ALLOCATIONS active Allocations of a cluster in XDMoD,
+    with accounts named "xdmod_<i>"."""
+    pi = User.objects.create(username="xdmod_pi", email="xdmod_pi@example.com")
+    project = create_active_project_with_pi("fc_xdmod", pi)
+    resource = Resource.objects.create(
+        name="xdmod-cluster",
+        description="",
+        resource_type=ResourceType.objects.get(name="Cluster"),
+    )
+    ResourceAttribute.objects.create(
+        resource=resource,
+        resource_attribute_type=ResourceAttributeType.objects.get_or_create(
+            name="xdmod_resource",
+            defaults={"attribute_type": AttributeType.objects.get(name="Text")},
+        )[0],
+        value="cluster.example",
+    )
+
+    allocations = []
+    for i in range(NUM_ALLOCATIONS):
+        allocation = Allocation.objects.create(
+            project=project,
+            status=AllocationStatusChoice.objects.get(name="Active"),
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31),
+        )
+        allocation.resources.add(resource)
+        for name, value in [
+            ("slurm_account_name", f"xdmod_{i}"),
+            ("Core Usage (Hours)", "1000"),
+        ]:
+            AllocationAttribute.objects.create(
+                allocation=allocation,
+                allocation_attribute_type=AllocationAttributeType.objects.get(
+                    name=name
+                ),
+                value=value,
+            )
+        allocations.append(allocation)
+    return allocations
+
+
+def xdmod_usage(**options):
+    out = StringIO()
+    call_command(
+        Command(), statistic="total_cpu_hours", sync=True, stdout=out, **options
+    )
+    return out.getvalue().splitlines()
+
+
+def get_usage(allocation):
+    return AllocationAttributeUsage.objects.get(
+        allocation_attribute__allocation=allocation,
+        allocation_attribute__allocation_attribute_type__name="Core Usage (Hours)",
+    ).value
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestXdmodUsage:
+    """Tests for fetching usage from XDMoD."""
+
+    def test_usage_synced(self, allocations, mock_xdmod):
+        """Test that the usage of each Allocation with data in XDMoD is
+        fetched in a single grouped request, and stored, in the order of
+        the Allocations."""
+        mock_xdmod.usage = {
+            ("Jobs", f"xdmod_{i}"): 10 * i for i in range(NUM_ALLOCATIONS - 1)
+        }
+        mock_xdmod.usage["Jobs", "other"] = 1
+        num_historical_usages = AllocationAttributeUsage.history.count()
+        rows = xdmod_usage()
+
+        [query] = mock_xdmod.queries
+        assert query["group_by"] == "pi"
+        assert "pi_filter" not in query
+        assert [row.split("\t")[2] for row in rows] == [
+            f"xdmod_{i}" for i in range(NUM_ALLOCATIONS - 1)
+        ]
+        assert rows[1].split("\t")[1] == "xdmod_pi"
+        for i, allocation in enumerate(allocations[:-1]):
+            assert get_usage(allocation) == Decimal(10 * i)
+        assert get_usage(allocations[-1]) == 0
+        assert (
+            AllocationAttributeUsage.history.count()
+            == num_historical_usages + NUM_ALLOCATIONS - 1
+        )
+
+    def test_unmatched_logged(self, allocations, mock_xdmod, caplog):
+        """Test that Allocations without a matching grouped row are
+        logged."""
+        mock_xdmod.usage = {("Jobs", "xdmod_0"): 5}
+        xdmod_usage()
+        [warning] = [r for r in caplog.records if "matched allocations" in r.message]
+        assert f"{allocations[1].pk} (xdmod_1)" in warning.message
+        assert f"{allocations[0].pk} (xdmod_0)" not in warning.message
+        assert not [r for r in caplog.records if r.levelname == "ERROR"]
+
+    def test_unmatched_labels_logged(self, allocations, mock_xdmod, caplog):
+        """Test that an error is logged if XDMoD labels grouped rows
+        with something other than account names."""
+        mock_xdmod.usage = {("Jobs", "Smith, Jane"): 5}
+        assert xdmod_usage() == []
+        [error] = [r for r in caplog.records if r.levelname == "ERROR"]
+        assert "Smith, Jane" in error.message
+
+    def test_grouped_by_period(self, allocations, mock_xdmod):
+        """Test that one request is made for each distinct period of the
+        Allocations."""
+        for allocation in allocations[:2]:
+            allocation.end_date = date(2026, 6, 30)
+            allocation.save()
+        xdmod_usage()
+        assert sorted(query["end_date"] for query in mock_xdmod.queries) == [
+            "2026-06-30",
+            "2026-12-31",
+        ]
+
+    @pytest.mark.parametrize(
+        "options", [{"per_allocation": True}, {"account": "xdmod_1"}]
+    )
+    def test_per_allocation(self, allocations, mock_xdmod, options):
+        """Test that usage is fetched for each Allocation separately if
+        requested, or if the Allocations are filtered by account."""
+        mock_xdmod.usage = {
+            ("Jobs", f"xdmod_{i}"): 10 * i for i in range(NUM_ALLOCATIONS)
+        }
+        rows = xdmod_usage(**options)
+        assert len(mock_xdmod.queries) == len(rows)
+        accounts = [row.split("\t")[2] for row in rows]
+        assert sorted(query["pi_filter"] for query in mock_xdmod.queries) == [
+            f'"{account}"' for account in accounts
+        ]
+        assert get_usage(allocations[1]) == Decimal(10)
+
+    def test_responses_cached(self, allocations, mock_xdmod):
+        """Test that a rerun reads responses from the on-disk cache."""
+        mock_xdmod.usage = {("Jobs", "xdmod_0"): 5}
+        first = xdmod_usage(per_allocation=True)
+        assert len(mock_xdmod.queries) == NUM_ALLOCATIONS
+
+        assert xdmod_usage(per_allocation=True) == first
+        assert len(mock_xdmod.queries) == NUM_ALLOCATIONS
+
+    def test_transient_errors_retried(self, allocations, mock_xdmod):
+        """Test that requests that fail with a transient error status
+        are retried."""
+        mock_xdmod.usage = {("Jobs", f"xdmod_{i}"): 1 for i in range(NUM_ALLOCATIONS)}
+        mock_xdmod.num_failures = 2
+        assert len(xdmod_usage()) == NUM_ALLOCATIONS
+        assert len(mock_xdmod.queries) == 1 + 2
+
+    def test_persistent_errors_raised(self, allocations, mock_xdmod):
+        """Test that requests that keep failing raise an error."""
+        mock_xdmod.num_failures = 100
+        with pytest.raises(xdmod_utils.XdmodError, match="503"):
+            xdmod_usage()
+
+    def test_concurrency_limited(self, allocations, mock_xdmod, monkeypatch):
+        """Test that requests are concurrent, but limited per host."""
+        monkeypatch.setattr(
+            xdmod_utils,
+            "_client",
+            xdmod_utils.XdmodClient(max_connections_per_host=2, cache_dir=""),
+        )
+        mock_xdmod.delay = 0.05
+        xdmod_usage(workers=NUM_ALLOCATIONS, per_allocation=True)
+        assert len(mock_xdmod.queries) == NUM_ALLOCATIONS
+        assert mock_xdmod.max_concurrent_requests == 2
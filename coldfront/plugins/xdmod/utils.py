@@ -1,8 +1,16 @@
+import hashlib
 import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
 import xml.etree.ElementTree as ET
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from coldfront.core.utils.common import import_from_settings
 
@@ -22,6 +30,19 @@ XDMOD_CPU_HOURS_ATTRIBUTE_NAME = import_from_settings(
     "XDMOD_CPU_HOURS_ATTRIBUTE_NAME", "Core Usage (Hours)"
 )
 XDMOD_API_URL = import_from_settings("XDMOD_API_URL")
+# The maximum number of concurrent requests to each XDMoD host.
+XDMOD_MAX_CONNECTIONS_PER_HOST = import_from_settings(
+    "XDMOD_MAX_CONNECTIONS_PER_HOST", 4
+)
+# The number of times, and the backoff factor (in seconds) with which, to
+# retry requests that fail to connect or return a transient error status.
+XDMOD_MAX_RETRIES = import_from_settings("XDMOD_MAX_RETRIES", 3)
+XDMOD_RETRY_BACKOFF_FACTOR = import_from_settings("XDMOD_RETRY_BACKOFF_FACTOR", 0.5)
+XDMOD_REQUEST_TIMEOUT = import_from_settings("XDMOD_REQUEST_TIMEOUT", 60)
+# A directory in which to cache responses, and the number of seconds for
+# which they are valid. Responses are not cached if the directory is None.
+XDMOD_CACHE_DIR = import_from_settings("XDMOD_CACHE_DIR", None)
+XDMOD_CACHE_TIMEOUT = import_from_settings("XDMOD_CACHE_TIMEOUT", 60 * 60)
 
 _ENDPOINT_CORE_HOURS = "/controllers/user_interface.php"
 
@@ -45,27 +66,159 @@ class XdmodNotFoundError(XdmodError):
     pass
 
 
-def xdmod_fetch_total_cpu_hours(start, end, account, resources=None):
-    if resources is None:
-        resources = []
+class XdmodClient:
+    """A client for the XDMoD API that reuses connections and may be
+    used from multiple threads.
+
+    Requests share a session whose connection pool holds up to
+    XDMOD_MAX_CONNECTIONS_PER_HOST connections per host, and no more
+    than that many requests to a host run at once. Requests that fail
+    to connect or return a transient error status are retried up to
+    XDMOD_MAX_RETRIES times, with exponential backoff.
+
+    If XDMOD_CACHE_DIR is set, the text of successful responses is
+    cached in that directory for XDMOD_CACHE_TIMEOUT seconds, keyed by
+    the query (e.g., the account, resources, and date range), so that
+    repeated runs do not fetch the same data again.
+    """
+
+    STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        max_connections_per_host=None,
+        max_retries=None,
+        backoff_factor=None,
+        cache_dir=None,
+        cache_timeout=None,
+    ):
+        if max_connections_per_host is None:
+            max_connections_per_host = XDMOD_MAX_CONNECTIONS_PER_HOST
+        if max_retries is None:
+            max_retries = XDMOD_MAX_RETRIES
+        if backoff_factor is None:
+            backoff_factor = XDMOD_RETRY_BACKOFF_FACTOR
+        self.max_connections_per_host = max_connections_per_host
+        self.cache_dir = XDMOD_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_timeout = (
+            XDMOD_CACHE_TIMEOUT if cache_timeout is None else cache_timeout
+        )
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.STATUS_FORCELIST,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_connections_per_host,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_semaphores = {}
+
+    def get(self, url, params):
+        """Return the text of the response to a GET request to the
+        given URL with the given parameters, from the cache if
+        possible. Raise an XdmodError if the request fails."""
+        cache_path = self._cache_path(url, params)
+        text = self._read_cache(cache_path)
+        if text is not None:
+            logger.info("Using cached XDMoD response for %s %s", url, params)
+            return text
+
+        with self._host_semaphore(url):
+            try:
+                r = self.session.get(url, params=params, timeout=XDMOD_REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                raise XdmodError(f"Failed to query XDMoD API: {e}") from e
+
+        logger.info(r.url)
+        logger.info(r.text)
+
+        if r.status_code >= 500:
+            raise XdmodError(f"XDMoD API returned status {r.status_code} for {r.url}")
+
+        if r.ok:
+            self._write_cache(cache_path, r.text)
+        return r.text
+
+    def _host_semaphore(self, url):
+        """Return the semaphore limiting concurrent requests to the host
+        of the given URL."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+
+    def _cache_path(self, url, params):
+        if not self.cache_dir:
+            return None
+        key = json.dumps([url, sorted(params.items())], default=str)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.xml")
+
+    def _read_cache(self, path):
+        if path is None:
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) >= self.cache_timeout:
+                return None
+            with open(path) as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def _write_cache(self, path, text):
+        """Write the given text to the given cache path atomically, so
+        that concurrent readers never see a partial response."""
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                fh.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to cache XDMoD response at %s: %s", path, e)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_xdmod_client():
+    """Return the XdmodClient shared by the process, creating it on
+    first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = XdmodClient()
+        return _client
+
 
+def _fetch_rows(params, client=None):
+    """Query XDMoD for usage, filtered and grouped by the given
+    parameters, and return a list of (name, value) pairs, one per row.
+    Raise an XdmodNotFoundError if XDMoD has no data."""
+    if client is None:
+        client = get_xdmod_client()
     url = f"{XDMOD_API_URL}{_ENDPOINT_CORE_HOURS}"
-    payload = _DEFAULT_PARAMS
-    payload["pi_filter"] = f'"{account}"'
-    payload["resource_filter"] = '"{}"'.format(",".join(resources))
-    payload["start_date"] = start
-    payload["end_date"] = end
-    payload["group_by"] = "pi"
-    payload["realm"] = "Jobs"
-    payload["operation"] = "get_data"
-    payload["statistic"] = "total_cpu_hours"
-    r = requests.get(url, params=payload)
-
-    logger.info(r.url)
-    logger.info(r.text)
+    payload = dict(_DEFAULT_PARAMS, **params)
+    text = client.get(url, payload)
 
     try:
-        error = r.json()
+        error = json.loads(text)
         # XXX fix me. Here we assume any json response is bad as we're
         # expecting xml but XDMoD should just return json always.
         raise XdmodNotFoundError(f"Got json response but expected XML: {error}")
@@ -73,63 +226,105 @@ def xdmod_fetch_total_cpu_hours(start, end, account, resources=None):
         pass
 
     try:
-        root = ET.fromstring(r.text)
-    except ET.ParserError as e:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
         raise XdmodError(f"Invalid XML data returned from XDMoD API: {e}")
 
     rows = root.find("rows")
+    if rows is None:
+        raise XdmodNotFoundError(f"Rows not found for {params}")
+
+    result = []
+    for row in rows.findall("row"):
+        cells = row.findall("cell")
+        if len(cells) != 2:
+            raise XdmodError(
+                "Invalid XML data returned from XDMoD API: Cells not found"
+            )
+        result.append((cells[0].find("value").text, cells[1].find("value").text))
+    return result
+
+
+def _fetch_usage(params, name, resources, client=None):
+    """Query XDMoD for the usage of the given statistic, filtered by the
+    given parameters, and return the value of its single row."""
+    rows = _fetch_rows(params, client=client)
     if len(rows) != 1:
-        raise XdmodNotFoundError(f"Rows not found for {account} - {resources}")
+        raise XdmodNotFoundError(f"Rows not found for {name} - {resources}")
+    return rows[0][1]
+
+
+def _fetch_grouped_usage(params, client=None):
+    """Query XDMoD for the usage of the given statistic, grouped by the
+    given parameters, and return a dict mapping the label of each row,
+    which is the value of its first cell, to its usage. Names without
+    data are omitted."""
+    try:
+        return dict(_fetch_rows(params, client=client))
+    except XdmodNotFoundError:
+        return {}
 
-    cells = rows.find("row").findall("cell")
-    if len(cells) != 2:
-        raise XdmodError("Invalid XML data returned from XDMoD API: Cells not found")
 
-    core_hours = cells[1].find("value").text
+def _total_cpu_hours_params(start, end, resources):
+    return {
+        "resource_filter": '"{}"'.format(",".join(resources or [])),
+        "start_date": start,
+        "end_date": end,
+        "group_by": "pi",
+        "realm": "Jobs",
+        "operation": "get_data",
+        "statistic": "total_cpu_hours",
+    }
 
-    return core_hours
 
+def _cloud_core_time_params(start, end, resources):
+    return {
+        "resource_filter": '"{}"'.format(",".join(resources or [])),
+        "start_date": start,
+        "end_date": end,
+        "group_by": "project",
+        "realm": "Cloud",
+        "operation": "get_data",
+        "statistic": "cloud_core_time",
+    }
 
-def xdmod_fetch_cloud_core_time(start, end, project, resources=None):
+
+def xdmod_fetch_total_cpu_hours(start, end, account, resources=None, client=None):
     if resources is None:
         resources = []
 
-    url = f"{XDMOD_API_URL}{_ENDPOINT_CORE_HOURS}"
-    payload = _DEFAULT_PARAMS
-    payload["project_filter"] = project
-    payload["resource_filter"] = '"{}"'.format(",".join(resources))
-    payload["start_date"] = start
-    payload["end_date"] = end
-    payload["group_by"] = "project"
-    payload["realm"] = "Cloud"
-    payload["operation"] = "get_data"
-    payload["statistic"] = "cloud_core_time"
-    r = requests.get(url, params=payload)
-
-    logger.info(r.url)
-    logger.info(r.text)
+    params = _total_cpu_hours_params(start, end, resources)
+    params["pi_filter"] = f'"{account}"'
+    return _fetch_usage(params, account, resources, client=client)
 
-    try:
-        error = r.json()
-        # XXX fix me. Here we assume any json response is bad as we're
-        # expecting xml but XDMoD should just return json always.
-        raise XdmodNotFoundError(f"Got json response but expected XML: {error}")
-    except json.decoder.JSONDecodeError:
-        pass
 
-    try:
-        root = ET.fromstring(r.text)
-    except ET.ParserError as e:
-        raise XdmodError(f"Invalid XML data returned from XDMoD API: {e}")
+def xdmod_fetch_cloud_core_time(start, end, project, resources=None, client=None):
+    if resources is None:
+        resources = []
 
-    rows = root.find("rows")
-    if len(rows) != 1:
-        raise XdmodNotFoundError(f"Rows not found for {project} - {resources}")
+    params = _cloud_core_time_params(start, end, resources)
+    params["project_filter"] = project
+    return _fetch_usage(params, project, resources, client=client)
+
+
+def xdmod_fetch_all_total_cpu_hours(start, end, resources=None, client=None):
+    """Return a dict mapping each account with jobs on the given
+    resources in the given period to its total CPU hours, in a single
+    request grouped by account.
+
+    XDMoD labels each row with the name of its PI, the same value that
+    xdmod_fetch_total_cpu_hours passes as pi_filter, which ColdFront
+    expects to be the Slurm account."""
+    params = _total_cpu_hours_params(start, end, resources)
+    return _fetch_grouped_usage(params, client=client)
 
-    cells = rows.find("row").findall("cell")
-    if len(cells) != 2:
-        raise XdmodError("Invalid XML data returned from XDMoD API: Cells not found")
 
-    core_hours = cells[1].find("value").text
+def xdmod_fetch_all_cloud_core_time(start, end, resources=None, client=None):
+    """Return a dict mapping each project with usage of the given
+    resources in the given period to its cloud core time, in a single
+    request grouped by project.
 
-    return core_hours
+    XDMoD labels each row with the name of its project, the same value
+    that xdmod_fetch_cloud_core_time passes as project_filter."""
+    params = _cloud_core_time_params(start, end, resources)
+    return _fetch_grouped_usage(params, client=client)
@@ -0,0 +1,215 @@
+"""Query-count regression tests for top pages and API endpoints.
+
+Each test requests a page or endpoint against a realistic fixture (a
+Project with hundreds of Users, each with a cluster account under the
+Project's compute Allocation) and fails if the number of queries made
+exceeds the corresponding budget in coldfront/tests/query_budgets.toml.
+
+Budgets should be set slightly above measured counts. A failure whose
+summary shows a statement repeated hundreds of times indicates an N+1
+query that scales with the number of Users."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+import pytest
+
+from coldfront.api.statistics.utils import create_project_allocation
+from coldfront.core.allocation.models import (
+    AllocationAttributeType,
+    AllocationUser,
+    AllocationUserAttribute,
+    AllocationUserStatusChoice,
+    ClusterAccessRequest,
+    ClusterAccessRequestStatusChoice,
+)
+from coldfront.core.project.models import (
+    ProjectUser,
+    ProjectUserRoleChoice,
+    ProjectUserStatusChoice,
+)
+from coldfront.core.user.models import ExpiringToken, UserProfile
+from coldfront.tests.query_budget import (
+    QueryRecorder,
+    assert_within_query_budget,
+    load_query_budgets,
+)
+
+NUM_PROJECT_USERS = 300
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    return load_query_budgets()
+
+
+@pytest.fixture
+def large_project(create_active_project_with_pi):
+    """Return a Project with NUM_PROJECT_USERS active Users, each with
+    an active cluster account under the Project's compute Allocation
+    and a pending ClusterAccessRequest."""
+    pi = User.objects.create(username="budget_pi", email="budget_pi@example.com")
+    project = create_active_project_with_pi("fc_budget", pi)
+    allocation = create_project_allocation(project, Decimal("1000.00")).allocation
+
+    users = User.objects.bulk_create(
+        [
+            User(username=f"budget_user{i}", email=f"budget_user{i}@example.com")
+            for i in range(NUM_PROJECT_USERS)
+        ]
+    )
+    # bulk_create does not send post_save, which creates profiles.
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+
+    ProjectUser.objects.bulk_create(
+        [
+            ProjectUser(
+                project=project,
+                user=user,
+                role=ProjectUserRoleChoice.objects.get(name="User"),
+                status=ProjectUserStatusChoice.objects.get(name="Active"),
+            )
+            for user in users
+        ]
+    )
+
+    allocation_users = AllocationUser.objects.bulk_create(
+        [
+            AllocationUser(
+                allocation=allocation,
+                user=user,
+                status=AllocationUserStatusChoice.objects.get(name="Active"),
+            )
+            for user in users
+        ]
+    )
+    attribute_values = [
+        ("Cluster Account Status", "Active"),
+        ("Service Units", "100.00"),
+    ]
+    AllocationUserAttribute.objects.bulk_create(
+        [
+            AllocationUserAttribute(
+                allocation=allocation,
+                allocation_user=allocation_user,
+                allocation_attribute_type=AllocationAttributeType.objects.get(
+                    name=name
+                ),
+                value=value,
+            )
+            for allocation_user in allocation_users
+            for name, value in attribute_values
+        ]
+    )
+    ClusterAccessRequest.objects.bulk_create(
+        [
+            ClusterAccessRequest(
+                allocation_user=allocation_user,
+                status=ClusterAccessRequestStatusChoice.objects.get(
+                    name="Pending - Add"
+                ),
+            )
+            for allocation_user in allocation_users
+        ]
+    )
+    return project
+
+
+@pytest.fixture
+def superuser_client(client):
+    superuser = User.objects.create_superuser(
+        username="budget_superuser", email="budget_superuser@example.com"
+    )
+    client.force_login(superuser)
+    return client
+
+
+@pytest.fixture
+def api_client(client):
+    superuser = User.objects.create_superuser(
+        username="budget_api_superuser", email="budget_api_superuser@example.com"
+    )
+    token = ExpiringToken.objects.create(user=superuser)
+    client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+    return client
+
+
+def assert_get_within_budget(client, url, name, budgets):
+    """Request the given URL with the given client, and assert that the
+    response is successful and within the budget with the given
+    name."""
+    with QueryRecorder() as recorder:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert_within_query_budget(name, recorder, budgets=budgets)
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestPageQueryBudgets:
+    """Tests that top pages stay within their query budgets."""
+
+    def test_home(self, budgets, large_project, superuser_client):
+        url = reverse("home")
+        assert_get_within_budget(superuser_client, url, "home", budgets)
+
+    def test_project_detail(self, budgets, large_project, superuser_client):
+        url = reverse("project-detail", kwargs={"pk": large_project.pk})
+        assert_get_within_budget(superuser_client, url, "project-detail", budgets)
+
+    def test_allocation_detail(self, budgets, large_project, superuser_client):
+        allocation = large_project.allocation_set.get()
+        url = reverse("allocation-detail", kwargs={"pk": allocation.pk})
+        assert_get_within_budget(superuser_client, url, "allocation-detail", budgets)
+
+    def test_project_user_table(self, budgets, large_project, superuser_client):
+        url = reverse("project-user-table", kwargs={"pk": large_project.pk})
+        assert_get_within_budget(superuser_client, url, "project-user-table", budgets)
+
+    def test_allocation_user_table(self, budgets, large_project, superuser_client):
+        allocation = large_project.allocation_set.get()
+        url = reverse("allocation-user-table", kwargs={"pk": allocation.pk})
+        assert_get_within_budget(
+            superuser_client, url, "allocation-user-table", budgets
+        )
+
+    def test_project_list(self, budgets, large_project, superuser_client):
+        url = reverse("project-list")
+        assert_get_within_budget(superuser_client, url, "project-list", budgets)
+
+    def test_request_hub(self, budgets, large_project, superuser_client):
+        url = reverse("request-hub")
+        assert_get_within_budget(superuser_client, url, "request-hub", budgets)
+
+
+@pytest.mark.django_db
+@pytest.mark.component
+class TestAPIQueryBudgets:
+    """Tests that top API endpoints stay within their query budgets."""
+
+    @pytest.mark.parametrize(
+        "name,url",
+        [
+            ("api-projects", "/api/projects/"),
+            ("api-allocations", "/api/allocations/"),
+            ("api-allocation-users", "/api/allocation_users/"),
+            ("api-cluster-access-requests", "/api/cluster_access_requests/"),
+            ("api-users", "/api/users/"),
+        ],
+    )
+    def test_list_endpoint(self, budgets, large_project, api_client, name, url):
+        assert_get_within_budget(api_client, url, name, budgets)
+
+    def test_project_users(self, budgets, large_project, api_client):
+        url = f"/api/projects/{large_project.pk}/users/"
+        assert_get_within_budget(api_client, url, "api-project-users", budgets)
+
+
+@pytest.mark.unit
+def test_budgets_well_formed(budgets):
+    """Test that every declared budget is positive and described."""
+    assert budgets
+    for budget in budgets.values():
+        assert budget.max_queries > 0
+        assert budget.description
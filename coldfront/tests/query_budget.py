@@ -0,0 +1,132 @@
+"""Helpers for enforcing per-view SQL query budgets in tests.
+
+A budget caps the number of SQL queries that a page or API endpoint may
+make for a single request. Budgets are declared in query_budgets.toml,
+next to this module, as tables keyed by budget name:
+
+    [project-detail]
+    max_queries = 40
+    description = "ProjectDetailView, as a superuser."
+
+Usage:
+    with QueryRecorder() as recorder:
+        response = client.get(url)
+    assert_within_query_budget("project-detail", recorder)
+
+Unlike django.test.utils.CaptureQueriesContext, QueryRecorder does not
+require DEBUG, records the time taken by each query, and records
+queries on all database connections.
+"""
+
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from pathlib import Path
+import time
+import tomllib
+
+from django.db import connections
+
+QUERY_BUDGETS_PATH = Path(__file__).with_name("query_budgets.toml")
+
+
+# A budget for a page or endpoint.
+#   - name: the key of the budget in the budget file
+#   - max_queries: the maximum number of queries per request
+#   - description: a description of what is measured
+QueryBudget = namedtuple("QueryBudget", ["name", "max_queries", "description"])
+
+
+# A query executed while recording.
+#   - alias: the alias of the database connection
+#   - sql: the SQL, with placeholders for parameters
+#   - duration: the number of seconds taken to execute it
+RecordedQuery = namedtuple("RecordedQuery", ["alias", "sql", "duration"])
+
+
+class QueryRecorder:
+    """A context manager that records the queries executed on all
+    database connections in the current thread."""
+
+    def __init__(self):
+        self.queries = []
+        self._exit_stack = None
+
+    def __enter__(self):
+        self.queries = []
+        self._exit_stack = ExitStack()
+        for connection in connections.all():
+            self._exit_stack.enter_context(
+                connection.execute_wrapper(self._wrapper(connection.alias))
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._exit_stack.close()
+        return False
+
+    def _wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append(
+                    RecordedQuery(alias, sql, time.perf_counter() - start)
+                )
+
+        return wrapper
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """The total number of seconds taken by recorded queries."""
+        return sum(query.duration for query in self.queries)
+
+    def most_repeated(self, n=5):
+        """Return a list of (SQL, count) tuples for the n statements
+        executed most often. Statements repeated with different
+        parameters typically indicate N+1 queries."""
+        return Counter(query.sql for query in self.queries).most_common(n)
+
+    def summary(self, n=5):
+        """Return a human-readable str summarizing the recorded
+        queries."""
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms."]
+        for sql, count in self.most_repeated(n):
+            lines.append(f"  {count} x {sql[:200]}")
+        return "\n".join(lines)
+
+
+def load_query_budgets(path=QUERY_BUDGETS_PATH):
+    """Return a dict mapping the name of each budget declared in the
+    given TOML file to a QueryBudget."""
+    with open(path, "rb") as budget_file:
+        data = tomllib.load(budget_file)
+    return {
+        name: QueryBudget(
+            name=name,
+            max_queries=int(table["max_queries"]),
+            description=table.get("description", ""),
+        )
+        for name, table in data.items()
+    }
+
+
+def assert_within_query_budget(name, recorder, budgets=None):
+    """Assert that the queries recorded by the given QueryRecorder are
+    within the budget with the given name.
+
+    Raises:
+        - AssertionError, if the budget is exceeded
+        - KeyError, if there is no budget with the given name
+    """
+    if budgets is None:
+        budgets = load_query_budgets()
+    budget = budgets[name]
+    assert recorder.count <= budget.max_queries, (
+        f'Query budget "{name}" exceeded: {recorder.count} > '
+        f"{budget.max_queries}. {recorder.summary()}"
+    )